@@ -0,0 +1,717 @@
+#!/usr/bin/env python3
+"""
+Convert Office documents with LibreOffice, optionally on warm instances.
+
+By default convert() runs `soffice --headless --convert-to` once per call.
+Every such run pays seconds of startup, and concurrent runs collide on the
+shared user profile. With OFFICE_SERVICE=on, convert() and recalculate() use
+the conversion service instead: it keeps soffice instances running, each with
+a profile of its own, and serves requests from a Unix socket, queueing them
+until an instance is free. Repeated conversions then cost only the conversion
+time.
+
+The service is started in the background on first use and exits after idling
+for IDLE_TIMEOUT seconds. It drives soffice through its UNO bridge, so it runs
+with a Python that can import uno: this one, the system python3 with
+python3-uno installed, or the one bundled with LibreOffice. Without any,
+convert() falls back to running soffice once.
+
+This module is shared by the docx, pptx and xlsx skills; the others import it
+from here.
+
+Environment:
+    OFFICE_SERVICE=on           Use the conversion service
+    OFFICE_SERVICE_DIR=<dir>    Directory of the socket, log and profiles
+    OFFICE_SERVICE_INSTANCES=N  Number of soffice instances of a new service
+
+Usage:
+    python office.py convert <file> <outdir> [--to pdf]
+    python office.py serve [--instances N] [--idle-timeout SECONDS]
+    python office.py stop
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import queue
+import shutil
+import socket
+import socketserver
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+# Seconds a conversion may take by default, and a new soffice to start
+CONVERT_TIMEOUT = 120
+STARTUP_TIMEOUT = 60
+
+# Seconds a request may wait for a free instance
+QUEUE_TIMEOUT = 300
+
+# Seconds without requests after which the service exits
+IDLE_TIMEOUT = 600
+
+DEFAULT_INSTANCES = 2
+
+# Export filters by target extension and document kind, for targets given
+# without a filter name
+EXPORT_FILTERS = {
+    "pdf": {
+        "text": "writer_pdf_Export",
+        "presentation": "impress_pdf_Export",
+        "spreadsheet": "calc_pdf_Export",
+    },
+    "html": {
+        "text": "HTML (StarWriter)",
+        "presentation": "impress_html_Export",
+        "spreadsheet": "HTML (StarCalc)",
+    },
+    "docx": {"text": "MS Word 2007 XML"},
+    "pptx": {"presentation": "Impress MS PowerPoint 2007 XML"},
+    "xlsx": {"spreadsheet": "Calc MS Excel 2007 XML"},
+}
+
+# UNO services implemented by each kind of document
+DOCUMENT_KINDS = [
+    ("presentation", "com.sun.star.presentation.PresentationDocument"),
+    ("spreadsheet", "com.sun.star.sheet.SpreadsheetDocument"),
+    ("text", "com.sun.star.text.TextDocument"),
+]
+
+
+class OfficeError(RuntimeError):
+    """A document could not be converted or recalculated."""
+
+
+class ServiceUnavailable(OfficeError):
+    """The conversion service is disabled or cannot run here."""
+
+
+def find_soffice():
+    """Return the path of the soffice executable, or None if not installed."""
+    found = shutil.which("soffice")
+    if found:
+        return found
+    bundle = "/Applications/LibreOffice.app/Contents/MacOS/soffice"  # macOS
+    return bundle if os.path.exists(bundle) else None
+
+
+def service_enabled():
+    """Whether the conversion service is turned on with OFFICE_SERVICE."""
+    return os.environ.get("OFFICE_SERVICE", "").lower() in ("1", "on", "yes", "true")
+
+
+def service_dir():
+    """Return the service directory, private to the user, creating it.
+
+    Raises:
+        PermissionError: If the directory exists but is not a directory owned
+            by the user and accessible to the user alone; in a shared /tmp,
+            another user could have created it to control the socket
+    """
+    directory = os.environ.get("OFFICE_SERVICE_DIR") or os.path.join(
+        tempfile.gettempdir(), f"office-service-{os.getuid()}"
+    )
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or stat.S_IMODE(info.st_mode) != 0o700
+    ):
+        raise PermissionError(
+            f"Refusing to use {directory}: not a directory private to this user"
+        )
+    return Path(directory)
+
+
+# Client
+
+
+def convert(path, outdir, to="pdf", timeout=CONVERT_TIMEOUT):
+    """Convert a document, as `soffice --headless --convert-to <to>` does.
+
+    Args:
+        path: Document to convert
+        outdir: Directory to write the converted document to
+        to: Target format as for --convert-to: an extension, optionally
+            followed by ":" and an export filter name ("pdf", "html:HTML")
+        timeout: Seconds the conversion may take, not counting the time spent
+            waiting for a free instance
+
+    Returns:
+        Path: The converted document, outdir/<stem>.<extension>
+
+    Raises:
+        FileNotFoundError: If soffice is not installed
+        TimeoutError: If the conversion took longer than timeout
+        OfficeError: If the conversion failed
+    """
+    path, outdir = Path(path).resolve(), Path(outdir).resolve()
+    if not service_enabled():
+        return _convert_once(path, outdir, to, timeout)
+    request = {"action": "convert", "path": str(path), "outdir": str(outdir), "to": to}
+    try:
+        return Path(_request(request, timeout))
+    except ServiceUnavailable:
+        return _convert_once(path, outdir, to, timeout)
+
+
+def recalculate(path, timeout=CONVERT_TIMEOUT):
+    """Recalculate all formulas of a spreadsheet and save it in place.
+
+    Raises:
+        ServiceUnavailable: If the service is not turned on or cannot run
+            here; there is no fallback without it
+        FileNotFoundError: If soffice is not installed
+        TimeoutError: If the recalculation took longer than timeout
+        OfficeError: If the recalculation failed
+    """
+    _request({"action": "recalculate", "path": str(Path(path).resolve())}, timeout)
+
+
+def stop_service():
+    """Stop the running service, if any. Returns whether one was running."""
+    try:
+        sock = _open_socket()
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    with sock:
+        _exchange(sock, {"action": "stop"}, timeout=10)
+    return True
+
+
+def _request(request, timeout):
+    """Send a request to the service, starting it if needed.
+
+    Returns:
+        The output of the request
+    """
+    if not service_enabled():
+        raise ServiceUnavailable("The conversion service is not turned on")
+    request = dict(request, timeout=timeout)
+    with _connect() as sock:
+        reply = _exchange(sock, request, QUEUE_TIMEOUT + timeout + 10)
+    if "error" in reply:
+        if reply.get("timeout"):
+            raise TimeoutError(reply["error"])
+        raise OfficeError(reply["error"])
+    return reply.get("output")
+
+
+def _exchange(sock, request, timeout):
+    """Send a request on a connected socket and return the reply."""
+    sock.settimeout(timeout)
+    try:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as reply_file:
+            line = reply_file.readline()
+    except socket.timeout:
+        raise TimeoutError("No reply from the conversion service") from None
+    if not line:
+        raise OfficeError("The conversion service closed the connection")
+    return json.loads(line)
+
+
+def _open_socket():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(service_dir() / "socket"))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _connect():
+    """Connect to the service, starting it if it is not running."""
+    try:
+        service_dir()
+    except PermissionError as e:
+        # Never talk to a socket another user may control
+        raise ServiceUnavailable(str(e)) from None
+    try:
+        return _open_socket()
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+
+    process = _start_service()
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            return _open_socket()
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Exit status 0: another client started the service first
+            if process.poll() not in (None, 0):
+                raise ServiceUnavailable(
+                    f"The conversion service failed to start, see "
+                    f"{service_dir() / 'service.log'}"
+                ) from None
+            if time.monotonic() > deadline:
+                raise ServiceUnavailable(
+                    "The conversion service did not start"
+                ) from None
+            time.sleep(0.1)
+
+
+def _start_service():
+    """Start the service in the background, detached from this process."""
+    if find_soffice() is None:
+        raise FileNotFoundError("soffice not found")
+    python = _uno_python()
+    if python is None:
+        raise ServiceUnavailable("No Python with the uno module found")
+    with open(service_dir() / "service.log", "ab") as log:
+        return subprocess.Popen(
+            [python, str(Path(__file__).resolve()), "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+
+@lru_cache(maxsize=1)
+def _uno_python():
+    """Return a Python interpreter that can import uno, or None."""
+    program_dir = Path(os.path.realpath(find_soffice())).parent
+    candidates = [
+        sys.executable,
+        shutil.which("python3"),
+        "/usr/bin/python3",
+        str(program_dir / "python"),  # LibreOffice's own
+        str(program_dir.parent / "Resources" / "python"),  # macOS
+    ]
+    for python in dict.fromkeys(filter(None, candidates)):
+        if not os.path.exists(python):
+            continue
+        try:
+            subprocess.run(
+                [python, "-c", "import uno"],
+                capture_output=True,
+                timeout=30,
+                check=True,
+            )
+        except (OSError, subprocess.SubprocessError):
+            continue
+        return python
+    return None
+
+
+def _convert_once(path, outdir, to, timeout):
+    """Convert a document with a soffice run of its own, as convert() does."""
+    soffice = find_soffice() or "soffice"
+    output = outdir / f"{path.stem}.{to.partition(':')[0]}"
+    try:
+        result = subprocess.run(
+            [
+                soffice,
+                "--headless",
+                "--convert-to",
+                to,
+                "--outdir",
+                str(outdir),
+                str(path),
+            ],
+            capture_output=True,
+            timeout=timeout,
+            text=True,
+        )
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"Conversion took longer than {timeout}s") from None
+    if not output.exists():
+        raise OfficeError(result.stderr.strip() or "Conversion failed")
+    return output
+
+
+# Service
+
+
+class OfficeInstance:
+    """A soffice process with a profile of its own, driven through UNO."""
+
+    def __init__(self, soffice, profile, pipe_name):
+        """
+        Args:
+            soffice: Path of the soffice executable
+            profile: Profile directory, used by this instance alone
+            pipe_name: Name of the pipe the UNO bridge listens on
+        """
+        self.soffice = soffice
+        self.profile = Path(profile)
+        self.pipe_name = pipe_name
+        self.process = None
+        self.desktop = None
+
+    @property
+    def alive(self):
+        return self.desktop is not None and self.process.poll() is None
+
+    def start(self, timeout=STARTUP_TIMEOUT):
+        """Start soffice and connect to it."""
+        import uno
+        from com.sun.star.connection import NoConnectException
+
+        self.kill()
+        self.process = subprocess.Popen(
+            [
+                self.soffice,
+                f"-env:UserInstallation={self.profile.as_uri()}",
+                "--headless",
+                "--invisible",
+                "--nocrashreport",
+                "--nodefault",
+                "--nologo",
+                "--norestore",
+                "--nolockcheck",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+                )
+                break
+            except NoConnectException:
+                if self.process.poll() is not None:
+                    raise OfficeError("soffice exited while starting") from None
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise TimeoutError("soffice did not start in time") from None
+                time.sleep(0.1)
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def kill(self):
+        """Kill soffice, interrupting any call in progress."""
+        self.desktop = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def stop(self):
+        """Ask soffice to exit, killing it if it does not."""
+        if self.alive:
+            try:
+                self.desktop.terminate()
+                self.process.wait(timeout=10)
+            except Exception:
+                pass
+        self.kill()
+
+    def convert(self, path, outdir, to):
+        """Convert a document as convert() does, and return the output path."""
+        extension, _, filter_name = to.partition(":")
+        filter_name = filter_name.partition(":")[0]
+        document = self._load(path, ReadOnly=True)
+        try:
+            if not filter_name:
+                filter_name = EXPORT_FILTERS.get(extension, {}).get(
+                    self._kind(document)
+                )
+                if filter_name is None:
+                    raise OfficeError(f"No export filter for {to} given")
+            output = Path(outdir) / f"{Path(path).stem}.{extension}"
+            document.storeToURL(
+                output.as_uri(), _properties(FilterName=filter_name, Overwrite=True)
+            )
+        finally:
+            self._close(document)
+        return output
+
+    def recalculate(self, path):
+        """Recalculate all formulas of a spreadsheet and save it in place."""
+        document = self._load(path)
+        try:
+            document.calculateAll()
+            document.store()
+        finally:
+            self._close(document)
+
+    def _load(self, path, **properties):
+        document = self.desktop.loadComponentFromURL(
+            Path(path).as_uri(),
+            "_blank",
+            0,
+            _properties(Hidden=True, MacroExecutionMode=0, **properties),
+        )
+        if document is None:
+            raise OfficeError(f"Could not open {path}")
+        return document
+
+    @staticmethod
+    def _kind(document):
+        for kind, service in DOCUMENT_KINDS:
+            if document.supportsService(service):
+                return kind
+        return None
+
+    @staticmethod
+    def _close(document):
+        try:
+            document.close(True)
+        except Exception:
+            document.dispose()
+
+
+def _properties(**values):
+    """Return a tuple of UNO PropertyValues."""
+    from com.sun.star.beans import PropertyValue
+
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name, prop.Value = name, value
+        properties.append(prop)
+    return tuple(properties)
+
+
+class ConversionService:
+    """Runs requests on a pool of instances, one request per instance at a time.
+
+    Requests wait for a free instance in a queue. A request running longer
+    than its timeout kills its instance, which is restarted for the next
+    request.
+    """
+
+    def __init__(self, instances):
+        """
+        Args:
+            instances: Objects with the interface of OfficeInstance
+        """
+        self.instances = list(instances)
+        self._idle = queue.Queue()
+        for instance in self.instances:
+            self._idle.put(instance)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_request = time.monotonic()
+
+    def warm(self):
+        """Start all instances in the background, before they are needed."""
+        for _ in self.instances:
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def _warm_one(self):
+        instance = self._idle.get()
+        try:
+            if not instance.alive:
+                instance.start()
+        except Exception as e:
+            print(f"Starting soffice failed: {e}", file=sys.stderr)
+        finally:
+            self._idle.put(instance)
+
+    def idle_seconds(self):
+        """Seconds since the last request finished, or 0 while one runs."""
+        with self._lock:
+            if self._active:
+                return 0
+            return time.monotonic() - self._last_request
+
+    def handle(self, request):
+        """Run a request and return the reply.
+
+        Returns:
+            dict: {"output": ...}, or {"error": message} with "timeout": True
+                if the request timed out
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            action = request.get("action")
+            if action not in ("convert", "recalculate"):
+                return {"error": f"Unknown action: {action}"}
+            try:
+                instance = self._idle.get(
+                    timeout=request.get("queue_timeout", QUEUE_TIMEOUT)
+                )
+            except queue.Empty:
+                return {"error": "No soffice instance became free", "timeout": True}
+            try:
+                return self._run(instance, request)
+            finally:
+                self._idle.put(instance)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._last_request = time.monotonic()
+
+    def _run(self, instance, request):
+        """Run a request on an instance, killing it on timeout."""
+        try:
+            if not instance.alive:
+                instance.start()
+        except Exception as e:
+            return {"error": f"Starting soffice failed: {e}"}
+
+        timeout = request.get("timeout", CONVERT_TIMEOUT)
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            instance.kill()
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        try:
+            if request["action"] == "convert":
+                output = str(
+                    instance.convert(
+                        request["path"], request["outdir"], request.get("to", "pdf")
+                    )
+                )
+            else:
+                instance.recalculate(request["path"])
+                output = request["path"]
+            return {"output": output}
+        except Exception as e:
+            if timed_out.is_set():
+                return {"error": f"Took longer than {timeout}s", "timeout": True}
+            return {"error": str(e) or type(e).__name__}
+        finally:
+            timer.cancel()
+
+    def close(self):
+        for instance in self.instances:
+            instance.stop()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request per connection and writes the JSON reply."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            reply = {"error": "Malformed request"}
+        else:
+            if request.get("action") == "stop":
+                threading.Thread(target=self.server.shutdown).start()
+                reply = {"output": "stopping"}
+            else:
+                reply = self.server.service.handle(request)
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class ServiceServer(socketserver.ThreadingUnixStreamServer):
+    """Serves a ConversionService on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        Path(socket_path).unlink(missing_ok=True)
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.service = service
+
+
+def serve(instances=None, idle_timeout=IDLE_TIMEOUT):
+    """Run the service until it idles for idle_timeout seconds or is stopped.
+
+    Returns:
+        int: Exit status; 0 also if another service is already running
+    """
+    directory = service_dir()
+    lock = open(directory / "lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return 0
+
+    soffice = find_soffice()
+    if soffice is None:
+        print("soffice not found", file=sys.stderr)
+        return 2
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        print(f"{sys.executable} cannot import uno", file=sys.stderr)
+        return 2
+
+    if instances is None:
+        instances = int(
+            os.environ.get("OFFICE_SERVICE_INSTANCES", 0) or DEFAULT_INSTANCES
+        )
+    service = ConversionService(
+        OfficeInstance(soffice, directory / f"profile-{i}", f"office-{os.getpid()}-{i}")
+        for i in range(instances)
+    )
+    socket_path = directory / "socket"
+    server = ServiceServer(socket_path, service)
+
+    def shut_down_when_idle():
+        while service.idle_seconds() < idle_timeout:
+            time.sleep(min(5, idle_timeout))
+        server.shutdown()
+
+    try:
+        service.warm()
+        threading.Thread(target=shut_down_when_idle, daemon=True).start()
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        socket_path.unlink(missing_ok=True)
+        server.server_close()
+        service.close()
+        lock.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="Convert a document")
+    convert_parser.add_argument("file", help="Document to convert")
+    convert_parser.add_argument("outdir", help="Directory for the converted file")
+    convert_parser.add_argument(
+        "--to", default="pdf", help="Target format, as for soffice --convert-to"
+    )
+    convert_parser.add_argument(
+        "--timeout", type=float, default=CONVERT_TIMEOUT, help="Seconds to allow"
+    )
+    serve_parser = commands.add_parser("serve", help="Run the conversion service")
+    serve_parser.add_argument(
+        "--instances",
+        type=int,
+        help=f"soffice instances (default: {DEFAULT_INSTANCES})",
+    )
+    serve_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=IDLE_TIMEOUT,
+        help="Seconds without requests after which to exit",
+    )
+    commands.add_parser("stop", help="Stop the running conversion service")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        sys.exit(serve(args.instances, args.idle_timeout))
+    if args.command == "stop":
+        if not stop_service():
+            print("The conversion service is not running")
+        return
+    try:
+        print(convert(args.file, args.outdir, args.to, args.timeout))
+    except (OSError, OfficeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
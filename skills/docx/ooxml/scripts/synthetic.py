@@ -0,0 +1,580 @@
+"""
+Synthetic Office documents for benchmarks and tests.
+
+Usage:
+    from synthetic import make_docx, make_pptx, make_xlsx
+    make_docx("sample.docx", paragraphs=500, headers=4, invalid_headers=2)
+    make_pptx("sample.pptx", slides=50, shapes=8, images=10, media_kb=64)
+    make_xlsx("sample.xlsx", sheets=4, rows=1000, cols=20)
+"""
+
+import random
+import zipfile
+from pathlib import Path
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
+W15_NAMESPACE = "http://schemas.microsoft.com/office/word/2012/wordml"
+W16CID_NAMESPACE = "http://schemas.microsoft.com/office/word/2016/wordml/cid"
+W16CEX_NAMESPACE = "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+P_NAMESPACE = "http://schemas.openxmlformats.org/presentationml/2006/main"
+A_NAMESPACE = "http://schemas.openxmlformats.org/drawingml/2006/main"
+S_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+WML_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml"
+PML_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml"
+SML_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+MS_REL_TYPE = "http://schemas.microsoft.com/office"
+
+_WORDS = (
+    "agreement party shall term notice payment clause provision section "
+    "obligation warranty liability confidential license services effective "
+    "date termination breach remedy governing law amendment"
+).split()
+
+
+_STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NAMESPACE}"><w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style></w:styles>"""
+
+_SETTINGS = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:settings xmlns:w="{W_NAMESPACE}"><w:defaultTabStop w:val="720"/><w:compat/></w:settings>"""
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _content_types_xml(overrides):
+    """Build [Content_Types].xml from (part name, content type) overrides."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Default Extension="png" ContentType="image/png"/>'
+        + "".join(
+            f'<Override PartName="{name}" ContentType="{ctype}"/>'
+            for name, ctype in overrides
+        )
+        + "</Types>"
+    )
+
+
+def _relationships_xml(rels):
+    """Build a .rels part from (id, type, target) relationships."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        + "".join(
+            f'<Relationship Id="{rid}" Type="{rtype}" Target="{target}"/>'
+            for rid, rtype, target in rels
+        )
+        + "</Relationships>"
+    )
+
+
+def _root_rel(target):
+    """The package relationship to the main part."""
+    return ("rId1", f"{REL_TYPE}/officeDocument", target)
+
+
+def docx_document_xml(paragraphs=100, tracked_changes=0, seed=0, comments=0):
+    """Build the XML for word/document.xml with the requested content.
+
+    Comments are anchored on whole paragraphs, spread evenly over the body;
+    docx_comments_parts builds the parts they refer to.
+    """
+    rng = random.Random(seed)
+    body = []
+    change_every = paragraphs // tracked_changes if tracked_changes else 0
+    comment_every = paragraphs // comments if comments else 0
+    change_id = comment_id = 0
+    for i in range(paragraphs):
+        text = _sentence(rng)
+        if change_every and i % change_every == 0 and change_id < tracked_changes:
+            content = (
+                f'<w:r><w:t xml:space="preserve">{text} </w:t></w:r>'
+                f'<w:ins w:id="{change_id}" w:author="Reviewer" w:date="2024-01-01T00:00:00Z">'
+                f"<w:r><w:t>Inserted clause {change_id}.</w:t></w:r></w:ins>"
+            )
+            change_id += 1
+        else:
+            content = f"<w:r><w:t>{text}</w:t></w:r>"
+        if comment_every and i % comment_every == 0 and comment_id < comments:
+            content = (
+                f'<w:commentRangeStart w:id="{comment_id}"/>{content}'
+                f'<w:commentRangeEnd w:id="{comment_id}"/>'
+                f'<w:r><w:commentReference w:id="{comment_id}"/></w:r>'
+            )
+            comment_id += 1
+        body.append(f"<w:p>{content}</w:p>")
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<w:document xmlns:w="{W_NAMESPACE}"><w:body>'
+        + "".join(body)
+        + "<w:sectPr/></w:body></w:document>"
+    )
+
+
+def docx_comments_parts(comments, seed=0):
+    """Build comments.xml and its three companion parts for comments 0..n-1.
+
+    Returns:
+        dict: Part name under word/ -> XML
+    """
+    rng = random.Random(seed)
+    para_ids = [f"{0x10000000 + i:08X}" for i in range(comments)]
+    durable_ids = [f"{0x20000000 + i:08X}" for i in range(comments)]
+    header = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    namespaces = (
+        f'xmlns:w="{W_NAMESPACE}" xmlns:w14="{W14_NAMESPACE}" '
+        f'xmlns:w15="{W15_NAMESPACE}" xmlns:w16cid="{W16CID_NAMESPACE}" '
+        f'xmlns:w16cex="{W16CEX_NAMESPACE}" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+        'mc:Ignorable="w14 w15 w16cid w16cex"'
+    )
+    return {
+        "comments.xml": header
+        + f"<w:comments {namespaces}>"
+        + "".join(
+            f'<w:comment w:id="{i}" w:author="Reviewer" w:date="2024-01-01T00:00:00Z">'
+            f'<w:p w14:paraId="{para_id}" w14:textId="77777777">'
+            f"<w:r><w:annotationRef/></w:r>"
+            f"<w:r><w:t>{_sentence(rng, 8)}</w:t></w:r></w:p></w:comment>"
+            for i, para_id in enumerate(para_ids)
+        )
+        + "</w:comments>",
+        "commentsExtended.xml": header
+        + f"<w15:commentsEx {namespaces}>"
+        + "".join(
+            f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
+            for para_id in para_ids
+        )
+        + "</w15:commentsEx>",
+        "commentsIds.xml": header
+        + f"<w16cid:commentsIds {namespaces}>"
+        + "".join(
+            f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
+            for para_id, durable_id in zip(para_ids, durable_ids)
+        )
+        + "</w16cid:commentsIds>",
+        "commentsExtensible.xml": header
+        + f"<w16cex:commentsExtensible {namespaces}>"
+        + "".join(
+            f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
+            for durable_id in durable_ids
+        )
+        + "</w16cex:commentsExtensible>",
+    }
+
+
+def docx_header_xml(index, invalid=False, seed=0):
+    """Build the XML for a header part, optionally with an XSD violation."""
+    rng = random.Random(seed + index)
+    # An out-of-range enumeration value is a cheap, well-localized XSD error
+    ppr = '<w:pPr><w:jc w:val="nowhere"/></w:pPr>' if invalid else ""
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<w:hdr xmlns:w="{W_NAMESPACE}"><w:p>{ppr}'
+        f"<w:r><w:t>{_sentence(rng, 6)}</w:t></w:r></w:p></w:hdr>"
+    )
+
+
+def make_docx(
+    path,
+    paragraphs=100,
+    tracked_changes=0,
+    headers=0,
+    invalid_headers=0,
+    media_kb=0,
+    images=1,
+    seed=0,
+    comments=0,
+):
+    """Write a synthetic .docx file and return its path.
+
+    Args:
+        path: Output .docx path
+        paragraphs: Number of body paragraphs
+        tracked_changes: Number of paragraphs carrying a w:ins by another author
+        headers: Number of header parts
+        invalid_headers: How many of the headers contain an XSD violation
+        media_kb: Size of each incompressible media part, to grow the archive
+        images: Number of media parts when media_kb is set
+        seed: Seed for the generated text
+        comments: Number of paragraphs carrying a comment by another author
+
+    Returns:
+        Path: The written file
+    """
+    path = Path(path)
+    overrides = [
+        ("/word/document.xml", f"{WML_CONTENT_TYPE}.document.main+xml"),
+        ("/word/styles.xml", f"{WML_CONTENT_TYPE}.styles+xml"),
+        ("/word/settings.xml", f"{WML_CONTENT_TYPE}.settings+xml"),
+    ]
+    rels = [
+        ("rId1", f"{REL_TYPE}/styles", "styles.xml"),
+        ("rId2", f"{REL_TYPE}/settings", "settings.xml"),
+    ]
+    parts = {}
+    for i in range(1, headers + 1):
+        name = f"header{i}.xml"
+        overrides.append((f"/word/{name}", f"{WML_CONTENT_TYPE}.header+xml"))
+        rels.append((f"rId{len(rels) + 1}", f"{REL_TYPE}/header", name))
+        parts[f"word/{name}"] = docx_header_xml(
+            i, invalid=i <= invalid_headers, seed=seed
+        )
+    if comments:
+        for name, rel_type in (
+            ("comments", f"{REL_TYPE}/comments"),
+            ("commentsExtended", f"{MS_REL_TYPE}/2011/relationships/commentsExtended"),
+            ("commentsIds", f"{MS_REL_TYPE}/2016/09/relationships/commentsIds"),
+            (
+                "commentsExtensible",
+                f"{MS_REL_TYPE}/2018/08/relationships/commentsExtensible",
+            ),
+        ):
+            overrides.append((f"/word/{name}.xml", f"{WML_CONTENT_TYPE}.{name}+xml"))
+            rels.append((f"rId{len(rels) + 1}", rel_type, f"{name}.xml"))
+        for name, xml in docx_comments_parts(comments, seed).items():
+            parts[f"word/{name}"] = xml
+    rng = random.Random(seed)
+    for i in range(1, images + 1 if media_kb else 1):
+        name = f"media/image{i}.png"
+        rels.append((f"rId{len(rels) + 1}", f"{REL_TYPE}/image", name))
+        parts[f"word/{name}"] = rng.randbytes(media_kb * 1024)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _content_types_xml(overrides))
+        zf.writestr("_rels/.rels", _relationships_xml([_root_rel("word/document.xml")]))
+        zf.writestr("word/_rels/document.xml.rels", _relationships_xml(rels))
+        zf.writestr(
+            "word/document.xml",
+            docx_document_xml(paragraphs, tracked_changes, seed, comments),
+        )
+        zf.writestr("word/styles.xml", _STYLES)
+        zf.writestr("word/settings.xml", _SETTINGS)
+        for name, data in parts.items():
+            zf.writestr(name, data)
+    return path
+
+
+_PML_ROOT = f'xmlns:a="{A_NAMESPACE}" xmlns:r="{REL_TYPE}" xmlns:p="{P_NAMESPACE}"'
+
+_EMPTY_SHAPE_TREE = (
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+    "<p:grpSpPr/>"
+)
+
+_SLIDE_MASTER = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<p:sldMaster {_PML_ROOT}><p:cSld><p:spTree>{_EMPTY_SHAPE_TREE}</p:spTree></p:cSld><p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" accent3="accent3" accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/><p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>"""
+
+_SLIDE_LAYOUT = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<p:sldLayout {_PML_ROOT} type="blank"><p:cSld name="Blank"><p:spTree>{_EMPTY_SHAPE_TREE}</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>"""
+
+_THEME_COLORS = "".join(
+    f'<a:{name}><a:srgbClr val="{value}"/></a:{name}>'
+    for name, value in (
+        ("dk1", "000000"),
+        ("lt1", "FFFFFF"),
+        ("dk2", "44546A"),
+        ("lt2", "E7E6E6"),
+        ("accent1", "4472C4"),
+        ("accent2", "ED7D31"),
+        ("accent3", "A5A5A5"),
+        ("accent4", "FFC000"),
+        ("accent5", "5B9BD5"),
+        ("accent6", "70AD47"),
+        ("hlink", "0563C1"),
+        ("folHlink", "954F72"),
+    )
+)
+
+_THEME_FONT = '<a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/>'
+
+_THEME_FILL = '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>'
+
+_THEME_LINES = "".join(
+    f'<a:ln w="{w}">{_THEME_FILL}</a:ln>' for w in (6350, 12700, 19050)
+)
+
+_THEME = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<a:theme xmlns:a="{A_NAMESPACE}" name="Office Theme"><a:themeElements><a:clrScheme name="Office">{_THEME_COLORS}</a:clrScheme><a:fontScheme name="Office"><a:majorFont>{_THEME_FONT}</a:majorFont><a:minorFont>{_THEME_FONT}</a:minorFont></a:fontScheme><a:fmtScheme name="Office"><a:fillStyleLst>{_THEME_FILL * 3}</a:fillStyleLst><a:lnStyleLst>{_THEME_LINES}</a:lnStyleLst><a:effectStyleLst>{"<a:effectStyle><a:effectLst/></a:effectStyle>" * 3}</a:effectStyleLst><a:bgFillStyleLst>{_THEME_FILL * 3}</a:bgFillStyleLst></a:fmtScheme></a:themeElements></a:theme>"""
+
+# Slide size in EMUs (16:9), and the size of each generated shape
+_SLIDE_CX, _SLIDE_CY = 12192000, 6858000
+_SHAPE_CX, _SHAPE_CY = 2743200, 914400
+
+
+def _shape_xfrm(index):
+    """Place shapes on a grid so that they do not overlap."""
+    per_row = _SLIDE_CX // _SHAPE_CX
+    x = (index % per_row) * _SHAPE_CX
+    y = (index // per_row) * _SHAPE_CY % (_SLIDE_CY - _SHAPE_CY)
+    return (
+        f'<a:xfrm><a:off x="{x}" y="{y}"/>'
+        f'<a:ext cx="{_SHAPE_CX}" cy="{_SHAPE_CY}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom>'
+    )
+
+
+def pptx_slide_xml(shapes=4, images=(), seed=0, paragraphs=1, words=6):
+    """Build the XML for a slide with text boxes and pictures.
+
+    Args:
+        shapes: Number of text boxes
+        images: Relationship ids of the pictures to show
+        seed: Seed for the generated text
+        paragraphs: Number of paragraphs in each text box
+        words: Number of words in each paragraph
+    """
+    rng = random.Random(seed)
+    tree = []
+    for i in range(shapes):
+        tree.append(
+            f'<p:sp><p:nvSpPr><p:cNvPr id="{i + 2}" name="TextBox {i + 1}"/>'
+            '<p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+            f"<p:spPr>{_shape_xfrm(i)}</p:spPr>"
+            '<p:txBody><a:bodyPr wrap="square"/><a:lstStyle/>'
+            + "".join(
+                f'<a:p><a:r><a:rPr lang="en-US" sz="1800"/>'
+                f"<a:t>{_sentence(rng, words)}</a:t></a:r></a:p>"
+                for _ in range(paragraphs)
+            )
+            + "</p:txBody></p:sp>"
+        )
+    for i, rid in enumerate(images, shapes):
+        tree.append(
+            f'<p:pic><p:nvPicPr><p:cNvPr id="{i + 2}" name="Picture {i + 1}"/>'
+            '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/>'
+            f'</p:nvPicPr><p:blipFill><a:blip r:embed="{rid}"/>'
+            "<a:stretch><a:fillRect/></a:stretch></p:blipFill>"
+            f"<p:spPr>{_shape_xfrm(i)}</p:spPr></p:pic>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f"<p:sld {_PML_ROOT}><p:cSld><p:spTree>{_EMPTY_SHAPE_TREE}"
+        + "".join(tree)
+        + "</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr>"
+        "</p:sld>"
+    )
+
+
+def make_pptx(
+    path, slides=10, shapes=4, images=0, media_kb=16, seed=0, paragraphs=1, words=6
+):
+    """Write a synthetic .pptx file and return its path.
+
+    The presentation has one slide master, layout and theme. Pictures are
+    spread over the slides in turn, each showing its own media part.
+
+    Args:
+        path: Output .pptx path
+        slides: Number of slides
+        shapes: Number of text boxes on each slide
+        images: Number of pictures, each with an incompressible media part
+        media_kb: Size of each media part
+        seed: Seed for the generated text
+        paragraphs: Number of paragraphs in each text box
+        words: Number of words in each paragraph
+
+    Returns:
+        Path: The written file
+    """
+    path = Path(path)
+    overrides = [
+        ("/ppt/presentation.xml", f"{PML_CONTENT_TYPE}.presentation.main+xml"),
+        ("/ppt/slideMasters/slideMaster1.xml", f"{PML_CONTENT_TYPE}.slideMaster+xml"),
+        ("/ppt/slideLayouts/slideLayout1.xml", f"{PML_CONTENT_TYPE}.slideLayout+xml"),
+        (
+            "/ppt/theme/theme1.xml",
+            "application/vnd.openxmlformats-officedocument.theme+xml",
+        ),
+    ]
+    rels = [
+        ("rId1", f"{REL_TYPE}/slideMaster", "slideMasters/slideMaster1.xml"),
+        ("rId2", f"{REL_TYPE}/theme", "theme/theme1.xml"),
+    ]
+    parts = {
+        "ppt/slideMasters/slideMaster1.xml": _SLIDE_MASTER,
+        "ppt/slideMasters/_rels/slideMaster1.xml.rels": _relationships_xml(
+            [
+                ("rId1", f"{REL_TYPE}/slideLayout", "../slideLayouts/slideLayout1.xml"),
+                ("rId2", f"{REL_TYPE}/theme", "../theme/theme1.xml"),
+            ]
+        ),
+        "ppt/slideLayouts/slideLayout1.xml": _SLIDE_LAYOUT,
+        "ppt/slideLayouts/_rels/slideLayout1.xml.rels": _relationships_xml(
+            [("rId1", f"{REL_TYPE}/slideMaster", "../slideMasters/slideMaster1.xml")]
+        ),
+        "ppt/theme/theme1.xml": _THEME,
+    }
+
+    rng = random.Random(seed)
+    slide_images = [[] for _ in range(slides)]
+    for i in range(1, images + 1 if slides else 1):
+        name = f"image{i}.png"
+        slide_images[(i - 1) % slides].append(name)
+        parts[f"ppt/media/{name}"] = rng.randbytes(media_kb * 1024)
+
+    slide_ids = []
+    for i in range(1, slides + 1):
+        name = f"slide{i}.xml"
+        overrides.append((f"/ppt/slides/{name}", f"{PML_CONTENT_TYPE}.slide+xml"))
+        rels.append((f"rId{len(rels) + 1}", f"{REL_TYPE}/slide", f"slides/{name}"))
+        slide_ids.append(f'<p:sldId id="{255 + i}" r:id="{rels[-1][0]}"/>')
+        slide_rels = [
+            ("rId1", f"{REL_TYPE}/slideLayout", "../slideLayouts/slideLayout1.xml")
+        ] + [
+            (f"rId{j}", f"{REL_TYPE}/image", f"../media/{image}")
+            for j, image in enumerate(slide_images[i - 1], 2)
+        ]
+        parts[f"ppt/slides/{name}"] = pptx_slide_xml(
+            shapes,
+            [rid for rid, _, _ in slide_rels[1:]],
+            seed + i,
+            paragraphs,
+            words,
+        )
+        parts[f"ppt/slides/_rels/{name}.rels"] = _relationships_xml(slide_rels)
+
+    presentation = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f"<p:presentation {_PML_ROOT}>"
+        '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/>'
+        "</p:sldMasterIdLst>"
+        + (f"<p:sldIdLst>{''.join(slide_ids)}</p:sldIdLst>" if slide_ids else "")
+        + f'<p:sldSz cx="{_SLIDE_CX}" cy="{_SLIDE_CY}"/>'
+        '<p:notesSz cx="6858000" cy="9144000"/></p:presentation>'
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _content_types_xml(overrides))
+        zf.writestr(
+            "_rels/.rels", _relationships_xml([_root_rel("ppt/presentation.xml")])
+        )
+        zf.writestr("ppt/_rels/presentation.xml.rels", _relationships_xml(rels))
+        zf.writestr("ppt/presentation.xml", presentation)
+        for name, data in parts.items():
+            zf.writestr(name, data)
+    return path
+
+
+_WORKBOOK_STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="{S_NAMESPACE}"><fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts><fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills><borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders><cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs><cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs></styleSheet>"""
+
+
+def _column_name(index):
+    """Spreadsheet column letters for a zero-based column index."""
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord("A") + remainder) + name
+    return name
+
+
+def xlsx_sheet_xml(rows=100, cols=10, strings=0, seed=0):
+    """Build the XML for a worksheet of numbers, with shared strings in column A.
+
+    Args:
+        rows: Number of rows
+        cols: Number of columns
+        strings: Number of entries in the shared string table to pick from
+        seed: Seed for the generated values
+    """
+    rng = random.Random(seed)
+    columns = [_column_name(c) for c in range(cols)]
+    sheet_rows = []
+    for r in range(1, rows + 1):
+        cells = []
+        for c, column in enumerate(columns):
+            if c == 0 and strings:
+                cells.append(
+                    f'<c r="{column}{r}" t="s"><v>{rng.randrange(strings)}</v></c>'
+                )
+            else:
+                cells.append(
+                    f'<c r="{column}{r}"><v>{rng.randrange(1000000) / 100}</v></c>'
+                )
+        sheet_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+    dimension = f"A1:{columns[-1]}{rows}" if rows and cols else "A1"
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<worksheet xmlns="{S_NAMESPACE}" xmlns:r="{REL_TYPE}">'
+        f'<dimension ref="{dimension}"/><sheetData>'
+        + "".join(sheet_rows)
+        + "</sheetData></worksheet>"
+    )
+
+
+def make_xlsx(path, sheets=1, rows=100, cols=10, seed=0):
+    """Write a synthetic .xlsx file and return its path.
+
+    Column A of every sheet holds shared strings, the other columns numbers.
+
+    Args:
+        path: Output .xlsx path
+        sheets: Number of worksheets
+        rows: Number of rows on each sheet
+        cols: Number of columns on each sheet
+        seed: Seed for the generated values
+
+    Returns:
+        Path: The written file
+    """
+    path = Path(path)
+    rng = random.Random(seed)
+    strings = [_sentence(rng, 4) for _ in range(max(rows // 10, 1))]
+    overrides = [
+        ("/xl/workbook.xml", f"{SML_CONTENT_TYPE}.sheet.main+xml"),
+        ("/xl/styles.xml", f"{SML_CONTENT_TYPE}.styles+xml"),
+        ("/xl/sharedStrings.xml", f"{SML_CONTENT_TYPE}.sharedStrings+xml"),
+    ]
+    rels = [
+        ("rId1", f"{REL_TYPE}/styles", "styles.xml"),
+        ("rId2", f"{REL_TYPE}/sharedStrings", "sharedStrings.xml"),
+    ]
+    parts = {}
+    sheet_entries = []
+    for i in range(1, sheets + 1):
+        name = f"sheet{i}.xml"
+        overrides.append(
+            (f"/xl/worksheets/{name}", f"{SML_CONTENT_TYPE}.worksheet+xml")
+        )
+        rels.append(
+            (f"rId{len(rels) + 1}", f"{REL_TYPE}/worksheet", f"worksheets/{name}")
+        )
+        sheet_entries.append(
+            f'<sheet name="Sheet{i}" sheetId="{i}" r:id="{rels[-1][0]}"/>'
+        )
+        parts[f"xl/worksheets/{name}"] = xlsx_sheet_xml(
+            rows, cols, len(strings), seed + i
+        )
+
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{S_NAMESPACE}" xmlns:r="{REL_TYPE}">'
+        f"<sheets>{''.join(sheet_entries)}</sheets></workbook>"
+    )
+    shared_strings = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<sst xmlns="{S_NAMESPACE}" count="{len(strings)}" '
+        f'uniqueCount="{len(strings)}">'
+        + "".join(f"<si><t>{text}</t></si>" for text in strings)
+        + "</sst>"
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _content_types_xml(overrides))
+        zf.writestr("_rels/.rels", _relationships_xml([_root_rel("xl/workbook.xml")]))
+        zf.writestr("xl/_rels/workbook.xml.rels", _relationships_xml(rels))
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/styles.xml", _WORKBOOK_STYLES)
+        zf.writestr("xl/sharedStrings.xml", shared_strings)
+        for name, data in parts.items():
+            zf.writestr(name, data)
+    return path
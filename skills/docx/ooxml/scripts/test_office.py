@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the LibreOffice conversion service.
+
+Most tests do not need soffice: the service runs on stand-in instances that
+write the converted files themselves. TestSoffice converts with the real
+soffice and is skipped where it is not installed.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from unittest import TestCase, main, mock, skipIf
+
+import office
+import pack
+from office import ConversionService, OfficeError, ServiceServer
+from synthetic import make_docx, make_pptx, make_xlsx
+
+
+class FakeInstance:
+    """Stands in for an OfficeInstance, taking delay seconds per conversion."""
+
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.starts = 0
+        self.started = False
+        self.killed = threading.Event()
+
+    @property
+    def alive(self):
+        return self.started
+
+    def start(self):
+        self.starts += 1
+        self.started = True
+        self.killed.clear()
+
+    def kill(self):
+        self.started = False
+        self.killed.set()
+
+    def stop(self):
+        self.kill()
+
+    def convert(self, path, outdir, to):
+        with FakeInstance.lock:
+            FakeInstance.running += 1
+            FakeInstance.most_running = max(
+                FakeInstance.most_running, FakeInstance.running
+            )
+        try:
+            # A killed soffice interrupts the conversion
+            if self.killed.wait(self.delay):
+                raise RuntimeError("Binary URP bridge disposed during call")
+            if to.startswith("bad"):
+                raise OfficeError(f"No export filter for {to} given")
+            output = Path(outdir) / f"{Path(path).stem}.{to.partition(':')[0]}"
+            output.write_text(f"{Path(path).name} as {to}")
+            return output
+        finally:
+            with FakeInstance.lock:
+                FakeInstance.running -= 1
+
+    def recalculate(self, path):
+        Path(path).write_text("recalculated")
+
+
+class TestConversionService(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_office_"))
+        self.document = self.temp_dir / "deck.pptx"
+        self.document.write_text("deck")
+        FakeInstance.running = FakeInstance.most_running = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, **kwargs):
+        return {
+            "action": "convert",
+            "path": str(self.document),
+            "outdir": str(self.temp_dir),
+            "to": "pdf",
+            **kwargs,
+        }
+
+    def test_runs_one_request_per_instance(self):
+        instances = [FakeInstance(0.05), FakeInstance(0.05)]
+        service = ConversionService(instances)
+        replies = []
+        threads = [
+            threading.Thread(
+                target=lambda: replies.append(service.handle(self.request()))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = {"output": str(self.temp_dir / "deck.pdf")}
+        self.assertEqual(replies, [expected] * 8)
+        self.assertEqual(FakeInstance.most_running, 2)
+        self.assertEqual([instance.starts for instance in instances], [1, 1])
+
+    def test_timeout_restarts_instance(self):
+        instance = FakeInstance(delay=30)
+        service = ConversionService([instance])
+        start = time.monotonic()
+        reply = service.handle(self.request(timeout=0.1))
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertTrue(reply["timeout"])
+        self.assertFalse(instance.alive)
+
+        instance.delay = 0
+        self.assertIn("output", service.handle(self.request()))
+        self.assertEqual(instance.starts, 2)
+
+    def test_queue_timeout(self):
+        service = ConversionService([FakeInstance(delay=0.5)])
+        busy = threading.Thread(target=service.handle, args=(self.request(),))
+        busy.start()
+        time.sleep(0.1)
+        reply = service.handle(self.request(queue_timeout=0.05))
+        busy.join()
+        self.assertEqual(
+            reply, {"error": "No soffice instance became free", "timeout": True}
+        )
+        self.assertEqual(service.handle({"action": "print"}).keys(), {"error"})
+
+    def test_client(self):
+        service_dir = self.temp_dir / "service"
+        environment = {"OFFICE_SERVICE": "on", "OFFICE_SERVICE_DIR": str(service_dir)}
+        with mock.patch.dict(os.environ, environment):
+            service = ConversionService([FakeInstance(delay=0.05)])
+            server = ServiceServer(office.service_dir() / "socket", service)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                output = office.convert(self.document, self.temp_dir, "html:HTML")
+                self.assertEqual(output, self.temp_dir / "deck.html")
+                self.assertEqual(output.read_text(), "deck.pptx as html:HTML")
+
+                with self.assertRaisesRegex(OfficeError, "No export filter"):
+                    office.convert(self.document, self.temp_dir, "bad")
+                with self.assertRaises(TimeoutError):
+                    office.convert(self.document, self.temp_dir, timeout=0.01)
+
+                office.recalculate(self.document)
+                self.assertEqual(self.document.read_text(), "recalculated")
+
+                self.assertTrue(office.stop_service())
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive())
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    def test_refuses_shared_service_dir(self):
+        service_dir = self.temp_dir / "service"
+        with mock.patch.dict(os.environ, {"OFFICE_SERVICE_DIR": str(service_dir)}):
+            self.assertEqual(office.service_dir(), service_dir)
+            service_dir.chmod(0o755)
+            with self.assertRaises(PermissionError):
+                office.service_dir()
+
+            service_dir.rmdir()
+            (self.temp_dir / "elsewhere").mkdir(mode=0o700)
+            service_dir.symlink_to(self.temp_dir / "elsewhere")
+            with self.assertRaises(PermissionError):
+                office.service_dir()
+
+    def fake_soffice(self):
+        """Put a stand-in soffice, writing the output its arguments name, on PATH."""
+        soffice = self.temp_dir / "soffice"
+        soffice.write_text('#!/bin/sh\necho "$@" > "$5/deck.${3%%:*}"\n')
+        soffice.chmod(0o755)
+
+    def test_runs_soffice_once_by_default(self):
+        self.fake_soffice()
+        environment = {
+            "OFFICE_SERVICE_DIR": str(self.temp_dir / "service"),
+            "PATH": str(self.temp_dir),
+        }
+        with mock.patch.dict(os.environ, environment):
+            os.environ.pop("OFFICE_SERVICE", None)
+            with mock.patch.object(office, "_request") as request:
+                output = office.convert(self.document, self.temp_dir, "html:HTML")
+            request.assert_not_called()
+        self.assertEqual(output, self.temp_dir / "deck.html")
+        self.assertEqual(
+            output.read_text().split(),
+            ["--headless", "--convert-to", "html:HTML", "--outdir"]
+            + [str(self.temp_dir), str(self.document)],
+        )
+
+    def test_shared_service_dir_falls_back_to_soffice_once(self):
+        self.fake_soffice()
+        service_dir = self.temp_dir / "service"
+        service_dir.mkdir(mode=0o755)
+        service_dir.chmod(0o755)
+        environment = {
+            "OFFICE_SERVICE": "on",
+            "OFFICE_SERVICE_DIR": str(service_dir),
+            "PATH": str(self.temp_dir),
+        }
+        with mock.patch.dict(os.environ, environment):
+            with mock.patch.object(office, "_start_service") as start_service:
+                output = office.convert(self.document, self.temp_dir, "pdf")
+                with self.assertRaises(office.ServiceUnavailable):
+                    office.recalculate(self.document)
+            start_service.assert_not_called()
+        self.assertEqual(output, self.temp_dir / "deck.pdf")
+        self.assertFalse((service_dir / "socket").exists())
+
+    def test_without_soffice(self):
+        if office.find_soffice() is not None:
+            self.skipTest("soffice is installed")
+        environment = {
+            "OFFICE_SERVICE_DIR": str(self.temp_dir / "service"),
+            "PATH": str(self.temp_dir),
+        }
+        with mock.patch.dict(os.environ, environment):
+            for enabled in ("off", "on"):
+                with mock.patch.dict(os.environ, {"OFFICE_SERVICE": enabled}):
+                    with self.assertRaises(FileNotFoundError):
+                        office.convert(self.document, self.temp_dir)
+            # Packing skips validation without soffice
+            self.assertTrue(pack.validate_document(self.document))
+
+
+@skipIf(office.find_soffice() is None, "soffice is not installed")
+class TestSoffice(TestCase):
+    """Converts with the real soffice, once per call and on the service."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_soffice_"))
+        make_docx(self.temp_dir / "document.docx", paragraphs=20)
+        make_pptx(self.temp_dir / "deck.pptx", slides=2)
+        make_xlsx(self.temp_dir / "book.xlsx", rows=10, cols=3)
+        environment = mock.patch.dict(
+            os.environ, {"OFFICE_SERVICE_DIR": str(self.temp_dir / "service")}
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+        os.environ.pop("OFFICE_SERVICE", None)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assert_converts(self):
+        outdir = self.temp_dir / "out"
+        outdir.mkdir(exist_ok=True)
+        for name in ("document.docx", "deck.pptx", "book.xlsx"):
+            with self.subTest(name=name):
+                output = office.convert(self.temp_dir / name, outdir, timeout=120)
+                self.assertEqual(output, outdir / f"{Path(name).stem}.pdf")
+                self.assertEqual(output.read_bytes()[:5], b"%PDF-")
+                output.unlink()
+        self.assertTrue(pack.validate_document(self.temp_dir / "document.docx"))
+
+    def test_convert_once(self):
+        self.assert_converts()
+
+    def test_service(self):
+        if office._uno_python() is None:
+            self.skipTest("No Python with the uno module")
+        os.environ["OFFICE_SERVICE"] = "on"
+        self.addCleanup(office.stop_service)
+        with mock.patch.object(office, "_convert_once") as convert_once:
+            self.assert_converts()
+            convert_once.assert_not_called()
+        book = self.temp_dir / "book.xlsx"
+        office.recalculate(book)
+        self.assertTrue(zipfile.is_zipfile(book))
+        self.assertTrue(office.stop_service())
+
+
+if __name__ == "__main__":
+    main()
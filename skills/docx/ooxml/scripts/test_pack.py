@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Regression tests for packing unpacked Office documents.
+"""
+
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase, main
+
+from pack import condense_xml_bytes, condense_xml_minidom, pack_document
+from synthetic import docx_document_xml, docx_header_xml, make_docx
+
+# Golden (input, condensed output) pairs produced by the DOM implementation
+GOLDEN = [
+    (
+        b'<?xml version="1.0" standalone="yes"?>\n<w:document xmlns:w="u">\n'
+        b"  <w:body>\n    <w:p/>\n  </w:body>\n</w:document>",
+        b'<w:document xmlns:w="u"><w:body><w:p/></w:body></w:document>',
+    ),
+    # Text in *:t elements is verbatim, including whitespace and comments
+    (
+        b'<r xmlns:w="u"><w:t>  </w:t><w:t> a <!--c--> b </w:t><t> </t></r>',
+        b'<r xmlns:w="u"><w:t>  </w:t><w:t> a <!--c--> b </w:t><t/></r>',
+    ),
+    # Comments split text nodes, so only the whitespace-only side is dropped
+    (
+        b"<r><p>a <!--c-->  </p><p>  <!--c--> b</p></r>",
+        b"<r><p>a </p><p> b</p></r>",
+    ),
+    # Non-breaking spaces count as whitespace
+    (b"<r>\xc2\xa0<p>\xc2\xa0x</p></r>", b"<r><p>\xc2\xa0x</p></r>"),
+    # Namespace declarations are written before the other attributes
+    (
+        b'<r a="1" xmlns="d" xmlns:w="u" w:b="2"><w:p xmlns=""/></r>',
+        b'<r xmlns="d" xmlns:w="u" a="1" w:b="2"><w:p xmlns=""/></r>',
+    ),
+    (
+        b'<r a="&lt;&amp;&quot;">&gt; "x"<p>\r\n</p></r>',
+        b'<r a="&lt;&amp;&quot;">&gt; &quot;x&quot;<p/></r>',
+    ),
+    (
+        b"<r><![CDATA[ ]]> x<![CDATA[]]> <p><![CDATA[<a>]]></p></r>",
+        b"<r><![CDATA[ ]]> x <p><![CDATA[<a>]]></p></r>",
+    ),
+    # Comments and processing instructions outside the root element are kept
+    (
+        b"<!--top--><?pi  data?>\n<r><?q?></r>\n<!--end-->",
+        b"<!--top--><?pi data?><r><?q ?></r><!--end-->",
+    ),
+    (b"<!DOCTYPE r><r> </r>", b"<!DOCTYPE r><r/>"),
+]
+
+
+class TestPackDocument(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_pack_"))
+        source = make_docx(
+            self.temp_dir / "source.docx", headers=3, media_kb=4, images=2
+        )
+        self.unpacked = self.temp_dir / "unpacked"
+        with zipfile.ZipFile(source) as zf:
+            zf.extractall(self.unpacked)
+
+        # Pretty-print a part the way unpack.py does
+        document = self.unpacked / "word" / "document.xml"
+        document.write_text(
+            document.read_text()
+            .replace("<w:p>", "\n  <w:p>")
+            .replace("<w:sectPr/>", "<!-- section -->\n  <w:sectPr/>")
+        )
+        self.output = self.temp_dir / "out" / "packed.docx"
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_condenses_xml_and_stores_media(self):
+        before = {f: f.read_bytes() for f in self.unpacked.rglob("*") if f.is_file()}
+
+        self.assertTrue(pack_document(self.unpacked, self.output))
+
+        with zipfile.ZipFile(self.output) as zf:
+            names = {info.filename: info for info in zf.infolist()}
+            self.assertEqual(
+                set(names),
+                {f.relative_to(self.unpacked).as_posix() for f in before},
+            )
+            for f, content in before.items():
+                name = f.relative_to(self.unpacked).as_posix()
+                if f.name.endswith((".xml", ".rels")):
+                    self.assertEqual(zf.read(name), condense_xml_bytes(content))
+                    self.assertEqual(names[name].compress_type, zipfile.ZIP_DEFLATED)
+                else:
+                    self.assertEqual(zf.read(name), content)
+                    self.assertEqual(names[name].compress_type, zipfile.ZIP_STORED)
+            self.assertNotIn(b"\n  <w:p>", zf.read("word/document.xml"))
+            self.assertNotIn(b"<!--", zf.read("word/document.xml"))
+
+        # The unpacked directory is left untouched
+        self.assertEqual(
+            {f: f.read_bytes() for f in self.unpacked.rglob("*") if f.is_file()},
+            before,
+        )
+
+    def test_parallel_matches_serial(self):
+        serial = self.temp_dir / "serial.docx"
+        pack_document(self.unpacked, serial)
+        pack_document(self.unpacked, self.output, jobs=2)
+
+        with zipfile.ZipFile(serial) as a, zipfile.ZipFile(self.output) as b:
+            self.assertEqual(a.namelist(), b.namelist())
+            for name in a.namelist():
+                self.assertEqual(a.read(name), b.read(name))
+
+    def test_failure_keeps_existing_output(self):
+        self.output.parent.mkdir()
+        self.output.write_bytes(b"previous")
+        (self.unpacked / "word" / "broken.xml").write_text("<w:p>")
+
+        with self.assertRaises(Exception):
+            pack_document(self.unpacked, self.output)
+
+        self.assertEqual(self.output.read_bytes(), b"previous")
+        self.assertEqual(list(self.output.parent.iterdir()), [self.output])
+
+    def test_imports_as_package_module(self):
+        # As scripts/document.py imports it, without this directory on sys.path
+        self.assertTrue(pack_document(self.unpacked, self.output))
+        script = (
+            "import sys\n"
+            "from pathlib import Path\n"
+            "from ooxml.scripts.pack import validate_document\n"
+            "validate_document(Path(sys.argv[1]))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script, str(self.output)],
+            cwd=Path(__file__).resolve().parents[2],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class TestCondenseXml(TestCase):
+    def test_golden(self):
+        declaration = b'<?xml version="1.0" encoding="UTF-8"?>'
+        for content, expected in GOLDEN:
+            with self.subTest(content=content):
+                self.assertEqual(condense_xml_bytes(content), declaration + expected)
+                self.assertEqual(condense_xml_minidom(content), declaration + expected)
+
+    def test_matches_dom_on_generated_parts(self):
+        parts = [
+            docx_document_xml(200, tracked_changes=20),
+            docx_header_xml(1),
+            docx_header_xml(2, invalid=True),
+        ]
+        for content in parts:
+            content = content.replace("<w:p>", "\n  <w:p>").encode()
+            self.assertEqual(condense_xml_bytes(content), condense_xml_minidom(content))
+
+    def test_matches_dom_on_random_documents(self):
+        rng = random.Random(0)
+        tags = ["w:t", "a:t", "w:p", "t", "p"]
+        chunks = [" ", "\n  ", "x", " y ", "&amp;", "<!--c-->", "<![CDATA[ ]]>"]
+
+        def node(depth):
+            if depth > 3 or rng.random() < 0.3:
+                return "".join(rng.choice(chunks) for _ in range(rng.randint(0, 3)))
+            tag = rng.choice(tags)
+            children = "".join(node(depth + 1) for _ in range(rng.randint(0, 4)))
+            return f"<{tag}>{children}</{tag}>"
+
+        for _ in range(300):
+            content = f'<r xmlns:w="u" xmlns:a="v">{node(0)}</r>'.encode()
+            self.assertEqual(condense_xml_bytes(content), condense_xml_minidom(content))
+
+    def test_rejects_entity_declarations(self):
+        content = b'<!DOCTYPE r [<!ENTITY e "x">]><r>&e;</r>'
+        with self.assertRaises(ValueError):
+            condense_xml_bytes(content)
+
+    def test_malformed_xml_raises(self):
+        with self.assertRaises(Exception):
+            condense_xml_bytes(b"<r><p></r>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Regression tests for unpacking and pretty-printing Office documents.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase, main
+
+from synthetic import make_docx
+from unpack import (
+    format_parts,
+    is_formatted,
+    pretty_print_minidom,
+    pretty_print_xml_bytes,
+    unpack_document,
+)
+
+# Golden (input, pretty-printed output) pairs produced by the DOM implementation
+GOLDEN = [
+    (
+        b'<?xml version="1.0" standalone="yes"?>\n'
+        b'<w:document xmlns:w="u"><w:body><w:p><w:r><w:t xml:space="preserve">'
+        b" a </w:t></w:r></w:p><w:sectPr/></w:body></w:document>",
+        b'<w:document xmlns:w="u">\n'
+        b"  <w:body>\n"
+        b"    <w:p>\n"
+        b"      <w:r>\n"
+        b'        <w:t xml:space="preserve"> a </w:t>\n'
+        b"      </w:r>\n"
+        b"    </w:p>\n"
+        b"    <w:sectPr/>\n"
+        b"  </w:body>\n"
+        b"</w:document>\n",
+    ),
+    # Mixed content puts each text node on its own indented line
+    (
+        b"<r><p>a<b/>c</p></r>",
+        b"<r>\n  <p>\n    a\n    <b/>\n    c\n  </p>\n</r>\n",
+    ),
+    # Namespace declarations come first and non-ASCII becomes references
+    (
+        b'<r a="1" xmlns="d">\xe2\x82\xac<!--x--></r>',
+        b'<r xmlns="d" a="1">\n  &#8364;\n  <!--x-->\n</r>\n',
+    ),
+    # CDATA sections are written without indentation
+    (
+        b"<r><a><![CDATA[x]]></a><b><![CDATA[y]]><c/></b></r>",
+        b"<r>\n  <a><![CDATA[x]]></a>\n  <b>\n<![CDATA[y]]>    <c/>\n  </b>\n</r>\n",
+    ),
+    (
+        b"<!--top--><?pi data?><r><?q?></r>",
+        b"<!--top-->\n<?pi data?>\n<r>\n  <?q ?>\n</r>\n",
+    ),
+]
+
+
+class TestPrettyPrint(TestCase):
+    def test_golden(self):
+        declaration = b'<?xml version="1.0" encoding="ascii"?>\n'
+        for content, expected in GOLDEN:
+            with self.subTest(content=content):
+                self.assertEqual(
+                    pretty_print_xml_bytes(content), declaration + expected
+                )
+                self.assertEqual(pretty_print_minidom(content), declaration + expected)
+
+    def test_matches_dom_on_random_documents(self):
+        rng = random.Random(0)
+        tags = ["w:t", "w:p", "t", "p"]
+        chunks = [" ", "\n  ", "x", "€", "&amp;", "<!--c-->", "<![CDATA[ ]]>"]
+
+        def node(depth):
+            if depth > 3 or rng.random() < 0.3:
+                return "".join(rng.choice(chunks) for _ in range(rng.randint(0, 3)))
+            tag = rng.choice(tags)
+            children = "".join(node(depth + 1) for _ in range(rng.randint(0, 4)))
+            return f"<{tag}>{children}</{tag}>"
+
+        for _ in range(300):
+            content = f'<r xmlns:w="u">{node(0)}</r>'.encode()
+            self.assertEqual(
+                pretty_print_xml_bytes(content), pretty_print_minidom(content)
+            )
+
+
+class TestUnpackDocument(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_unpack_"))
+        self.docx = make_docx(
+            self.temp_dir / "source.docx", headers=4, media_kb=4, images=2
+        )
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def read_tree(self, directory):
+        return {
+            f.relative_to(directory).as_posix(): f.read_bytes()
+            for f in directory.rglob("*")
+            if f.is_file()
+        }
+
+    def test_formats_xml_parts(self):
+        output = self.temp_dir / "serial"
+        parts = unpack_document(self.docx, output)
+
+        with zipfile.ZipFile(self.docx) as zf:
+            self.assertEqual(set(self.read_tree(output)), set(zf.namelist()))
+            self.assertIn("_rels/.rels", parts)
+            for name in zf.namelist():
+                content = (output / name).read_bytes()
+                if name in parts:
+                    self.assertEqual(content, pretty_print_minidom(zf.read(name)))
+                else:
+                    self.assertEqual(content, zf.read(name))
+
+    def test_parallel_and_lazy_match_serial(self):
+        unpack_document(self.docx, self.temp_dir / "serial")
+        unpack_document(self.docx, self.temp_dir / "parallel", jobs=2)
+        lazy = self.temp_dir / "lazy"
+        unpack_document(self.docx, lazy, lazy=True)
+
+        self.assertFalse(is_formatted(lazy / "word" / "document.xml"))
+        self.assertEqual(
+            format_parts(lazy, ["word/document.xml"]), ["word/document.xml"]
+        )
+        self.assertTrue(is_formatted(lazy / "word" / "document.xml"))
+        self.assertFalse(is_formatted(lazy / "word" / "styles.xml"))
+        # Formatting is idempotent and skips parts already done
+        self.assertEqual(format_parts(lazy, ["word/document.xml"]), [])
+        self.assertNotIn("word/document.xml", format_parts(lazy))
+
+        expected = self.read_tree(self.temp_dir / "serial")
+        self.assertEqual(self.read_tree(self.temp_dir / "parallel"), expected)
+        self.assertEqual(self.read_tree(lazy), expected)
+
+    def test_format_keeps_linked_copies(self):
+        lazy = self.temp_dir / "lazy"
+        unpack_document(self.docx, lazy, lazy=True)
+        document = lazy / "word" / "document.xml"
+        link = self.temp_dir / "document.xml"
+        os.link(document, link)
+        original = link.read_bytes()
+
+        format_parts(lazy, ["word/document.xml"])
+        self.assertTrue(is_formatted(document))
+        self.assertEqual(link.read_bytes(), original)
+        self.assertEqual(list(document.parent.glob("*.tmp")), [])
+
+    def test_format_missing_part(self):
+        unpack_document(self.docx, self.temp_dir / "lazy", lazy=True)
+        with self.assertRaises(ValueError):
+            format_parts(self.temp_dir / "lazy", ["word/missing.xml"])
+
+    def test_rejects_paths_outside_output(self):
+        archive = self.temp_dir / "unsafe.docx"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("../escape.xml", "<r/>")
+        with self.assertRaises(ValueError):
+            unpack_document(archive, self.temp_dir / "out")
+        self.assertFalse((self.temp_dir / "escape.xml").exists())
+
+
+if __name__ == "__main__":
+    main()
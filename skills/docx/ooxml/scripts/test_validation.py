@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the OOXML validators.
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+import lxml.etree
+from synthetic import make_docx, make_pptx, make_xlsx
+from unpack import unpack_document
+from validation import (
+    BaseSchemaValidator,
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+    schemas,
+)
+from validation.baseline import OriginalDocument
+from validation.package import PackageGraph, resolve_target
+from validation.redlining import W_NS, scan_paragraphs
+from validation.results import ResultCache
+from validation.stats import ValidationStats, profiled
+from validation.textdiff import diff_paragraphs, word_diff
+from validation.trees import TreeStore
+
+
+def quietly(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class TestOriginalBaseline(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+        self.original = make_docx(
+            self.temp_dir / "original.docx",
+            paragraphs=20,
+            headers=3,
+            invalid_headers=2,
+        )
+        self.unpacked = self.temp_dir / "unpacked"
+        with zipfile.ZipFile(self.original) as zf:
+            zf.extractall(self.unpacked)
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_reads_parts_without_extracting(self):
+        with OriginalDocument(self.original) as baseline:
+            self.assertTrue(baseline.has_part("word/document.xml"))
+            self.assertTrue(baseline.has_part("/word/header1.xml"))
+            self.assertFalse(baseline.has_part("word/comments.xml"))
+            with self.assertRaises(KeyError):
+                baseline.read("word/comments.xml")
+            self.assertIs(
+                baseline.tree("word/document.xml"), baseline.tree("/word/document.xml")
+            )
+
+    def test_caches_original_xsd_errors_per_part(self):
+        baseline = OriginalDocument(self.original)
+        validator = DOCXSchemaValidator(self.unpacked, self.original, baseline=baseline)
+
+        errors = baseline.xsd_errors("word/header1.xml", validator)
+
+        self.assertTrue(errors)
+        self.assertIs(errors, baseline.xsd_errors("word/header1.xml", validator))
+        self.assertEqual(baseline.xsd_errors("word/header3.xml", validator), set())
+        self.assertEqual(baseline.xsd_errors("word/missing.xml", validator), set())
+
+    def test_ignores_errors_already_in_original(self):
+        validator = DOCXSchemaValidator(self.unpacked, self.original)
+
+        self.assertTrue(quietly(validator.validate_against_xsd))
+
+    def test_reports_new_errors(self):
+        header = self.unpacked / "word" / "header3.xml"
+        header.write_text(
+            header.read_text().replace("<w:p>", '<w:p><w:pPr><w:jc w:val="x"/></w:pPr>')
+        )
+        validator = DOCXSchemaValidator(self.unpacked, self.original)
+
+        self.assertFalse(quietly(validator.validate_against_xsd))
+
+    def test_validators_share_baseline(self):
+        with OriginalDocument(self.original) as baseline:
+            schema_validator = DOCXSchemaValidator(
+                self.unpacked, self.original, baseline=baseline
+            )
+            redlining_validator = RedliningValidator(
+                self.unpacked, self.original, baseline=baseline
+            )
+
+            self.assertEqual(schema_validator.count_paragraphs_in_original(), 20)
+            self.assertTrue(quietly(schema_validator.validate))
+            self.assertTrue(quietly(redlining_validator.validate))
+
+
+class TestTreeStore(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+        self.original = make_docx(self.temp_dir / "original.docx", headers=2)
+        self.unpacked = self.temp_dir / "unpacked"
+        with zipfile.ZipFile(self.original) as zf:
+            zf.extractall(self.unpacked)
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_parses_each_file_once_per_run(self):
+        trees = TreeStore()
+        validator = DOCXSchemaValidator(self.unpacked, self.original, trees=trees)
+
+        self.assertTrue(quietly(validator.validate))
+        self.assertEqual(trees.parse_count, len(validator.xml_files))
+
+    def test_reparses_changed_files(self):
+        trees = TreeStore()
+        document = self.unpacked / "word" / "document.xml"
+        first = trees.parse(document)
+        self.assertIs(first, trees.parse(document))
+
+        document.write_text(document.read_text().replace("<w:sectPr/>", ""))
+
+        self.assertIsNot(first, trees.parse(document))
+        self.assertEqual(trees.parse_count, 2)
+
+    def test_caches_parse_errors(self):
+        trees = TreeStore()
+        broken = self.unpacked / "word" / "broken.xml"
+        broken.write_text("<w:p>")
+
+        for _ in range(2):
+            with self.assertRaises(lxml.etree.XMLSyntaxError):
+                trees.parse(broken)
+        self.assertEqual(trees.parse_count, 1)
+
+    def test_unique_id_pass_does_not_modify_shared_tree(self):
+        document = self.unpacked / "word" / "document.xml"
+        mc = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+        bookmark = '<w:p><w:bookmarkStart w:id="7" w:name="b"/></w:p>'
+        alternate = (
+            f'<mc:AlternateContent><mc:Choice Requires="w">{bookmark}</mc:Choice>'
+            "</mc:AlternateContent>"
+        )
+        document.write_text(
+            document.read_text()
+            .replace("<w:document ", f'<w:document xmlns:mc="{mc}" ')
+            .replace("<w:sectPr/>", f"{bookmark}{alternate}<w:sectPr/>")
+        )
+        trees = TreeStore()
+        validator = DOCXSchemaValidator(self.unpacked, self.original, trees=trees)
+
+        self.assertTrue(quietly(validator.validate_unique_ids))
+        shared_root = trees.getroot(document)
+        self.assertEqual(
+            len(shared_root.xpath("//mc:AlternateContent", namespaces={"mc": mc})), 1
+        )
+
+
+MAIN_XSD = """<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:t="urn:types" targetNamespace="urn:main" elementFormDefault="qualified">
+  <xsd:annotation><xsd:documentation>Main schema</xsd:documentation></xsd:annotation>
+  <xsd:import namespace="urn:types" schemaLocation="types/types.xsd"/>
+  <xsd:element name="root" type="t:ST_Value"/>
+</xsd:schema>"""
+
+TYPES_XSD = """<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    targetNamespace="urn:types">
+  <xsd:simpleType name="ST_Value">
+    <xsd:restriction base="xsd:string"><xsd:enumeration value="%s"/></xsd:restriction>
+  </xsd:simpleType>
+</xsd:schema>"""
+
+
+class TestSchemaCache(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_schemas_"))
+        self.schemas_dir = self.temp_dir / "schemas"
+        (self.schemas_dir / "types").mkdir(parents=True)
+        (self.schemas_dir / "main.xsd").write_text(MAIN_XSD)
+        self.write_types("a")
+        self.bundle = self.temp_dir / "bundle.zip"
+        # Keep the process-wide caches of other tests out of these ones
+        patcher = mock.patch.multiple(
+            schemas, _compiled_schemas={}, _bundled_sources={}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_types(self, value):
+        (self.schemas_dir / "types" / "types.xsd").write_text(TYPES_XSD % value)
+
+    def accepts(self, value):
+        schema = schemas.get_schema(self.schemas_dir / "main.xsd")
+        return schema.validate(
+            lxml.etree.fromstring(f'<root xmlns="urn:main">{value}</root>')
+        )
+
+    def test_compiles_each_schema_once(self):
+        count = schemas.compile_count()
+        schema = schemas.get_schema(self.schemas_dir / "main.xsd")
+        self.assertIs(
+            schemas.get_schema(self.schemas_dir / "types/../main.xsd"), schema
+        )
+        self.assertEqual(schemas.compile_count(), count + 1)
+
+    def test_resolves_imports_from_bundle(self):
+        self.assertTrue(schemas.load_schema_bundle(self.bundle, self.schemas_dir))
+        with zipfile.ZipFile(self.bundle) as zf:
+            self.assertNotIn(b"documentation", zf.read("main.xsd"))
+        # The schema tree is no longer read once the bundle is loaded
+        shutil.rmtree(self.schemas_dir)
+        self.assertTrue(self.accepts("a"))
+        self.assertFalse(self.accepts("b"))
+
+    def test_rebuilds_stale_bundle(self):
+        self.assertTrue(schemas.load_schema_bundle(self.bundle, self.schemas_dir))
+        self.assertFalse(schemas.load_schema_bundle(self.bundle, self.schemas_dir))
+
+        self.write_types("bb")
+        self.assertTrue(schemas.load_schema_bundle(self.bundle, self.schemas_dir))
+        self.assertTrue(self.accepts("bb"))
+        self.assertFalse(self.accepts("a"))
+
+        # Changed files of the same size are caught by their modification time
+        self.write_types("cc")
+        stat = (self.schemas_dir / "main.xsd").stat()
+        os.utime(
+            self.schemas_dir / "types" / "types.xsd",
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+        )
+        self.assertTrue(schemas.load_schema_bundle(self.bundle, self.schemas_dir))
+
+
+class TestPackageGraph(TestCase):
+    setUp = TestTreeStore.setUp
+    tearDown = TestTreeStore.tearDown
+
+    def add_relationships(self, relationships):
+        rels = self.unpacked / "word" / "_rels" / "document.xml.rels"
+        rels.write_text(
+            rels.read_text().replace(
+                "</Relationships>", relationships + "</Relationships>"
+            )
+        )
+
+    def test_resolves_targets_to_parts(self):
+        self.assertEqual(resolve_target("", "word/document.xml"), "word/document.xml")
+        self.assertEqual(
+            resolve_target("ppt/slides/slide1.xml", "../media/image1.png"),
+            "ppt/media/image1.png",
+        )
+        self.assertEqual(
+            resolve_target("word/document.xml", "/word/styles.xml"), "word/styles.xml"
+        )
+        self.assertEqual(resolve_target("word/document.xml", "../../x.xml"), "../x.xml")
+
+        self.add_relationships(
+            '<Relationship Id="rId8" Type="t/hyperlink" Target="file:///x.docx"'
+            ' TargetMode="External"/>'
+            '<Relationship Id="rId9" Type="t/styles" Target="/word/styles.xml"/>'
+        )
+        package = PackageGraph(self.unpacked, TreeStore())
+        relationships, error = package.relationships("word/document.xml")
+        self.assertIsNone(error)
+        self.assertEqual(
+            [(rel.id, rel.type, rel.part) for rel in relationships[-2:]],
+            [("rId8", "t/hyperlink", None), ("rId9", "t/styles", "word/styles.xml")],
+        )
+        self.assertEqual(package.relationships("word/header1.xml"), ([], None))
+        self.assertEqual(
+            [rel.part for rel in package.relationships("")[0]], ["word/document.xml"]
+        )
+        self.assertIn("png", package.content_types().defaults)
+
+    def test_reports_broken_and_unreferenced_parts(self):
+        self.add_relationships(
+            '<Relationship Id="rId9" Type="t/image" Target="media/missing.png"/>'
+        )
+        (self.unpacked / "word" / "orphan.xml").write_text("<orphan/>")
+        validator = DOCXSchemaValidator(self.unpacked, self.original)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertFalse(validator.validate_file_references())
+        self.assertIn(
+            "word/_rels/document.xml.rels: Line 2: "
+            "Broken reference to media/missing.png",
+            output.getvalue(),
+        )
+        self.assertIn("Unreferenced file: word/orphan.xml", output.getvalue())
+
+    def test_reads_each_rels_file_once(self):
+        trees = TreeStore()
+        validator = DOCXSchemaValidator(self.unpacked, self.original, trees=trees)
+        with mock.patch.object(
+            TreeStore, "getroot", autospec=True, side_effect=TreeStore.getroot
+        ) as getroot:
+            for check in (
+                validator.validate_file_references,
+                validator.validate_all_relationship_ids,
+                validator.validate_content_types,
+            ):
+                self.assertTrue(quietly(check))
+        rels_reads = [
+            call.args[1].name
+            for call in getroot.call_args_list
+            if call.args[1].name.endswith(".rels")
+        ]
+        self.assertEqual(sorted(rels_reads), [".rels", "document.xml.rels"])
+
+
+class TestIncrementalValidation(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+        self.original = make_docx(
+            self.temp_dir / "original.docx", headers=4, invalid_headers=1
+        )
+        self.unpacked = self.temp_dir / "unpacked"
+        with zipfile.ZipFile(self.original) as zf:
+            zf.extractall(self.unpacked)
+        self.trees = TreeStore()
+        self.results = ResultCache()
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def run_validator(self):
+        validator = DOCXSchemaValidator(
+            self.unpacked,
+            self.original,
+            verbose=True,
+            trees=self.trees,
+            results=self.results,
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = validator.validate()
+        return result, output.getvalue()
+
+    def test_reuses_results_of_unchanged_parts(self):
+        first = self.run_validator()
+        misses = self.results.misses
+
+        self.assertEqual(self.run_validator(), first)
+        self.assertEqual(self.results.misses, misses)
+
+    def test_rechecks_modified_parts(self):
+        self.assertTrue(self.run_validator()[0])
+        header = self.unpacked / "word" / "header3.xml"
+        header.write_text(
+            header.read_text().replace("<w:p>", '<w:p><w:pPr><w:jc w:val="x"/></w:pPr>')
+        )
+        self.results.invalidate([header])
+
+        result, output = self.run_validator()
+
+        self.assertFalse(result)
+        self.assertIn("word/header3.xml: 1 new error(s)", output)
+
+
+class TestParallelValidation(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+        self.original = make_docx(
+            self.temp_dir / "original.docx", headers=8, invalid_headers=2
+        )
+        self.unpacked = self.temp_dir / "unpacked"
+        with zipfile.ZipFile(self.original) as zf:
+            zf.extractall(self.unpacked)
+
+        # New XSD errors, duplicate IDs and undeclared Ignorable prefixes
+        for i in range(3, 9, 2):
+            header = self.unpacked / "word" / f"header{i}.xml"
+            header.write_text(
+                header.read_text()
+                .replace("<w:hdr ", '<w:hdr xmlns:mc="urn:mc" mc:Ignorable="b a" ')
+                .replace(
+                    "<w:p>",
+                    '<w:p><w:pPr><w:jc w:val="x"/></w:pPr>'
+                    '<w:bookmarkStart w:id="1" w:name="a"/>'
+                    '<w:bookmarkStart w:id="1" w:name="b"/>',
+                )
+            )
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def run_validator(self, jobs):
+        validator = DOCXSchemaValidator(
+            self.unpacked, self.original, verbose=True, jobs=jobs
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = validator.validate()
+        return result, output.getvalue()
+
+    def test_parallel_output_matches_serial(self):
+        serial_result, serial_output = self.run_validator(jobs=1)
+        parallel_result, parallel_output = self.run_validator(jobs=2)
+
+        self.assertFalse(serial_result)
+        self.assertIn("Duplicate id='1'", serial_output)
+        self.assertIn("Namespace 'a' in Ignorable", serial_output)
+        self.assertIn("new error(s)", serial_output)
+        self.assertEqual(parallel_result, serial_result)
+        self.assertEqual(parallel_output, serial_output)
+
+
+class TestValidationStats(TestCase):
+    setUp = TestParallelValidation.setUp
+    tearDown = TestParallelValidation.tearDown
+
+    def run_validator(self, **kwargs):
+        stats = ValidationStats()
+        validator = DOCXSchemaValidator(
+            self.unpacked, self.original, stats=stats, **kwargs
+        )
+        self.assertFalse(quietly(validator.validate))
+        return stats
+
+    def entry(self, stats, name):
+        return stats.passes[("DOCXSchemaValidator", name)]
+
+    def test_counts_passes_and_parts(self):
+        stats = self.run_validator()
+        xml_parts = len(list(self.unpacked.rglob("*.xml")))
+        xml_parts += len(list(self.unpacked.rglob("*.rels")))
+
+        parse = self.entry(stats, "validate_xml")
+        self.assertEqual(parse["runs"], 1)
+        self.assertTrue(parse["passed"])
+        self.assertEqual(parse["parts"], xml_parts)
+        self.assertEqual(parse["parses"], xml_parts)
+        self.assertGreater(parse["bytes_parsed"], 0)
+
+        unique_ids = self.entry(stats, "validate_unique_ids")
+        self.assertFalse(unique_ids["passed"])
+        self.assertEqual(unique_ids["parses"], 0)
+        self.assertEqual(unique_ids["errors"], 3)
+
+        xsd = self.entry(stats, "validate_against_xsd")
+        self.assertEqual(xsd["errors"], 3)
+        self.assertEqual(
+            sorted(
+                part
+                for part, passes in stats.parts.items()
+                if passes.get("validate_against_xsd", {}).get("errors")
+            ),
+            ["word/header3.xml", "word/header5.xml", "word/header7.xml"],
+        )
+        self.assertAlmostEqual(
+            stats.total_seconds,
+            sum(entry["seconds"] for entry in stats.passes.values()),
+        )
+        self.assertIn("validate_against_xsd", stats.summary())
+
+        report = self.temp_dir / "report.json"
+        stats.write_json(report)
+        self.assertIn('"validate_xml"', report.read_text())
+
+    def test_counts_cached_and_worker_parts(self):
+        results = ResultCache()
+        first = self.entry(self.run_validator(results=results), "validate_against_xsd")
+        cached = self.entry(self.run_validator(results=results), "validate_against_xsd")
+        self.assertEqual(cached["cached_parts"], first["parts"])
+        self.assertEqual((cached["parts"], cached["parses"]), (0, 0))
+        self.assertEqual(cached["errors"], first["errors"])
+
+        serial = self.run_validator()
+        parallel = self.run_validator(jobs=2)
+        for name in ("validate_namespaces", "validate_against_xsd"):
+            with self.subTest(name=name):
+                # Workers parse again with their own trees, so only these agree
+                for key in ("parts", "errors"):
+                    self.assertEqual(
+                        self.entry(parallel, name)[key], self.entry(serial, name)[key]
+                    )
+        self.assertEqual(parallel.parts.keys(), serial.parts.keys())
+
+    def test_profiled_saves_cprofile_data(self):
+        output = self.temp_dir / "validate.prof"
+        with profiled("cprofile", output=output):
+            self.run_validator()
+        self.assertGreater(output.stat().st_size, 0)
+        with self.assertRaises(ValueError):
+            with profiled("unknown"):
+                pass
+
+
+# Golden (original, modified, diff) cases for the in-process word diff
+WORD_DIFF = [
+    ("same\ntext", "same\ntext", ""),
+    (
+        "The report is monthly",
+        "The report is quarterly",
+        "The report is [-monthly-]{+quarterly+}",
+    ),
+    # Small edits inside a word are shown by character
+    ("The colour is red.", "The color is red!", "The colo[-u-]r is red[-.-]{+!+}"),
+    ("a b", "a b c", "a b{+ c+}"),
+    ("Hello", "Goodbye", "[-Hello-]{+Goodbye+}"),
+    # Edited paragraphs are paired with their most similar counterpart
+    (
+        "keep\nGone paragraph\nA b c\nlast",
+        "keep\nA b d\nNew para\nlast",
+        "[-Gone paragraph-]\nA b [-c-]{+d+}\n{+New para+}",
+    ),
+    ("one\ntwo\nthree", "one\nthree", "[-two-]"),
+    ("one\nthree", "one\ntwo\nthree", "{+two+}"),
+]
+
+
+class TestWordDiff(TestCase):
+    def test_golden(self):
+        for original, modified, expected in WORD_DIFF:
+            with self.subTest(original=original, modified=modified):
+                self.assertEqual(word_diff(original, modified), expected)
+
+    def test_only_changed_paragraphs_are_reported(self):
+        original = [f"Paragraph {i} of the agreement." for i in range(3000)]
+        modified = list(original)
+        modified[10] = "Paragraph 10 of the amended agreement."
+        del modified[2000]
+        modified.insert(2500, "A new clause.")
+        original.extend(["Repeated."] * 3)
+        modified.extend(["Repeated."] * 2)
+
+        self.assertEqual(
+            diff_paragraphs(original, modified),
+            [
+                "Paragraph 10 of the {+amended +}agreement.",
+                "[-Paragraph 2000 of the agreement.-]",
+                "{+A new clause.+}",
+                "[-Repeated.-]",
+            ],
+        )
+
+    def test_redlining_report_without_git(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+        self.addCleanup(shutil.rmtree, temp_dir)
+        original = make_docx(temp_dir / "original.docx", paragraphs=5)
+        unpacked = temp_dir / "unpacked"
+        with zipfile.ZipFile(original) as zf:
+            zf.extractall(unpacked)
+        document = unpacked / "word" / "document.xml"
+        # An untracked edit next to a tracked insertion
+        document.write_text(
+            document.read_text().replace(
+                "<w:sectPr/>",
+                '<w:p><w:ins w:author="Claude"><w:r><w:t>Added</w:t></w:r></w:ins>'
+                "<w:r><w:t>Untracked</w:t></w:r></w:p><w:sectPr/>",
+            )
+        )
+        validator = RedliningValidator(unpacked, original)
+
+        output = io.StringIO()
+        path = os.environ.get("PATH", "")
+        os.environ["PATH"] = ""
+        try:
+            with contextlib.redirect_stdout(output):
+                self.assertFalse(validator.validate())
+        finally:
+            os.environ["PATH"] = path
+        self.assertTrue(output.getvalue().rstrip().endswith("{+Untracked+}"))
+
+
+def reference_paragraphs(xml, author="Claude"):
+    """Paragraph texts as computed on a full tree before streaming."""
+    tag = {name: f"{{{W_NS}}}{name}" for name in ("p", "t", "delText", "ins", "del")}
+    author_attr = f"{{{W_NS}}}author"
+    root = ET.fromstring(xml)
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if child.tag == tag["ins"] and child.get(author_attr) == author:
+                parent.remove(child)
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if child.tag == tag["del"] and child.get(author_attr) == author:
+                for elem in child.iter(tag["delText"]):
+                    elem.tag = tag["t"]
+                index = list(parent).index(child)
+                parent[index : index + 1] = list(child)
+    texts = [
+        "".join(t.text or "" for t in p.iter(tag["t"])) for p in root.iter(tag["p"])
+    ]
+    return [text for text in texts if text]
+
+
+class TestParagraphScan(TestCase):
+    def random_document(self, rng):
+        def node(depth):
+            if depth > 5 or rng.random() < 0.25:
+                tag = rng.choice(["w:t", "w:t", "w:delText"])
+                return f"<{tag}>{rng.choice(['', 'a', 'b c', ' x '])}</{tag}>"
+            tag = rng.choice(["w:p", "w:r", "w:ins", "w:del", "w:tbl"])
+            attrs = ""
+            if tag in ("w:ins", "w:del"):
+                attrs = f' w:author="{rng.choice(["Claude", "Reviewer"])}"'
+            children = "".join(node(depth + 1) for _ in range(rng.randint(0, 4)))
+            return f"<{tag}{attrs}>{children}</{tag}>"
+
+        body = "".join(node(0) for _ in range(rng.randint(1, 6)))
+        return f'<w:document xmlns:w="{W_NS}"><w:body>{body}</w:body></w:document>'
+
+    def test_matches_tree_based_extraction(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            xml = self.random_document(rng)
+            expected = reference_paragraphs(xml)
+            with self.subTest(xml=xml):
+                scan = scan_paragraphs(
+                    io.BytesIO(xml.encode()), keep=range(len(expected))
+                )
+                self.assertEqual(
+                    [scan.texts[i] for i in range(len(scan.fingerprints))], expected
+                )
+                self.assertEqual(scan.changes, xml.count('"Claude"'))
+
+    def test_fingerprints_ignore_claude_changes(self):
+        original = f'<w:document xmlns:w="{W_NS}"><w:body><w:p><w:r><w:t>Pay in 30 days</w:t></w:r></w:p></w:body></w:document>'
+        redlined = original.replace(
+            "<w:r><w:t>Pay in 30 days</w:t></w:r>",
+            "<w:r><w:t>Pay in </w:t></w:r>"
+            '<w:del w:author="Claude"><w:r><w:delText>30</w:delText></w:r></w:del>'
+            '<w:ins w:author="Claude"><w:r><w:t>45</w:t></w:r></w:ins>'
+            "<w:r><w:t> days</w:t></w:r>",
+        )
+
+        first = scan_paragraphs(io.BytesIO(original.encode()))
+        second = scan_paragraphs(io.BytesIO(redlined.encode()))
+
+        self.assertEqual(first.fingerprints, second.fingerprints)
+        self.assertEqual((first.changes, second.changes), (0, 2))
+        self.assertEqual(second.texts, {})
+
+
+class TestSyntheticDocuments(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_validation_"))
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def assert_schema_valid(self, path, validator_class):
+        """Every part with a schema is valid, not only free of new errors."""
+        unpacked = self.temp_dir / path.stem
+        unpack_document(path, unpacked)
+        validator = validator_class(unpacked, path)
+        for xml_file in validator.xml_files:
+            with self.subTest(document=path.name, part=xml_file.name):
+                valid, errors = validator._validate_single_file_xsd(
+                    xml_file, validator.unpacked_dir
+                )
+                self.assertIn(valid, (True, None), errors)
+        return validator
+
+    def test_generated_documents_are_valid(self):
+        docx = make_docx(
+            self.temp_dir / "docx.docx",
+            paragraphs=40,
+            tracked_changes=5,
+            comments=7,
+            headers=1,
+        )
+        validator = self.assert_schema_valid(docx, DOCXSchemaValidator)
+        self.assertTrue(quietly(validator.validate))
+        comments = (validator.unpacked_dir / "word" / "comments.xml").read_text()
+        self.assertEqual(comments.count("<w:comment "), 7)
+
+        pptx = make_pptx(
+            self.temp_dir / "pptx.pptx", slides=3, shapes=5, images=4, media_kb=1
+        )
+        validator = self.assert_schema_valid(pptx, PPTXSchemaValidator)
+        self.assertTrue(quietly(validator.validate))
+        self.assertEqual(len(list(validator.unpacked_dir.glob("ppt/slides/*.xml"))), 3)
+
+        xlsx = make_xlsx(self.temp_dir / "xlsx.xlsx", sheets=2, rows=10, cols=30)
+        validator = self.assert_schema_valid(xlsx, BaseSchemaValidator)
+        sheet = (
+            validator.unpacked_dir / "xl" / "worksheets" / "sheet2.xml"
+        ).read_text()
+        self.assertIn('<dimension ref="A1:AD10"/>', sheet)
+
+
+if __name__ == "__main__":
+    main()
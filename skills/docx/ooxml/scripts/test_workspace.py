@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the copy-on-write document workspace.
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+import workspace
+from synthetic import make_docx
+from unpack import unpack_document
+from workspace import Workspace
+
+
+class TestWorkspace(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_workspace_"))
+        self.source = self.temp_dir / "source"
+        make_docx(self.temp_dir / "source.docx", headers=2, media_kb=4, images=2)
+        unpack_document(self.temp_dir / "source.docx", self.source)
+        self.original = self.read_tree(self.source)
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def read_tree(self, directory):
+        return {
+            f.relative_to(directory).as_posix(): f.read_bytes()
+            for f in directory.rglob("*")
+            if f.is_file()
+        }
+
+    def replace(self, path, content):
+        """Rewrite a part the way editors do: a new file renamed over the old."""
+        temp_path = path.with_name(path.name + ".new")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+
+    def edit(self, space):
+        """Rewrite document.xml and add a new part; return the expected tree."""
+        document = space.path / "word" / "document.xml"
+        self.replace(document, document.read_bytes().replace(b"</w:t>", b"!</w:t>"))
+        (space.path / "word" / "people.xml").write_bytes(b"<people/>")
+        expected = dict(self.original)
+        expected["word/document.xml"] = document.read_bytes()
+        expected["word/people.xml"] = b"<people/>"
+        return expected
+
+    def test_mirrors_source_without_changes(self):
+        space = Workspace(self.source, self.temp_dir / "work")
+        self.assertEqual(self.read_tree(space.path), self.original)
+        self.assertEqual(self.read_tree(space.original), self.original)
+        self.assertEqual(space.changed_parts(), [])
+        self.assertEqual(space.save(), [])
+
+    def test_save_writes_only_changed_parts(self):
+        space = Workspace(self.source, self.temp_dir / "work")
+        expected = self.edit(space)
+        self.assertEqual(
+            space.changed_parts(), ["word/document.xml", "word/people.xml"]
+        )
+
+        self.assertEqual(space.save(), ["word/document.xml", "word/people.xml"])
+        self.assertEqual(self.read_tree(self.source), expected)
+        # The snapshot still holds the original, and unchanged parts are not resaved
+        self.assertEqual(self.read_tree(space.original), self.original)
+        self.assertEqual(space.save(), [])
+
+    def test_save_to_other_directory_copies_missing_parts(self):
+        space = Workspace(self.source, self.temp_dir / "work")
+        expected = self.edit(space)
+        target = self.temp_dir / "target"
+
+        self.assertEqual(sorted(space.save(target)), sorted(expected))
+        self.assertEqual(self.read_tree(target), expected)
+        self.assertEqual(self.read_tree(self.source), self.original)
+        self.assertEqual(space.save(target), [])
+
+    def test_in_place_write_stays_in_workspace(self):
+        space = Workspace(self.source, self.temp_dir / "work")
+        for directory in (space.path, space.original):
+            for f in directory.rglob("*"):
+                if f.is_file():
+                    source_file = self.source / f.relative_to(directory)
+                    self.assertNotEqual(f.stat().st_ino, source_file.stat().st_ino)
+
+        with open(space.path / "word" / "media" / "image1.png", "wb") as f:
+            f.write(b"NEW")
+
+        self.assertEqual(self.read_tree(self.source), self.original)
+        self.assertEqual(self.read_tree(space.original), self.original)
+        self.assertEqual(space.changed_parts(), ["word/media/image1.png"])
+        self.assertEqual(space.save(), ["word/media/image1.png"])
+        self.assertEqual(
+            (self.source / "word" / "media" / "image1.png").read_bytes(), b"NEW"
+        )
+        self.assertEqual(self.read_tree(space.original), self.original)
+
+    def test_copy_fallback(self):
+        # Without shared blocks the workspace copies the parts and behaves the same
+        fcntl = mock.Mock()
+        fcntl.ioctl.side_effect = OSError(errno.EOPNOTSUPP, "not supported")
+        with mock.patch.object(workspace, "fcntl", fcntl):
+            space = Workspace(self.source, self.temp_dir / "work")
+        # Cloning is not retried for every part once it failed
+        self.assertEqual(fcntl.ioctl.call_count, 1)
+        self.assertEqual(self.read_tree(space.path), self.original)
+        self.assertEqual(self.read_tree(space.original), self.original)
+
+        expected = self.edit(space)
+        self.assertEqual(space.save(), ["word/document.xml", "word/people.xml"])
+        self.assertEqual(self.read_tree(self.source), expected)
+        self.assertEqual(self.read_tree(space.original), self.original)
+
+    def test_failed_write_leaves_target_intact(self):
+        space = Workspace(self.source, self.temp_dir / "work")
+        self.edit(space)
+        with mock.patch.object(
+            workspace.os, "replace", side_effect=OSError("disk full")
+        ):
+            with self.assertRaises(OSError):
+                space.save()
+        self.assertEqual(self.read_tree(self.source), self.original)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,427 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)
 
+Example usage:
+    python unpack.py <office_file> <output_dir>
+    python unpack.py <office_file> <output_dir> --jobs 0  # Format on all CPUs
+    python unpack.py <office_file> <output_dir> --lazy    # Format parts on demand
+    python unpack.py --format <output_dir> word/document.xml
+"""
+
+import argparse
+import os
 import random
 import sys
 import defusedxml.minidom
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from xml.parsers import expat
+
+# Parts that are pretty-printed; matched on the name since "_rels/.rels" has no suffix
+XML_SUFFIXES = (".xml", ".rels")
+
+# Declaration written on every pretty-printed part; raw Office parts use UTF-8
+FORMATTED_DECLARATION = b'<?xml version="1.0" encoding="ascii"?>'
+
+INDENT = "  "
+
+# Per-process archive used by pool workers, set by _init_worker
+_worker_zip = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Unpack an Office file and pretty-print its XML parts",
+        usage=(
+            "%(prog)s <office_file> <output_dir> [--lazy] [--jobs N]\n"
+            "       %(prog)s --format <output_dir> [part ...]"
+        ),
+    )
+    parser.add_argument("paths", nargs="+", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Extract parts as-is and pretty-print them later with --format",
+    )
+    parser.add_argument(
+        "--format",
+        action="store_true",
+        help="Pretty-print parts of a lazily unpacked directory (default: all)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for pretty-printing (0 = all CPUs)",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.format:
+            formatted = format_parts(args.paths[0], args.paths[1:] or None, args.jobs)
+            print(f"Formatted {len(formatted)} part(s)")
+            return
+
+        if len(args.paths) != 2:
+            parser.error("expected <office_file> <output_dir>")
+        input_file, output_dir = args.paths
+        unpack_document(input_file, output_dir, jobs=args.jobs, lazy=args.lazy)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
+    if args.lazy:
+        print(
+            "Parts were not pretty-printed. Before reading a part, run: "
+            f"python {Path(sys.argv[0]).name} --format {output_dir} <part>"
+        )
+
+    # For .docx files, suggest an RSID for tracked changes
+    if input_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(input_file, output_dir, jobs=1, lazy=False):
+    """Extract an Office file and pretty-print its XML parts.
+
+    Each XML part is read from the archive, formatted and written in one step,
+    so parts are never written twice. With lazy=True parts are extracted as-is
+    and can be pretty-printed on demand with format_parts().
+
+    Args:
+        input_file: Path to the .docx/.pptx/.xlsx file
+        output_dir: Directory to extract into
+        jobs: Number of worker processes for pretty-printing (0 = all CPUs)
+        lazy: If True, skip pretty-printing
+
+    Returns:
+        list: Relative paths of the XML parts that were pretty-printed
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    with zipfile.ZipFile(input_file) as zf:
+        if lazy:
+            zf.extractall(output_path)
+            return []
+
+        xml_parts = []
+        for member in zf.infolist():
+            if member.filename.endswith(XML_SUFFIXES) and not member.is_dir():
+                xml_parts.append(member.filename)
+            else:
+                zf.extract(member, output_path)
+
+        jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        if jobs > 1 and len(xml_parts) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(xml_parts)),
+                initializer=_init_worker,
+                initargs=(input_file,),
+            ) as pool:
+                list(
+                    pool.map(
+                        _format_member_in_worker,
+                        xml_parts,
+                        [output_path] * len(xml_parts),
+                        chunksize=max(1, len(xml_parts) // (jobs * 4)),
+                    )
+                )
+        else:
+            for name in xml_parts:
+                _format_member(zf, name, output_path)
+
+    return xml_parts
+
+
+def format_parts(unpacked_dir, parts=None, jobs=1):
+    """Pretty-print parts of a lazily unpacked directory that are still raw.
+
+    Parts already pretty-printed are left alone, so this is safe to call
+    before every access.
+
+    Args:
+        unpacked_dir: Directory created by unpack_document(..., lazy=True)
+        parts: Relative part paths to format, or None for all XML parts
+        jobs: Number of worker processes for pretty-printing (0 = all CPUs)
+
+    Returns:
+        list: Relative paths of the parts that were pretty-printed
+
+    Raises:
+        ValueError: If a requested part does not exist
+    """
+    unpacked_path = Path(unpacked_dir)
+    if parts is None:
+        files = [
+            f
+            for f in sorted(unpacked_path.rglob("*"))
+            if f.name.endswith(XML_SUFFIXES) and f.is_file()
+        ]
+    else:
+        files = [unpacked_path / part for part in parts]
+        for f in files:
+            if not f.is_file():
+                raise ValueError(f"Part not found: {f.relative_to(unpacked_path)}")
+
+    pending = [f for f in files if not is_formatted(f)]
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            list(pool.map(format_file, pending))
+    else:
+        for f in pending:
+            format_file(f)
+    return [f.relative_to(unpacked_path).as_posix() for f in pending]
+
+
+def is_formatted(xml_file):
+    """Check if a part was already pretty-printed by this script."""
+    with open(xml_file, "rb") as f:
+        return f.read(len(FORMATTED_DECLARATION)) == FORMATTED_DECLARATION
+
+
+def format_file(xml_file):
+    """Pretty-print an XML file, replacing it with a new file.
+
+    The formatted part is written next to the original and renamed over it, so
+    an interrupted run never leaves a truncated part and other hard links to the
+    part keep the old file.
+    """
+    xml_file = Path(xml_file)
+    formatted = pretty_print_xml_bytes(xml_file.read_bytes())
+    temp_file = xml_file.with_name(f".{xml_file.name}.{os.getpid()}.tmp")
+    try:
+        temp_file.write_bytes(formatted)
+        os.replace(temp_file, xml_file)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+
+def _member_path(output_path, name):
+    """Return the extraction path of an archive member, refusing to escape."""
+    target = output_path / name
+    root = os.path.abspath(output_path)
+    if os.path.commonpath([root, os.path.abspath(target)]) != root:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    return target
+
+
+def _format_member(zf, name, output_path):
+    """Read an XML member from the archive and write it out pretty-printed."""
+    target = _member_path(output_path, name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(pretty_print_xml_bytes(zf.read(name)))
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
 
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
+def _init_worker(input_file):
+    """Open the archive once per worker process."""
+    global _worker_zip
+    _worker_zip = zipfile.ZipFile(input_file)
 
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
+
+def _format_member_in_worker(name, output_path):
+    _format_member(_worker_zip, name, output_path)
+
+
+def pretty_print_xml_bytes(content):
+    """Pretty-print XML content with two-space indentation.
+
+    The document is formatted in a single pass over the parser events without
+    building a DOM. The output is identical to pretty_print_minidom.
+
+    Args:
+        content: XML document as bytes
+
+    Returns:
+        bytes: The formatted document, ASCII encoded with character references
+    """
+    try:
+        return _StreamingFormatter().format(content)
+    except _NeedsDOM:
+        # Documents with a DTD are rare in Office files; let defusedxml vet them
+        return pretty_print_minidom(content)
+
+
+def pretty_print_minidom(content):
+    """Reference DOM-based implementation of pretty_print_xml_bytes.
+
+    Kept for equivalence tests and benchmarks.
+    """
     dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
+    return dom.toprettyxml(indent=INDENT, encoding="ascii")
+
+
+class _NeedsDOM(Exception):
+    """Raised when a document uses features only the DOM formatter handles."""
+
+
+def _escape(data):
+    """Escape character data the way minidom serializes text and attributes."""
+    return (
+        data.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+# States of an open element while its children are being written
+_EMPTY = 0  # start tag not yet closed, no children seen
+_HELD = 1  # a single text/CDATA child is held back until the next event
+_BLOCK = 2  # children are written on their own indented lines
+
+
+class _StreamingFormatter:
+    """Serialize expat events straight to minidom-style pretty-printed XML.
+
+    minidom writes an element whose only child is text inline and puts every
+    other child on its own line, so the first text child of an element is held
+    back until the next event shows whether it is the only one.
+    """
+
+    def __init__(self):
+        self._out = []
+        # One [qname, state, held child] entry per open element
+        self._stack = []
+        self._text = []
+        self._cdata = None
+        self._ns_decls = []
+        self._names = {}
+
+    def format(self, content):
+        parser = expat.ParserCreate(namespace_separator=" ")
+        parser.namespace_prefixes = True
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.specified_attributes = True
+        parser.StartDoctypeDeclHandler = self._doctype
+        parser.StartNamespaceDeclHandler = self._start_namespace
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._character_data
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+
+        self._out.append('<?xml version="1.0" encoding="ascii"?>\n')
+        parser.Parse(content, True)
+        return "".join(self._out).encode("ascii", "xmlcharrefreplace")
+
+    def _qname(self, name):
+        """Turn expat's "uri local prefix" name back into the qualified name."""
+        qname = self._names.get(name)
+        if qname is None:
+            parts = name.split(" ")
+            if len(parts) == 3:
+                qname = f"{parts[2]}:{parts[1]}"
+            else:
+                qname = parts[-1]
+            self._names[name] = qname
+        return qname
+
+    def _write_block_child(self, kind, data):
+        """Write a text or CDATA child on its own line."""
+        if kind == "text":
+            self._out.append(_escape(f"{INDENT * len(self._stack)}{data}\n"))
+        else:
+            self._out.append(f"<![CDATA[{data}]]>")
+
+    def _block(self):
+        """Switch the current element to writing children on separate lines."""
+        if not self._stack:
+            return
+        entry = self._stack[-1]
+        if entry[1] == _BLOCK:
+            return
+        self._out.append(">\n")
+        if entry[1] == _HELD:
+            self._write_block_child(*entry[2])
+            entry[2] = None
+        entry[1] = _BLOCK
+
+    def _add_leaf(self, kind, data):
+        """Add a text or CDATA child, holding it back if it may be written inline."""
+        if not self._stack:
+            return
+        entry = self._stack[-1]
+        if entry[1] == _EMPTY:
+            entry[1] = _HELD
+            entry[2] = (kind, data)
+        else:
+            self._block()
+            self._write_block_child(kind, data)
+
+    def _flush_text(self):
+        if self._text:
+            data = "".join(self._text)
+            self._text = []
+            self._add_leaf("text", data)
+
+    def _doctype(self, *args):
+        raise _NeedsDOM()
+
+    def _start_namespace(self, prefix, uri):
+        self._ns_decls.append((prefix, uri))
+
+    def _start_element(self, name, attributes):
+        self._flush_text()
+        self._block()
+        qname = self._qname(name)
+        parts = [INDENT * len(self._stack), "<", qname]
+        # minidom lists namespace declarations before the other attributes
+        for prefix, uri in self._ns_decls:
+            attr = f"xmlns:{prefix}" if prefix else "xmlns"
+            parts.append(f' {attr}="{_escape(uri or "")}"')
+        self._ns_decls = []
+        for i in range(0, len(attributes), 2):
+            attr = self._qname(attributes[i])
+            parts.append(f' {attr}="{_escape(attributes[i + 1])}"')
+        self._out.append("".join(parts))
+        self._stack.append([qname, _EMPTY, None])
+
+    def _end_element(self, name):
+        self._flush_text()
+        qname, state, held = self._stack.pop()
+        if state == _EMPTY:
+            self._out.append("/>\n")
+        elif state == _HELD:
+            kind, data = held
+            inline = _escape(data) if kind == "text" else f"<![CDATA[{data}]]>"
+            self._out.append(f">{inline}</{qname}>\n")
+        else:
+            self._out.append(f"{INDENT * len(self._stack)}</{qname}>\n")
+
+    def _character_data(self, data):
+        if self._cdata is not None:
+            self._cdata.append(data)
+        else:
+            self._text.append(data)
+
+    def _start_cdata(self):
+        self._cdata = []
+
+    def _end_cdata(self):
+        # An empty section creates no node, so text around it stays one node
+        if self._cdata:
+            self._flush_text()
+            self._add_leaf("cdata", "".join(self._cdata))
+        self._cdata = None
+
+    def _comment(self, data):
+        self._flush_text()
+        self._block()
+        self._out.append(f"{INDENT * len(self._stack)}<!--{data}-->\n")
+
+    def _processing_instruction(self, target, data):
+        self._flush_text()
+        self._block()
+        self._out.append(f"{INDENT * len(self._stack)}<?{target} {data}?>\n")
+
 
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,30 @@ Command line tool to validate Office document XML files against XSD schemas and
 
 Usage:
     python validate.py <dir> --original <original_file>
+    python validate.py <dir> --original <original_file> --schema-bundle <bundle.zip>
+    python validate.py <dir> --original <original_file> --jobs 0  # Use all CPUs
+    python validate.py <dir> --original <original_file> --report stats.json
+    python validate.py <dir> --original <original_file> --profile cprofile
 """
 
 import argparse
+import contextlib
+import importlib.util
 import sys
 from pathlib import Path
 
-from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validation import (
+    BaseSchemaValidator,
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+    ValidationStats,
+)
+from validation.baseline import OriginalDocument
+from validation.schemas import load_schema_bundle
+from validation.stats import profiled
+
+SCHEMAS_DIR = Path(__file__).parent.parent / "schemas"
 
 
 def main():
@@ -30,6 +47,32 @@ def main():
         action="store_true",
         help="Enable verbose output",
     )
+    parser.add_argument(
+        "--schema-bundle",
+        help="Path to a pre-parsed schema bundle (created if missing or out of date)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-part checks (0 = all CPUs)",
+    )
+    parser.add_argument(
+        "--report",
+        help="Write per-pass and per-part timings and counters to this JSON file "
+        "and print a summary",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        help="Profile the validation and print the profile",
+    )
+    parser.add_argument(
+        "--profile-output",
+        help="Save the profile to this file instead of printing it "
+        "(pstats data for cprofile, HTML for pyinstrument)",
+    )
     args = parser.parse_args()
 
     # Validate paths
@@ -42,6 +85,11 @@ def main():
         f"Error: {original_file} must be a .docx, .pptx, or .xlsx file"
     )
 
+    # Load schemas from the bundle instead of the schema tree, (re)building it
+    # if it is missing or out of date
+    if args.schema_bundle:
+        load_schema_bundle(Path(args.schema_bundle), SCHEMAS_DIR)
+
     # Run validations
     match file_extension:
         case ".docx":
@@ -52,12 +100,31 @@ def main():
             print(f"Error: Validation not supported for file type {file_extension}")
             sys.exit(1)
 
-    # Run validators
+    if args.profile == "pyinstrument" and not importlib.util.find_spec("pyinstrument"):
+        print("Error: pyinstrument is not installed; use --profile cprofile")
+        sys.exit(1)
+    profile = (
+        profiled(args.profile, args.profile_output)
+        if args.profile
+        else contextlib.nullcontext()
+    )
+    stats = ValidationStats() if args.report else None
+
+    # Run validators, sharing a single view of the original file
     success = True
-    for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
-        if not validator.validate():
-            success = False
+    with profile, OriginalDocument(original_file) as baseline:
+        for V in validators:
+            options = {"verbose": args.verbose, "baseline": baseline, "stats": stats}
+            if issubclass(V, BaseSchemaValidator):
+                options["jobs"] = args.jobs
+            validator = V(unpacked_dir, original_file, **options)
+            if not validator.validate():
+                success = False
+
+    if stats is not None:
+        stats.write_json(args.report)
+        print(stats.summary())
+        print(f"Wrote validation report to {args.report}")
 
     if success:
         print("All validations PASSED!")
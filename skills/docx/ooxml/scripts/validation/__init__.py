@@ -4,12 +4,16 @@ Validation modules for Word document processing.
 
 from .base import BaseSchemaValidator
 from .docx import DOCXSchemaValidator
+from .package import PackageGraph
 from .pptx import PPTXSchemaValidator
 from .redlining import RedliningValidator
+from .stats import ValidationStats
 
 __all__ = [
     "BaseSchemaValidator",
     "DOCXSchemaValidator",
+    "PackageGraph",
     "PPTXSchemaValidator",
     "RedliningValidator",
+    "ValidationStats",
 ]
@@ -2,11 +2,21 @@
 Base validator with common validation logic for document files.
 """
 
+import os
+import posixpath
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 import lxml.etree
 
+from .baseline import OriginalDocument
+from .package import CONTENT_TYPES_PART, PackageGraph, rels_part
+from .schemas import get_schema
+from .stats import measure_part, validation_pass
+from .trees import TreeStore, file_stamp
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,18 +113,53 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file,
+        verbose=False,
+        baseline=None,
+        trees=None,
+        jobs=1,
+        results=None,
+        stats=None,
+    ):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
 
+        # Number of worker processes for per-part checks (0 = all CPUs)
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+
+        # Parsed trees of the unpacked files, shared by all validation passes
+        self.trees = trees if trees is not None else TreeStore()
+
+        # Optional ResultCache of per-part results kept across validation runs
+        self.results = results
+
+        # Optional ValidationStats recording timings and counters of each pass
+        self.stats = stats
+
+        # File stamps, taken once since a validator checks a snapshot of the files
+        self._stamps = {}
+
+        # Original document, opened once and shared by all checks against it
+        self.baseline = (
+            baseline if baseline is not None else OriginalDocument(self.original_file)
+        )
+
         # Set schemas directory
         self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
 
+        # Parts, relationships and content types, read once for all passes
+        self.package = PackageGraph(self.unpacked_dir, self.trees)
+
         # Get all XML and .rels files
-        patterns = ["*.xml", "*.rels"]
         self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+            self.package.path(part)
+            for suffix in (".xml", ".rels")
+            for part in self.package.parts
+            if part.endswith(suffix)
         ]
 
         if not self.xml_files:
@@ -124,26 +169,104 @@ class BaseSchemaValidator:
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
 
-    def validate_xml(self):
-        """Validate that all XML files are well-formed."""
-        errors = []
+    def _map_parts(self, method_name, files):
+        """Run a per-part check method on each file and return results in order.
 
-        for xml_file in self.xml_files:
-            try:
-                # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
-            except lxml.etree.XMLSyntaxError as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Line {e.lineno}: {e.msg}"
-                )
-            except Exception as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                    f"Unexpected error: {str(e)}"
+        With a result cache, parts unchanged since a previous run reuse their
+        cached result and only the remaining parts are checked. With jobs > 1
+        those are fanned out to a process pool. Per-part checks only return
+        data, so merging the results in file order gives the same output as
+        running serially.
+        """
+        if self.results is None:
+            return self._run_parts(method_name, files)
+
+        results = [None] * len(files)
+        pending = []
+        for index, xml_file in enumerate(files):
+            stamp = self._part_stamp(xml_file)
+            found, result = self.results.get(method_name, xml_file, stamp)
+            if found:
+                results[index] = result
+            else:
+                pending.append((index, stamp))
+
+        if self.stats is not None:
+            self.stats.add_cached(len(files) - len(pending))
+        computed = self._run_parts(method_name, [files[i] for i, _ in pending])
+        for (index, stamp), result in zip(pending, computed):
+            self.results.put(method_name, files[index], stamp, result)
+            results[index] = result
+        return results
+
+    def _part_stamp(self, xml_file):
+        """Return the stamp of a part and of the .rels file its checks depend on."""
+        stamp = self._stamps.get(xml_file)
+        if stamp is None:
+            rels_name = rels_part(self.package.part_name(xml_file))
+            rels_stamp = None
+            if self.package.exists(rels_name):
+                rels_stamp = file_stamp(self.package.path(rels_name))
+            stamp = self._stamps[xml_file] = (file_stamp(xml_file), rels_stamp)
+        return stamp
+
+    def _run_parts(self, method_name, files):
+        """Run a per-part check method on each file, in a process pool if enabled.
+
+        When keeping stats, every check is measured where it runs and recorded
+        under the running pass.
+        """
+        measure = self.stats is not None
+        in_workers = self.jobs > 1 and len(files) > 1
+        if not in_workers:
+            if not measure:
+                method = getattr(self, method_name)
+                return [method(xml_file) for xml_file in files]
+            results = [measure_part(self, method_name, f) for f in files]
+        else:
+            jobs = min(self.jobs, len(files))
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_worker,
+                initargs=(type(self), self.unpacked_dir, self.original_file),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _run_part_check,
+                        repeat(method_name),
+                        files,
+                        repeat(measure),
+                        chunksize=max(1, len(files) // (jobs * 4)),
+                    )
                 )
+            if not measure:
+                return results
+
+        # Measured results are (result, measurement) pairs
+        for xml_file, (_, measurement) in zip(files, results):
+            self.stats.add_part(
+                xml_file.relative_to(self.unpacked_dir).as_posix(),
+                measurement,
+                external=in_workers,
+            )
+        return [result for result, _ in results]
+
+    def _record_errors(self, errors, part=None):
+        """Count errors reported by the running pass, when keeping stats."""
+        if self.stats is not None:
+            self.stats.add_errors(errors, part)
+
+    @validation_pass
+    def validate_xml(self):
+        """Validate that all XML files are well-formed."""
+        errors = [
+            error
+            for error in self._map_parts("_check_part_xml", self.xml_files)
+            if error is not None
+        ]
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} XML violations:")
             for error in errors:
                 print(error)
@@ -153,28 +276,33 @@ class BaseSchemaValidator:
                 print("PASSED - All XML files are well-formed")
             return True
 
+    def _check_part_xml(self, xml_file):
+        """Return the well-formedness error of a single file, or None."""
+        try:
+            # Try to parse the XML file
+            self.trees.parse(xml_file)
+        except lxml.etree.XMLSyntaxError as e:
+            return (
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Line {e.lineno}: {e.msg}"
+            )
+        except Exception as e:
+            return (
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Unexpected error: {str(e)}"
+            )
+        return None
+
+    @validation_pass
     def validate_namespaces(self):
         """Validate that namespace prefixes in Ignorable attributes are declared."""
         errors = []
 
-        for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
-
-                for attr_val in [
-                    v for k, v in root.attrib.items() if k.endswith("Ignorable")
-                ]:
-                    undeclared = set(attr_val.split()) - declared
-                    errors.extend(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Namespace '{ns}' in Ignorable but not declared"
-                        for ns in undeclared
-                    )
-            except lxml.etree.XMLSyntaxError:
-                continue
+        for file_errors in self._map_parts("_check_part_namespaces", self.xml_files):
+            errors.extend(file_errors)
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - {len(errors)} namespace issues:")
             for error in errors:
                 print(error)
@@ -183,88 +311,58 @@ class BaseSchemaValidator:
             print("PASSED - All namespace prefixes properly declared")
         return True
 
+    def _check_part_namespaces(self, xml_file):
+        """Return Ignorable namespace errors for a single file."""
+        errors = []
+        try:
+            root = self.trees.getroot(xml_file)
+            declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
+
+            for attr_val in [
+                v for k, v in root.attrib.items() if k.endswith("Ignorable")
+            ]:
+                undeclared = set(attr_val.split()) - declared
+                errors.extend(
+                    f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                    f"Namespace '{ns}' in Ignorable but not declared"
+                    for ns in sorted(undeclared)
+                )
+        except lxml.etree.XMLSyntaxError:
+            pass
+        return errors
+
+    @validation_pass
     def validate_unique_ids(self):
         """Validate that specific IDs are unique according to OOXML requirements."""
         errors = []
         global_ids = {}  # Track globally unique IDs across all files
 
-        for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                file_ids = {}  # Track IDs that must be unique within this file
-
-                # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
+        # Merge per-file results in file order; global IDs are checked here
+        for xml_file, events in zip(
+            self.xml_files, self._map_parts("_collect_part_ids", self.xml_files)
+        ):
+            for event in events:
+                if event[0] == "error":
+                    errors.append(event[1])
+                    continue
 
-                # Now check IDs in the cleaned tree
-                for elem in root.iter():
-                    # Get the element name without namespace
-                    tag = (
-                        elem.tag.split("}")[-1].lower()
-                        if "}" in elem.tag
-                        else elem.tag.lower()
+                _, id_value, line, tag = event
+                if id_value in global_ids:
+                    prev_file, prev_line, prev_tag = global_ids[id_value]
+                    errors.append(
+                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                        f"Line {line}: Global ID '{id_value}' in <{tag}> "
+                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
+                    )
+                else:
+                    global_ids[id_value] = (
+                        xml_file.relative_to(self.unpacked_dir),
+                        line,
+                        tag,
                     )
-
-                    # Check if this element type has ID uniqueness requirements
-                    if tag in self.UNIQUE_ID_REQUIREMENTS:
-                        attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
-
-                        # Look for the specified attribute
-                        id_value = None
-                        for attr, value in elem.attrib.items():
-                            attr_local = (
-                                attr.split("}")[-1].lower()
-                                if "}" in attr
-                                else attr.lower()
-                            )
-                            if attr_local == attr_name:
-                                id_value = value
-                                break
-
-                        if id_value is not None:
-                            if scope == "global":
-                                # Check global uniqueness
-                                if id_value in global_ids:
-                                    prev_file, prev_line, prev_tag = global_ids[
-                                        id_value
-                                    ]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Global ID '{id_value}' in <{tag}> "
-                                        f"already used in {prev_file} at line {prev_line} in <{prev_tag}>"
-                                    )
-                                else:
-                                    global_ids[id_value] = (
-                                        xml_file.relative_to(self.unpacked_dir),
-                                        elem.sourceline,
-                                        tag,
-                                    )
-                            elif scope == "file":
-                                # Check file-level uniqueness
-                                key = (tag, attr_name)
-                                if key not in file_ids:
-                                    file_ids[key] = {}
-
-                                if id_value in file_ids[key]:
-                                    prev_line = file_ids[key][id_value]
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
-                                        f"(first occurrence at line {prev_line})"
-                                    )
-                                else:
-                                    file_ids[key][id_value] = elem.sourceline
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} ID uniqueness violations:")
             for error in errors:
                 print(error)
@@ -274,101 +372,132 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
+    def _collect_part_ids(self, xml_file):
+        """Check file-scoped ID uniqueness for a single file.
+
+        Returns:
+            list: Events in document order, either ("error", message) or
+                ("global", id_value, line, tag) for IDs that must be unique
+                across all files
+        """
+        events = []
+        try:
+            root = self.trees.getroot(xml_file)
+            file_ids = {}  # Track IDs that must be unique within this file
+
+            # Remove all mc:AlternateContent elements from a private copy
+            # of the tree, leaving the shared tree untouched
+            mc_path = ".//mc:AlternateContent"
+            mc_namespaces = {"mc": self.MC_NAMESPACE}
+            if root.xpath(mc_path, namespaces=mc_namespaces):
+                root = self.trees.copy(xml_file).getroot()
+                for elem in root.xpath(mc_path, namespaces=mc_namespaces):
+                    elem.getparent().remove(elem)
+
+            # Now check IDs in the cleaned tree
+            for elem in root.iter():
+                # Get the element name without namespace
+                tag = (
+                    elem.tag.split("}")[-1].lower()
+                    if "}" in elem.tag
+                    else elem.tag.lower()
+                )
+
+                # Check if this element type has ID uniqueness requirements
+                if tag in self.UNIQUE_ID_REQUIREMENTS:
+                    attr_name, scope = self.UNIQUE_ID_REQUIREMENTS[tag]
+
+                    # Look for the specified attribute
+                    id_value = None
+                    for attr, value in elem.attrib.items():
+                        attr_local = (
+                            attr.split("}")[-1].lower() if "}" in attr else attr.lower()
+                        )
+                        if attr_local == attr_name:
+                            id_value = value
+                            break
+
+                    if id_value is not None:
+                        if scope == "global":
+                            # Global uniqueness is checked when merging
+                            events.append(("global", id_value, elem.sourceline, tag))
+                        elif scope == "file":
+                            # Check file-level uniqueness
+                            key = (tag, attr_name)
+                            if key not in file_ids:
+                                file_ids[key] = {}
+
+                            if id_value in file_ids[key]:
+                                prev_line = file_ids[key][id_value]
+                                events.append(
+                                    (
+                                        "error",
+                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                                        f"Line {elem.sourceline}: Duplicate {attr_name}='{id_value}' in <{tag}> "
+                                        f"(first occurrence at line {prev_line})",
+                                    )
+                                )
+                            else:
+                                file_ids[key][id_value] = elem.sourceline
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            events.append(
+                ("error", f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}")
+            )
+
+        return events
+
+    @validation_pass
     def validate_file_references(self):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
         """
         errors = []
+        package = self.package
 
         # Find all .rels files
-        rels_files = list(self.unpacked_dir.rglob("*.rels"))
+        rels_parts = package.rels_parts()
 
-        if not rels_files:
+        if not rels_parts:
             if self.verbose:
                 print("PASSED - No .rels files found")
             return True
 
-        # Get all files in the unpacked directory (excluding reference files)
-        all_files = []
-        for file_path in self.unpacked_dir.rglob("*"):
-            if (
-                file_path.is_file()
-                and file_path.name != "[Content_Types].xml"
-                and not file_path.name.endswith(".rels")
-            ):  # This file is not referenced by .rels
-                all_files.append(file_path.resolve())
+        # Get all files in the package (excluding reference files)
+        all_files = package.target_parts()
 
         # Track all files that are referenced by any .rels file
         all_referenced_files = set()
 
         if self.verbose:
             print(
-                f"Found {len(rels_files)} .rels files and {len(all_files)} target files"
+                f"Found {len(rels_parts)} .rels files and {len(all_files)} target files"
             )
 
-        # Check each .rels file
-        for rels_file in rels_files:
-            try:
-                # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-
-                # Get the directory where this .rels file is located
-                rels_dir = rels_file.parent
-
-                # Find all relationships and their targets
-                referenced_files = set()
-                broken_refs = []
-
-                for rel in rels_root.findall(
-                    ".//ns:Relationship",
-                    namespaces={"ns": self.PACKAGE_RELATIONSHIPS_NAMESPACE},
-                ):
-                    target = rel.get("Target")
-                    if target and not target.startswith(
-                        ("http", "mailto:")
-                    ):  # Skip external URLs
-                        # Resolve the target path relative to the .rels file location
-                        if rels_file.name == ".rels":
-                            # Root .rels file - targets are relative to unpacked_dir
-                            target_path = self.unpacked_dir / target
-                        else:
-                            # Other .rels files - targets are relative to their parent's parent
-                            # e.g., word/_rels/document.xml.rels -> targets relative to word/
-                            base_dir = rels_dir.parent
-                            target_path = base_dir / target
-
-                        # Normalize the path and check if it exists
-                        try:
-                            target_path = target_path.resolve()
-                            if target_path.exists() and target_path.is_file():
-                                referenced_files.add(target_path)
-                                all_referenced_files.add(target_path)
-                            else:
-                                broken_refs.append((target, rel.sourceline))
-                        except (OSError, ValueError):
-                            broken_refs.append((target, rel.sourceline))
-
-                # Report broken references
-                if broken_refs:
-                    rel_path = rels_file.relative_to(self.unpacked_dir)
-                    for broken_ref, line_num in broken_refs:
-                        errors.append(
-                            f"  {rel_path}: Line {line_num}: Broken reference to {broken_ref}"
-                        )
-
-            except Exception as e:
-                rel_path = rels_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Error parsing {rel_path}: {e}")
+        # Check that each internal target of each .rels file exists
+        for rels_name in rels_parts:
+            relationships, parse_error = package.load_rels(rels_name)
+            if parse_error is not None:
+                errors.append(f"  Error parsing {rels_name}: {parse_error}")
+                continue
+            for rel in relationships:
+                if rel.part is None:
+                    continue  # External or empty target
+                if package.exists(rel.part):
+                    all_referenced_files.add(rel.part)
+                else:
+                    errors.append(
+                        f"  {rels_name}: Line {rel.line}: "
+                        f"Broken reference to {rel.target}"
+                    )
 
         # Check for unreferenced files (files that exist but are not referenced anywhere)
-        unreferenced_files = set(all_files) - all_referenced_files
-
-        if unreferenced_files:
-            for unref_file in sorted(unreferenced_files):
-                unref_rel_path = unref_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Unreferenced file: {unref_rel_path}")
+        for part in all_files:
+            if part not in all_referenced_files:
+                errors.append(f"  Unreferenced file: {part}")
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} relationship validation errors:")
             for error in errors:
                 print(error)
@@ -385,94 +514,22 @@ class BaseSchemaValidator:
                 )
             return True
 
+    @validation_pass
     def validate_all_relationship_ids(self):
         """
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
-        for xml_file in self.xml_files:
-            # Skip .rels files themselves
-            if xml_file.suffix == ".rels":
-                continue
-
-            # Determine the corresponding .rels file
-            # For dir/file.xml, it's dir/_rels/file.xml.rels
-            rels_dir = xml_file.parent / "_rels"
-            rels_file = rels_dir / f"{xml_file.name}.rels"
-
-            # Skip if there's no corresponding .rels file (that's okay)
-            if not rels_file.exists():
-                continue
-
-            try:
-                # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
-                rid_to_type = {}
-
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rid = rel.get("Id")
-                    rel_type = rel.get("Type", "")
-                    if rid:
-                        # Check for duplicate rIds
-                        if rid in rid_to_type:
-                            rels_rel_path = rels_file.relative_to(self.unpacked_dir)
-                            errors.append(
-                                f"  {rels_rel_path}: Line {rel.sourceline}: "
-                                f"Duplicate relationship ID '{rid}' (IDs must be unique)"
-                            )
-                        # Extract just the type name from the full URL
-                        type_name = (
-                            rel_type.split("/")[-1] if "/" in rel_type else rel_type
-                        )
-                        rid_to_type[rid] = type_name
-
-                # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
-
-                # Find all elements with r:id attributes
-                for elem in xml_root.iter():
-                    # Check for r:id attribute (relationship ID)
-                    rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
-                    if rid_attr:
-                        xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                        elem_name = (
-                            elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-                        )
-
-                        # Check if the ID exists
-                        if rid_attr not in rid_to_type:
-                            errors.append(
-                                f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                f"<{elem_name}> references non-existent relationship '{rid_attr}' "
-                                f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
-                            )
-                        # Check if we have type expectations for this element
-                        elif self.ELEMENT_RELATIONSHIP_TYPES:
-                            expected_type = self._get_expected_relationship_type(
-                                elem_name
-                            )
-                            if expected_type:
-                                actual_type = rid_to_type[rid_attr]
-                                # Check if the actual type matches or contains the expected type
-                                if expected_type not in actual_type.lower():
-                                    errors.append(
-                                        f"  {xml_rel_path}: Line {elem.sourceline}: "
-                                        f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
-                                        f"but should point to a '{expected_type}' relationship"
-                                    )
-
-            except Exception as e:
-                xml_rel_path = xml_file.relative_to(self.unpacked_dir)
-                errors.append(f"  Error processing {xml_rel_path}: {e}")
+        for file_errors in self._map_parts(
+            "_check_part_relationship_ids", self.xml_files
+        ):
+            errors.extend(file_errors)
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} relationship ID reference errors:")
             for error in errors:
                 print(error)
@@ -483,6 +540,80 @@ class BaseSchemaValidator:
                 print("PASSED - All relationship ID references are valid")
             return True
 
+    def _check_part_relationship_ids(self, xml_file):
+        """Return r:id reference errors for a single file."""
+        errors = []
+
+        # Skip .rels files themselves
+        if xml_file.suffix == ".rels":
+            return errors
+
+        # Determine the corresponding .rels file
+        # For dir/file.xml, it's dir/_rels/file.xml.rels
+        part = self.package.part_name(xml_file)
+        rels_name = rels_part(part)
+
+        # Skip if there's no corresponding .rels file (that's okay)
+        if not self.package.exists(rels_name):
+            return errors
+
+        relationships, rels_error = self.package.load_rels(rels_name)
+        if rels_error is not None:
+            return [f"  Error processing {part}: {rels_error}"]
+
+        try:
+            # Valid relationship IDs and their types
+            rid_to_type = {}
+            for rel in relationships:
+                if rel.id:
+                    # Check for duplicate rIds
+                    if rel.id in rid_to_type:
+                        errors.append(
+                            f"  {rels_name}: Line {rel.line}: "
+                            f"Duplicate relationship ID '{rel.id}' (IDs must be unique)"
+                        )
+                    # Extract just the type name from the full URL
+                    rid_to_type[rel.id] = rel.type.split("/")[-1]
+
+            # Parse the XML file to find all r:id references
+            xml_root = self.trees.getroot(xml_file)
+
+            # Find all elements with r:id attributes
+            for elem in xml_root.xpath(
+                "//*[@r:id]", namespaces={"r": self.OFFICE_RELATIONSHIPS_NAMESPACE}
+            ):
+                # Check for r:id attribute (relationship ID)
+                rid_attr = elem.get(f"{{{self.OFFICE_RELATIONSHIPS_NAMESPACE}}}id")
+                if rid_attr:
+                    xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+                    elem_name = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+
+                    # Check if the ID exists
+                    if rid_attr not in rid_to_type:
+                        errors.append(
+                            f"  {xml_rel_path}: Line {elem.sourceline}: "
+                            f"<{elem_name}> references non-existent relationship '{rid_attr}' "
+                            f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})"
+                        )
+                    # Check if we have type expectations for this element
+                    elif self.ELEMENT_RELATIONSHIP_TYPES:
+                        expected_type = self._get_expected_relationship_type(elem_name)
+                        if expected_type:
+                            actual_type = rid_to_type[rid_attr]
+                            # Check if the actual type matches or contains the expected type
+                            if expected_type not in actual_type.lower():
+                                errors.append(
+                                    f"  {xml_rel_path}: Line {elem.sourceline}: "
+                                    f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
+                                    f"but should point to a '{expected_type}' relationship"
+                                )
+
+        except Exception as e:
+            xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+            errors.append(f"  Error processing {xml_rel_path}: {e}")
+
+        return errors
+
     def _get_expected_relationship_type(self, element_name):
         """
         Get the expected relationship type for an element.
@@ -519,37 +650,22 @@ class BaseSchemaValidator:
 
         return None
 
+    @validation_pass
     def validate_content_types(self):
         """Validate that all content files are properly declared in [Content_Types].xml."""
         errors = []
 
         # Find [Content_Types].xml file
-        content_types_file = self.unpacked_dir / "[Content_Types].xml"
-        if not content_types_file.exists():
+        if not self.package.exists(CONTENT_TYPES_PART):
+            self._record_errors(["[Content_Types].xml: file not found"])
             print("FAILED - [Content_Types].xml file not found")
             return False
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
-            declared_parts = set()
-            declared_extensions = set()
-
-            # Get Override declarations (specific files)
-            for override in root.findall(
-                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Override"
-            ):
-                part_name = override.get("PartName")
-                if part_name is not None:
-                    declared_parts.add(part_name.lstrip("/"))
-
-            # Get Default declarations (by extension)
-            for default in root.findall(
-                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Default"
-            ):
-                extension = default.get("Extension")
-                if extension is not None:
-                    declared_extensions.add(extension.lower())
+            content_types = self.package.content_types()
+            declared_parts = content_types.overrides
+            declared_extensions = content_types.defaults
 
             # Root elements that require content type declaration
             declarable_roots = {
@@ -575,15 +691,10 @@ class BaseSchemaValidator:
                 "emf": "image/x-emf",
             }
 
-            # Get all files in the unpacked directory
-            all_files = list(self.unpacked_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
-
             # Check all XML files for Override declarations
+            content_files = []
             for xml_file in self.xml_files:
-                path_str = str(xml_file.relative_to(self.unpacked_dir)).replace(
-                    "\\", "/"
-                )
+                path_str = self.package.part_name(xml_file)
 
                 # Skip non-content files
                 if any(
@@ -591,42 +702,42 @@ class BaseSchemaValidator:
                     for skip in [".rels", "[Content_Types]", "docProps/", "_rels/"]
                 ):
                     continue
+                content_files.append((xml_file, path_str))
 
-                try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
-                    root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
-
-                    if root_name in declarable_roots and path_str not in declared_parts:
-                        errors.append(
-                            f"  {path_str}: File with <{root_name}> root not declared in [Content_Types].xml"
-                        )
-
-                except Exception:
+            root_names = self._map_parts(
+                "_get_part_root_name", [xml_file for xml_file, _ in content_files]
+            )
+            for (_, path_str), root_name in zip(content_files, root_names):
+                if root_name is None:
                     continue  # Skip unparseable files
 
+                if root_name in declarable_roots and path_str not in declared_parts:
+                    errors.append(
+                        f"  {path_str}: File with <{root_name}> root not declared in [Content_Types].xml"
+                    )
+
             # Check all non-XML files for Default extension declarations
-            for file_path in all_files:
+            for part in self.package.parts:
                 # Skip XML files and metadata files (already checked above)
-                if file_path.suffix.lower() in {".xml", ".rels"}:
+                *directories, name = part.split("/")
+                extension = posixpath.splitext(name)[1].lstrip(".").lower()
+                if extension in {"xml", "rels"}:
                     continue
-                if file_path.name == "[Content_Types].xml":
-                    continue
-                if "_rels" in file_path.parts or "docProps" in file_path.parts:
+                if "_rels" in directories or "docProps" in directories:
                     continue
 
-                extension = file_path.suffix.lstrip(".").lower()
                 if extension and extension not in declared_extensions:
                     # Check if it's a known media extension that should be declared
                     if extension in media_extensions:
-                        relative_path = file_path.relative_to(self.unpacked_dir)
                         errors.append(
-                            f'  {relative_path}: File with extension \'{extension}\' not declared in [Content_Types].xml - should add: <Default Extension="{extension}" ContentType="{media_extensions[extension]}"/>'
+                            f'  {part}: File with extension \'{extension}\' not declared in [Content_Types].xml - should add: <Default Extension="{extension}" ContentType="{media_extensions[extension]}"/>'
                         )
 
         except Exception as e:
             errors.append(f"  Error parsing [Content_Types].xml: {e}")
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} content type declaration errors:")
             for error in errors:
                 print(error)
@@ -638,6 +749,14 @@ class BaseSchemaValidator:
                 )
             return True
 
+    def _get_part_root_name(self, xml_file):
+        """Return the local name of a file's root element, or None if unparseable."""
+        try:
+            root_tag = self.trees.getroot(xml_file).tag
+        except Exception:
+            return None
+        return root_tag.split("}")[-1] if "}" in root_tag else root_tag
+
     def validate_file_against_xsd(self, xml_file, verbose=False):
         """Validate a single XML file against XSD schema, comparing with original.
 
@@ -673,7 +792,7 @@ class BaseSchemaValidator:
             if verbose:
                 relative_path = xml_file.relative_to(unpacked_dir)
                 print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
-                for error in list(new_errors)[:3]:
+                for error in sorted(new_errors)[:3]:
                     truncated = error[:250] + "..." if len(error) > 250 else error
                     print(f"  - {truncated}")
             return False, new_errors
@@ -685,6 +804,7 @@ class BaseSchemaValidator:
                 )
             return True, set()
 
+    @validation_pass
     def validate_against_xsd(self):
         """Validate XML files against XSD schemas, showing only new errors compared to original."""
         new_errors = []
@@ -692,11 +812,9 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
-        for xml_file in self.xml_files:
+        results = self._map_parts("validate_file_against_xsd", self.xml_files)
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -711,8 +829,9 @@ class BaseSchemaValidator:
                 continue
 
             # Has new errors
+            self._record_errors(new_file_errors, part=Path(relative_path).as_posix())
             new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
-            for error in list(new_file_errors)[:3]:  # Show first 3 errors
+            for error in sorted(new_file_errors)[:3]:  # Show first 3 errors
                 new_errors.append(
                     f"    - {error[:250]}..." if len(error) > 250 else f"    - {error}"
                 )
@@ -830,23 +949,30 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            # Load XML
+            xml_doc = self.trees.parse(xml_file)
 
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+            return self._validate_xsd_tree(
+                xml_doc, xml_file.relative_to(base_path), schema_path
+            )
 
+        except Exception as e:
+            return False, {str(e)}
+
+    def _validate_xsd_tree(self, xml_doc, relative_path, schema_path):
+        """Validate a parsed XML tree against XSD schema. Returns (is_valid, errors_set).
+
+        The tree is not modified; preprocessing works on a copy.
+        """
+        try:
+            # Load schema (compiled once per process and shared by all validators)
+            schema = get_schema(schema_path)
+
+            # Preprocess XML
             xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
             xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
             # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
             if (
                 relative_path.parts
                 and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
@@ -875,33 +1001,13 @@ class BaseSchemaValidator:
         Returns:
             set: Set of error messages from the original file
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
-
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
-
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
-            )
-            return errors if errors else set()
+        # Cached per part; parts that didn't exist in the original have no errors
+        return self.baseline.xsd_errors(relative_path, self)
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         """Remove template tags from XML text nodes and collect warnings.
@@ -947,5 +1053,25 @@ class BaseSchemaValidator:
         return lxml.etree.ElementTree(xml_copy), warnings
 
 
+# Validator instance of a worker process, created once per worker
+_worker_validator = None
+
+
+def _init_worker(validator_class, unpacked_dir, original_file):
+    """Create the validator used by this worker process."""
+    global _worker_validator
+    _worker_validator = validator_class(unpacked_dir, original_file)
+
+
+def _run_part_check(method_name, xml_file, measure=False):
+    """Run a per-part check method of the worker's validator.
+
+    With measure, return (result, measurement) as measure_part does.
+    """
+    if measure:
+        return measure_part(_worker_validator, method_name, xml_file)
+    return getattr(_worker_validator, method_name)(xml_file)
+
+
 if __name__ == "__main__":
     raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,147 @@
+"""
+Baseline view of the original document used to diff validation errors.
+"""
+
+import zipfile
+from pathlib import Path
+
+import lxml.etree
+
+
+class OriginalDocument:
+    """Read-only view of the original .docx/.pptx/.xlsx file or unpacked directory.
+
+    The archive is opened once; parts of a directory are read from its files.
+    Parsed trees and per-part XSD error sets are computed lazily and cached for
+    the lifetime of the object, so any number of validators and parts can
+    consult the original without re-extracting it.
+    """
+
+    def __init__(self, original_file):
+        self.original_file = Path(original_file)
+        self._zip = None
+        self._names = None
+        self._trees = {}
+        self._xsd_errors = {}
+        self.parse_count = 0
+        self.bytes_parsed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the underlying archive (nothing to do for a directory)."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def _archive(self):
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.original_file, "r")
+            self._names = set(self._zip.namelist())
+        return self._zip
+
+    def _is_directory(self):
+        return self.original_file.is_dir()
+
+    def has_part(self, part_name):
+        """Check if the original contains the given part (e.g. 'word/document.xml')."""
+        if self._is_directory():
+            return (self.original_file / _normalize(part_name)).is_file()
+        self._archive()
+        return _normalize(part_name) in self._names
+
+    def read(self, part_name):
+        """Return the raw bytes of a part.
+
+        Raises:
+            KeyError: If the part does not exist in the original
+        """
+        part_name = _normalize(part_name)
+        if not self.has_part(part_name):
+            raise KeyError(f"{part_name} not found in {self.original_file}")
+        if self._is_directory():
+            return (self.original_file / part_name).read_bytes()
+        return self._archive().read(part_name)
+
+    def part_size(self, part_name):
+        """Return the uncompressed size of a part in bytes.
+
+        Raises:
+            KeyError: If the part does not exist in the original
+        """
+        part_name = _normalize(part_name)
+        if not self.has_part(part_name):
+            raise KeyError(f"{part_name} not found in {self.original_file}")
+        if self._is_directory():
+            return (self.original_file / part_name).stat().st_size
+        return self._archive().getinfo(part_name).file_size
+
+    def open(self, part_name):
+        """Return a binary file object streaming a part from the original.
+
+        Raises:
+            KeyError: If the part does not exist in the original
+        """
+        part_name = _normalize(part_name)
+        if not self.has_part(part_name):
+            raise KeyError(f"{part_name} not found in {self.original_file}")
+        if self._is_directory():
+            return open(self.original_file / part_name, "rb")
+        return self._archive().open(part_name)
+
+    def tree(self, part_name):
+        """Return the parsed lxml tree of a part (cached, must not be mutated).
+
+        Raises:
+            KeyError: If the part does not exist in the original
+            lxml.etree.XMLSyntaxError: If the part is not well-formed
+        """
+        part_name = _normalize(part_name)
+        if part_name not in self._trees:
+            content = self.read(part_name)
+            self.parse_count += 1
+            self.bytes_parsed += len(content)
+            self._trees[part_name] = lxml.etree.ElementTree(
+                lxml.etree.fromstring(content)
+            )
+        return self._trees[part_name]
+
+    def xsd_errors(self, part_name, validator):
+        """Return the XSD error messages of a part in the original.
+
+        Args:
+            part_name: Part path relative to the package root
+            validator: BaseSchemaValidator providing schema lookup and preprocessing
+
+        Returns:
+            set: Error messages, empty if the part is valid, missing or has no schema
+        """
+        part_name = _normalize(part_name)
+        if part_name not in self._xsd_errors:
+            errors = set()
+            if self.has_part(part_name):
+                schema_path = validator._get_schema_path(Path(part_name))
+                if schema_path:
+                    try:
+                        xml_doc = self.tree(part_name)
+                    except Exception as e:
+                        errors = {str(e)}
+                    else:
+                        _, errors = validator._validate_xsd_tree(
+                            xml_doc, Path(part_name), schema_path
+                        )
+            self._xsd_errors[part_name] = errors or set()
+        return self._xsd_errors[part_name]
+
+
+def _normalize(part_name):
+    """Normalize a part path to the zip member form."""
+    return Path(part_name).as_posix().lstrip("/")
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
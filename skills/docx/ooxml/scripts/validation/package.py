@@ -0,0 +1,196 @@
+"""
+Relationship graph of an unpacked OOXML package.
+
+The file reference, relationship ID and content type checks all need the same
+picture of the package: which parts exist, what each part's relationships point
+to and what [Content_Types].xml declares. The graph lists the package once, in
+a single directory walk that serves as the cache of which files exist, and reads
+each .rels file once (through the shared TreeStore) into Relationship records
+with their targets already resolved to part names. The checks are then lookups,
+with no rglob scans and no filesystem calls per relationship target.
+
+Parts are named by their path relative to the package root with forward
+slashes, as in "word/document.xml"; the package-level relationships in
+_rels/.rels belong to the source part "". Like the validators, a graph
+describes a snapshot of the package: files changed after it listed or read
+them are not seen.
+"""
+
+import os
+import posixpath
+from collections import namedtuple
+from pathlib import Path
+
+PACKAGE_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+CONTENT_TYPES_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/content-types"
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+# One relationship of a .rels file. part is the target resolved to a part name,
+# or None for external and empty targets; it may name a part that does not
+# exist. line is the line of the Relationship element in the .rels file.
+Relationship = namedtuple("Relationship", ["id", "type", "target", "part", "line"])
+
+# Declarations of [Content_Types].xml: part name -> content type for the
+# Override elements, lowercase extension -> content type for the Default ones
+ContentTypes = namedtuple("ContentTypes", ["overrides", "defaults"])
+
+
+def rels_part(part):
+    """Return the name of the .rels part holding a part's relationships."""
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def source_part(rels_name):
+    """Return the name of the part whose relationships a .rels part holds."""
+    rels_dir, name = posixpath.split(rels_name)
+    return posixpath.join(posixpath.dirname(rels_dir), name[: -len(".rels")])
+
+
+def resolve_target(source, target):
+    """Resolve a relationship target of a source part to a part name.
+
+    Relative targets are relative to the source part's directory, and targets
+    starting with "/" to the package root. Targets leading out of the package
+    resolve to names starting with "../", which no part has.
+    """
+    if target.startswith("/"):
+        return posixpath.normpath(target.lstrip("/"))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source), target))
+
+
+class PackageGraph:
+    """Parts, relationships and content types of an unpacked package."""
+
+    def __init__(self, unpacked_dir, trees):
+        """
+        Args:
+            unpacked_dir: Root directory of the unpacked package
+            trees: TreeStore to parse .rels files and [Content_Types].xml with
+        """
+        self.unpacked_dir = Path(unpacked_dir)
+        self.trees = trees
+        # Part names of all files, listed on first use
+        self._parts = None
+        # .rels part -> (relationships, error message or None)
+        self._relationships = {}
+        self._content_types = None
+
+    @property
+    def parts(self):
+        """Names of all files in the package, in directory walk order."""
+        if self._parts is None:
+            self._parts = {}
+            root = str(self.unpacked_dir)
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                prefix = os.path.relpath(directory, root).replace(os.sep, "/")
+                prefix = "" if prefix == "." else prefix + "/"
+                for name in sorted(filenames):
+                    self._parts[prefix + name] = None
+        return self._parts
+
+    def exists(self, part):
+        """Whether the package has a file of that name."""
+        return part in self.parts
+
+    def path(self, part):
+        """Return the filesystem path of a part."""
+        return self.unpacked_dir / part
+
+    def part_name(self, path):
+        """Return the part name of a filesystem path inside the package."""
+        return Path(path).relative_to(self.unpacked_dir).as_posix()
+
+    def rels_parts(self):
+        """Names of all .rels parts."""
+        return [part for part in self.parts if part.endswith(".rels")]
+
+    def target_parts(self):
+        """Names of the parts that relationships can point to.
+
+        These are all parts except [Content_Types].xml and the .rels parts.
+        """
+        return [
+            part
+            for part in self.parts
+            if part != CONTENT_TYPES_PART and not part.endswith(".rels")
+        ]
+
+    def load_rels(self, rels_name):
+        """Read a .rels part, once.
+
+        Returns:
+            tuple: (relationships, error) with the Relationship records in
+                document order, or an empty list and the error message if the
+                .rels part could not be read
+        """
+        entry = self._relationships.get(rels_name)
+        if entry is None:
+            try:
+                root = self.trees.getroot(self.path(rels_name))
+            except Exception as e:
+                entry = ([], str(e))
+            else:
+                source = source_part(rels_name)
+                relationships = []
+                for rel in root.iter(
+                    f"{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+                ):
+                    target = rel.get("Target", "")
+                    part = None
+                    if target and not (
+                        rel.get("TargetMode") == "External"
+                        or target.startswith(("http", "mailto:"))
+                    ):
+                        part = resolve_target(source, target)
+                    relationships.append(
+                        Relationship(
+                            rel.get("Id"),
+                            rel.get("Type", ""),
+                            target,
+                            part,
+                            rel.sourceline,
+                        )
+                    )
+                entry = (relationships, None)
+            self._relationships[rels_name] = entry
+        return entry
+
+    def relationships(self, part):
+        """Return (relationships, error) of a part, as load_rels does.
+
+        A part without a .rels part has no relationships.
+        """
+        name = rels_part(part)
+        if not self.exists(name):
+            return [], None
+        return self.load_rels(name)
+
+    def content_types(self):
+        """Return the ContentTypes declared by [Content_Types].xml, read once.
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If [Content_Types].xml is not well-formed
+            OSError: If it cannot be read
+        """
+        if self._content_types is None:
+            root = self.trees.getroot(self.path(CONTENT_TYPES_PART))
+            overrides, defaults = {}, {}
+            for override in root.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Override"):
+                part_name = override.get("PartName")
+                if part_name is not None:
+                    overrides[part_name.lstrip("/")] = override.get("ContentType")
+            for default in root.iter(f"{{{CONTENT_TYPES_NAMESPACE}}}Default"):
+                extension = default.get("Extension")
+                if extension is not None:
+                    defaults[extension.lower()] = default.get("ContentType")
+            self._content_types = ContentTypes(overrides, defaults)
+        return self._content_types
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
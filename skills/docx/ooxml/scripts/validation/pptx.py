@@ -2,9 +2,12 @@
 Validator for PowerPoint presentation XML files against XSD schemas.
 """
 
+import posixpath
 import re
 
 from .base import BaseSchemaValidator
+from .package import rels_part, source_part
+from .stats import validation_pass
 
 
 class PPTXSchemaValidator(BaseSchemaValidator):
@@ -74,6 +77,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         return all_valid
 
+    @validation_pass
     def validate_uuid_ids(self):
         """Validate that ID attributes that look like UUIDs contain only hex values."""
         import lxml.etree
@@ -86,7 +90,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.trees.getroot(xml_file)
 
                 # Check all elements for ID attributes
                 for elem in root.iter():
@@ -109,6 +113,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 )
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} UUID ID validation errors:")
             for error in errors:
                 print(error)
@@ -125,6 +130,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         # Check if it's 32 hex-like characters (could include invalid hex chars)
         return len(clean_value) == 32 and all(c.isalnum() for c in clean_value)
 
+    @validation_pass
     def validate_slide_layout_ids(self):
         """Validate that sldLayoutId elements in slide masters reference valid slide layouts."""
         import lxml.etree
@@ -132,7 +138,11 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         errors = []
 
         # Find all slide master files
-        slide_masters = list(self.unpacked_dir.glob("ppt/slideMasters/*.xml"))
+        slide_masters = [
+            part
+            for part in self.package.parts
+            if posixpath.dirname(part) == "ppt/slideMasters" and part.endswith(".xml")
+        ]
 
         if not slide_masters:
             if self.verbose:
@@ -142,29 +152,26 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         for slide_master in slide_masters:
             try:
                 # Parse the slide master file
-                root = lxml.etree.parse(str(slide_master)).getroot()
+                root = self.trees.getroot(self.package.path(slide_master))
 
                 # Find the corresponding _rels file for this slide master
-                rels_file = slide_master.parent / "_rels" / f"{slide_master.name}.rels"
+                rels_name = rels_part(slide_master)
 
-                if not rels_file.exists():
+                if not self.package.exists(rels_name):
                     errors.append(
-                        f"  {slide_master.relative_to(self.unpacked_dir)}: "
-                        f"Missing relationships file: {rels_file.relative_to(self.unpacked_dir)}"
+                        f"  {slide_master}: Missing relationships file: {rels_name}"
                     )
                     continue
 
-                # Parse the relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                # Relationships of the slide master
+                relationships, rels_error = self.package.load_rels(rels_name)
+                if rels_error is not None:
+                    raise ValueError(rels_error)
 
                 # Build a set of valid relationship IDs that point to slide layouts
-                valid_layout_rids = set()
-                for rel in rels_root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rel_type = rel.get("Type", "")
-                    if "slideLayout" in rel_type:
-                        valid_layout_rids.add(rel.get("Id"))
+                valid_layout_rids = {
+                    rel.id for rel in relationships if "slideLayout" in rel.type
+                }
 
                 # Find all sldLayoutId elements in the slide master
                 for sld_layout_id in root.findall(
@@ -177,17 +184,16 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
                     if r_id and r_id not in valid_layout_rids:
                         errors.append(
-                            f"  {slide_master.relative_to(self.unpacked_dir)}: "
+                            f"  {slide_master}: "
                             f"Line {sld_layout_id.sourceline}: sldLayoutId with id='{layout_id}' "
                             f"references r:id='{r_id}' which is not found in slide layout relationships"
                         )
 
             except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {slide_master.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+                errors.append(f"  {slide_master}: Error: {e}")
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} slide layout ID validation errors:")
             for error in errors:
                 print(error)
@@ -200,37 +206,27 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All slide layout IDs reference valid slide layouts")
             return True
 
+    @validation_pass
     def validate_no_duplicate_slide_layouts(self):
         """Validate that each slide has exactly one slideLayout reference."""
-        import lxml.etree
-
         errors = []
-        slide_rels_files = list(self.unpacked_dir.glob("ppt/slides/_rels/*.xml.rels"))
 
-        for rels_file in slide_rels_files:
-            try:
-                root = lxml.etree.parse(str(rels_file)).getroot()
+        for rels_name in self._slide_rels_parts():
+            relationships, rels_error = self.package.load_rels(rels_name)
+            if rels_error is not None:
+                errors.append(f"  {rels_name}: Error: {rels_error}")
+                continue
 
-                # Find all slideLayout relationships
-                layout_rels = [
-                    rel
-                    for rel in root.findall(
-                        f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                    )
-                    if "slideLayout" in rel.get("Type", "")
-                ]
+            # Find all slideLayout relationships
+            layout_rels = [rel for rel in relationships if "slideLayout" in rel.type]
 
-                if len(layout_rels) > 1:
-                    errors.append(
-                        f"  {rels_file.relative_to(self.unpacked_dir)}: has {len(layout_rels)} slideLayout references"
-                    )
-
-            except Exception as e:
+            if len(layout_rels) > 1:
                 errors.append(
-                    f"  {rels_file.relative_to(self.unpacked_dir)}: Error: {e}"
+                    f"  {rels_name}: has {len(layout_rels)} slideLayout references"
                 )
 
         if errors:
+            self._record_errors(errors)
             print("FAILED - Found slides with duplicate slideLayout references:")
             for error in errors:
                 print(error)
@@ -240,52 +236,35 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All slides have exactly one slideLayout reference")
             return True
 
+    @validation_pass
     def validate_notes_slide_references(self):
         """Validate that each notesSlide file is referenced by only one slide."""
-        import lxml.etree
-
         errors = []
         notes_slide_references = {}  # Track which slides reference each notesSlide
 
         # Find all slide relationship files
-        slide_rels_files = list(self.unpacked_dir.glob("ppt/slides/_rels/*.xml.rels"))
+        slide_rels_parts = self._slide_rels_parts()
 
-        if not slide_rels_files:
+        if not slide_rels_parts:
             if self.verbose:
                 print("PASSED - No slide relationship files found")
             return True
 
-        for rels_file in slide_rels_files:
-            try:
-                # Parse the relationships file
-                root = lxml.etree.parse(str(rels_file)).getroot()
-
-                # Find all notesSlide relationships
-                for rel in root.findall(
-                    f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
-                ):
-                    rel_type = rel.get("Type", "")
-                    if "notesSlide" in rel_type:
-                        target = rel.get("Target", "")
-                        if target:
-                            # Normalize the target path to handle relative paths
-                            normalized_target = target.replace("../", "")
-
-                            # Track which slide references this notesSlide
-                            slide_name = rels_file.stem.replace(
-                                ".xml", ""
-                            )  # e.g., "slide1"
-
-                            if normalized_target not in notes_slide_references:
-                                notes_slide_references[normalized_target] = []
-                            notes_slide_references[normalized_target].append(
-                                (slide_name, rels_file)
-                            )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {rels_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+        for rels_name in slide_rels_parts:
+            relationships, rels_error = self.package.load_rels(rels_name)
+            if rels_error is not None:
+                errors.append(f"  {rels_name}: Error: {rels_error}")
+                continue
+
+            # Find all notesSlide relationships
+            for rel in relationships:
+                if "notesSlide" in rel.type and rel.part is not None:
+                    # Track which slide references this notesSlide
+                    slide_name = posixpath.basename(source_part(rels_name))
+                    slide_name = slide_name.removesuffix(".xml")  # e.g., "slide1"
+                    notes_slide_references.setdefault(rel.part, []).append(
+                        (slide_name, rels_name)
+                    )
 
         # Check for duplicate references
         for target, references in notes_slide_references.items():
@@ -294,10 +273,11 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 errors.append(
                     f"  Notes slide '{target}' is referenced by multiple slides: {', '.join(slide_names)}"
                 )
-                for slide_name, rels_file in references:
-                    errors.append(f"    - {rels_file.relative_to(self.unpacked_dir)}")
+                for slide_name, rels_name in references:
+                    errors.append(f"    - {rels_name}")
 
         if errors:
+            self._record_errors([e for e in errors if not e.startswith("    ")])
             print(
                 f"FAILED - Found {len([e for e in errors if not e.startswith('    ')])} notes slide reference validation errors:"
             )
@@ -310,6 +290,15 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All notes slide references are unique")
             return True
 
+    def _slide_rels_parts(self):
+        """Return the names of the .rels parts of the slides."""
+        return [
+            part
+            for part in self.package.rels_parts()
+            if posixpath.dirname(part) == "ppt/slides/_rels"
+            and part.endswith(".xml.rels")
+        ]
+
 
 if __name__ == "__main__":
     raise RuntimeError("This module should not be run directly.")
@@ -2,23 +2,134 @@
 Validator for tracked changes in Word documents.
 """
 
-import subprocess
-import tempfile
-import zipfile
+import hashlib
+from collections import namedtuple
 from pathlib import Path
 
+import lxml.etree
+
+from .baseline import OriginalDocument
+from .stats import validation_pass
+from .textdiff import align_paragraphs, diff_paragraphs
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_P = f"{{{W_NS}}}p"
+_T = f"{{{W_NS}}}t"
+_DEL_TEXT = f"{{{W_NS}}}delText"
+_INS = f"{{{W_NS}}}ins"
+_DEL = f"{{{W_NS}}}del"
+_AUTHOR = f"{{{W_NS}}}author"
+
+# Result of scan_paragraphs: per-paragraph fingerprints, the texts that were
+# asked for by index, and the number of w:ins/w:del elements by the author
+ParagraphScan = namedtuple("ParagraphScan", ["fingerprints", "texts", "changes"])
+
+
+def scan_paragraphs(source, author="Claude", keep=()):
+    """Fingerprint the paragraph texts of a document with author's changes undone.
+
+    A single streaming pass that reads the document as if the author's w:ins
+    elements were removed and their w:del elements unwrapped (w:delText inside
+    them read as text). Every w:p with text gets a fingerprint, in document
+    order; a paragraph's text includes that of paragraphs nested in it, and
+    empty paragraphs are skipped. Elements are discarded as soon as they end,
+    so memory stays bounded by the largest paragraph.
+
+    Args:
+        source: File path or binary file object of a WordprocessingML part
+        author: Author whose tracked changes are undone
+        keep: Indexes (into the fingerprints) of paragraphs whose text to return
+
+    Returns:
+        ParagraphScan: fingerprints list, {index: text} for keep, change count
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the part is not well-formed
+    """
+    keep = set(keep)
+    fingerprints = []
+    texts = {}
+    changes = 0
+
+    stack = []  # Open elements
+    removed_depth = None  # Depth of the author's w:ins being skipped
+    deletions = 0  # Open w:del elements by the author
+    open_paragraphs = []  # [start order, text parts] of open w:p elements
+    finished = []  # (start order, text) of w:p elements inside open ones
+    started = 0
+
+    events = lxml.etree.iterparse(
+        source, events=("start", "end"), resolve_entities=False
+    )
+    for event, elem in events:
+        if event == "start":
+            stack.append(elem)
+            is_change = elem.tag in (_INS, _DEL) and elem.get(_AUTHOR) == author
+            changes += is_change
+            if removed_depth is not None:
+                continue
+            if is_change and elem.tag == _INS:
+                removed_depth = len(stack)
+            elif is_change:
+                deletions += 1
+            elif elem.tag == _P:
+                open_paragraphs.append([started, []])
+                started += 1
+            continue
+
+        depth = len(stack)
+        stack.pop()
+        if removed_depth is not None:
+            if depth == removed_depth:
+                removed_depth = None
+        elif elem.tag == _T or (elem.tag == _DEL_TEXT and deletions):
+            if elem.text:
+                for _, parts in open_paragraphs:
+                    parts.append(elem.text)
+        elif elem.tag == _DEL and elem.get(_AUTHOR) == author:
+            deletions -= 1
+        elif elem.tag == _P:
+            order, parts = open_paragraphs.pop()
+            finished.append((order, "".join(parts)))
+            if not open_paragraphs:
+                # Nested paragraphs end first but come after their parent
+                finished.sort()
+                for _, text in finished:
+                    if text:
+                        if len(fingerprints) in keep:
+                            texts[len(fingerprints)] = text
+                        fingerprints.append(_fingerprint(text))
+                finished.clear()
+
+        # Drop what has been read, keeping the open ancestors
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+    return ParagraphScan(fingerprints, texts, changes)
+
+
+def _fingerprint(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
 
 class RedliningValidator:
     """Validator for tracked changes in Word documents."""
 
-    def __init__(self, unpacked_dir, original_docx, verbose=False):
+    def __init__(
+        self, unpacked_dir, original_docx, verbose=False, baseline=None, stats=None
+    ):
         self.unpacked_dir = Path(unpacked_dir)
         self.original_docx = Path(original_docx)
         self.verbose = verbose
-        self.namespaces = {
-            "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
-        }
-
+        self.baseline = (
+            baseline if baseline is not None else OriginalDocument(self.original_docx)
+        )
+        self.namespaces = {"w": W_NS}
+        # Optional ValidationStats recording the timings and counters of the pass
+        self.stats = stats
+
+    @validation_pass
     def validate(self):
         """Main validation method that returns True if valid, False otherwise."""
         # Verify unpacked directory exists and has correct structure
@@ -27,92 +138,81 @@ class RedliningValidator:
             print(f"FAILED - Modified document.xml not found at {modified_file}")
             return False
 
-        # First, check if there are any tracked changes by Claude to validate
+        # Fingerprint the modified document with Claude's changes undone
         try:
-            import xml.etree.ElementTree as ET
-
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
-
-            # Check for w:del or w:ins tags authored by Claude
-            del_elements = root.findall(".//w:del", self.namespaces)
-            ins_elements = root.findall(".//w:ins", self.namespaces)
-
-            # Filter to only include changes by Claude
-            claude_del_elements = [
-                elem
-                for elem in del_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-            claude_ins_elements = [
-                elem
-                for elem in ins_elements
-                if elem.get(f"{{{self.namespaces['w']}}}author") == "Claude"
-            ]
-
-            # Redlining validation is only needed if tracked changes by Claude have been used.
-            if not claude_del_elements and not claude_ins_elements:
-                if self.verbose:
-                    print("PASSED - No tracked changes by Claude found.")
-                return True
-
-        except Exception:
-            # If we can't parse the XML, continue with full validation
-            pass
-
-        # Create temporary directory for unpacking original docx
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Unpack original docx
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
-
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
-                print(
-                    f"FAILED - Original document.xml not found in {self.original_docx}"
-                )
-                return False
-
-            # Parse both XML files using xml.etree.ElementTree for redlining validation
-            try:
-                import xml.etree.ElementTree as ET
-
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
-            except ET.ParseError as e:
-                print(f"FAILED - Error parsing XML files: {e}")
-                return False
-
-            # Remove Claude's tracked changes from both documents
-            self._remove_claude_tracked_changes(original_root)
-            self._remove_claude_tracked_changes(modified_root)
-
-            # Extract and compare text content
-            modified_text = self._extract_text_content(modified_root)
-            original_text = self._extract_text_content(original_root)
-
-            if modified_text != original_text:
-                # Show detailed character-level differences for each paragraph
-                error_message = self._generate_detailed_diff(
-                    original_text, modified_text
-                )
-                print(error_message)
-                return False
+            modified = scan_paragraphs(modified_file)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
+        self._record_scan(modified_file.stat().st_size)
 
+        # Redlining validation is only needed if tracked changes by Claude have been used.
+        if not modified.changes:
             if self.verbose:
-                print("PASSED - All changes by Claude are properly tracked")
+                print("PASSED - No tracked changes by Claude found.")
             return True
 
-    def _generate_detailed_diff(self, original_text, modified_text):
-        """Generate detailed word-level differences using git word diff."""
+        # Read document.xml from the original docx
+        try:
+            has_document = self.baseline.has_part("word/document.xml")
+        except Exception as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
+
+        if not has_document:
+            print(f"FAILED - Original document.xml not found in {self.original_docx}")
+            return False
+
+        try:
+            with self.baseline.open("word/document.xml") as f:
+                original = scan_paragraphs(f)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
+        self._record_scan(self.baseline.part_size("word/document.xml"))
+
+        if modified.fingerprints != original.fingerprints:
+            # Show detailed word-level differences for each changed paragraph
+            error_message = self._generate_detailed_diff(
+                original.fingerprints, modified.fingerprints, modified_file
+            )
+            print(error_message)
+            return False
+
+        if self.verbose:
+            print("PASSED - All changes by Claude are properly tracked")
+        return True
+
+    def _generate_detailed_diff(self, original_prints, modified_prints, modified_file):
+        """Generate detailed word-level differences for the changed paragraphs.
+
+        Only the paragraphs whose fingerprints did not align are read again,
+        to get their text for the report.
+        """
+        blocks = [
+            (a1, a2, b1, b2)
+            for op, a1, a2, b1, b2 in align_paragraphs(original_prints, modified_prints)
+            if op != "equal"
+        ]
+        with self.baseline.open("word/document.xml") as f:
+            original_texts = scan_paragraphs(
+                f, keep=(i for a1, a2, _, _ in blocks for i in range(a1, a2))
+            ).texts
+        modified_texts = scan_paragraphs(
+            modified_file, keep=(j for _, _, b1, b2 in blocks for j in range(b1, b2))
+        ).texts
+
+        differences = []
+        for a1, a2, b1, b2 in blocks:
+            differences.extend(
+                diff_paragraphs(
+                    [original_texts[i] for i in range(a1, a2)],
+                    [modified_texts[j] for j in range(b1, b2)],
+                )
+            )
+        if self.stats is not None:
+            self.stats.add_errors(differences, part="word/document.xml")
+
         error_parts = [
             "FAILED - Document text doesn't match after removing Claude's tracked changes",
             "",
@@ -125,154 +225,21 @@ class RedliningValidator:
             "  - To reject another's INSERTION: Nest <w:del> inside their <w:ins>",
             "  - To restore another's DELETION: Add new <w:ins> AFTER their <w:del>",
             "",
+            "Differences:",
+            "============",
+            *differences,
         ]
 
-        # Show git word diff
-        git_diff = self._get_git_word_diff(original_text, modified_text)
-        if git_diff:
-            error_parts.extend(["Differences:", "============", git_diff])
-        else:
-            error_parts.append("Unable to generate word diff (git not available)")
-
         return "\n".join(error_parts)
 
-    def _get_git_word_diff(self, original_text, modified_text):
-        """Generate word diff using git with character-level precision."""
-        try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-
-                # Create two files
-                original_file = temp_path / "original.txt"
-                modified_file = temp_path / "modified.txt"
-
-                original_file.write_text(original_text, encoding="utf-8")
-                modified_file.write_text(modified_text, encoding="utf-8")
-
-                # Try character-level diff first for precise differences
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "--word-diff-regex=.",  # Character-by-character diff
-                        "-U0",  # Zero lines of context - show only changed lines
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    # Clean up the output - remove git diff header lines
-                    lines = result.stdout.split("\n")
-                    # Skip the header lines (diff --git, index, +++, ---, @@)
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-
-                    if content_lines:
-                        return "\n".join(content_lines)
-
-                # Fallback to word-level diff if character-level is too verbose
-                result = subprocess.run(
-                    [
-                        "git",
-                        "diff",
-                        "--word-diff=plain",
-                        "-U0",  # Zero lines of context
-                        "--no-index",
-                        str(original_file),
-                        str(modified_file),
-                    ],
-                    capture_output=True,
-                    text=True,
-                )
-
-                if result.stdout.strip():
-                    lines = result.stdout.split("\n")
-                    content_lines = []
-                    in_content = False
-                    for line in lines:
-                        if line.startswith("@@"):
-                            in_content = True
-                            continue
-                        if in_content and line.strip():
-                            content_lines.append(line)
-                    return "\n".join(content_lines)
-
-        except (subprocess.CalledProcessError, FileNotFoundError, Exception):
-            # Git not available or other error, return None to use fallback
-            pass
-
-        return None
-
-    def _remove_claude_tracked_changes(self, root):
-        """Remove tracked changes authored by Claude from the XML root."""
-        ins_tag = f"{{{self.namespaces['w']}}}ins"
-        del_tag = f"{{{self.namespaces['w']}}}del"
-        author_attr = f"{{{self.namespaces['w']}}}author"
-
-        # Remove w:ins elements
-        for parent in root.iter():
-            to_remove = []
-            for child in parent:
-                if child.tag == ins_tag and child.get(author_attr) == "Claude":
-                    to_remove.append(child)
-            for elem in to_remove:
-                parent.remove(elem)
-
-        # Unwrap content in w:del elements where author is "Claude"
-        deltext_tag = f"{{{self.namespaces['w']}}}delText"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        for parent in root.iter():
-            to_process = []
-            for child in parent:
-                if child.tag == del_tag and child.get(author_attr) == "Claude":
-                    to_process.append((child, list(parent).index(child)))
-
-            # Process in reverse order to maintain indices
-            for del_elem, del_index in reversed(to_process):
-                # Convert w:delText to w:t before moving
-                for elem in del_elem.iter():
-                    if elem.tag == deltext_tag:
-                        elem.tag = t_tag
-
-                # Move all children of w:del to its parent before removing w:del
-                for child in reversed(list(del_elem)):
-                    parent.insert(del_index, child)
-                parent.remove(del_elem)
-
-    def _extract_text_content(self, root):
-        """Extract text content from Word XML, preserving paragraph structure.
-
-        Empty paragraphs are skipped to avoid false positives when tracked
-        insertions add only structural elements without text content.
-        """
-        p_tag = f"{{{self.namespaces['w']}}}p"
-        t_tag = f"{{{self.namespaces['w']}}}t"
-
-        paragraphs = []
-        for p_elem in root.findall(f".//{p_tag}"):
-            # Get all text elements within this paragraph
-            text_parts = []
-            for t_elem in p_elem.findall(f".//{t_tag}"):
-                if t_elem.text:
-                    text_parts.append(t_elem.text)
-            paragraph_text = "".join(text_parts)
-            # Skip empty paragraphs - they don't affect content validation
-            if paragraph_text:
-                paragraphs.append(paragraph_text)
-
-        return "\n".join(paragraphs)
+    def _record_scan(self, size):
+        """Count a streaming read of document.xml in the stats, when keeping them."""
+        if self.stats is not None:
+            self.stats.add_part(
+                "word/document.xml",
+                {"parses": 1, "bytes_parsed": size},
+                external=True,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""
+Cache of per-part validation results for incremental validation.
+
+Per-part checks only depend on the part itself (and its .rels file), so their
+results can be reused across validation runs for as long as those files are
+unchanged. Results are keyed by check name and part path and stored with the
+stamp of the files they were computed from; a changed stamp is a cache miss.
+Callers that know which parts they modified should also invalidate them
+explicitly, since a file rewritten within the timestamp resolution with the
+same size keeps its stamp.
+"""
+
+import os
+
+
+class ResultCache:
+    """Per-part check results keyed by (check name, path) and file stamp."""
+
+    def __init__(self):
+        # (check name, absolute path) -> (stamp, result)
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, check, path, stamp):
+        """Return (found, result) for a check of path at the given stamp."""
+        entry = self._results.get((check, os.path.abspath(path)))
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def put(self, check, path, stamp, result):
+        """Store the result of a check of path at the given stamp."""
+        self._results[(check, os.path.abspath(path))] = (stamp, result)
+
+    def invalidate(self, paths=None):
+        """Forget results for the given paths, or all results if None."""
+        if paths is None:
+            self._results.clear()
+            return
+        paths = {os.path.abspath(path) for path in paths}
+        for key in [key for key in self._results if key[1] in paths]:
+            del self._results[key]
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
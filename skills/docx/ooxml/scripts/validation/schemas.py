@@ -0,0 +1,169 @@
+"""
+Process-wide cache of compiled XSD schemas shared by all validators.
+
+Compiling the OOXML schemas (wml.xsd pulls in a dozen imported schemas) is far
+more expensive than validating a typical part against them, so every schema is
+compiled at most once per process and reused for every part, for the original
+copy of every part, and across DOCX and PPTX validators.
+
+An optional schema bundle packs the whole schema tree into a single archive
+with documentation annotations stripped. Once loaded, schema imports are
+resolved from memory instead of the filesystem. The bundle records the size
+and modification time of every schema it was built from and is rebuilt when
+they no longer match the schema tree.
+"""
+
+import json
+import zipfile
+from pathlib import Path
+
+import lxml.etree
+
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+# Compiled schemas keyed by resolved schema path
+_compiled_schemas = {}
+
+# Schema sources from a loaded bundle, keyed by resolved schema path
+_bundled_sources = {}
+
+# Bundle member listing the size and mtime of each schema the bundle was built from
+MANIFEST_NAME = "manifest.json"
+
+# Number of schemas compiled by this process
+_compile_count = 0
+
+
+class _BundleResolver(lxml.etree.Resolver):
+    """Resolve schema imports and includes from the loaded bundle."""
+
+    def resolve(self, system_url, public_id, context):
+        source = _bundled_sources.get(_normalize(system_url))
+        if source is None:
+            return None
+        return self.resolve_string(source, context, base_url=system_url)
+
+
+def _normalize(path):
+    """Normalize a schema path or file URL into a cache key."""
+    path = str(path)
+    if path.startswith("file://"):
+        path = path[len("file://") :]
+    return str(Path(path).resolve())
+
+
+def get_schema(schema_path):
+    """Return the compiled XMLSchema for schema_path, compiling it on first use.
+
+    Args:
+        schema_path: Path to the top-level .xsd file
+
+    Returns:
+        lxml.etree.XMLSchema: The compiled schema
+    """
+    global _compile_count
+    key = _normalize(schema_path)
+    schema = _compiled_schemas.get(key)
+    if schema is None:
+        parser = lxml.etree.XMLParser()
+        if key in _bundled_sources:
+            parser.resolvers.add(_BundleResolver())
+            xsd_doc = lxml.etree.fromstring(
+                _bundled_sources[key], parser=parser, base_url=key
+            ).getroottree()
+        else:
+            with open(key, "rb") as xsd_file:
+                xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=key)
+        schema = lxml.etree.XMLSchema(xsd_doc)
+        _compiled_schemas[key] = schema
+        _compile_count += 1
+    return schema
+
+
+def compile_count():
+    """Return the number of schemas this process has compiled."""
+    return _compile_count
+
+
+def clear_schema_cache():
+    """Drop all compiled schemas and loaded bundle sources."""
+    _compiled_schemas.clear()
+    _bundled_sources.clear()
+
+
+def build_schema_bundle(schemas_dir, bundle_path):
+    """Pack every .xsd under schemas_dir into a single bundle file.
+
+    Documentation annotations are stripped since they do not affect validation.
+
+    Args:
+        schemas_dir: Root directory of the schema tree
+        bundle_path: Path of the bundle archive to write
+
+    Returns:
+        int: Number of schemas written to the bundle
+    """
+    schemas_dir = Path(schemas_dir)
+    with zipfile.ZipFile(bundle_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        manifest = _schema_stamps(schemas_dir)
+        for name in manifest:
+            root = lxml.etree.parse(str(schemas_dir / name)).getroot()
+            for annotation in root.xpath(
+                "//xsd:annotation", namespaces={"xsd": XSD_NAMESPACE}
+            ):
+                annotation.getparent().remove(annotation)
+            zf.writestr(
+                name, lxml.etree.tostring(root, encoding="UTF-8", xml_declaration=True)
+            )
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+    return len(manifest)
+
+
+def load_schema_bundle(bundle_path, schemas_dir):
+    """Load a schema bundle so schemas under schemas_dir are read from memory.
+
+    A missing bundle is built first, and a bundle whose schemas no longer match
+    schemas_dir (added, removed or modified files) is rebuilt.
+
+    Args:
+        bundle_path: Path to a bundle created by build_schema_bundle
+        schemas_dir: Schema directory the bundle stands in for
+
+    Returns:
+        bool: Whether the bundle was (re)built
+    """
+    schemas_dir = Path(schemas_dir)
+    rebuilt = not _bundle_is_current(bundle_path, schemas_dir)
+    if rebuilt:
+        build_schema_bundle(schemas_dir, bundle_path)
+    with zipfile.ZipFile(bundle_path, "r") as zf:
+        for name in zf.namelist():
+            if name != MANIFEST_NAME:
+                _bundled_sources[_normalize(schemas_dir / name)] = zf.read(name)
+    return rebuilt
+
+
+def _schema_stamps(schemas_dir):
+    """Map each .xsd under schemas_dir to its [size, mtime in ns]."""
+    stamps = {}
+    for xsd_file in sorted(schemas_dir.rglob("*.xsd")):
+        stat = xsd_file.stat()
+        stamps[xsd_file.relative_to(schemas_dir).as_posix()] = [
+            stat.st_size,
+            stat.st_mtime_ns,
+        ]
+    return stamps
+
+
+def _bundle_is_current(bundle_path, schemas_dir):
+    """Whether bundle_path exists and was built from the schemas now in schemas_dir."""
+    try:
+        with zipfile.ZipFile(bundle_path, "r") as zf:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+    except (FileNotFoundError, KeyError, zipfile.BadZipFile, ValueError):
+        return False
+    return manifest == _schema_stamps(schemas_dir)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,337 @@
+"""
+Timings and counters of validation passes, for finding what makes validation slow.
+
+A ValidationStats passed to a validator as stats= records, for every pass
+(validate_xml, validate_against_xsd, ...) and for every part a pass checks:
+
+- wall time
+- parts visited, and per-part results reused from a ResultCache
+- XML parses and bytes parsed, of the unpacked parts and of the original
+- XSD schema compilations
+- errors reported
+
+Per-part checks that run in worker processes report their own timings and
+counters back with their results. Without stats, validators skip all of this.
+
+Usage:
+    stats = ValidationStats()
+    DOCXSchemaValidator(unpacked_dir, original, stats=stats).validate()
+    print(stats.summary())
+    stats.write_json("validation.json")
+"""
+
+import contextlib
+import functools
+import io
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from . import schemas
+
+# Counters of a pass or part, in report order
+COUNTERS = ("parses", "bytes_parsed", "schema_compiles", "errors")
+
+# Part path at the start of an error message, as in "  word/document.xml: Line 3"
+_ERROR_PART = re.compile(r"^\s*([^\s:][^:]*):")
+
+
+def validation_pass(method):
+    """Record each call of a validator method as a pass in the validator's stats."""
+
+    @functools.wraps(method)
+    def run(self, *args, **kwargs):
+        if self.stats is None:
+            return method(self, *args, **kwargs)
+        with self.stats.measure_pass(self, method.__name__) as entry:
+            passed = method(self, *args, **kwargs)
+            # Passes that only report (like compare_paragraph_counts) return None
+            if passed is False:
+                entry["passed"] = False
+        return passed
+
+    return run
+
+
+def counters(validator):
+    """Return the parse and schema counters a validator has accumulated so far."""
+    parses = bytes_parsed = 0
+    for source in (getattr(validator, "trees", None), validator.baseline):
+        if source is not None:
+            parses += source.parse_count
+            bytes_parsed += source.bytes_parsed
+    return {
+        "parses": parses,
+        "bytes_parsed": bytes_parsed,
+        "schema_compiles": schemas.compile_count(),
+    }
+
+
+def measure_part(validator, method_name, xml_file):
+    """Run a per-part check and return (result, measurement of the call)."""
+    before = counters(validator)
+    start = time.perf_counter()
+    result = getattr(validator, method_name)(xml_file)
+    measurement = {"seconds": time.perf_counter() - start}
+    after = counters(validator)
+    for name, value in before.items():
+        measurement[name] = after[name] - value
+    return result, measurement
+
+
+class ValidationStats:
+    """Per-pass and per-part timings and counters of one or more validators."""
+
+    def __init__(self):
+        # (validator class, pass) -> totals, in the order passes first ran
+        self.passes = {}
+        # Part -> pass -> totals of that pass's work on the part
+        self.parts = {}
+        # Wall time of the passes that did not run inside another pass
+        self.total_seconds = 0.0
+        # Running passes, innermost last
+        self._running = []
+
+    @contextlib.contextmanager
+    def measure_pass(self, validator, name):
+        """Time a pass and count what it parsed, compiled and reported.
+
+        Passes that run inside another pass are measured on their own and
+        also count towards the enclosing pass.
+
+        Yields:
+            dict: The pass entry, for the caller to add to
+        """
+        key = (type(validator).__name__, name)
+        entry = self.passes.get(key)
+        if entry is None:
+            entry = self.passes[key] = {
+                "validator": key[0],
+                "pass": name,
+                "runs": 0,
+                "passed": True,
+                "seconds": 0.0,
+                "parts": 0,
+                "cached_parts": 0,
+                **dict.fromkeys(COUNTERS, 0),
+            }
+        running = _RunningPass(entry, validator)
+        trees = getattr(validator, "trees", None)
+        if trees is not None:
+            previous_visits, trees.visits = trees.visits, set()
+        self._running.append(running)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            elapsed = time.perf_counter() - start
+            self._running.pop()
+            if trees is not None:
+                running.visited |= {running.part(path) for path in trees.visits}
+                if previous_visits is not None:
+                    previous_visits |= trees.visits
+                trees.visits = previous_visits
+            entry["runs"] += 1
+            entry["seconds"] += elapsed
+            entry["parts"] += len(running.visited)
+            after = counters(validator)
+            for counter, value in running.before.items():
+                entry[counter] += after[counter] - value
+            if self._running:
+                self._running[-1].visited |= running.visited
+            else:
+                self.total_seconds += elapsed
+
+    def visit(self, part):
+        """Count a part as visited by the running pass."""
+        if self._running:
+            self._running[-1].visited.add(str(part))
+
+    def add_part(self, part, measurement, external=False):
+        """Record a per-part check of the running pass.
+
+        Args:
+            part: Part path relative to the unpacked directory
+            measurement: Dict with seconds and counters, from measure_part
+            external: Whether the counters were not taken from this process's
+                validator (a worker process, or a parse outside the trees),
+                so the running passes have not seen them yet
+        """
+        if not self._running:
+            return
+        self.visit(part)
+        totals = self._part_totals(part)
+        for name, value in measurement.items():
+            totals[name] += value
+        if external:
+            for running in self._running:
+                for counter in COUNTERS:
+                    running.entry[counter] += measurement.get(counter, 0)
+
+    def add_cached(self, count):
+        """Count per-part results of the running pass taken from a ResultCache."""
+        if self._running:
+            self._running[-1].entry["cached_parts"] += count
+
+    def add_errors(self, errors, part=None):
+        """Count errors reported by the running pass.
+
+        Args:
+            errors: Error messages; each is attributed to the part named at
+                its start ("  word/document.xml: ...") unless part is given
+            part: Part all of the errors belong to
+        """
+        if not self._running:
+            return
+        for running in self._running:
+            running.entry["errors"] += len(errors)
+        known = self._running[-1].known_parts()
+        for error in errors:
+            error_part = part
+            if error_part is None:
+                match = _ERROR_PART.match(error)
+                error_part = match[1] if match and match[1] in known else None
+            if error_part is not None:
+                self._part_totals(error_part)["errors"] += 1
+
+    def _part_totals(self, part):
+        """Return the totals of the running pass for a part."""
+        name = self._running[-1].entry["pass"]
+        return self.parts.setdefault(str(part), {}).setdefault(
+            name, {"seconds": 0.0, **dict.fromkeys(COUNTERS, 0)}
+        )
+
+    def to_dict(self):
+        """Return the recorded passes and parts as JSON-serializable data."""
+        return {
+            "total_seconds": self.total_seconds,
+            "passes": list(self.passes.values()),
+            "parts": self.parts,
+        }
+
+    def write_json(self, path):
+        """Write the report as JSON to path."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def summary(self, slowest_parts=5):
+        """Return a table of the passes, slowest first, and the slowest parts."""
+        entries = sorted(self.passes.values(), key=lambda e: -e["seconds"])
+        names = [f"{entry['validator']}.{entry['pass']}" for entry in entries]
+        slowest = sorted(
+            (
+                (sum(totals["seconds"] for totals in passes.values()), part)
+                for part, passes in self.parts.items()
+            ),
+            reverse=True,
+        )[:slowest_parts]
+        width = max(map(len, names + [part for _, part in slowest]), default=4)
+
+        lines = [
+            f"{'pass':<{width}} {'time (s)':>9} {'parts':>6} {'cached':>7}"
+            f" {'parses':>7} {'MB parsed':>10} {'schemas':>8} {'errors':>7}"
+        ]
+        for name, entry in zip(names, entries):
+            lines.append(
+                f"{name:<{width}} {entry['seconds']:>9.3f} {entry['parts']:>6}"
+                f" {entry['cached_parts']:>7} {entry['parses']:>7}"
+                f" {entry['bytes_parsed'] / 2**20:>10.2f}"
+                f" {entry['schema_compiles']:>8} {entry['errors']:>7}"
+            )
+        lines.append(f"{'total':<{width}} {self.total_seconds:>9.3f}")
+        if slowest:
+            lines.append("")
+            lines.append(f"{'slowest parts':<{width}} {'time (s)':>9}")
+            lines.extend(
+                f"{part:<{width}} {seconds:>9.3f}" for seconds, part in slowest
+            )
+        return "\n".join(lines)
+
+
+class _RunningPass:
+    """State of a pass while it runs."""
+
+    def __init__(self, entry, validator):
+        self.entry = entry
+        self.validator = validator
+        self.visited = set()
+        self.before = counters(validator)
+        self._known = None
+
+    def part(self, path):
+        """Return a path as a part name relative to the unpacked directory."""
+        try:
+            return Path(path).relative_to(self.validator.unpacked_dir).as_posix()
+        except ValueError:
+            return str(path)
+
+    def known_parts(self):
+        """Part names of the validator's XML files."""
+        if self._known is None:
+            self._known = {
+                self.part(xml_file)
+                for xml_file in getattr(self.validator, "xml_files", ())
+            }
+        return self._known
+
+
+@contextlib.contextmanager
+def profiled(profiler, output=None, limit=30):
+    """Profile the enclosed code and print or save the profile afterwards.
+
+    Args:
+        profiler: "cprofile", or "pyinstrument" if that package is installed
+        output: File to save the profile to (pstats data for cprofile, HTML
+            for pyinstrument) instead of printing it
+        limit: Number of functions printed for cprofile
+
+    Raises:
+        ImportError: If pyinstrument is asked for but not installed
+        ValueError: For an unknown profiler
+    """
+    if profiler == "cprofile":
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if output:
+                profile.dump_stats(output)
+            else:
+                report = io.StringIO()
+                stats = pstats.Stats(profile, stream=report)
+                stats.sort_stats("cumulative").print_stats(limit)
+                print(report.getvalue(), file=sys.stderr)
+    elif profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError(
+                "pyinstrument is not installed (pip install pyinstrument); "
+                "use the cprofile profiler instead"
+            ) from e
+
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            if output:
+                with open(output, "w") as f:
+                    f.write(profile.output_html())
+            else:
+                print(profile.output_text(), file=sys.stderr)
+    else:
+        raise ValueError(f"Unknown profiler: {profiler}")
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,80 @@
+"""
+Shared store of parsed XML trees for the unpacked document.
+
+Every validation pass reads the same parts. The store parses each file once and
+hands the same tree to every pass for as long as the file is unchanged on disk
+(same mtime and size). Parse failures are cached too, so a malformed part is
+reported consistently without being re-read by each pass.
+
+Trees returned by the store are shared and must be treated as read-only.
+Passes that need to modify a tree take a private copy with copy().
+"""
+
+import copy
+import os
+
+import lxml.etree
+
+
+def file_stamp(path):
+    """Return the (mtime_ns, size) stamp used to detect changed files."""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class TreeStore:
+    """Parse-once cache of lxml trees keyed by path and file stamp."""
+
+    def __init__(self):
+        # Absolute path -> (stamp, tree or exception)
+        self._entries = {}
+        self.parse_count = 0
+        self.bytes_parsed = 0
+        # Set of paths to add every path handed out to, while instrumented
+        self.visits = None
+
+    def parse(self, xml_file):
+        """Return the shared parsed tree for xml_file.
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the file is not well-formed
+            OSError: If the file cannot be read
+        """
+        path = os.path.abspath(xml_file)
+        stamp = file_stamp(path)
+        if self.visits is not None:
+            self.visits.add(path)
+
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != stamp:
+            try:
+                result = lxml.etree.parse(path)
+            except Exception as e:
+                result = e
+            self.parse_count += 1
+            self.bytes_parsed += stamp[1]
+            entry = (stamp, result)
+            self._entries[path] = entry
+
+        if isinstance(entry[1], Exception):
+            raise entry[1]
+        return entry[1]
+
+    def getroot(self, xml_file):
+        """Return the root element of the shared tree for xml_file."""
+        return self.parse(xml_file).getroot()
+
+    def copy(self, xml_file):
+        """Return a private copy of the tree for xml_file that may be modified."""
+        return copy.deepcopy(self.parse(xml_file))
+
+    def invalidate(self, xml_file=None):
+        """Forget the cached tree for xml_file, or for all files if None."""
+        if xml_file is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.path.abspath(xml_file), None)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
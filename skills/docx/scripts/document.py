@@ -13,6 +13,9 @@ Usage:
     node = doc["word/document.xml"].get_node(tag="w:del", attrs={"w:id": "1"})
     node = doc["word/document.xml"].get_node(tag="w:p", line_number=10)
 
+    # Find text, also where it is split across runs
+    matches = doc["word/document.xml"].text_index().find_all("Effective Date")
+
     # Add comments
     doc.add_comment(start=node, end=node, text="Comment text")
     doc.reply_to_comment(parent_comment_id=0, text="Reply text")
@@ -26,23 +29,44 @@ Usage:
     doc.save()
 """
 
+import copy
+import functools
 import html
 import random
+import re
 import shutil
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 
+import lxml.etree
 from defusedxml import minidom
-from ooxml.scripts.pack import pack_document
+from ooxml.scripts.unpack import format_parts
+from ooxml.scripts.validation.baseline import OriginalDocument
 from ooxml.scripts.validation.docx import DOCXSchemaValidator
 from ooxml.scripts.validation.redlining import RedliningValidator
+from ooxml.scripts.validation.results import ResultCache
+from ooxml.scripts.validation.trees import TreeStore, file_stamp
+from ooxml.scripts.workspace import Workspace
 
-from .utilities import XMLEditor
+from .text_index import TextIndex
+from .utilities import LxmlXMLEditor, SegmentedXMLEditor, XMLEditor
 
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Namespaces of the attributes and elements created by the editors
+_NAMESPACES = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "w14": "http://schemas.microsoft.com/office/word/2010/wordml",
+    "w16du": "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
+    "w16cex": "http://schemas.microsoft.com/office/word/2018/wordml/cex",
+    "xml": "http://www.w3.org/XML/1998/namespace",
+}
+
+# w:id of tracked changes in the raw XML (a w:id in text only overestimates)
+_RAW_CHANGE_ID = re.compile(rb"<w:(?:ins|del)(?=\s)[^<]*?\sw:id\s*=\s*[\"'](\d+)")
+
 
 class DocxXMLEditor(XMLEditor):
     """XMLEditor that automatically applies RSID, author, and date to new elements.
@@ -56,6 +80,9 @@ class DocxXMLEditor(XMLEditor):
         dom (defusedxml.minidom.Document): The DOM document for direct manipulation
     """
 
+    # TextIndex over the paragraphs, created on first use
+    _text_index = None
+
     def __init__(
         self, xml_path, rsid: str, author: str = "Claude", initials: str = "C"
     ):
@@ -72,13 +99,27 @@ class DocxXMLEditor(XMLEditor):
         self.author = author
         self.initials = initials
 
+    def text_index(self):
+        """Return the full-text index of this part's paragraphs.
+
+        Created on first use and kept up to date by edits made through this
+        editor. Finds phrases that span several runs, and maps them back to
+        their w:t elements; see TextIndex.
+
+        Example:
+            for match in editor.text_index().find_all("Effective Date"):
+                t, start, end = match.spans[0]
+        """
+        if self._text_index is None:
+            self._text_index = TextIndex(self._index)
+        return self._text_index
+
     def _get_next_change_id(self):
         """Get the next available change ID by checking all tracked change elements."""
         max_id = -1
         for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
+            for elem in self._index.candidates(tag):
+                change_id = self._index.attribute(elem, "w:id")
                 if change_id:
                     try:
                         max_id = max(max_id, int(change_id))
@@ -86,32 +127,74 @@ class DocxXMLEditor(XMLEditor):
                         pass
         return max_id + 1
 
-    def _ensure_w16du_namespace(self):
-        """Ensure w16du namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16du"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16du",
-                "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
-            )
+    # Node access used by the attribute injection and RSID handling below, so
+    # they are shared with LxmlDocxXMLEditor, which overrides these methods.
+    # Names are prefixed ("w:p", "w:rsidR").
+
+    def _name(self, name):
+        """Return a prefixed name as _tag returns it."""
+        return name
+
+    def _tag(self, node):
+        """Return the tag of an element node, or None for other nodes."""
+        return node.tagName if node.nodeType == node.ELEMENT_NODE else None
+
+    def _get_attribute(self, elem, name):
+        """Return the value of an attribute, or None if elem does not have it."""
+        return elem.getAttribute(name) if elem.hasAttribute(name) else None
+
+    def _set_attribute(self, elem, name, value):
+        elem.setAttribute(name, value)
+
+    def _pop_attribute(self, elem, name):
+        """Remove an attribute and return its value, or None if it was not set."""
+        value = self._get_attribute(elem, name)
+        if value is not None:
+            elem.removeAttribute(name)
+        return value
+
+    def _descendants(self, node, tag):
+        """Return the descendant elements of node with the given tag."""
+        return node.getElementsByTagName(tag)
+
+    def _inside(self, elem, tag):
+        """Check if elem has an ancestor with the given tag."""
+        parent = elem.parentNode
+        while parent:
+            if parent.nodeType == parent.ELEMENT_NODE and parent.tagName == tag:
+                return True
+            parent = parent.parentNode
+        return False
 
-    def _ensure_w16cex_namespace(self):
-        """Ensure w16cex namespace is declared on the root element."""
-        root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w16cex",
-                "http://schemas.microsoft.com/office/word/2018/wordml/cex",
-            )
+    def _leading_text(self, elem):
+        """Return the text elem starts with, or None if it starts with an element."""
+        child = elem.firstChild
+        return child.data if child and child.nodeType == child.TEXT_NODE else None
 
-    def _ensure_w14_namespace(self):
-        """Ensure w14 namespace is declared on the root element."""
+    def _ensure_namespace(self, prefix):
+        """Ensure a namespace prefix is declared on the root element."""
         root = self.dom.documentElement
-        if not root.hasAttribute("xmlns:w14"):  # type: ignore
-            root.setAttribute(  # type: ignore
-                "xmlns:w14",
-                "http://schemas.microsoft.com/office/word/2010/wordml",
-            )
+        if not root.hasAttribute(f"xmlns:{prefix}"):  # type: ignore
+            root.setAttribute(f"xmlns:{prefix}", _NAMESPACES[prefix])  # type: ignore
+            self._index.changed([root], deep=False)
+
+    def _set_default(self, elem, name, value):
+        """Set an attribute unless elem already has it; return whether it was set."""
+        if self._get_attribute(elem, name) is None:
+            self._set_attribute(elem, name, value)
+            return True
+        return False
+
+    def _move_rsid(self, run, old_name, new_name):
+        """Rename a run's RSID attribute, or set new_name to this editor's RSID.
+
+        Used to turn w:rsidR into w:rsidDel when a run is deleted, and back.
+        """
+        value = self._pop_attribute(run, old_name)
+        if value is not None:
+            self._set_attribute(run, new_name, value)
+        else:
+            self._set_default(run, new_name, self.rsid)
 
     def _inject_attributes_to_nodes(self, nodes):
         """Inject RSID, author, and date attributes into DOM nodes where applicable.
@@ -127,139 +210,89 @@ class DocxXMLEditor(XMLEditor):
         Args:
             nodes: List of DOM nodes to process
         """
-        from datetime import datetime, timezone
-
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        def is_inside_deletion(elem):
-            """Check if element is inside a w:del element."""
-            parent = elem.parentNode
-            while parent:
-                if parent.nodeType == parent.ELEMENT_NODE and parent.tagName == "w:del":
-                    return True
-                parent = parent.parentNode
-            return False
+        set_default = self._set_default
 
         def add_rsid_to_p(elem):
-            if not elem.hasAttribute("w:rsidR"):
-                elem.setAttribute("w:rsidR", self.rsid)
-            if not elem.hasAttribute("w:rsidRDefault"):
-                elem.setAttribute("w:rsidRDefault", self.rsid)
-            if not elem.hasAttribute("w:rsidP"):
-                elem.setAttribute("w:rsidP", self.rsid)
+            set_default(elem, "w:rsidR", self.rsid)
+            set_default(elem, "w:rsidRDefault", self.rsid)
+            set_default(elem, "w:rsidP", self.rsid)
             # Add w14:paraId and w14:textId if not present
-            if not elem.hasAttribute("w14:paraId"):
-                self._ensure_w14_namespace()
-                elem.setAttribute("w14:paraId", _generate_hex_id())
-            if not elem.hasAttribute("w14:textId"):
-                self._ensure_w14_namespace()
-                elem.setAttribute("w14:textId", _generate_hex_id())
+            if set_default(elem, "w14:paraId", _generate_hex_id()):
+                self._ensure_namespace("w14")
+            if set_default(elem, "w14:textId", _generate_hex_id()):
+                self._ensure_namespace("w14")
 
         def add_rsid_to_r(elem):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
-            if is_inside_deletion(elem):
-                if not elem.hasAttribute("w:rsidDel"):
-                    elem.setAttribute("w:rsidDel", self.rsid)
+            if self._inside(elem, "w:del"):
+                set_default(elem, "w:rsidDel", self.rsid)
             else:
-                if not elem.hasAttribute("w:rsidR"):
-                    elem.setAttribute("w:rsidR", self.rsid)
+                set_default(elem, "w:rsidR", self.rsid)
+
+        # Scanned once, when the first element needs an id
+        next_change_id = None
 
         def add_tracked_change_attrs(elem):
+            nonlocal next_change_id
             # Auto-assign w:id if not present
-            if not elem.hasAttribute("w:id"):
-                elem.setAttribute("w:id", str(self._get_next_change_id()))
-            if not elem.hasAttribute("w:author"):
-                elem.setAttribute("w:author", self.author)
-            if not elem.hasAttribute("w:date"):
-                elem.setAttribute("w:date", timestamp)
+            if self._get_attribute(elem, "w:id") is None:
+                if next_change_id is None:
+                    next_change_id = self._get_next_change_id()
+                self._set_attribute(elem, "w:id", str(next_change_id))
+                next_change_id += 1
+            set_default(elem, "w:author", self.author)
+            set_default(elem, "w:date", timestamp)
             # Add w16du:dateUtc for tracked changes (same as w:date since we generate UTC timestamps)
-            if elem.tagName in ("w:ins", "w:del") and not elem.hasAttribute(
-                "w16du:dateUtc"
-            ):
-                self._ensure_w16du_namespace()
-                elem.setAttribute("w16du:dateUtc", timestamp)
+            if set_default(elem, "w16du:dateUtc", timestamp):
+                self._ensure_namespace("w16du")
 
         def add_comment_attrs(elem):
-            if not elem.hasAttribute("w:author"):
-                elem.setAttribute("w:author", self.author)
-            if not elem.hasAttribute("w:date"):
-                elem.setAttribute("w:date", timestamp)
-            if not elem.hasAttribute("w:initials"):
-                elem.setAttribute("w:initials", self.initials)
+            set_default(elem, "w:author", self.author)
+            set_default(elem, "w:date", timestamp)
+            set_default(elem, "w:initials", self.initials)
 
         def add_comment_extensible_date(elem):
             # Add w16cex:dateUtc for comment extensible elements
-            if not elem.hasAttribute("w16cex:dateUtc"):
-                self._ensure_w16cex_namespace()
-                elem.setAttribute("w16cex:dateUtc", timestamp)
+            if set_default(elem, "w16cex:dateUtc", timestamp):
+                self._ensure_namespace("w16cex")
 
         def add_xml_space_to_t(elem):
             # Add xml:space="preserve" to w:t if text has leading/trailing whitespace
-            if (
-                elem.firstChild
-                and elem.firstChild.nodeType == elem.firstChild.TEXT_NODE
-            ):
-                text = elem.firstChild.data
-                if text and (text[0].isspace() or text[-1].isspace()):
-                    if not elem.hasAttribute("xml:space"):
-                        elem.setAttribute("xml:space", "preserve")
-
+            text = self._leading_text(elem)
+            if text and (text[0].isspace() or text[-1].isspace()):
+                set_default(elem, "xml:space", "preserve")
+
+        # Applied to each node and then to its descendants tag by tag, in this
+        # order, which decides the change ids assigned
+        handlers = {
+            "w:p": add_rsid_to_p,
+            "w:r": add_rsid_to_r,
+            "w:t": add_xml_space_to_t,
+            "w:ins": add_tracked_change_attrs,
+            "w:del": add_tracked_change_attrs,
+            "w:comment": add_comment_attrs,
+            "w16cex:commentExtensible": add_comment_extensible_date,
+        }
+        by_tag = {self._name(tag): handler for tag, handler in handlers.items()}
         for node in nodes:
-            if node.nodeType != node.ELEMENT_NODE:
+            tag = self._tag(node)
+            if tag is None:
                 continue
 
-            # Handle the node itself
-            if node.tagName == "w:p":
-                add_rsid_to_p(node)
-            elif node.tagName == "w:r":
-                add_rsid_to_r(node)
-            elif node.tagName == "w:t":
-                add_xml_space_to_t(node)
-            elif node.tagName in ("w:ins", "w:del"):
-                add_tracked_change_attrs(node)
-            elif node.tagName == "w:comment":
-                add_comment_attrs(node)
-            elif node.tagName == "w16cex:commentExtensible":
-                add_comment_extensible_date(node)
-
-            # Process descendants (getElementsByTagName doesn't return the element itself)
-            for elem in node.getElementsByTagName("w:p"):
-                add_rsid_to_p(elem)
-            for elem in node.getElementsByTagName("w:r"):
-                add_rsid_to_r(elem)
-            for elem in node.getElementsByTagName("w:t"):
-                add_xml_space_to_t(elem)
-            for tag in ("w:ins", "w:del"):
-                for elem in node.getElementsByTagName(tag):
-                    add_tracked_change_attrs(elem)
-            for elem in node.getElementsByTagName("w:comment"):
-                add_comment_attrs(elem)
-            for elem in node.getElementsByTagName("w16cex:commentExtensible"):
-                add_comment_extensible_date(elem)
-
-    def replace_node(self, elem, new_content):
-        """Replace node with automatic attribute injection."""
-        nodes = super().replace_node(elem, new_content)
-        self._inject_attributes_to_nodes(nodes)
-        return nodes
-
-    def insert_after(self, elem, xml_content):
-        """Insert after with automatic attribute injection."""
-        nodes = super().insert_after(elem, xml_content)
-        self._inject_attributes_to_nodes(nodes)
-        return nodes
+            # Handle the node itself, then its descendants
+            if tag in by_tag:
+                by_tag[tag](node)
+            for tag, handler in handlers.items():
+                for elem in self._descendants(node, tag):
+                    handler(elem)
 
-    def insert_before(self, elem, xml_content):
-        """Insert before with automatic attribute injection."""
-        nodes = super().insert_before(elem, xml_content)
-        self._inject_attributes_to_nodes(nodes)
-        return nodes
+        self._index.changed(nodes)
 
-    def append_to(self, elem, xml_content):
-        """Append to with automatic attribute injection."""
-        nodes = super().append_to(elem, xml_content)
+    def _edits_applied(self, nodes):
+        """Inject attributes into everything added by the applied edits at once."""
+        super()._edits_applied(nodes)
         self._inject_attributes_to_nodes(nodes)
-        return nodes
 
     def revert_insertion(self, elem):
         """Reject an insertion by wrapping its content in a deletion.
@@ -299,7 +332,12 @@ class DocxXMLEditor(XMLEditor):
                 f"The provided element <{elem.tagName}> contains no insertions. "
             )
 
-        # Process all insertions - wrap all children in w:del
+        self._edit(lambda _: self._wrap_insertions_in_deletions(ins_elements))
+        return [elem]
+
+    def _wrap_insertions_in_deletions(self, ins_elements):
+        """Wrap the runs of each w:ins in a w:del and return the new wrappers."""
+        del_wrappers = []
         for ins_elem in ins_elements:
             runs = list(ins_elem.getElementsByTagName("w:r"))
             if not runs:
@@ -311,11 +349,7 @@ class DocxXMLEditor(XMLEditor):
             # Process each run
             for run in runs:
                 # Convert w:t → w:delText and w:rsidR → w:rsidDel
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
+                self._move_rsid(run, "w:rsidR", "w:rsidDel")
 
                 for t_elem in list(run.getElementsByTagName("w:t")):
                     del_text = self.dom.createElement("w:delText")
@@ -333,11 +367,10 @@ class DocxXMLEditor(XMLEditor):
 
             # Add del wrapper back to ins
             ins_elem.appendChild(del_wrapper)
+            del_wrappers.append(del_wrapper)
+            self._index.changed([ins_elem])
 
-            # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
-
-        return [elem]
+        return del_wrappers
 
     def revert_deletion(self, elem):
         """Reject a deletion by re-inserting the deleted content.
@@ -351,6 +384,7 @@ class DocxXMLEditor(XMLEditor):
 
         Returns:
             list: If elem is w:del, returns [elem, new_ins]. Otherwise returns [elem].
+                Inside a batch() the insertion does not exist yet and [elem] is returned.
 
         Raises:
             ValueError: If the element contains no w:del elements
@@ -409,11 +443,7 @@ class DocxXMLEditor(XMLEditor):
                     del_text.parentNode.replaceChild(t_elem, del_text)
 
                 # Update run attributes: w:rsidDel → w:rsidR
-                if new_run.hasAttribute("w:rsidDel"):
-                    new_run.setAttribute("w:rsidR", new_run.getAttribute("w:rsidDel"))
-                    new_run.removeAttribute("w:rsidDel")
-                elif not new_run.hasAttribute("w:rsidR"):
-                    new_run.setAttribute("w:rsidR", self.rsid)
+                self._move_rsid(new_run, "w:rsidDel", "w:rsidR")
 
                 ins_elem.appendChild(new_run)
 
@@ -500,35 +530,8 @@ class DocxXMLEditor(XMLEditor):
             if elem.getElementsByTagName("w:delText"):
                 raise ValueError("w:r element already contains w:delText")
 
-            # Convert w:t → w:delText
-            for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
-                # Copy ALL child nodes (not just firstChild) to handle entities
-                while t_elem.firstChild:
-                    del_text.appendChild(t_elem.firstChild)
-                # Preserve attributes like xml:space
-                for i in range(t_elem.attributes.length):
-                    attr = t_elem.attributes.item(i)
-                    del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
-
-            # Update run attributes: w:rsidR → w:rsidDel
-            if elem.hasAttribute("w:rsidR"):
-                elem.setAttribute("w:rsidDel", elem.getAttribute("w:rsidR"))
-                elem.removeAttribute("w:rsidR")
-            elif not elem.hasAttribute("w:rsidDel"):
-                elem.setAttribute("w:rsidDel", self.rsid)
-
-            # Wrap in w:del
             del_wrapper = self.dom.createElement("w:del")
-            parent = elem.parentNode
-            parent.insertBefore(del_wrapper, elem)
-            parent.removeChild(elem)
-            del_wrapper.appendChild(elem)
-
-            # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
-
+            self._edit(lambda _: self._delete_run(elem, del_wrapper))
             return del_wrapper
 
         elif elem.nodeName == "w:p":
@@ -536,61 +539,361 @@ class DocxXMLEditor(XMLEditor):
             if elem.getElementsByTagName("w:ins") or elem.getElementsByTagName("w:del"):
                 raise ValueError("w:p element already contains tracked changes")
 
-            # Check if it's a numbered list item
-            pPr_list = elem.getElementsByTagName("w:pPr")
-            is_numbered = pPr_list and pPr_list[0].getElementsByTagName("w:numPr")
+            self._edit(lambda _: self._delete_paragraph(elem))
+            return elem
 
-            if is_numbered:
-                # Add <w:del/> to w:rPr in w:pPr
-                pPr = pPr_list[0]
-                rPr_list = pPr.getElementsByTagName("w:rPr")
+        else:
+            raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
 
-                if not rPr_list:
-                    rPr = self.dom.createElement("w:rPr")
-                    pPr.appendChild(rPr)
-                else:
-                    rPr = rPr_list[0]
-
-                # Add <w:del/> marker
-                del_marker = self.dom.createElement("w:del")
-                rPr.insertBefore(
-                    del_marker, rPr.firstChild
-                ) if rPr.firstChild else rPr.appendChild(del_marker)
-
-            # Convert w:t → w:delText in all runs
-            for t_elem in list(elem.getElementsByTagName("w:t")):
-                del_text = self.dom.createElement("w:delText")
-                # Copy ALL child nodes (not just firstChild) to handle entities
-                while t_elem.firstChild:
-                    del_text.appendChild(t_elem.firstChild)
-                # Preserve attributes like xml:space
-                for i in range(t_elem.attributes.length):
-                    attr = t_elem.attributes.item(i)
-                    del_text.setAttribute(attr.name, attr.value)
-                t_elem.parentNode.replaceChild(del_text, t_elem)
-
-            # Update run attributes: w:rsidR → w:rsidDel
-            for run in elem.getElementsByTagName("w:r"):
-                if run.hasAttribute("w:rsidR"):
-                    run.setAttribute("w:rsidDel", run.getAttribute("w:rsidR"))
-                    run.removeAttribute("w:rsidR")
-                elif not run.hasAttribute("w:rsidDel"):
-                    run.setAttribute("w:rsidDel", self.rsid)
-
-            # Wrap all non-pPr children in <w:del>
-            del_wrapper = self.dom.createElement("w:del")
-            for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
-                elem.removeChild(child)
-                del_wrapper.appendChild(child)
-            elem.appendChild(del_wrapper)
+    def _delete_run(self, elem, del_wrapper):
+        """Convert a run to deleted text and wrap it in del_wrapper."""
+        # Convert w:t → w:delText
+        for t_elem in list(elem.getElementsByTagName("w:t")):
+            del_text = self.dom.createElement("w:delText")
+            # Copy ALL child nodes (not just firstChild) to handle entities
+            while t_elem.firstChild:
+                del_text.appendChild(t_elem.firstChild)
+            # Preserve attributes like xml:space
+            for i in range(t_elem.attributes.length):
+                attr = t_elem.attributes.item(i)
+                del_text.setAttribute(attr.name, attr.value)
+            t_elem.parentNode.replaceChild(del_text, t_elem)
+
+        # Update run attributes: w:rsidR → w:rsidDel
+        self._move_rsid(elem, "w:rsidR", "w:rsidDel")
+
+        # Wrap in w:del
+        parent = elem.parentNode
+        parent.insertBefore(del_wrapper, elem)
+        parent.removeChild(elem)
+        del_wrapper.appendChild(elem)
+        return [del_wrapper]
+
+    def _delete_paragraph(self, elem):
+        """Convert a paragraph's content to deleted text and return the new w:del."""
+        # Check if it's a numbered list item
+        pPr_list = elem.getElementsByTagName("w:pPr")
+        is_numbered = pPr_list and pPr_list[0].getElementsByTagName("w:numPr")
+
+        if is_numbered:
+            # Add <w:del/> to w:rPr in w:pPr
+            pPr = pPr_list[0]
+            rPr_list = pPr.getElementsByTagName("w:rPr")
+
+            if not rPr_list:
+                rPr = self.dom.createElement("w:rPr")
+                pPr.appendChild(rPr)
+            else:
+                rPr = rPr_list[0]
+
+            # Add <w:del/> marker
+            del_marker = self.dom.createElement("w:del")
+            rPr.insertBefore(
+                del_marker, rPr.firstChild
+            ) if rPr.firstChild else rPr.appendChild(del_marker)
+
+        # Convert w:t → w:delText in all runs
+        for t_elem in list(elem.getElementsByTagName("w:t")):
+            del_text = self.dom.createElement("w:delText")
+            # Copy ALL child nodes (not just firstChild) to handle entities
+            while t_elem.firstChild:
+                del_text.appendChild(t_elem.firstChild)
+            # Preserve attributes like xml:space
+            for i in range(t_elem.attributes.length):
+                attr = t_elem.attributes.item(i)
+                del_text.setAttribute(attr.name, attr.value)
+            t_elem.parentNode.replaceChild(del_text, t_elem)
+
+        # Update run attributes: w:rsidR → w:rsidDel
+        for run in elem.getElementsByTagName("w:r"):
+            self._move_rsid(run, "w:rsidR", "w:rsidDel")
+
+        # Wrap all non-pPr children in <w:del>
+        del_wrapper = self.dom.createElement("w:del")
+        for child in [c for c in elem.childNodes if c.nodeName != "w:pPr"]:
+            elem.removeChild(child)
+            del_wrapper.appendChild(child)
+        elem.appendChild(del_wrapper)
+
+        self._index.changed([elem])
+        return [del_wrapper]
+
+
+class SegmentedDocxXMLEditor(SegmentedXMLEditor, DocxXMLEditor):
+    """DocxXMLEditor that only parses the w:body children that lookups reach.
+
+    For very large documents that get a few edits: paragraphs and tables are
+    parsed into self.dom as get_node finds them, and everything else is saved
+    verbatim. See SegmentedXMLEditor. New change ids also account for the
+    tracked changes in unparsed paragraphs.
+
+    Attributes:
+        dom (defusedxml.minidom.Document): The document outside w:body and the
+            w:body children parsed so far
+    """
+
+    container = "w:body"
+    # Highest w:id of a w:ins or w:del in the file, found on first use
+    _raw_change_id = None
+
+    def _get_next_change_id(self):
+        """Get the next available change ID, including unparsed tracked changes."""
+        if self._raw_change_id is None:
+            self._raw_change_id = max(
+                (int(m[1]) for m in _RAW_CHANGE_ID.finditer(self._content)),
+                default=-1,
+            )
+        return max(super()._get_next_change_id(), self._raw_change_id + 1)
+
+    def text_index(self):
+        """Return the full-text index of the body, parsing every segment first."""
+        for segment in range(len(self._lines)):
+            self._open_segment(segment)
+        return super().text_index()
+
+
+class LxmlDocxXMLEditor(LxmlXMLEditor, DocxXMLEditor):
+    """LxmlXMLEditor that automatically applies RSID, author, and date to new elements.
+
+    The lxml counterpart of DocxXMLEditor for very large parts: attributes are
+    added to inserted content by the same code, through the node access methods
+    overridden here, and the tracked change methods do the same on lxml elements.
+
+    Attributes:
+        tree (lxml.etree._ElementTree): The parsed tree for direct manipulation
+        root (lxml.etree._Element): Root element of the tree
+    """
+
+    def _name(self, name):
+        return _qn(name)
+
+    def _tag(self, node):
+        return node.tag if isinstance(node.tag, str) else None
+
+    def _get_attribute(self, elem, name):
+        return elem.get(_qn(name))
+
+    def _set_attribute(self, elem, name, value):
+        elem.set(_qn(name), value)
+
+    def _pop_attribute(self, elem, name):
+        return elem.attrib.pop(_qn(name), None)
+
+    def _descendants(self, node, tag):
+        return [elem for elem in node.iter(_qn(tag)) if elem is not node]
+
+    def _inside(self, elem, tag):
+        return next(elem.iterancestors(_qn(tag)), None) is not None
+
+    def _leading_text(self, elem):
+        return elem.text
+
+    def _ensure_namespace(self, prefix):
+        """Declare a namespace prefix on the root element once it is in use.
+
+        lxml declares namespaces where attributes are set, so the declaration
+        is moved up to the root afterwards.
+        """
+        uri = _NAMESPACES[prefix]
+        if self.root.nsmap.get(prefix) != uri:
+            lxml.etree.cleanup_namespaces(
+                self.tree,
+                top_nsmap={prefix: uri},
+                keep_ns_prefixes=[p for p in self.root.nsmap if p],
+            )
+
+    def revert_insertion(self, elem):
+        """Reject an insertion by wrapping its content in a deletion.
+
+        Same as DocxXMLEditor.revert_insertion.
+
+        Args:
+            elem: Element to process (w:ins, w:p, w:body, etc.)
+
+        Returns:
+            list: List containing the processed element(s)
+
+        Raises:
+            ValueError: If the element contains no w:ins elements
+        """
+        if elem.tag == _qn("w:ins"):
+            ins_elements = [elem]
+        else:
+            ins_elements = list(elem.iter(_qn("w:ins")))
+        if not ins_elements:
+            raise ValueError(
+                f"revert_insertion requires w:ins elements. "
+                f"The provided element <{_prefixed_name(elem)}> contains no insertions. "
+            )
+
+        self._edit(lambda _: self._wrap_insertions_in_deletions(ins_elements))
+        return [elem]
+
+    def _wrap_insertions_in_deletions(self, ins_elements):
+        """Wrap the runs of each w:ins in a w:del and return the new wrappers."""
+        del_wrappers = []
+        for ins_elem in ins_elements:
+            runs = list(ins_elem.iter(_qn("w:r")))
+            if not runs:
+                continue
+
+            for run in runs:
+                self._move_rsid(run, "w:rsidR", "w:rsidDel")
+                for t_elem in list(run.iter(_qn("w:t"))):
+                    _retag(t_elem, "w:delText")
+
+            # Move all content from ins into a del wrapper inside it
+            del_wrapper = ins_elem.makeelement(_qn("w:del"))
+            del_wrapper.text, ins_elem.text = ins_elem.text, None
+            del_wrapper.extend(list(ins_elem))
+            ins_elem.append(del_wrapper)
+            del_wrappers.append(del_wrapper)
+            self._index.changed([ins_elem])
+
+        return del_wrappers
+
+    def revert_deletion(self, elem):
+        """Reject a deletion by re-inserting the deleted content.
+
+        Same as DocxXMLEditor.revert_deletion.
+
+        Args:
+            elem: Element to process (w:del, w:p, w:body, etc.)
+
+        Returns:
+            list: If elem is w:del, returns [elem, new_ins]. Otherwise returns [elem].
+                Inside a batch() the insertion does not exist yet and [elem] is returned.
+
+        Raises:
+            ValueError: If the element contains no w:del elements
+        """
+        is_single_del = elem.tag == _qn("w:del")
+        del_elements = [elem] if is_single_del else list(elem.iter(_qn("w:del")))
+        if not del_elements:
+            raise ValueError(
+                f"revert_deletion requires w:del elements. "
+                f"The provided element <{_prefixed_name(elem)}> contains no deletions. "
+            )
+
+        created_insertion = None
+        for del_elem in del_elements:
+            runs = list(del_elem.iter(_qn("w:r")))
+            if not runs:
+                continue
+
+            # Copy the deleted runs into an insertion, converting w:delText → w:t
+            ins_elem = del_elem.makeelement(_qn("w:ins"))
+            for run in runs:
+                new_run = copy.deepcopy(run)
+                for del_text in list(new_run.iter(_qn("w:delText"))):
+                    _retag(del_text, "w:t")
+                self._move_rsid(new_run, "w:rsidDel", "w:rsidR")
+                ins_elem.append(new_run)
+
+            # Insert it as a fragment, so it gets new ids like any inserted content
+            nodes = self.insert_after(
+                del_elem, lxml.etree.tostring(ins_elem, encoding="unicode")
+            )
+            if is_single_del and nodes:
+                created_insertion = nodes[0]
 
-            # Inject attributes to the deletion wrapper
-            self._inject_attributes_to_nodes([del_wrapper])
+        if is_single_del and created_insertion is not None:
+            return [elem, created_insertion]
+        return [elem]
+
+    def suggest_deletion(self, elem):
+        """Mark a w:r or w:p element as deleted with tracked changes.
+
+        Same as DocxXMLEditor.suggest_deletion.
+
+        Args:
+            elem: A w:r or w:p element without existing tracked changes
+
+        Returns:
+            Element: The new w:del for a w:r, or the w:p itself
+
+        Raises:
+            ValueError: If element has existing tracked changes or invalid structure
+        """
+        if elem.tag == _qn("w:r"):
+            if next(elem.iter(_qn("w:delText")), None) is not None:
+                raise ValueError("w:r element already contains w:delText")
+
+            del_wrapper = elem.makeelement(_qn("w:del"))
+            self._edit(lambda _: self._delete_run(elem, del_wrapper))
+            return del_wrapper
 
+        elif elem.tag == _qn("w:p"):
+            if next(elem.iter(_qn("w:ins"), _qn("w:del")), None) is not None:
+                raise ValueError("w:p element already contains tracked changes")
+
+            self._edit(lambda _: self._delete_paragraph(elem))
             return elem
 
         else:
-            raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
+            raise ValueError(f"Element must be w:r or w:p, got {_prefixed_name(elem)}")
+
+    def _delete_run(self, elem, del_wrapper):
+        """Convert a run to deleted text and wrap it in del_wrapper."""
+        for t_elem in list(elem.iter(_qn("w:t"))):
+            _retag(t_elem, "w:delText")
+        self._move_rsid(elem, "w:rsidR", "w:rsidDel")
+
+        # Wrap in w:del, leaving the text that followed the run after the wrapper
+        elem.addprevious(del_wrapper)
+        del_wrapper.tail, elem.tail = elem.tail, None
+        del_wrapper.append(elem)
+        return [del_wrapper]
+
+    def _delete_paragraph(self, elem):
+        """Convert a paragraph's content to deleted text and return the new w:del."""
+        pPr = next(elem.iter(_qn("w:pPr")), None)
+        if pPr is not None and next(pPr.iter(_qn("w:numPr")), None) is not None:
+            # Add <w:del/> to w:rPr in w:pPr
+            rPr = next(pPr.iter(_qn("w:rPr")), None)
+            if rPr is None:
+                rPr = lxml.etree.SubElement(pPr, _qn("w:rPr"))
+            rPr.insert(0, rPr.makeelement(_qn("w:del")))
+
+        for t_elem in list(elem.iter(_qn("w:t"))):
+            _retag(t_elem, "w:delText")
+        for run in elem.iter(_qn("w:r")):
+            self._move_rsid(run, "w:rsidR", "w:rsidDel")
+
+        # Wrap all non-pPr children in <w:del>
+        del_wrapper = elem.makeelement(_qn("w:del"))
+        del_wrapper.extend([c for c in elem if c.tag != _qn("w:pPr")])
+        elem.append(del_wrapper)
+
+        self._index.changed([elem])
+        return [del_wrapper]
+
+
+@functools.cache
+def _qn(name):
+    """Return the Clark name ({namespace}local) of a prefixed WordprocessingML name."""
+    prefix, local = name.split(":")
+    return f"{{{_NAMESPACES[prefix]}}}{local}"
+
+
+def _prefixed_name(elem):
+    """Return the name of an lxml element as written in the document (e.g. "w:p")."""
+    local = lxml.etree.QName(elem).localname
+    return f"{elem.prefix}:{local}" if elem.prefix else local
+
+
+def _retag(elem, name):
+    """Replace elem with a new element of another name that takes over its content.
+
+    A new element, rather than a renamed one, so lookups by the old name and line
+    number no longer find it, as with DocxXMLEditor.
+    """
+    new_elem = elem.makeelement(_qn(name), elem.attrib)
+    new_elem.text = elem.text
+    new_elem.extend(list(elem))
+    new_elem.tail = elem.tail
+    elem.getparent().replace(elem, new_elem)
+    return new_elem
 
 
 def _generate_hex_id() -> str:
@@ -604,6 +907,26 @@ def _generate_hex_id() -> str:
     return f"{random.randint(1, 0x7FFFFFFE):08X}"
 
 
+def _generate_hex_ids(count, taken=()) -> list:
+    """Generate count distinct hex IDs, as _generate_hex_id, none of them in taken."""
+    taken = set(taken)
+    ids = {}
+    while len(ids) < count:
+        hex_id = _generate_hex_id()
+        if hex_id not in taken:
+            ids[hex_id] = None
+    return list(ids)
+
+
+def _element(nodes, tag):
+    """Return the first element with the given tag among nodes."""
+    return next(
+        node
+        for node in nodes
+        if node.nodeType == node.ELEMENT_NODE and node.tagName == tag
+    )
+
+
 def _generate_rsid() -> str:
     """Generate random 8-character hex RSID."""
     return "".join(random.choices("0123456789ABCDEF", k=8))
@@ -619,6 +942,7 @@ class Document:
         track_revisions=False,
         author="Claude",
         initials="C",
+        segmented=False,
     ):
         """
         Initialize with path to unpacked Word document directory.
@@ -630,20 +954,33 @@ class Document:
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Claude")
             initials: Default author initials for comments (default: "C")
+            segmented: If True, word/document.xml is edited with SegmentedDocxXMLEditor,
+                which only parses the paragraphs and tables that get_node reaches
+                (default: False)
         """
         self.original_path = Path(unpacked_dir)
 
         if not self.original_path.exists() or not self.original_path.is_dir():
             raise ValueError(f"Directory not found: {unpacked_dir}")
 
-        # Create temporary directory with subdirectories for unpacked content and baseline
+        # Mirror the original into a temporary workspace, cloning parts where
+        # the file system allows it: save() only writes back changed parts, and
+        # a snapshot of the original serves as the validation baseline
         self.temp_dir = tempfile.mkdtemp(prefix="docx_")
-        self.unpacked_path = Path(self.temp_dir) / "unpacked"
-        shutil.copytree(self.original_path, self.unpacked_path)
+        self._workspace = Workspace(self.original_path, self.temp_dir)
+        self.unpacked_path = self._workspace.path
+        self.baseline_path = self._workspace.original
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
-        self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        # The original never changes, so its parsed parts and XSD errors are
+        # shared by every validator for the lifetime of this document
+        self._baseline = OriginalDocument(self.baseline_path)
+
+        # Parsed trees and per-part validation results kept across validate()
+        # calls, so repeated validation only re-checks parts that changed
+        self._trees = TreeStore()
+        self._results = ResultCache()
+        self._dirty_parts = set()
+        self._redlining_stamp = None
 
         self.word_path = self.unpacked_path / "word"
 
@@ -654,6 +991,7 @@ class Document:
         # Set default author and initials
         self.author = author
         self.initials = initials
+        self.segmented = segmented
 
         # Cache for lazy-loaded editors
         self._editors = {}
@@ -704,8 +1042,14 @@ class Document:
             file_path = self.unpacked_path / xml_path
             if not file_path.exists():
                 raise ValueError(f"XML file not found: {xml_path}")
+            # Parts left raw by unpack.py --lazy are pretty-printed on first
+            # access, so line numbers match the formatted part
+            format_parts(self.unpacked_path, [xml_path])
             # Use DocxXMLEditor with RSID, author, and initials for all editors
-            self._editors[xml_path] = DocxXMLEditor(
+            editor_class = DocxXMLEditor
+            if self.segmented and xml_path == "word/document.xml":
+                editor_class = SegmentedDocxXMLEditor
+            self._editors[xml_path] = editor_class(
                 file_path, rsid=self.rsid, author=self.author, initials=self.initials
             )
         return self._editors[xml_path]
@@ -730,31 +1074,13 @@ class Document:
         comment_id = self.next_comment_id
         para_id = _generate_hex_id()
         durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         # Add comment ranges to document.xml immediately
-        self._document.insert_before(start, self._comment_range_start_xml(comment_id))
-
-        # If end node is a paragraph, append comment markup inside it
-        # Otherwise insert after it (for run-level anchors)
-        if end.tagName == "w:p":
-            self._document.append_to(end, self._comment_range_end_xml(comment_id))
-        else:
-            self._document.insert_after(end, self._comment_range_end_xml(comment_id))
+        self._insert_comment_markers(comment_id, start, end)
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
-        )
-
-        # Add to commentsExtended.xml immediately
-        self._add_to_comments_extended_xml(para_id, parent_para_id=None)
-
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
-
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
+        # Add to comments.xml, commentsExtended.xml, commentsIds.xml and
+        # commentsExtensible.xml immediately
+        self._add_to_comment_parts([(comment_id, para_id, durable_id, None, text)])
 
         # Update existing_comments so replies work
         self.existing_comments[comment_id] = {"para_id": para_id}
@@ -787,80 +1113,193 @@ class Document:
         comment_id = self.next_comment_id
         para_id = _generate_hex_id()
         durable_id = _generate_hex_id()
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         # Add comment ranges to document.xml immediately
-        parent_start_elem = self._document.get_node(
-            tag="w:commentRangeStart", attrs={"w:id": str(parent_comment_id)}
-        )
-        parent_ref_elem = self._document.get_node(
-            tag="w:commentReference", attrs={"w:id": str(parent_comment_id)}
-        )
-
-        self._document.insert_after(
-            parent_start_elem, self._comment_range_start_xml(comment_id)
-        )
-        parent_ref_run = parent_ref_elem.parentNode
-        self._document.insert_after(
-            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
-        )
-        self._document.insert_after(
-            parent_ref_run, self._comment_ref_run_xml(comment_id)
-        )
+        parent_start, parent_ref_run = self._find_comment_markers(parent_comment_id)
+        self._insert_reply_markers(comment_id, parent_start, parent_ref_run)
 
-        # Add to comments.xml immediately
-        self._add_to_comments_xml(
-            comment_id, para_id, text, self.author, self.initials, timestamp
+        # Add to the comment parts immediately (with parent)
+        self._add_to_comment_parts(
+            [(comment_id, para_id, durable_id, parent_info["para_id"], text)]
         )
 
-        # Add to commentsExtended.xml immediately (with parent)
-        self._add_to_comments_extended_xml(
-            para_id, parent_para_id=parent_info["para_id"]
-        )
-
-        # Add to commentsIds.xml immediately
-        self._add_to_comments_ids_xml(para_id, durable_id)
-
-        # Add to commentsExtensible.xml immediately
-        self._add_to_comments_extensible_xml(durable_id)
-
         # Update existing_comments so replies work
         self.existing_comments[comment_id] = {"para_id": para_id}
 
         self.next_comment_id += 1
         return comment_id
 
+    def add_comments(self, comments) -> list:
+        """
+        Add many comments, and replies to them, in one pass.
+
+        Gives the same result as calling add_comment and reply_to_comment for
+        each entry in turn, but the range markers for all comments are inserted
+        into document.xml in one batch, IDs, paraIds and durableIds are
+        allocated up front, and each comments part gets all of its new entries
+        in a single append.
+
+        Args:
+            comments: Iterable of entries, each one of:
+                - (start, end, text) tuple: a comment, as for add_comment
+                - dict with "start", "end" and "text", and optionally "replies",
+                  a list of reply texts added after the comment
+                - dict with "parent" (w:id of an existing comment) and "text":
+                  a reply, as for reply_to_comment
+
+        Returns:
+            List of the comment IDs that were created, in order, each comment
+            followed by its replies
+
+        Raises:
+            ValueError: If a parent comment does not exist, or a reply has replies
+
+        Example:
+            doc.add_comments([
+                (para1, para1, "Needs a source"),
+                {"start": run, "end": run, "text": "Typo", "replies": ["Fixed"]},
+                {"parent": 0, "text": "Agreed"},
+            ])
+        """
+        entries = []
+        for entry in comments:
+            if not isinstance(entry, dict):
+                start, end, text = entry
+                entry = {"start": start, "end": end, "text": text}
+            elif "parent" in entry:
+                if entry["parent"] not in self.existing_comments:
+                    raise ValueError(
+                        f"Parent comment with id={entry['parent']} not found"
+                    )
+                if entry.get("replies"):
+                    raise ValueError("Replies cannot have replies of their own")
+            entries.append(entry)
+        if not entries:
+            return []
+
+        count = sum(1 + len(entry.get("replies", ())) for entry in entries)
+        hex_ids = _generate_hex_ids(
+            2 * count,
+            taken=(info["para_id"] for info in self.existing_comments.values()),
+        )
+        para_ids = iter(hex_ids[:count])
+        durable_ids = iter(hex_ids[count:])
+        comment_ids = iter(range(self.next_comment_id, self.next_comment_id + count))
+
+        # (comment_id, para_id, durable_id, parent_para_id, text) in ID order
+        added = []
+        # Replies whose parent's markers are only inserted by this call
+        deferred = []
+        with self._document.batch():
+            for entry in entries:
+                comment_id = next(comment_ids)
+                para_id = next(para_ids)
+                parent = entry.get("parent")
+                if parent is None:
+                    markers = self._insert_comment_markers(
+                        comment_id, entry["start"], entry["end"]
+                    )
+                    parent_para_id = None
+                else:
+                    self._insert_reply_markers(
+                        comment_id, *self._find_comment_markers(parent)
+                    )
+                    parent_para_id = self.existing_comments[parent]["para_id"]
+                added.append(
+                    (
+                        comment_id,
+                        para_id,
+                        next(durable_ids),
+                        parent_para_id,
+                        entry["text"],
+                    )
+                )
+                for reply in entry.get("replies", ()):
+                    reply_id = next(comment_ids)
+                    deferred.append((reply_id, markers))
+                    added.append(
+                        (reply_id, next(para_ids), next(durable_ids), para_id, reply)
+                    )
+
+        if deferred:
+            # The batch has filled in the parents' marker nodes by now
+            with self._document.batch():
+                for reply_id, (start_nodes, end_nodes) in deferred:
+                    self._insert_reply_markers(
+                        reply_id, start_nodes[0], _element(end_nodes, "w:r")
+                    )
+
+        self._add_to_comment_parts(added)
+        for comment_id, para_id, _, _, _ in added:
+            self.existing_comments[comment_id] = {"para_id": para_id}
+        self.next_comment_id += count
+        return [comment_id for comment_id, _, _, _, _ in added]
+
     def __del__(self):
         """Clean up temporary directory on deletion."""
+        if hasattr(self, "_baseline"):
+            self._baseline.close()
         if hasattr(self, "temp_dir") and Path(self.temp_dir).exists():
             shutil.rmtree(self.temp_dir)
 
-    def validate(self) -> None:
+    def validate(self, jobs=1, stats=None) -> None:
         """
         Validate the document against XSD schema and redlining rules.
 
+        Args:
+            jobs: Number of worker processes for per-part checks (0 = all CPUs)
+            stats: Optional ValidationStats recording per-pass timings and counters
+
         Raises:
             ValueError: If validation fails.
         """
-        # Create validators with current state
+        # Drop cached state of parts saved since the last validation
+        unpacked_path = self.unpacked_path.resolve()
+        dirty_paths = [unpacked_path / part for part in self._dirty_parts]
+        for path in dirty_paths:
+            self._trees.invalidate(path)
+        self._results.invalidate(dirty_paths)
+        if "word/document.xml" in self._dirty_parts:
+            self._redlining_stamp = None
+        self._dirty_parts.clear()
+
+        # Create validators with current state; clean parts reuse cached results
         schema_validator = DOCXSchemaValidator(
-            self.unpacked_path, self.original_docx, verbose=False
-        )
-        redlining_validator = RedliningValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path,
+            self.baseline_path,
+            verbose=False,
+            baseline=self._baseline,
+            trees=self._trees,
+            jobs=jobs,
+            results=self._results,
+            stats=stats,
         )
 
         # Run validations
         if not schema_validator.validate():
             raise ValueError("Schema validation failed")
-        if not redlining_validator.validate():
-            raise ValueError("Redlining validation failed")
+
+        # Redlining only depends on document.xml, skip it if that is unchanged
+        document_stamp = file_stamp(self.word_path / "document.xml")
+        if document_stamp != self._redlining_stamp:
+            redlining_validator = RedliningValidator(
+                self.unpacked_path,
+                self.baseline_path,
+                verbose=False,
+                baseline=self._baseline,
+                stats=stats,
+            )
+            if not redlining_validator.validate():
+                raise ValueError("Redlining validation failed")
+            self._redlining_stamp = document_stamp
 
     def save(self, destination=None, validate=True) -> None:
         """
         Save all modified XML files to disk and copy to destination directory.
 
         This persists all changes made via add_comment() and reply_to_comment().
+        Only parts that changed are written, each atomically; saving to another
+        directory also copies the unchanged parts it does not have yet.
 
         Args:
             destination: Optional path to save to. If None, saves back to original directory.
@@ -872,16 +1311,16 @@ class Document:
             self._ensure_comment_content_types()
 
         # Save all modified XML files in temp directory
-        for editor in self._editors.values():
-            editor.save()
+        for xml_path, editor in self._editors.items():
+            if editor.save():
+                self._dirty_parts.add(xml_path)
 
         # Validate by default
         if validate:
             self.validate()
 
-        # Copy contents from temp directory to destination (or original directory)
-        target_path = Path(destination) if destination else self.original_path
-        shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
+        # Write changed parts to destination (or original directory)
+        self._workspace.save(destination or self.original_path)
 
     # ==================== Private: Initialization ====================
 
@@ -1065,71 +1504,116 @@ class Document:
 
     # ==================== Private: XML File Creation ====================
 
-    def _add_to_comments_xml(
-        self, comment_id, para_id, text, author, initials, timestamp
-    ):
-        """Add a single comment to comments.xml."""
-        if not self.comments_path.exists():
-            shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
-
-        editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
+    def _add_to_comment_parts(self, comments):
+        """Append comments to comments.xml and its three companion parts.
 
-        escaped_text = (
-            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        )
-        # Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r,
-        # and w:author, w:date, w:initials on w:comment are automatically added by DocxXMLEditor
-        comment_xml = f'''<w:comment w:id="{comment_id}">
-  <w:p w14:paraId="{para_id}" w14:textId="77777777">
-    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
-    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
-  </w:p>
-</w:comment>'''
-        editor.append_to(root, comment_xml)
+        Each part gets all of its new entries in a single append.
 
-    def _add_to_comments_extended_xml(self, para_id, parent_para_id):
-        """Add a single comment to commentsExtended.xml."""
-        if not self.comments_extended_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtended.xml", self.comments_extended_path
+        Args:
+            comments: List of (comment_id, para_id, durable_id, parent_para_id,
+                text) tuples; parent_para_id is None for comments that are not
+                replies
+        """
+        parts = [
+            ("word/comments.xml", self.comments_path, "w:comments"),
+            (
+                "word/commentsExtended.xml",
+                self.comments_extended_path,
+                "w15:commentsEx",
+            ),
+            ("word/commentsIds.xml", self.comments_ids_path, "w16cid:commentsIds"),
+            (
+                "word/commentsExtensible.xml",
+                self.comments_extensible_path,
+                "w16cex:commentsExtensible",
+            ),
+        ]
+        fragments = [[], [], [], []]
+        for comment_id, para_id, durable_id, parent_para_id, text in comments:
+            fragments[0].append(self._comment_xml(comment_id, para_id, text))
+            fragments[1].append(self._comment_ex_xml(para_id, parent_para_id))
+            fragments[2].append(
+                f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
+            )
+            fragments[3].append(
+                f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
             )
 
-        editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
-
-        if parent_para_id:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
-        else:
-            xml = f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
-        editor.append_to(root, xml)
-
-    def _add_to_comments_ids_xml(self, para_id, durable_id):
-        """Add a single comment to commentsIds.xml."""
-        if not self.comments_ids_path.exists():
-            shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
+        for (xml_path, path, root_tag), xml in zip(parts, fragments):
+            if not path.exists():
+                shutil.copy(TEMPLATE_DIR / path.name, path)
+            editor = self[xml_path]
+            editor.append_to(editor.get_node(tag=root_tag), "".join(xml))
 
-        editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
+    def _insert_comment_markers(self, comment_id, start, end):
+        """Insert the range markers of a comment around start and end.
 
-        xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+        Returns:
+            tuple: The inserted start and end node lists
+        """
+        start_nodes = self._document.insert_before(
+            start, self._comment_range_start_xml(comment_id)
+        )
 
-    def _add_to_comments_extensible_xml(self, durable_id):
-        """Add a single comment to commentsExtensible.xml."""
-        if not self.comments_extensible_path.exists():
-            shutil.copy(
-                TEMPLATE_DIR / "commentsExtensible.xml", self.comments_extensible_path
+        # If end node is a paragraph, append comment markup inside it
+        # Otherwise insert after it (for run-level anchors)
+        if end.tagName == "w:p":
+            end_nodes = self._document.append_to(
+                end, self._comment_range_end_xml(comment_id)
+            )
+        else:
+            end_nodes = self._document.insert_after(
+                end, self._comment_range_end_xml(comment_id)
             )
+        return start_nodes, end_nodes
 
-        editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
+    def _find_comment_markers(self, comment_id):
+        """Return the w:commentRangeStart and reference run of a comment."""
+        start = self._document.get_node(
+            tag="w:commentRangeStart", attrs={"w:id": str(comment_id)}
+        )
+        reference = self._document.get_node(
+            tag="w:commentReference", attrs={"w:id": str(comment_id)}
+        )
+        return start, reference.parentNode
 
-        xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
-        editor.append_to(root, xml)
+    def _insert_reply_markers(self, comment_id, parent_start, parent_ref_run):
+        """Insert the range markers of a reply next to those of its parent."""
+        self._document.insert_after(
+            parent_start, self._comment_range_start_xml(comment_id)
+        )
+        self._document.insert_after(
+            parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
+        )
+        self._document.insert_after(
+            parent_ref_run, self._comment_ref_run_xml(comment_id)
+        )
 
     # ==================== Private: XML Fragments ====================
 
+    def _comment_xml(self, comment_id, para_id, text):
+        """Generate XML for a w:comment holding text.
+
+        Note: w:rsidR, w:rsidRDefault, w:rsidP on w:p, w:rsidR on w:r, and
+        w:author, w:date, w:initials on w:comment are automatically added by
+        DocxXMLEditor.
+        """
+        escaped_text = (
+            text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        )
+        return f'''<w:comment w:id="{comment_id}">
+  <w:p w14:paraId="{para_id}" w14:textId="77777777">
+    <w:r><w:rPr><w:rStyle w:val="CommentReference"/></w:rPr><w:annotationRef/></w:r>
+    <w:r><w:rPr><w:color w:val="000000"/><w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr><w:t>{escaped_text}</w:t></w:r>
+  </w:p>
+</w:comment>'''
+
+    def _comment_ex_xml(self, para_id, parent_para_id):
+        """Generate XML for a commentsExtended.xml entry."""
+        if parent_para_id:
+            return f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
+        return f'<w15:commentEx w15:paraId="{para_id}" w15:done="0"/>'
+
     def _comment_range_start_xml(self, comment_id):
         """Generate XML for comment range start."""
         return f'<w:commentRangeStart w:id="{comment_id}"/>'
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Regression tests for opening and saving documents through Document.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+import lxml.etree
+from ooxml.scripts.synthetic import make_docx
+from ooxml.scripts.unpack import unpack_document
+
+from .document import Document, SegmentedDocxXMLEditor
+from .test_utilities import canonical
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W14 = "{http://schemas.microsoft.com/office/word/2010/wordml}"
+W15 = "{http://schemas.microsoft.com/office/word/2012/wordml}"
+
+# Parts written by adding a comment to a document without comments
+COMMENT_PARTS = [
+    "[Content_Types].xml",
+    "word/_rels/document.xml.rels",
+    "word/comments.xml",
+    "word/commentsExtended.xml",
+    "word/commentsExtensible.xml",
+    "word/commentsIds.xml",
+    "word/document.xml",
+    "word/people.xml",
+    "word/settings.xml",
+]
+
+
+class TestDocumentSave(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_document_"))
+        self.source = self.temp_dir / "source"
+        make_docx(self.temp_dir / "source.docx", headers=2, media_kb=16, images=2)
+        unpack_document(self.temp_dir / "source.docx", self.source)
+
+    def tearDown(self):
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def stamps(self, directory):
+        return {
+            f.relative_to(directory).as_posix(): (os.stat(f).st_ino, f.read_bytes())
+            for f in directory.rglob("*")
+            if f.is_file()
+        }
+
+    def comment(self, segmented=False):
+        doc = Document(self.source, rsid="00AB12CD", segmented=segmented)
+        lines = (self.source / "word" / "document.xml").read_text().split("\n")
+        line = next(i for i, text in enumerate(lines, 1) if text.strip() == "<w:p>")
+        paragraph = doc["word/document.xml"].get_node(tag="w:p", line_number=line)
+        doc.add_comment(paragraph, paragraph, "Check this")
+        return doc
+
+    def test_save_rewrites_only_changed_parts(self):
+        before = self.stamps(self.source)
+        self.comment().save()
+        after = self.stamps(self.source)
+
+        changed = sorted(part for part in after if before.get(part) != after[part])
+        self.assertEqual(changed, COMMENT_PARTS)
+        self.assertTrue(
+            all(after[part] == before[part] for part in before if "media" in part)
+        )
+
+    def test_save_to_destination_leaves_source_untouched(self):
+        before = self.stamps(self.source)
+        destination = self.temp_dir / "destination"
+        doc = self.comment()
+        doc.save(destination)
+
+        self.assertEqual(self.stamps(self.source), before)
+        saved = self.stamps(destination)
+        self.assertEqual(sorted(saved), sorted(set(before) | set(COMMENT_PARTS)))
+        self.assertIn(b"Check this", saved["word/comments.xml"][1])
+
+        # Validation still compares against the original after saving
+        doc.save()
+        doc.validate()
+
+    def test_media_overwritten_in_place(self):
+        doc = self.comment()
+        with open(doc.unpacked_path / "word" / "media" / "image1.png", "wb") as f:
+            f.write(b"NEW")
+
+        doc.save()
+        doc.validate()
+        self.assertEqual(
+            (self.source / "word" / "media" / "image1.png").read_bytes(), b"NEW"
+        )
+        self.assertNotEqual(
+            (doc.baseline_path / "word" / "media" / "image1.png").read_bytes(), b"NEW"
+        )
+
+    def test_lazy_unpacked_part_formatted_on_first_access(self):
+        lazy = self.temp_dir / "lazy"
+        unpack_document(self.temp_dir / "source.docx", lazy, lazy=True)
+        doc = Document(lazy, rsid="00AB12CD")
+
+        editor = doc["word/document.xml"]
+
+        self.assertEqual(
+            editor.xml_path.read_bytes(),
+            (self.source / "word" / "document.xml").read_bytes(),
+        )
+        doc.save()
+        doc.validate()
+
+    def test_segmented_document_saves_same_content(self):
+        saved = {}
+        for segmented in (False, True):
+            destination = self.temp_dir / f"segmented_{segmented}"
+            doc = self.comment(segmented)
+            self.assertEqual(
+                isinstance(doc["word/document.xml"], SegmentedDocxXMLEditor), segmented
+            )
+            doc.save(destination)
+            doc.validate()
+            saved[segmented] = destination
+
+        self.assertEqual(
+            self.stamps(saved[True]).keys(), self.stamps(saved[False]).keys()
+        )
+        self.assertEqual(
+            canonical(saved[True] / "word" / "document.xml"),
+            canonical(saved[False] / "word" / "document.xml"),
+        )
+
+    def paragraphs(self, doc, count):
+        lines = (self.source / "word" / "document.xml").read_text().split("\n")
+        starts = [i for i, text in enumerate(lines, 1) if text.strip() == "<w:p>"]
+        editor = doc["word/document.xml"]
+        return [editor.get_node(tag="w:p", line_number=i) for i in starts[:count]]
+
+    def threads(self, directory):
+        """Map each comment's text to the text of the comment it replies to."""
+        comments = lxml.etree.parse(str(directory / "word" / "comments.xml"))
+        texts = {
+            p.get(f"{W14}paraId"): "".join(p.itertext()).strip()
+            for p in comments.iter(f"{W}p")
+        }
+        extended = lxml.etree.parse(str(directory / "word" / "commentsExtended.xml"))
+        return {
+            texts[entry.get(f"{W15}paraId")]: texts.get(entry.get(f"{W15}paraIdParent"))
+            for entry in extended.iter(f"{W15}commentEx")
+        }
+
+    def test_add_comments_matches_one_at_a_time(self):
+        saved = {}
+        for bulk in (False, True):
+            doc = Document(self.source, rsid="00AB12CD")
+            first, second, third = self.paragraphs(doc, 3)
+            run = second.getElementsByTagName("w:r")[0]
+            if bulk:
+                ids = doc.add_comments(
+                    [
+                        (first, first, "First"),
+                        {"start": run, "end": run, "text": "Second", "replies": ["A"]},
+                        (first, third, "Third & <last>"),
+                    ]
+                )
+                ids += doc.add_comments([{"parent": ids[0], "text": "B"}])
+            else:
+                ids = [doc.add_comment(first, first, "First")]
+                ids.append(doc.add_comment(run, run, "Second"))
+                ids.append(doc.reply_to_comment(ids[1], "A"))
+                ids.append(doc.add_comment(first, third, "Third & <last>"))
+                ids.append(doc.reply_to_comment(ids[0], "B"))
+            self.assertEqual(ids, [0, 1, 2, 3, 4])
+
+            destination = self.temp_dir / f"bulk_{bulk}"
+            doc.save(destination)
+            doc.validate()
+            saved[bulk] = destination
+
+        for part in ("word/document.xml", "word/comments.xml"):
+            self.assertEqual(
+                canonical(saved[True] / part), canonical(saved[False] / part)
+            )
+        self.assertEqual(
+            self.threads(saved[True]),
+            {
+                "First": None,
+                "Second": None,
+                "A": "Second",
+                "Third & <last>": None,
+                "B": "First",
+            },
+        )
+        self.assertEqual(self.threads(saved[True]), self.threads(saved[False]))
+
+        ids_xml = (saved[True] / "word" / "commentsIds.xml").read_text()
+        extensible_xml = (saved[True] / "word" / "commentsExtensible.xml").read_text()
+        durable_ids = re.findall(r'durableId="([0-9A-F]{8})"', ids_xml)
+        self.assertEqual(len(set(durable_ids)), 5)
+        self.assertEqual(
+            re.findall(r'durableId="([0-9A-F]{8})"', extensible_xml), durable_ids
+        )
+
+    def test_add_comments_rejects_unknown_parent(self):
+        doc = Document(self.source, rsid="00AB12CD")
+        with self.assertRaises(ValueError):
+            doc.add_comments([{"parent": 7, "text": "Orphan"}])
+        self.assertEqual(doc.next_comment_id, 0)
+        self.assertEqual(doc.add_comments([]), [])
+
+
+if __name__ == "__main__":
+    main()
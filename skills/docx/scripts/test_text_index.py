@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the paragraph full-text index.
+"""
+
+import re
+from unittest import TestCase, main, mock
+
+import lxml.etree
+from ooxml.scripts.synthetic import docx_document_xml
+from ooxml.scripts.unpack import pretty_print_xml_bytes
+
+from .document import DocxXMLEditor, LxmlDocxXMLEditor, SegmentedDocxXMLEditor
+from .test_utilities import TestLxmlEditor
+from .text_index import W_NS, TextIndex
+
+W = f"{{{W_NS}}}"
+
+# One phrase over four runs, with a whitespace-only w:t, an insertion and a tab
+SPLIT_BODY = """<w:p>
+  <w:r><w:t>The Effective</w:t></w:r>
+  <w:r><w:t xml:space="preserve"> </w:t></w:r>
+  <w:ins w:id="70" w:author="Other" w:date="2024-01-01T00:00:00Z">
+    <w:r><w:t>Date</w:t></w:r>
+  </w:ins>
+  <w:r><w:tab/><w:t>shall</w:t><w:br/><w:t>apply</w:t></w:r>
+</w:p>
+"""
+
+
+def own_text(node):
+    """Text of a w:t element of either backend."""
+    if isinstance(node, lxml.etree._Element):
+        return node.text or ""
+    return "".join(c.data for c in node.childNodes if c.nodeType == c.TEXT_NODE)
+
+
+def reference_paragraphs(xml_path):
+    """Read a saved part's paragraph texts with lxml, as (text, w:t pieces)."""
+    characters = {f"{W}t": None, f"{W}tab": "\t", f"{W}br": "\n", f"{W}cr": "\n"}
+    paragraphs = []
+    root = lxml.etree.parse(str(xml_path)).getroot()
+    for paragraph in root.iter(f"{W}p"):
+        text, pieces = "", []
+        for elem in paragraph.iter(*characters):
+            if next(elem.iterancestors(f"{W}p")) is not paragraph:
+                continue
+            piece = characters[elem.tag]
+            if piece is None:
+                piece = elem.text or ""
+                pieces.append((len(text), piece))
+            text += piece
+        paragraphs.append((text, pieces))
+    return paragraphs
+
+
+def reference_matches(xml_path, regex):
+    """Match a regex against every saved paragraph, described like describe()."""
+    matches = []
+    for i, (text, pieces) in enumerate(reference_paragraphs(xml_path)):
+        for m in regex.finditer(text):
+            if m.end() > m.start():
+                spans = tuple(
+                    piece[max(m.start() - at, 0) : m.end() - at]
+                    for at, piece in pieces
+                    if at < m.end() and at + len(piece) > m.start()
+                )
+                matches.append((i, m.start(), m.end(), m[0], spans))
+    return matches
+
+
+def describe(editor, matches):
+    """Describe matches comparably across backends and with reference_matches."""
+    position = {p: i for i, p in enumerate(editor.text_index().paragraphs())}
+    return [
+        (
+            position[m.paragraph],
+            m.start,
+            m.end,
+            m.text,
+            tuple(own_text(t)[start:end] for t, start, end in m.spans),
+        )
+        for m in matches
+    ]
+
+
+class TestTextIndex(TestCase):
+    setUp = TestLxmlEditor.setUp
+    tearDown = TestLxmlEditor.tearDown
+    redline = TestLxmlEditor.redline
+
+    def open_editors(self, content=None):
+        editors = []
+        for name, editor_class in (
+            ("minidom.xml", DocxXMLEditor),
+            ("lxml.xml", LxmlDocxXMLEditor),
+            ("segmented.xml", SegmentedDocxXMLEditor),
+        ):
+            xml_path = self.temp_dir / name
+            xml_path.write_bytes(content or self.content)
+            editors.append(editor_class(xml_path, rsid="00AB12CD", author="Tester"))
+        return editors
+
+    def random_queries(self, xml_path, count):
+        """Phrases cut from random paragraphs at random places, and some regexes."""
+        texts = [text for text, _ in reference_paragraphs(xml_path) if text]
+        queries = [r"\bne\w+", r"\d+\.", r"(?i)replaced .q.", r"\s"]
+        while len(queries) < count:
+            text = self.rng.choice(texts)
+            start = self.rng.randrange(len(text))
+            end = self.rng.randrange(start + 1, min(len(text), start + 30) + 1)
+            queries.append(text[start:end])
+        return queries
+
+    def assert_matches_reference(self, editor, queries, edited):
+        editor.save()
+        for query in queries:
+            with self.subTest(editor=type(editor).__name__, edited=edited, q=query):
+                if query.startswith(("\\", "(")):
+                    regex = re.compile(query)
+                    found = editor.text_index().search(query)
+                else:
+                    regex = re.compile(re.escape(query))
+                    found = editor.text_index().find_all(query)
+                self.assertEqual(
+                    describe(editor, found),
+                    reference_matches(editor.xml_path, regex),
+                )
+
+    def test_matches_reference_across_edits(self):
+        lines = self.content.decode().split("\n")
+        paragraph_lines = [i for i, s in enumerate(lines, 1) if s.strip() == "<w:p>"]
+        for editor in self.open_editors():
+            # Built before the edits, so these exercise the incremental updates
+            queries = self.random_queries(self.temp_dir / "minidom.xml", 60)
+            self.assert_matches_reference(editor, queries, edited=False)
+            self.redline(editor, paragraph_lines)
+            queries = self.random_queries(editor.xml_path, 60)
+            self.assert_matches_reference(editor, queries, edited=True)
+
+    def test_phrase_split_across_runs(self):
+        content = docx_document_xml(3, seed=2).replace(
+            "<w:sectPr/>", SPLIT_BODY + "<w:sectPr/>"
+        )
+        for editor in self.open_editors(pretty_print_xml_bytes(content.encode())):
+            with self.subTest(editor=type(editor).__name__):
+                index = editor.text_index()
+                self.assertEqual(
+                    describe(editor, index.find_all("Effective Date\tshall")),
+                    [
+                        (
+                            3,
+                            4,
+                            24,
+                            "Effective Date\tshall",
+                            ("Effective", " ", "Date", "shall"),
+                        )
+                    ],
+                )
+                # No whole word in the phrase: every paragraph is searched
+                self.assertEqual(
+                    describe(editor, index.find_all("ffective Da")),
+                    [(3, 5, 16, "ffective Da", ("ffective", " ", "Da"))],
+                )
+                self.assertEqual(
+                    [m.text for m in index.search(r"shall\napply")],
+                    ["shall\napply"],
+                )
+                # get_node only sees non-whitespace text nodes
+                with self.assertRaises(ValueError):
+                    editor.get_node(tag="w:p", contains="Effective Date")
+
+    def test_edits_reread_only_touched_paragraphs(self):
+        xml_path = self.temp_dir / "document.xml"
+        xml_path.write_bytes(self.content)
+        editor = DocxXMLEditor(xml_path, rsid="00AB12CD")
+        index = editor.text_index()
+        self.assertEqual(len(index.find_all("Inserted clause 2.")), 1)
+        paragraph = editor.get_node(tag="w:p", contains="Inserted clause 3.")
+
+        with mock.patch.object(
+            TextIndex, "_read", autospec=True, side_effect=TextIndex._read
+        ) as read:
+            editor.append_to(paragraph, "<w:r><w:t> and more</w:t></w:r>")
+            self.assertEqual(
+                [m.paragraph for m in index.find_all("clause 3. and more")],
+                [paragraph],
+            )
+            self.assertEqual(
+                [call.args[1] for call in read.call_args_list], [paragraph]
+            )
+
+            # A new paragraph is placed in document order
+            editor.insert_after(paragraph, "<w:p><w:r><w:t>Follows</w:t></w:r></w:p>")
+            paragraphs = index.paragraphs()
+            self.assertEqual(
+                index.text(paragraphs[paragraphs.index(paragraph) + 1]), "Follows"
+            )
+
+        editor.suggest_deletion(editor.get_node(tag="w:r", contains="and more"))
+        self.assertEqual(index.find_all("clause 3. and more"), [])
+
+        # Direct DOM changes show after invalidate_indexes()
+        paragraph.parentNode.removeChild(paragraph.nextSibling)
+        editor.invalidate_indexes()
+        self.assertEqual(index.find_all("Follows"), [])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Regression tests for XMLEditor node lookup and batched edits.
+"""
+
+import html
+import random
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+from xml.parsers.expat import ExpatError
+
+import lxml.etree
+from defusedxml import EntitiesForbidden
+from ooxml.scripts.synthetic import docx_document_xml
+from ooxml.scripts.unpack import pretty_print_xml_bytes
+
+from .document import DocxXMLEditor, LxmlDocxXMLEditor, SegmentedDocxXMLEditor
+from .utilities import LxmlXMLEditor, XMLEditor
+
+
+def linear_matches(editor, tag, attrs=None, line_number=None, contains=None):
+    """Reference lookup: scan every element like get_node did before indexing."""
+
+    def text(elem):
+        parts = []
+        for node in elem.childNodes:
+            if node.nodeType == node.TEXT_NODE and node.data.strip():
+                parts.append(node.data)
+            elif node.nodeType == node.ELEMENT_NODE:
+                parts.append(text(node))
+        return "".join(parts)
+
+    matches = []
+    for elem in editor.dom.getElementsByTagName(tag):
+        line = getattr(elem, "parse_position", (None,))[0]
+        if line_number is not None and (
+            line not in line_number
+            if isinstance(line_number, range)
+            else line != line_number
+        ):
+            continue
+        if attrs is not None and not all(
+            elem.getAttribute(name) == value for name, value in attrs.items()
+        ):
+            continue
+        if contains is not None and html.unescape(contains) not in text(elem):
+            continue
+        matches.append(elem)
+    return matches
+
+
+class TestIndexedLookup(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_utilities_"))
+        self.xml_path = self.temp_dir / "document.xml"
+        content = docx_document_xml(200, tracked_changes=20, seed=1).encode()
+        self.xml_path.write_bytes(pretty_print_xml_bytes(content))
+        self.editor = DocxXMLEditor(self.xml_path, rsid="00AB12CD", author="Tester")
+        self.rng = random.Random(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def random_query(self):
+        """Build lookup filters from a random element so some queries match."""
+        elem = self.rng.choice(self.editor.dom.getElementsByTagName("*"))
+        tag = self.rng.choice([elem.tagName, elem.tagName, "*", "w:r"])
+        query = {}
+        if elem.hasAttribute("w:id") and self.rng.random() < 0.7:
+            query["attrs"] = {"w:id": elem.getAttribute("w:id")}
+        if hasattr(elem, "parse_position") and self.rng.random() < 0.5:
+            line = elem.parse_position[0]
+            query["line_number"] = self.rng.choice([line, range(line - 3, line + 3)])
+        if self.rng.random() < 0.3:
+            words = self.editor._get_element_text(elem).split()
+            query["contains"] = self.rng.choice(words) if words else "zzz"
+        return tag, query
+
+    def assert_lookups_match(self, count=150):
+        for _ in range(count):
+            tag, query = self.random_query()
+            expected = linear_matches(self.editor, tag, **query)
+            with self.subTest(tag=tag, query=query):
+                if len(expected) == 1:
+                    self.assertIs(self.editor.get_node(tag, **query), expected[0])
+                else:
+                    with self.assertRaises(ValueError):
+                        self.editor.get_node(tag, **query)
+
+    def test_lookups_match_linear_scan_across_edits(self):
+        self.assert_lookups_match()
+        for step in range(40):
+            runs = self.editor.dom.getElementsByTagName("w:r")
+            run = self.rng.choice(runs)
+            action = step % 5
+            if action == 0:
+                self.editor.replace_node(
+                    run, f"<w:r><w:t>replaced {step}</w:t></w:r><w:ins/>"
+                )
+            elif action == 1:
+                self.editor.insert_after(
+                    run, f"<w:ins><w:r><w:t>after {step}</w:t></w:r></w:ins>"
+                )
+            elif action == 2:
+                self.editor.insert_before(run, f"<w:r><w:t>before {step}</w:t></w:r>")
+            elif action == 3:
+                self.editor.append_to(run, f"<w:t>appended {step}</w:t>")
+            elif not run.getElementsByTagName(
+                "w:delText"
+            ) and run.parentNode.tagName not in ("w:ins", "w:del"):
+                self.editor.suggest_deletion(run)
+            self.assert_lookups_match(30)
+
+        for ins in list(self.editor.dom.getElementsByTagName("w:ins"))[:5]:
+            if ins.getElementsByTagName("w:r"):
+                self.editor.revert_insertion(ins)
+        self.assert_lookups_match()
+
+    def test_finds_inserted_and_drops_removed_nodes(self):
+        para = self.editor.get_node(tag="w:p", line_number=range(1, 10))
+        nodes = self.editor.replace_node(
+            para, "<w:p><w:r><w:t>Brand new paragraph</w:t></w:r></w:p>"
+        )
+
+        self.assertIs(self.editor.get_node(tag="w:p", contains="Brand new"), nodes[0])
+        with self.assertRaises(ValueError):
+            self.editor.get_node(tag="w:p", line_number=para.parse_position[0])
+        self.assertNotIn(para, self.editor._index.candidates("w:p"))
+
+        # Injected attributes are indexed as well
+        ins = self.editor.insert_after(nodes[0], "<w:ins/>")[0]
+        self.assertIs(
+            self.editor.get_node(tag="w:ins", attrs={"w:id": ins.getAttribute("w:id")}),
+            ins,
+        )
+
+    def test_ancestor_text_refreshed_after_edit(self):
+        run = self.editor.get_node(tag="w:r", contains="Inserted clause 3.")
+        para = run.parentNode.parentNode
+        self.assertNotIn("Extra words", self.editor._get_element_text(para))
+
+        self.editor.append_to(run, "<w:t>Extra words</w:t>")
+
+        self.assertIs(self.editor.get_node(tag="w:p", contains="Extra words"), para)
+
+    def test_text_changed_directly_in_dom(self):
+        lxml_editor = LxmlDocxXMLEditor(self.xml_path, rsid="00AB12CD")
+        for editor in (self.editor, lxml_editor):
+            with self.subTest(editor=type(editor).__name__):
+                para = editor.get_node(tag="w:p", contains="Inserted clause 3.")
+                t = editor.get_node(tag="w:t", contains="Inserted clause 3.")
+                if editor is lxml_editor:
+                    t.text = "Rewritten clause"
+                else:
+                    t.firstChild.data = "Rewritten clause"
+
+                with self.assertRaises(ValueError):
+                    editor.get_node(tag="w:p", contains="Inserted clause 3.")
+                self.assertIs(
+                    editor.get_node(tag="w:p", contains="Rewritten clause"), para
+                )
+
+    def test_invalidate_after_direct_dom_changes(self):
+        para = self.editor.get_node(tag="w:p", line_number=range(1, 10))
+        # Build the attribute index before changing the attribute behind its back
+        self.editor.get_node(
+            tag="w:p", attrs={"w14:paraId": ""}, line_number=para.parse_position[0]
+        )
+        para.setAttribute("w14:paraId", "1234ABCD")
+        self.editor.invalidate_indexes()
+
+        self.assertIs(
+            self.editor.get_node(tag="w:p", attrs={"w14:paraId": "1234ABCD"}), para
+        )
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_batch_"))
+        content = docx_document_xml(100, tracked_changes=10, seed=2).encode()
+        self.content = pretty_print_xml_bytes(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def open_editor(self, name):
+        xml_path = self.temp_dir / name
+        xml_path.write_bytes(self.content)
+        return DocxXMLEditor(xml_path, rsid="00AB12CD", author="Tester")
+
+    def redline(self, editor):
+        """Apply a mix of edits to fixed targets, as a review script would."""
+        paras = editor.dom.getElementsByTagName("w:p")
+        # Resolve every target up front, as get_node does inside a batch
+        ins = editor.dom.getElementsByTagName("w:ins")[0]
+        for i in range(0, 90, 9):
+            run = paras[i].getElementsByTagName("w:r")[0]
+            deleted = editor.suggest_deletion(run)
+            editor.insert_after(
+                deleted, f"<w:ins><w:r><w:t>new {i}</w:t></w:r></w:ins>"
+            )
+            editor.insert_before(
+                paras[i + 1], f"<w:p><w:r><w:t> p{i} </w:t></w:r></w:p>"
+            )
+        editor.replace_node(paras[95], "<w:p><w:r><w:t>replaced</w:t></w:r></w:p>")
+        editor.append_to(paras[96], "<w:ins><w:r><w:t>appended</w:t></w:r></w:ins>")
+        editor.suggest_deletion(paras[97])
+        editor.revert_insertion(ins)
+
+    def serialized(self, editor):
+        # Paragraph ids are random and dates depend on the clock
+        xml = editor.dom.toxml()
+        return re.sub(r'(w14:paraId|w14:textId|w:date|w16du:dateUtc)="[^"]*"', "", xml)
+
+    def test_batch_matches_sequential_edits(self):
+        sequential = self.open_editor("sequential.xml")
+        self.redline(sequential)
+
+        batched = self.open_editor("batched.xml")
+        with batched.batch():
+            self.redline(batched)
+            # Nothing is applied until the block exits
+            self.assertEqual(len(batched.dom.getElementsByTagName("w:del")), 0)
+
+        self.assertEqual(self.serialized(batched), self.serialized(sequential))
+        ids = [
+            e.getAttribute("w:id")
+            for tag in ("w:ins", "w:del")
+            for e in batched.dom.getElementsByTagName(tag)
+            if e.hasAttribute("w:id")
+        ]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_lookups_see_pre_batch_document(self):
+        editor = self.open_editor("document.xml")
+        para = editor.get_node(tag="w:p", line_number=range(1, 10))
+        with editor.batch():
+            with editor.batch():
+                editor.insert_after(para, "<w:p><w:r><w:t>Nested</w:t></w:r></w:p>")
+            nodes = editor.replace_node(
+                para, "<w:p><w:r><w:t>Swapped</w:t></w:r></w:p>"
+            )
+            self.assertEqual(nodes, [])
+            self.assertIs(
+                editor.get_node(tag="w:p", line_number=para.parse_position[0]), para
+            )
+
+        self.assertIs(editor.get_node(tag="w:p", contains="Swapped"), nodes[0])
+        self.assertIs(
+            editor.get_node(tag="w:p", contains="Nested").previousSibling, nodes[0]
+        )
+        self.assertTrue(nodes[0].hasAttribute("w:rsidR"))
+
+    def test_failed_batch_applies_nothing(self):
+        editor = self.open_editor("document.xml")
+        before = editor.dom.toxml()
+        para = editor.dom.getElementsByTagName("w:p")[0]
+
+        with self.assertRaises(RuntimeError):
+            with editor.batch():
+                editor.insert_after(para, "<w:p/>")
+                raise RuntimeError("abort")
+        with self.assertRaises(ExpatError):
+            with editor.batch():
+                editor.insert_after(para, "<w:p/>")
+                editor.insert_after(para, "<w:p>")
+        self.assertEqual(editor.dom.toxml(), before)
+
+        editor.insert_after(para, "<w:p/>")
+        self.assertNotEqual(editor.dom.toxml(), before)
+
+
+# Paragraphs appended to the synthetic body: a numbered item, another author's
+# deletion, entities and comments, and a start tag spanning several lines
+EXTRA_BODY = """<w:p>
+  <w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr></w:pPr>
+  <w:r><w:t>Numbered &#8220;item&#8221;</w:t></w:r>
+</w:p>
+<w:p>
+  <w:r><w:t xml:space="preserve">Kept </w:t></w:r>
+  <w:del w:id="90" w:author="Other" w:date="2024-01-01T00:00:00Z">
+    <w:r w:rsidDel="00112233"><w:delText>removed text</w:delText></w:r>
+  </w:del>
+  <!-- reviewer note -->
+</w:p>
+<w:p
+    w:rsidR="00445566"><w:r><w:t>Tom &amp; Jerry</w:t></w:r></w:p>
+"""
+
+# Attributes with random or clock-dependent values
+VOLATILE_ATTRIBUTES = re.compile(r"\}(paraId|textId|date|dateUtc)$")
+
+
+def canonical(xml_path):
+    """Return the root namespace prefixes and canonical XML of a saved part.
+
+    Whitespace between elements is dropped: the backends place the formatting
+    whitespace around inserted content differently. So are comments, which the
+    minidom editor loses when parsing a file.
+    """
+    root = lxml.etree.parse(str(xml_path)).getroot()
+    for elem in root.iter():
+        if len(elem) and elem.text and not elem.text.strip():
+            elem.text = None
+        if elem.tail and not elem.tail.strip():
+            elem.tail = None
+        if isinstance(elem.tag, str):
+            for name in [n for n in elem.attrib if VOLATILE_ATTRIBUTES.search(n)]:
+                del elem.attrib[name]
+    prefixes = sorted(prefix for prefix in root.nsmap if prefix)
+    return prefixes, lxml.etree.tostring(
+        root, method="c14n", exclusive=True, with_comments=False
+    )
+
+
+class TestLxmlEditor(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_lxml_"))
+        content = docx_document_xml(60, tracked_changes=6, seed=3)
+        content = content.replace("<w:sectPr/>", EXTRA_BODY + "<w:sectPr/>")
+        self.content = pretty_print_xml_bytes(content.encode())
+        self.rng = random.Random(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def open_editors(self):
+        editors = []
+        for name, editor_class in (
+            ("minidom.xml", DocxXMLEditor),
+            ("lxml.xml", LxmlDocxXMLEditor),
+        ):
+            xml_path = self.temp_dir / name
+            xml_path.write_bytes(self.content)
+            editors.append(editor_class(xml_path, rsid="00AB12CD", author="Tester"))
+        return editors
+
+    def outcome(self, editor, tag, query):
+        """Describe what get_node finds, comparably across backends."""
+        try:
+            elem = editor.get_node(tag, **query)
+        except ValueError as e:
+            return str(e)
+        return editor._index.line(elem), editor._get_element_text(elem)
+
+    def random_query(self, editor):
+        """Build lookup filters from a random element of the minidom editor."""
+        elem = self.rng.choice(editor.dom.getElementsByTagName("*"))
+        tag = self.rng.choice([elem.tagName, elem.tagName, "*", "w:r"])
+        query = {}
+        if elem.hasAttribute("w:id") and self.rng.random() < 0.7:
+            query["attrs"] = {"w:id": elem.getAttribute("w:id")}
+        if hasattr(elem, "parse_position") and self.rng.random() < 0.5:
+            line = elem.parse_position[0]
+            query["line_number"] = self.rng.choice([line, range(line - 3, line + 3)])
+        if self.rng.random() < 0.3:
+            words = editor._get_element_text(elem).split()
+            query["contains"] = self.rng.choice(words + ["&#8220;item"])
+        return tag, query
+
+    def redline(self, editor, paragraph_lines):
+        """Edit both backends through the shared API only."""
+        for k, line in enumerate(paragraph_lines[1:40:4]):
+            deleted = editor.suggest_deletion(
+                editor.get_node(tag="w:r", line_number=line + 1)
+            )
+            editor.insert_after(
+                deleted,
+                f'<w:ins><w:r><w:t xml:space="preserve"> new {k}</w:t></w:r></w:ins>',
+            )
+            editor.insert_before(
+                editor.get_node(tag="w:p", line_number=line),
+                f"<w:p><w:r><w:t> p{k}</w:t></w:r></w:p>",
+            )
+        editor.replace_node(
+            editor.get_node(tag="w:p", line_number=paragraph_lines[42]),
+            "<w:p><w:r><w:t>replaced &#8220;q&#8221;</w:t></w:r></w:p><w:ins/>",
+        )
+        editor.append_to(
+            editor.get_node(tag="w:p", line_number=paragraph_lines[43]),
+            "<w:ins><w:r><w:t>appended</w:t></w:r></w:ins><!-- added -->",
+        )
+        editor.suggest_deletion(editor.get_node(tag="w:p", contains="Numbered"))
+        editor.suggest_deletion(
+            editor.get_node(tag="w:p", line_number=paragraph_lines[44])
+        )
+        editor.revert_insertion(editor.get_node(tag="w:ins", attrs={"w:id": "1"}))
+        editor.revert_insertion(
+            editor.get_node(tag="w:p", contains="Inserted clause 2.")
+        )
+        return editor.revert_deletion(
+            editor.get_node(tag="w:del", attrs={"w:author": "Other"})
+        )
+
+    def test_line_numbers_match(self):
+        minidom_editor, lxml_editor = self.open_editors()
+        self.assertEqual(
+            [e.parse_position[0] for e in minidom_editor.dom.getElementsByTagName("*")],
+            [e.sourceline for e in lxml_editor.root.iter(lxml.etree.Element)],
+        )
+
+    def test_inserted_nodes_have_no_line(self):
+        fragment = "<w:p>\n<w:r>\n<w:t>New</w:t>\n</w:r>\n</w:p>"
+        for editor in self.open_editors():
+            with self.subTest(editor=type(editor).__name__):
+                index = editor._index
+                paragraph = index.candidates("w:p")[0]
+                # Build the line indexes first, so the insertion updates them
+                for tag in ("w:p", "w:r", "w:t", "*"):
+                    index.candidates(tag, line_number=0)
+                nodes = editor.insert_before(paragraph, fragment)
+
+                added = list(index._elements(nodes[0]))
+                self.assertEqual([index.line(elem) for elem in added], [None] * 3)
+                # Neither 0 nor the lines within the fragment find them
+                for tag in ("w:p", "w:r", "w:t", "*"):
+                    found = index.candidates(tag, line_number=range(0, 6))
+                    self.assertFalse(set(found) & set(added))
+
+    def test_lookups_match_across_edits(self):
+        minidom_editor, lxml_editor = self.open_editors()
+        paragraph_lines = [
+            p.parse_position[0] for p in minidom_editor.dom.getElementsByTagName("w:p")
+        ]
+        for edited in (False, True):
+            if edited:
+                for editor in (minidom_editor, lxml_editor):
+                    self.redline(editor, paragraph_lines)
+            for _ in range(300):
+                tag, query = self.random_query(minidom_editor)
+                with self.subTest(edited=edited, tag=tag, query=query):
+                    self.assertEqual(
+                        self.outcome(lxml_editor, tag, query),
+                        self.outcome(minidom_editor, tag, query),
+                    )
+
+    def test_edits_match(self):
+        paragraph_lines = None
+        for use_batch in (False, True):
+            minidom_editor, lxml_editor = self.open_editors()
+            if paragraph_lines is None:
+                paragraph_lines = [
+                    p.parse_position[0]
+                    for p in minidom_editor.dom.getElementsByTagName("w:p")
+                ]
+            results = []
+            for editor in (minidom_editor, lxml_editor):
+                if use_batch:
+                    with editor.batch():
+                        result = self.redline(editor, paragraph_lines)
+                else:
+                    result = self.redline(editor, paragraph_lines)
+                results.append(len(result))
+                self.assertTrue(editor.save())
+                self.assertFalse(editor.save())
+
+            with self.subTest(batch=use_batch):
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(
+                    canonical(lxml_editor.xml_path), canonical(minidom_editor.xml_path)
+                )
+                self.assertEqual(
+                    self.outcome(lxml_editor, "w:ins", {"contains": "removed text"}),
+                    self.outcome(minidom_editor, "w:ins", {"contains": "removed text"}),
+                )
+
+    def test_save_keeps_declaration_and_encoding(self):
+        xml_path = self.temp_dir / "ascii.xml"
+        xml_path.write_bytes(
+            b'<?xml version="1.0" encoding="ascii" standalone="yes"?>\n'
+            b"<r><a>caf&#233;</a></r>"
+        )
+        editor = LxmlXMLEditor(xml_path)
+        editor.append_to(editor.get_node(tag="r"), "<b>naïve</b>")
+        editor.save()
+        self.assertEqual(
+            xml_path.read_bytes(),
+            b'<?xml version="1.0" encoding="ascii" standalone="yes"?>\n'
+            b"<r><a>caf&#233;</a><b>na&#239;ve</b></r>",
+        )
+
+    def test_utf16_part_saves_as_utf8(self):
+        content = (
+            self.content.decode()
+            .replace('encoding="ascii"', 'encoding="UTF-16"')
+            .encode("utf-16")
+        )
+        self.content = content
+        paragraph_lines = None
+        for editor in self.open_editors():
+            if paragraph_lines is None:
+                paragraph_lines = [
+                    p.parse_position[0] for p in editor.dom.getElementsByTagName("w:p")
+                ]
+            self.redline(editor, paragraph_lines)
+            self.assertTrue(editor.save())
+            self.assertTrue(
+                editor.xml_path.read_bytes().startswith(
+                    b'<?xml version="1.0" encoding="utf-8"'
+                )
+            )
+        self.assertEqual(
+            canonical(self.temp_dir / "lxml.xml"),
+            canonical(self.temp_dir / "minidom.xml"),
+        )
+
+    def test_rejects_entity_declarations(self):
+        xml_path = self.temp_dir / "entities.xml"
+        xml_path.write_bytes(
+            b'<!DOCTYPE r [<!ENTITY e SYSTEM "file:///etc/passwd">]><r>&e;</r>'
+        )
+        for editor_class in (XMLEditor, LxmlXMLEditor):
+            with self.subTest(editor=editor_class.__name__):
+                with self.assertRaises(EntitiesForbidden):
+                    editor_class(xml_path)
+
+
+class TestSegmentedEditor(TestCase):
+    setUp = TestLxmlEditor.setUp
+    tearDown = TestLxmlEditor.tearDown
+    outcome = TestLxmlEditor.outcome
+    random_query = TestLxmlEditor.random_query
+    redline = TestLxmlEditor.redline
+
+    def open_editors(self):
+        editors = []
+        for name, editor_class in (
+            ("minidom.xml", DocxXMLEditor),
+            ("segmented.xml", SegmentedDocxXMLEditor),
+        ):
+            xml_path = self.temp_dir / name
+            xml_path.write_bytes(self.content)
+            editors.append(editor_class(xml_path, rsid="00AB12CD", author="Tester"))
+        return editors
+
+    def paragraph_lines(self):
+        lines = self.content.decode().split("\n")
+        return [i for i, line in enumerate(lines, 1) if line.strip() == "<w:p>"]
+
+    def test_lookups_match_across_edits(self):
+        minidom_editor, segmented_editor = self.open_editors()
+        for edited in (False, True):
+            if edited:
+                for editor in (minidom_editor, segmented_editor):
+                    self.redline(editor, self.paragraph_lines())
+            for _ in range(300):
+                tag, query = self.random_query(minidom_editor)
+                with self.subTest(edited=edited, tag=tag, query=query):
+                    self.assertEqual(
+                        self.outcome(segmented_editor, tag, query),
+                        self.outcome(minidom_editor, tag, query),
+                    )
+
+    def test_edits_match(self):
+        for use_batch in (False, True):
+            editors = self.open_editors()
+            for editor in editors:
+                if use_batch:
+                    with editor.batch():
+                        self.redline(editor, self.paragraph_lines())
+                else:
+                    self.redline(editor, self.paragraph_lines())
+                self.assertTrue(editor.save())
+                self.assertFalse(editor.save())
+
+            with self.subTest(batch=use_batch):
+                minidom_editor, segmented_editor = editors
+                self.assertEqual(
+                    canonical(segmented_editor.xml_path),
+                    canonical(minidom_editor.xml_path),
+                )
+
+    def test_saves_unparsed_paragraphs_verbatim(self):
+        # Quotes in text are written back escaped by minidom
+        content = self.content.replace(b"Tom &amp; Jerry", b'"Tom" &amp; Jerry')
+        xml_path = self.temp_dir / "document.xml"
+        xml_path.write_bytes(content)
+        editor = SegmentedDocxXMLEditor(xml_path, rsid="00AB12CD", author="Tester")
+
+        paragraph_lines = self.paragraph_lines()
+        paragraph = editor.get_node(tag="w:p", line_number=paragraph_lines[1])
+        deleted = editor.suggest_deletion(paragraph).getElementsByTagName("w:del")[0]
+        self.assertEqual(len(editor.dom.getElementsByTagName("w:p")), 1)
+        # Change ids follow those of the paragraphs that were not parsed
+        ids = [int(i) for i in re.findall(rb'w:id="(\d+)"', content)]
+        self.assertEqual(int(deleted.getAttribute("w:id")), max(ids) + 1)
+
+        self.assertTrue(editor.save())
+        saved = xml_path.read_bytes()
+        lines = content.split(b"\n")
+        start = sum(len(line) + 1 for line in lines[: paragraph_lines[2] - 1])
+        self.assertIn(content[start : content.index(b"</w:body>")], saved)
+        self.assertIn(b"<!-- reviewer note -->", saved)
+        self.assertIn(b"<w:del ", saved[: saved.index(b'"Tom"')])
+        self.assertFalse(editor.save())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Full-text index over the paragraphs of a WordprocessingML part.
+
+Each w:p is read once into its text, the w:t, w:tab, w:br and w:cr elements
+that the text came from and the offset where each one starts, so phrases
+split across runs are found and can be mapped back to their w:t elements.
+Phrase lookups go through an index of the words in each paragraph, built on
+the first lookup, and only read the paragraphs holding the phrase's rarest
+whole word. The index listens to the editor's element index: edits mark the
+paragraphs they touch, which are read again before the next lookup.
+
+Example:
+    index = editor.text_index()
+    for match in index.find_all("the Effective Date"):
+        for t, start, end in match.spans:
+            ...  # t is a w:t element, text[start:end] of it is part of the match
+"""
+
+import bisect
+import html
+import re
+from collections import namedtuple
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+# Words, for the phrase lookup index
+_WORD = re.compile(r"\w+")
+
+# Elements that stand for characters in the paragraph text
+_CHARACTERS = {"tab": "\t", "br": "\n", "cr": "\n"}
+
+# A phrase or pattern match in one paragraph. start and end are offsets into
+# the paragraph text; spans lists (w:t element, start, end) for every w:t the
+# match covers, with offsets into that element's text.
+TextMatch = namedtuple("TextMatch", ["paragraph", "start", "end", "text", "spans"])
+
+# Text of a paragraph, and the elements it came from: nodes[i] starts at
+# offsets[i] (None for w:tab, w:br and w:cr), offsets[-1] is the text length
+_Paragraph = namedtuple("_Paragraph", ["text", "offsets", "nodes"])
+
+
+class TextIndex:
+    """
+    Paragraph texts of a part, with offsets back to their w:t elements.
+
+    The text of a w:p is the text of its w:t elements in document order, with
+    a tab character for w:tab and a line break for w:br and w:cr. Text inside
+    paragraphs nested in it (such as text boxes) belongs to those paragraphs.
+    Deleted text (w:delText) is not included, inserted text is.
+
+    Built on first use; edits made through the editor keep it up to date.
+    After changing the DOM directly, call the editor's invalidate_indexes().
+    """
+
+    def __init__(self, element_index):
+        """
+        Attach to an editor's element index.
+
+        Args:
+            element_index: The editor's _ElementIndex, whose DOM is indexed and
+                whose changes are followed
+        """
+        self._elements = element_index
+        self._lxml = not hasattr(element_index.dom, "nodeType")
+        if self._lxml:
+            self._p, self._t = f"{{{W_NS}}}p", f"{{{W_NS}}}t"
+            self._characters = {f"{{{W_NS}}}{k}": v for k, v in _CHARACTERS.items()}
+        else:
+            self._p, self._t = "w:p", "w:t"
+            self._characters = {f"w:{k}": v for k, v in _CHARACTERS.items()}
+        self.clear()
+        element_index.listeners.append(self)
+
+    def clear(self):
+        """Forget everything; the index is rebuilt on the next lookup."""
+        # Paragraphs in document order, and paragraph -> position in it
+        self._order = None
+        self._position = {}
+        # Paragraph -> _Paragraph
+        self._paragraphs = {}
+        # Word -> {paragraph: None}; may hold paragraphs that lost the word
+        self._words = None
+        # Paragraphs to read again, and whether paragraphs were added
+        self._dirty = {}
+        self._reorder = False
+
+    def changed(self, nodes, deep=True):
+        """Mark the paragraphs that hold or are inside the changed nodes."""
+        if self._order is None:
+            return
+        elements = self._elements
+        for node in nodes:
+            parent = node
+            while parent is not None and not (
+                elements._is_element(parent) and elements._tag(parent) == self._p
+            ):
+                parent = elements._parent(parent)
+            if parent is not None:
+                self._dirty[parent] = None
+            if deep and elements._is_element(node):
+                for elem in elements._elements(node):
+                    if elements._tag(elem) == self._p:
+                        self._dirty[elem] = None
+                        if elem not in self._paragraphs:
+                            self._reorder = True
+
+    def paragraphs(self):
+        """Return the w:p elements in document order."""
+        self._sync()
+        return [p for p in self._order if self._elements._is_attached(p)]
+
+    def text(self, paragraph):
+        """Return the text of a w:p element."""
+        self._sync()
+        entry = self._paragraphs.get(paragraph)
+        if entry is None:
+            raise ValueError("Not an indexed paragraph")
+        return entry.text
+
+    def find_all(self, phrase):
+        """
+        Find every occurrence of a phrase, also where it spans several runs.
+
+        Args:
+            phrase: Text to find; entity notation (&#8220;) is decoded as in
+                get_node. Matching is exact: case and spaces must agree.
+
+        Returns:
+            list[TextMatch]: Non-overlapping matches in document order
+
+        Raises:
+            ValueError: If phrase is empty
+        """
+        phrase = html.unescape(phrase)
+        if not phrase:
+            raise ValueError("Cannot search for an empty phrase")
+        self._sync()
+
+        # Only words with a boundary on both sides inside the phrase are whole
+        # words of the paragraph text too
+        words = [
+            m[0]
+            for m in _WORD.finditer(phrase)
+            if m.start() > 0 and m.end() < len(phrase)
+        ]
+        if words:
+            index = self._word_index()
+            candidates = min((index.get(word, {}) for word in words), key=len)
+            candidates = sorted(
+                (p for p in candidates if p in self._position),
+                key=self._position.__getitem__,
+            )
+        else:
+            candidates = self._order
+
+        matches = []
+        for paragraph in candidates:
+            entry = self._paragraphs[paragraph]
+            start = entry.text.find(phrase)
+            if start < 0 or not self._elements._is_attached(paragraph):
+                continue
+            while start >= 0:
+                end = start + len(phrase)
+                matches.append(self._match(paragraph, entry, start, end))
+                start = entry.text.find(phrase, end)
+        return matches
+
+    def search(self, pattern, flags=0):
+        """
+        Find every match of a regular expression in the paragraph texts.
+
+        Matches never span paragraphs. Empty matches are skipped.
+
+        Args:
+            pattern: Regular expression (string or compiled)
+            flags: re flags for a string pattern
+
+        Returns:
+            list[TextMatch]: Matches in document order
+        """
+        regex = re.compile(pattern, flags)
+        self._sync()
+        matches = []
+        for paragraph in self._order:
+            entry = self._paragraphs[paragraph]
+            found = [m for m in regex.finditer(entry.text) if m.end() > m.start()]
+            if found and self._elements._is_attached(paragraph):
+                matches.extend(
+                    self._match(paragraph, entry, m.start(), m.end()) for m in found
+                )
+        return matches
+
+    def _match(self, paragraph, entry, start, end):
+        """Build the TextMatch for [start, end) of a paragraph's text."""
+        offsets, nodes = entry.offsets, entry.nodes
+        spans = []
+        i = bisect.bisect_right(offsets, start) - 1
+        while i < len(nodes) and offsets[i] < end:
+            if nodes[i] is not None and offsets[i + 1] > offsets[i]:
+                spans.append(
+                    (
+                        nodes[i],
+                        max(start, offsets[i]) - offsets[i],
+                        min(end, offsets[i + 1]) - offsets[i],
+                    )
+                )
+            i += 1
+        return TextMatch(paragraph, start, end, entry.text[start:end], spans)
+
+    def _sync(self):
+        """Build the index, or catch up with the paragraphs changed since."""
+        if self._order is not None and not self._reorder:
+            dirty, self._dirty = self._dirty, {}
+            for paragraph in dirty:
+                if paragraph in self._paragraphs:
+                    self._read(paragraph)
+            return
+
+        elements = self._elements
+        order = [
+            elem
+            for elem in elements._elements(elements.dom)
+            if elements._tag(elem) == self._p
+        ]
+        paragraphs = {}
+        for paragraph in order:
+            entry = self._paragraphs.get(paragraph)
+            if entry is None or paragraph in self._dirty:
+                entry = self._read(paragraph)
+            paragraphs[paragraph] = entry
+        self._order = order
+        self._position = {p: i for i, p in enumerate(order)}
+        self._paragraphs = paragraphs
+        self._dirty = {}
+        self._reorder = False
+
+    def _read(self, paragraph):
+        """Read a paragraph's text into the index and return its entry."""
+        parts, offsets, nodes = [], [], []
+        length = 0
+        stack = list(reversed(self._children(paragraph)))
+        while stack:
+            elem = stack.pop()
+            tag = self._elements._tag(elem)
+            if tag == self._p:
+                continue
+            if tag == self._t:
+                text = self._own_text(elem)
+            elif tag in self._characters:
+                text = self._characters[tag]
+            else:
+                stack.extend(reversed(self._children(elem)))
+                continue
+            offsets.append(length)
+            nodes.append(elem if tag == self._t else None)
+            parts.append(text)
+            length += len(text)
+        offsets.append(length)
+
+        entry = _Paragraph("".join(parts), offsets, nodes)
+        self._paragraphs[paragraph] = entry
+        if self._words is not None:
+            for word in set(_WORD.findall(entry.text)):
+                self._words.setdefault(word, {})[paragraph] = None
+        return entry
+
+    def _word_index(self):
+        """Return the word -> paragraphs index, built on first use."""
+        if self._words is None:
+            self._words = {}
+            for paragraph in self._order:
+                for word in set(_WORD.findall(self._paragraphs[paragraph].text)):
+                    self._words.setdefault(word, {})[paragraph] = None
+        return self._words
+
+    def _children(self, elem):
+        if self._lxml:
+            return [child for child in elem if isinstance(child.tag, str)]
+        return [
+            child for child in elem.childNodes if child.nodeType == child.ELEMENT_NODE
+        ]
+
+    def _own_text(self, elem):
+        if self._lxml:
+            return elem.text or ""
+        return "".join(
+            child.data for child in elem.childNodes if child.nodeType == child.TEXT_NODE
+        )
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -5,6 +5,9 @@ Utilities for editing OOXML documents.
 This module provides XMLEditor, a tool for manipulating XML files with support for
 line-number-based node finding and DOM manipulation. Each element is automatically
 annotated with its original line and column position during parsing.
+LxmlXMLEditor offers the same API on lxml trees, for parts too large for minidom,
+and SegmentedXMLEditor keeps minidom but only parses the parts of the file that
+lookups reach.
 
 Example usage:
     editor = XMLEditor("document.xml")
@@ -30,12 +33,30 @@ Example usage:
     editor.save()
 """
 
+import bisect
+import hashlib
 import html
+import io
+import os
+import re
+from array import array
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Union
+from xml.parsers.expat import ExpatError, ParserCreate
 
 import defusedxml.minidom
 import defusedxml.sax
+import lxml.etree
+from defusedxml import EntitiesForbidden
+
+_XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# Text nodes within an element (text and tails, not comment text), as plain strings
+_TEXT_NODES = lxml.etree.XPath(".//text()", smart_strings=False)
+
+# Attribute values that are written the same way in any XML file
+_PLAIN_VALUE = re.compile(r"[\w.:-]+", re.ASCII)
 
 
 class XMLEditor:
@@ -46,6 +67,12 @@ class XMLEditor:
     of each element. This enables finding nodes by their line number in the original
     file, which is useful when working with Read tool output.
 
+    Lookups go through indexes that are built on first use and kept up to date by
+    replace_node, insert_after, insert_before and append_to. Call
+    invalidate_indexes() after adding elements or changing attributes or text
+    through the DOM directly. Many edits can be grouped with batch() so their
+    fragments are parsed and applied in one pass.
+
     Attributes:
         xml_path: Path to the XML file being edited
         encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
@@ -66,12 +93,22 @@ class XMLEditor:
         if not self.xml_path.exists():
             raise ValueError(f"XML file not found: {xml_path}")
 
-        with open(self.xml_path, "rb") as f:
-            header = f.read(200).decode("utf-8", errors="ignore")
+        content = self.xml_path.read_bytes()
+        header = content[:200].decode("utf-8", errors="ignore")
         self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
 
+        # Digest of the file as last read or written, to skip unchanged saves
+        self._saved_digest = _digest(content)
+
+        self._load(content)
+        # Edits queued by an open batch(), or None
+        self._batch = None
+
+    def _load(self, content):
+        """Parse the file into self.dom and set up the lookup index."""
         parser = _create_line_tracking_parser()
         self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
+        self._index = _ElementIndex(self.dom)
 
     def get_node(
         self,
@@ -109,12 +146,11 @@ class XMLEditor:
             elem = editor.get_node(tag="w:t", contains="&#8220;Agreement")  # Entity notation
             elem = editor.get_node(tag="w:t", contains="\u201cAgreement")   # Unicode character
         """
-        matches = []
-        for elem in self.dom.getElementsByTagName(tag):
+        filtered = []
+        for elem in self._index.candidates(tag, attrs, line_number):
             # Check line_number filter
             if line_number is not None:
-                parse_pos = getattr(elem, "parse_position", (None,))
-                elem_line = parse_pos[0]
+                elem_line = self._index.line(elem)
 
                 # Handle both single line number and range
                 if isinstance(line_number, range):
@@ -127,22 +163,36 @@ class XMLEditor:
             # Check attrs filter
             if attrs is not None:
                 if not all(
-                    elem.getAttribute(attr_name) == attr_value
+                    self._index.attribute(elem, attr_name) == attr_value
                     for attr_name, attr_value in attrs.items()
                 ):
                     continue
 
-            # Check contains filter
-            if contains is not None:
-                elem_text = self._get_element_text(elem)
-                # Normalize the search string: convert HTML entities to Unicode characters
-                # This allows searching for both "&#8220;Rowan" and ""Rowan"
-                normalized_contains = html.unescape(contains)
-                if normalized_contains not in elem_text:
-                    continue
-
-            # If all applicable filters passed, this is a match
-            matches.append(elem)
+            filtered.append(elem)
+
+        # Check contains filter
+        matches = filtered
+        if contains is not None:
+            # Normalize the search string: convert HTML entities to Unicode characters
+            # This allows searching for both "&#8220;Rowan" and ""Rowan"
+            normalized_contains = html.unescape(contains)
+            matches = [
+                elem
+                for elem in filtered
+                if normalized_contains in self._get_element_text(elem)
+            ]
+            # Cached texts miss text nodes changed directly in the DOM: confirm
+            # the matches, and re-read every candidate if one was stale or none
+            # matched
+            if not matches or any(
+                normalized_contains not in self._index.text(elem, fresh=True)
+                for elem in matches
+            ):
+                matches = [
+                    elem
+                    for elem in filtered
+                    if normalized_contains in self._index.text(elem, fresh=True)
+                ]
 
         if not matches:
             # Build descriptive error message
@@ -182,7 +232,7 @@ class XMLEditor:
 
     def _get_element_text(self, elem):
         """
-        Recursively extract all text content from an element.
+        Extract all text content from an element, cached until it changes.
 
         Skips text nodes that contain only whitespace (spaces, tabs, newlines),
         which typically represent XML formatting rather than document content.
@@ -193,15 +243,48 @@ class XMLEditor:
         Returns:
             str: Concatenated text from all non-whitespace text nodes within the element
         """
-        text_parts = []
-        for node in elem.childNodes:
-            if node.nodeType == node.TEXT_NODE:
-                # Skip whitespace-only text nodes (XML formatting)
-                if node.data.strip():
-                    text_parts.append(node.data)
-            elif node.nodeType == node.ELEMENT_NODE:
-                text_parts.append(self._get_element_text(node))
-        return "".join(text_parts)
+        return self._index.text(elem)
+
+    def invalidate_indexes(self):
+        """
+        Drop all lookup indexes and cached element text.
+
+        Call after modifying self.dom directly (creating elements, changing
+        attributes or text); the editing methods keep the indexes up to date.
+        """
+        self._index.clear()
+
+    @contextmanager
+    def batch(self):
+        """
+        Queue edits made inside the block and apply them together when it exits.
+
+        Inside the block replace_node, insert_after, insert_before and append_to
+        only record the edit, so get_node keeps resolving targets against the
+        document as it was before the batch. On exit all fragments are parsed in
+        one pass and the edits are applied in the order they were made. Nothing is
+        applied if the block raises or a fragment is malformed. Nested batches
+        join the outer one.
+
+        The node lists returned inside the block are filled in when the batch is
+        applied.
+
+        Example:
+            with editor.batch():
+                for elem in targets:
+                    editor.insert_after(elem, "<w:r><w:t>note</w:t></w:r>")
+        """
+        if self._batch is not None:
+            yield self
+            return
+
+        self._batch = []
+        try:
+            yield self
+            edits = self._batch
+        finally:
+            self._batch = None
+        self._apply_edits(edits)
 
     def replace_node(self, elem, new_content):
         """
@@ -217,12 +300,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.replace_node(old_elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
-        nodes = self._parse_fragment(new_content)
-        for node in nodes:
-            parent.insertBefore(node, elem)
-        parent.removeChild(elem)
-        return nodes
+
+        return self._edit(lambda nodes: self._replace_with(elem, nodes), new_content)
 
     def insert_after(self, elem, xml_content):
         """
@@ -238,15 +317,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_after(elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
-        next_sibling = elem.nextSibling
-        nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            if next_sibling:
-                parent.insertBefore(node, next_sibling)
-            else:
-                parent.appendChild(node)
-        return nodes
+
+        return self._edit(lambda nodes: self._place_after(elem, nodes), xml_content)
 
     def insert_before(self, elem, xml_content):
         """
@@ -262,11 +334,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_before(elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
-        nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            parent.insertBefore(node, elem)
-        return nodes
+
+        return self._edit(lambda nodes: self._place_before(elem, nodes), xml_content)
 
     def append_to(self, elem, xml_content):
         """
@@ -282,16 +351,14 @@ class XMLEditor:
         Example:
             new_nodes = editor.append_to(elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            elem.appendChild(node)
-        return nodes
+
+        return self._edit(lambda nodes: self._place_inside(elem, nodes), xml_content)
 
     def get_next_rid(self):
         """Get the next available rId for relationships files."""
         max_id = 0
-        for rel_elem in self.dom.getElementsByTagName("Relationship"):
-            rel_id = rel_elem.getAttribute("Id")
+        for rel_elem in self._index.candidates("Relationship"):
+            rel_id = self._index.attribute(rel_elem, "Id")
             if rel_id.startswith("rId"):
                 try:
                     max_id = max(max_id, int(rel_id[3:]))
@@ -304,10 +371,129 @@ class XMLEditor:
         Save the edited XML back to the file.
 
         Serializes the DOM tree and writes it back to the original file path,
-        preserving the original encoding (ascii or utf-8).
+        preserving the original encoding (ascii or utf-8). The file is left
+        untouched if its content would not change. Otherwise it is replaced
+        atomically (written next to it and renamed), never rewritten in place,
+        so an interrupted save never leaves a truncated part.
+
+        Returns:
+            bool: True if the file was written, False if it was already up to date
+        """
+        content = self._serialize()
+        digest = _digest(content)
+        if digest == self._saved_digest:
+            return False
+        temp_path = self.xml_path.with_name(f".{self.xml_path.name}.{os.getpid()}.tmp")
+        try:
+            temp_path.write_bytes(content)
+            os.replace(temp_path, self.xml_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._saved_digest = digest
+        return True
+
+    def _serialize(self):
+        """Return the document as bytes in the file's encoding."""
+        return self.dom.toxml(encoding=self.encoding)
+
+    def _replace_with(self, elem, nodes):
+        """Put nodes in place of elem and return them."""
+        parent = elem.parentNode
+        for node in nodes:
+            parent.insertBefore(node, elem)
+        parent.removeChild(elem)
+        return nodes
+
+    def _place_after(self, elem, nodes):
+        """Insert nodes right after elem and return them."""
+        parent = elem.parentNode
+        next_sibling = elem.nextSibling
+        for node in nodes:
+            if next_sibling:
+                parent.insertBefore(node, next_sibling)
+            else:
+                parent.appendChild(node)
+        return nodes
+
+    def _place_before(self, elem, nodes):
+        """Insert nodes right before elem and return them."""
+        parent = elem.parentNode
+        for node in nodes:
+            parent.insertBefore(node, elem)
+        return nodes
+
+    def _place_inside(self, elem, nodes):
+        """Append nodes as the last children of elem and return them."""
+        for node in nodes:
+            elem.appendChild(node)
+        return nodes
+
+    def _edit(self, apply, xml_content=None):
+        """
+        Apply an edit now, or queue it until the open batch exits.
+
+        Args:
+            apply: Callable that receives the parsed fragment nodes (None without
+                a fragment), changes the DOM and returns the new or changed nodes
+            xml_content: Optional XML fragment to parse for the edit
+
+        Returns:
+            list: The fragment nodes, filled in once the edit is applied
+        """
+        edit = (apply, xml_content, [])
+        if self._batch is not None:
+            self._batch.append(edit)
+        else:
+            self._apply_edits([edit])
+        return edit[2]
+
+    def _apply_edits(self, edits):
+        """Parse the fragments of all edits at once, then apply them in order."""
+        parsed = iter(
+            self._parse_fragments([xml for _, xml, _ in edits if xml is not None])
+        )
+        changed = []
+        for apply, xml_content, result in edits:
+            nodes = next(parsed) if xml_content is not None else None
+            changed.extend(apply(nodes))
+            result.extend(nodes or ())
+        self._edits_applied(changed)
+
+    def _edits_applied(self, nodes):
+        """Called once with the nodes added or changed by a group of edits."""
+        self._index.changed(nodes)
+
+    def _parse_fragments(self, fragments):
+        """
+        Parse several XML fragments with a single parser run.
+
+        Returns:
+            List of node lists, one per fragment, as returned by _parse_fragment
         """
-        content = self.dom.toxml(encoding=self.encoding)
-        self.xml_path.write_bytes(content)
+        if len(fragments) < 2:
+            return [self._parse_fragment(f) for f in fragments]
+
+        wrapped = "".join(f"<fragment>{f}</fragment>" for f in fragments)
+        try:
+            containers = self._parse_fragment(wrapped)
+        except (ExpatError, AssertionError):
+            containers = None
+        if len(containers or ()) != len(fragments) or any(
+            c.nodeType != c.ELEMENT_NODE or c.tagName != "fragment" for c in containers
+        ):
+            # Parse one at a time so the error names the offending fragment
+            return [self._parse_fragment(f) for f in fragments]
+
+        parsed = []
+        for container in containers:
+            nodes = list(container.childNodes)
+            elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+            assert elements, "Fragment must contain at least one element"
+            for node in nodes:
+                container.removeChild(node)
+            parsed.append(nodes)
+        return parsed
 
     def _parse_fragment(self, xml_content):
         """
@@ -334,15 +520,775 @@ class XMLEditor:
         ns_decl = " ".join(namespaces)
         wrapper = f"<root {ns_decl}>{xml_content}</root>"
         fragment_doc = defusedxml.minidom.parseString(wrapper)
-        nodes = [
-            self.dom.importNode(child, deep=True)
-            for child in fragment_doc.documentElement.childNodes  # type: ignore
-        ]
+        nodes = _adopt_children(fragment_doc.documentElement, self.dom)
         elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
         assert elements, "Fragment must contain at least one element"
         return nodes
 
 
+def _adopt_children(parent, document):
+    """Detach the children of parent and move them into document.
+
+    The fragment's own document is thrown away, so its nodes are handed over
+    instead of copied: importNode would clone every node and attribute.
+
+    Returns:
+        list: The detached child nodes
+    """
+    nodes = list(parent.childNodes)
+    for node in nodes:
+        parent.removeChild(node)
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        node.ownerDocument = document
+        if node.nodeType == node.ELEMENT_NODE:
+            for attr in (node._attrs or {}).values():
+                attr.ownerDocument = document
+            stack.extend(node.childNodes)
+    return nodes
+
+
+class LxmlXMLEditor(XMLEditor):
+    """
+    XMLEditor backed by lxml instead of minidom.
+
+    Offers the same get_node, replace_node, insert_after, insert_before,
+    append_to, batch and save API, but works on lxml elements: the trees are far
+    smaller and faster to build and serialize than minidom's, which matters for
+    very large parts. Line numbers come from lxml's sourceline, and tag and
+    attribute names in lookups use the prefixes declared on the root element
+    (e.g. "w:p", "w:id"). Parsing is hardened: entities are not expanded, the
+    network is never accessed and documents declaring entities are rejected.
+
+    Unlike minidom, lxml keeps text inside elements (text and tail), so the edit
+    methods return only the inserted elements, and text between elements in a
+    fragment must be whitespace.
+
+    Attributes:
+        xml_path: Path to the XML file being edited
+        encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        tree: Parsed lxml.etree._ElementTree
+        root: Root element of the tree
+    """
+
+    def _load(self, content):
+        """Parse the file into self.tree with the hardened parser."""
+        self.tree = lxml.etree.ElementTree(
+            lxml.etree.fromstring(content, _hardened_parser())
+        )
+        dtd = self.tree.docinfo.internalDTD
+        for entity in dtd.iterentities() if dtd is not None else ():
+            raise EntitiesForbidden(
+                entity.name, entity.content, None, entity.system_url, None, None
+            )
+        self.root = self.tree.getroot()
+        self._index = _LxmlElementIndex(self.root)
+
+    def _serialize(self):
+        docinfo = self.tree.docinfo
+        standalone = ' standalone="yes"' if docinfo.standalone else ""
+        declaration = f'<?xml version="1.0" encoding="{self.encoding}"{standalone}?>\n'
+        return declaration.encode("ascii") + lxml.etree.tostring(
+            self.tree, encoding=self.encoding, xml_declaration=False
+        )
+
+    def _replace_with(self, elem, nodes):
+        self._place_before(elem, nodes)
+        # elem's tail is the parent's text after it and must stay there
+        if elem.tail:
+            nodes[-1].tail = (nodes[-1].tail or "") + elem.tail
+        elem.getparent().remove(elem)
+        return nodes
+
+    def _place_after(self, elem, nodes):
+        anchor = elem
+        for node in nodes:
+            anchor.addnext(node)
+            anchor = node
+        return nodes
+
+    def _place_before(self, elem, nodes):
+        for node in nodes:
+            elem.addprevious(node)
+        return nodes
+
+    def _place_inside(self, elem, nodes):
+        for node in nodes:
+            elem.append(node)
+        return nodes
+
+    def _parse_fragments(self, fragments):
+        """
+        Parse several XML fragments with a single parser run.
+
+        Returns:
+            List of element lists, one per fragment, as returned by _parse_fragment
+        """
+        if len(fragments) < 2:
+            return [self._parse_fragment(f) for f in fragments]
+
+        wrapped = "".join(f"<fragment>{f}</fragment>" for f in fragments)
+        try:
+            containers = self._parse_fragment(wrapped)
+        except (lxml.etree.XMLSyntaxError, AssertionError):
+            containers = None
+        if len(containers or ()) != len(fragments) or any(
+            c.tag != "fragment" or (c.tail or "").strip() for c in containers
+        ):
+            # Parse one at a time so the error names the offending fragment
+            return [self._parse_fragment(f) for f in fragments]
+        return [_fragment_children(container) for container in containers]
+
+    def _parse_fragment(self, xml_content):
+        """
+        Parse XML fragment and return its top-level elements.
+
+        Args:
+            xml_content: String containing XML fragment
+
+        Returns:
+            List of lxml elements (and comments), not attached to any tree
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the fragment is not well-formed
+            AssertionError: If fragment contains no elements or loose text
+        """
+        # Declare the root element's namespaces around the fragment
+        ns_decl = " ".join(
+            f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"'
+            for prefix, uri in self.root.nsmap.items()
+        )
+        wrapper = lxml.etree.fromstring(
+            f"<root {ns_decl}>{xml_content}</root>", _hardened_parser()
+        )
+        return _fragment_children(wrapper)
+
+
+class SegmentedXMLEditor(XMLEditor):
+    """
+    XMLEditor that only parses the parts of a large file that lookups reach.
+
+    Opening the file records where each child of the container element starts
+    (byte offset, line and column), in one expat pass that builds no DOM. These
+    children are the segments; the container is the root element unless a
+    subclass names another (e.g. "w:body"). self.dom starts out with everything
+    outside the container and no segments, and get_node parses each segment
+    that may hold a match into it before searching. Candidates are found by line
+    range and by searching the raw bytes for the tag and simple attribute values
+    and the segment text for contains. On save the parsed segments are
+    serialized from the DOM and all others are copied from the file verbatim,
+    so memory and save time follow the part of the file that was looked up
+    rather than its size.
+
+    Lookups that can only be narrowed by a common tag (get_node(tag="w:p")) or
+    by "*" parse every segment with such an element. self.dom only holds the
+    segments parsed so far: walk it directly only below nodes found with
+    get_node.
+
+    Attributes:
+        xml_path: Path to the XML file being edited
+        encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        dom: DOM tree with everything outside the container and parsed segments
+        container: Tag of the element whose children are the segments, or None
+            for the root element
+    """
+
+    container = None
+
+    def _load(self, content):
+        """Index the segments, and parse the rest of the file into self.dom."""
+        self._content = content
+        self._bounds, self._lines, self._columns = _scan_children(
+            content, self.container
+        )
+        # Text of every segment without whitespace, and where each one starts
+        self._text = None
+        self._text_bounds = None
+        # Byte pattern -> set of segments it occurs in
+        self._matching = {}
+
+        count = len(self._lines)
+        if count:
+            content = content[: self._bounds[0]] + content[self._bounds[-1] :]
+        self.dom = defusedxml.minidom.parse(
+            io.BytesIO(content), _create_line_tracking_parser()
+        )
+        self._index = _ElementIndex(self.dom)
+
+        root = self.dom.documentElement
+        container = next(
+            (e for e in _iter_elements(root) if self.container in (None, e.tagName)),
+            root,
+        )
+        self._namespaces = " ".join(
+            f'{attr.name}="{html.escape(attr.value)}"'
+            for elem in {root: None, container: None}
+            for attr in elem.attributes.values()
+            if attr.name.startswith("xmlns")
+        )
+
+        # Segments still unparsed are runs [start, stop) whose bytes are spliced
+        # in at the processing instruction standing in for them
+        self._gap_target = f"segments-{os.urandom(8).hex()}"
+        self._gap_pattern = re.compile(
+            rb"<\?%s (\d+) (\d+)\?>" % self._gap_target.encode()
+        )
+        self._gap_starts = []
+        self._gaps = {}  # start -> (stop, processing instruction)
+        if count:
+            marker = self.dom.createProcessingInstruction(self._gap_target, "")
+            container.appendChild(marker)
+            self._set_gap(0, count, marker)
+
+    def get_node(
+        self,
+        tag: str,
+        attrs: Optional[dict[str, str]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+    ):
+        """
+        Get a DOM element by tag and identifier, parsing the segments it may be in.
+
+        Same filters and errors as XMLEditor.get_node.
+        """
+        for segment in self._candidate_segments(tag, attrs, line_number, contains):
+            self._open_segment(segment)
+        return super().get_node(tag, attrs, line_number, contains)
+
+    def _serialize(self):
+        """Serialize the DOM and splice in the bytes of the unparsed segments."""
+        serialized = self.dom.toxml(encoding=self.encoding)
+        content = memoryview(self._content)
+        pieces = []
+        position = 0
+        for match in self._gap_pattern.finditer(serialized):
+            pieces.append(serialized[position : match.start()])
+            start, stop = int(match[1]), int(match[2])
+            pieces.append(content[self._bounds[start] : self._bounds[stop]])
+            position = match.end()
+        pieces.append(serialized[position:])
+        return b"".join(pieces)
+
+    def _candidate_segments(self, tag, attrs, line_number, contains):
+        """Return the unparsed segments that may hold an element matching the filters."""
+        if not self._lines:
+            return []
+        patterns = []
+        if tag != "*":
+            patterns.append(rb"<%s[\s/>]" % re.escape(tag.encode()))
+        for name, value in (attrs or {}).items():
+            if value and _PLAIN_VALUE.fullmatch(value):
+                patterns.append(
+                    rb"%s\s*=\s*([\"'])%s\1"
+                    % (re.escape(name.encode()), re.escape(value.encode()))
+                )
+
+        count = len(self._lines)
+        segments = range(count)
+        if line_number is not None:
+            # Elements of a segment start between its first line and the next's
+            if isinstance(line_number, range):
+                first, last = line_number.start, line_number.stop - 1
+            else:
+                first = last = line_number
+            start = bisect.bisect_left(self._lines, first)
+            # The segment before may run on into the first line
+            if start and (
+                start == count
+                or self._lines[start] > first
+                or not self._ends_with_newline(start - 1)
+            ):
+                start -= 1
+            segments = range(start, bisect.bisect_right(self._lines, last))
+        for pattern in patterns:
+            if len(segments) * 8 < count:
+                # Few candidates left: search only their bytes
+                search = re.compile(pattern).search
+                segments = [
+                    s
+                    for s in segments
+                    if search(self._content, self._bounds[s], self._bounds[s + 1])
+                ]
+            elif len(segments) == count:
+                segments = self._segments_matching(pattern)
+            else:
+                segments = self._segments_matching(pattern).intersection(segments)
+
+        if contains is not None:
+            needle = "".join(html.unescape(contains).split())
+            if needle:
+                segments = set(segments) & self._segments_containing(needle)
+
+        return sorted(s for s in segments if self._gap_of(s) is not None)
+
+    def _ends_with_newline(self, segment):
+        """Whether a line break follows the last tag in a segment."""
+        end = self._bounds[segment + 1]
+        last_tag = self._content.rfind(b"<", self._bounds[segment], end)
+        return self._content.find(b"\n", last_tag, end) >= 0
+
+    def _segments_matching(self, pattern):
+        """Return the set of segments whose bytes match a pattern, cached."""
+        segments = self._matching.get(pattern)
+        if segments is None:
+            segments = set()
+            search = re.compile(pattern).search
+            position, end = self._bounds[0], self._bounds[-1]
+            while match := search(self._content, position, end):
+                segment = bisect.bisect_right(self._bounds, match.start()) - 1
+                segments.add(segment)
+                # One match is enough; go on with the next segment
+                position = self._bounds[segment + 1]
+            self._matching[pattern] = segments
+        return segments
+
+    def _segments_containing(self, needle):
+        """Return the set of segments whose text (without whitespace) holds needle."""
+        if self._text is None:
+            self._text, self._text_bounds = _scan_text(self._content, self._bounds)
+        segments = set()
+        position = self._text.find(needle)
+        while position >= 0:
+            segment = bisect.bisect_right(self._text_bounds, position) - 1
+            # Text of one element never spans two segments
+            if position + len(needle) <= self._text_bounds[segment + 1]:
+                segments.add(segment)
+            position = self._text.find(needle, position + 1)
+        return segments
+
+    def _gap_of(self, segment):
+        """Return the start of the unparsed run holding segment, or None if parsed."""
+        i = bisect.bisect_right(self._gap_starts, segment) - 1
+        if i >= 0 and segment < self._gaps[self._gap_starts[i]][0]:
+            return self._gap_starts[i]
+        return None
+
+    def _set_gap(self, start, stop, marker):
+        """Record that marker stands in for the unparsed segments [start, stop)."""
+        if start not in self._gaps:
+            bisect.insort(self._gap_starts, start)
+        marker.data = f"{start} {stop}"
+        self._gaps[start] = (stop, marker)
+
+    def _open_segment(self, segment):
+        """Parse an unparsed segment into the DOM where its bytes would go."""
+        start = self._gap_of(segment)
+        if start is None:
+            return
+        stop, marker = self._gaps.pop(start)
+        self._gap_starts.remove(start)
+
+        nodes = self._parse_segment(segment)
+        parent, anchor = marker.parentNode, marker.nextSibling
+        for node in nodes:
+            parent.insertBefore(node, anchor)
+        if segment + 1 < stop:
+            after = self.dom.createProcessingInstruction(self._gap_target, "")
+            parent.insertBefore(after, anchor)
+            self._set_gap(segment + 1, stop, after)
+        if start < segment:
+            self._set_gap(start, segment, marker)
+        else:
+            parent.removeChild(marker)
+        self._index.changed(nodes)
+
+    def _parse_segment(self, segment):
+        """Parse a segment's bytes, with parse positions as in the whole file."""
+        prefix = f"<root {self._namespaces}>".encode()
+        wrapper = b"%s%s</root>" % (
+            prefix,
+            self._content[self._bounds[segment] : self._bounds[segment + 1]],
+        )
+        fragment_doc = defusedxml.minidom.parse(
+            io.BytesIO(wrapper), _create_line_tracking_parser()
+        )
+        line, column = self._lines[segment], self._columns[segment]
+        nodes = _adopt_children(fragment_doc.documentElement, self.dom)
+        for node in nodes:
+            for elem in _iter_elements(node):
+                parsed_line, parsed_column = elem.parse_position
+                if parsed_line == 1:
+                    parsed_column += column - len(prefix)
+                elem.parse_position = (parsed_line + line - 1, parsed_column)
+        return nodes
+
+
+class _ElementIndex:
+    """
+    Lazily built lookup indexes over the elements of a DOM.
+
+    Keeps elements by tag, by (tag, attribute, value) and by tag and parse line,
+    plus the extracted text of each element. Buckets may still hold elements that
+    were since removed or changed, so callers re-check every candidate; they never
+    miss a matching element as long as every insertion or modification is
+    reported through changed().
+
+    Node access goes through a few small methods (tag, attribute, line, parent)
+    that subclasses override for other tree implementations. Other indexes over
+    the same tree (such as a TextIndex) can be added to listeners to have their
+    clear() and changed() called along with this index's.
+    """
+
+    def __init__(self, dom):
+        self.dom = dom
+        self.listeners = []
+        self.clear()
+
+    def clear(self):
+        """Forget all indexes; they are rebuilt on the next lookup."""
+        for listener in self.listeners:
+            listener.clear()
+        # tag -> {element: None}, in document order at build time; "*" holds all
+        self._by_tag = None
+        # (tag, attribute) -> {value: {element: None}}
+        self._by_attr = {}
+        # tag -> (sorted line numbers, {line: {element: None}})
+        self._by_line = {}
+        # element -> extracted text
+        self._text = {}
+        # (node, deep) pairs to add to the indexes before the next lookup
+        self._pending = []
+
+    def candidates(self, tag, attrs=None, line_number=None):
+        """Return attached elements that may match the given filters.
+
+        Every element matching tag, attrs and line_number is included; some
+        returned elements may not match and must be checked by the caller.
+        """
+        self._sync()
+        if attrs:
+            attr, value = next(iter(attrs.items()))
+            bucket = self._attr_buckets(tag, attr).get(value, {})
+        elif line_number is not None:
+            bucket = self._line_bucket(tag, line_number)
+        else:
+            bucket = self._by_tag.get(tag, {})
+        return [elem for elem in bucket if self._is_attached(elem)]
+
+    def attribute(self, elem, name):
+        """Return the value of an attribute, or "" if elem does not have it."""
+        return elem.getAttribute(name)
+
+    def line(self, elem):
+        """Return the line elem started on in the parsed file, or None if added later."""
+        return getattr(elem, "parse_position", (None,))[0]
+
+    def _tag(self, elem):
+        return elem.tagName
+
+    def _parent(self, node):
+        return node.parentNode
+
+    def _is_element(self, node):
+        return node.nodeType == node.ELEMENT_NODE
+
+    def _elements(self, node):
+        return _iter_elements(node)
+
+    def text(self, elem, fresh=False):
+        """Return the text of all non-whitespace text nodes within elem.
+
+        The text is cached until changed() reports elem or a node around it;
+        fresh=True re-reads it from the tree, for text nodes edited directly.
+        """
+        text = None if fresh else self._text.get(elem)
+        if text is None:
+            text_parts = []
+            for node in elem.childNodes:
+                if node.nodeType == node.TEXT_NODE:
+                    # Skip whitespace-only text nodes (XML formatting)
+                    if node.data.strip():
+                        text_parts.append(node.data)
+                elif node.nodeType == node.ELEMENT_NODE:
+                    text_parts.append(self.text(node, fresh))
+            text = "".join(text_parts)
+            self._text[elem] = text
+        return text
+
+    def changed(self, nodes, deep=True):
+        """Record nodes that were inserted or modified in place.
+
+        Drops the cached text of each node, its ancestors and (if deep) its
+        descendants, and queues the elements to be re-indexed.
+
+        Args:
+            nodes: Nodes that were inserted, or whose attributes or content changed
+            deep: If False, only the nodes themselves changed, not their subtrees
+        """
+        for listener in self.listeners:
+            listener.changed(nodes, deep)
+        if self._by_tag is None:
+            return
+        for node in nodes:
+            parent = self._parent(node)
+            while parent is not None:
+                self._text.pop(parent, None)
+                parent = self._parent(parent)
+            for elem in self._elements(node) if deep else [node]:
+                self._text.pop(elem, None)
+            if self._is_element(node):
+                self._pending.append((node, deep))
+
+    def _sync(self):
+        """Build the tag index, or add the elements changed since the last lookup."""
+        if self._by_tag is None:
+            self._by_tag = {"*": {}}
+            tag_of, every = self._tag, self._by_tag["*"]
+            for elem in self._elements(self.dom):
+                self._by_tag.setdefault(tag_of(elem), {})[elem] = None
+                every[elem] = None
+            return
+
+        pending, self._pending = self._pending, []
+        for node, deep in pending:
+            for elem in self._elements(node) if deep else [node]:
+                self._add(elem)
+
+    def _add(self, elem):
+        """Add an element to every index built so far, under its current values."""
+        elem_tag = self._tag(elem)
+        self._by_tag.setdefault(elem_tag, {})[elem] = None
+        self._by_tag["*"][elem] = None
+        for tag in (elem_tag, "*"):
+            for (index_tag, attr), buckets in self._by_attr.items():
+                if index_tag == tag:
+                    buckets.setdefault(self.attribute(elem, attr), {})[elem] = None
+            line = self.line(elem)
+            if line is not None and tag in self._by_line:
+                lines, buckets = self._by_line[tag]
+                if line not in buckets:
+                    bisect.insort(lines, line)
+                buckets.setdefault(line, {})[elem] = None
+
+    def _attr_buckets(self, tag, attr):
+        buckets = self._by_attr.get((tag, attr))
+        if buckets is None:
+            buckets = {}
+            for elem in self._by_tag.get(tag, {}):
+                # A missing attribute reads as "", as get_node expects
+                buckets.setdefault(self.attribute(elem, attr), {})[elem] = None
+            self._by_attr[(tag, attr)] = buckets
+        return buckets
+
+    def _line_bucket(self, tag, line_number):
+        if tag not in self._by_line:
+            buckets = {}
+            for elem in self._by_tag.get(tag, {}):
+                line = self.line(elem)
+                if line is not None:
+                    buckets.setdefault(line, {})[elem] = None
+            self._by_line[tag] = (sorted(buckets), buckets)
+
+        lines, buckets = self._by_line[tag]
+        if not isinstance(line_number, range):
+            return buckets.get(line_number, {})
+        if line_number.step != 1:
+            return {
+                elem: None for line in line_number for elem in buckets.get(line, {})
+            }
+        start = bisect.bisect_left(lines, line_number.start)
+        stop = bisect.bisect_left(lines, line_number.stop)
+        return {elem: None for line in lines[start:stop] for elem in buckets[line]}
+
+    def _is_attached(self, node):
+        """Check if node is still part of the document."""
+        parent = self._parent(node)
+        while parent is not None:
+            node, parent = parent, self._parent(parent)
+        return node is self.dom
+
+
+class _LxmlElementIndex(_ElementIndex):
+    """
+    _ElementIndex over an lxml tree.
+
+    Elements are indexed by their Clark names ({namespace}local); lookups by
+    prefixed name are resolved through the root element's namespace
+    declarations. The index keeps a reference to every indexed element, so their
+    lxml proxies, and with them identity and hashing, stay stable.
+    """
+
+    def candidates(self, tag, attrs=None, line_number=None):
+        tag = self._clark(tag, attribute=False)
+        if attrs:
+            attrs = {self._clark(name): value for name, value in attrs.items()}
+        return super().candidates(tag, attrs, line_number)
+
+    def attribute(self, elem, name):
+        return elem.get(self._clark(name), "")
+
+    def line(self, elem):
+        # Added elements have their line cleared to 0, which reads as None
+        return elem.sourceline or None
+
+    def _tag(self, elem):
+        return elem.tag
+
+    def _parent(self, node):
+        return node.getparent()
+
+    def _is_element(self, node):
+        return isinstance(node.tag, str)
+
+    def _elements(self, node):
+        return node.iter(lxml.etree.Element)
+
+    def text(self, elem, fresh=False):
+        text = None if fresh else self._text.get(elem)
+        if text is None:
+            # Skip whitespace-only text nodes (XML formatting)
+            text = "".join(filter(str.strip, _TEXT_NODES(elem)))
+            self._text[elem] = text
+        return text
+
+    def _clark(self, name, attribute=True):
+        """Return the Clark name of a prefixed element or attribute name.
+
+        Unprefixed attributes have no namespace, while unprefixed elements are
+        in the default namespace. Names with undeclared prefixes are returned
+        unchanged and match nothing.
+        """
+        if name == "*" or name.startswith("{"):
+            return name
+        prefix, _, local = name.rpartition(":")
+        if prefix == "xml":
+            return f"{{{_XML_NS}}}{local}"
+        if not prefix and attribute:
+            return local
+        uri = self.dom.nsmap.get(prefix or None)
+        return f"{{{uri}}}{local}" if uri else name
+
+
+def _iter_elements(node):
+    """Yield node (if an element) and all its descendant elements in document order."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.nodeType == node.ELEMENT_NODE:
+            yield node
+        stack.extend(reversed(node.childNodes))
+
+
+def _scan_children(content, container):
+    """
+    Find where the children of the container element start, without a tree.
+
+    Args:
+        content: XML document as bytes
+        container: Tag of the container element, or None for the root element
+
+    Returns:
+        (bounds, lines, columns): Arrays of the byte offset of each child's
+        start tag followed by that of the container's end tag, and of the line
+        and column each child starts at. All are empty if the container has no
+        children.
+
+    Raises:
+        ExpatError: If the document is not well-formed
+        EntitiesForbidden: If the document declares entities
+    """
+    parser = ParserCreate()
+    parser.EntityDeclHandler = _forbid_entity
+    bounds, lines, columns = array("q"), array("q"), array("q")
+    depth = 0
+    container_depth = None  # Depth of the container while it is open
+    found = False
+
+    def start_element(name, attrs):
+        nonlocal depth, container_depth, found
+        depth += 1
+        if container_depth is not None:
+            if depth == container_depth + 1:
+                bounds.append(parser.CurrentByteIndex)
+                lines.append(parser.CurrentLineNumber)
+                columns.append(parser.CurrentColumnNumber)
+        elif not found and container in (None, name):
+            container_depth, found = depth, True
+
+    def end_element(name):
+        nonlocal depth, container_depth
+        if depth == container_depth:
+            bounds.append(parser.CurrentByteIndex)
+            container_depth = None
+        depth -= 1
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.Parse(content, True)
+    if not lines:
+        del bounds[:]
+    return bounds, lines, columns
+
+
+def _scan_text(content, bounds):
+    """
+    Return the text of every segment with whitespace removed, as one string.
+
+    Args:
+        content: XML document as bytes
+        bounds: Segment offsets, as returned by _scan_children
+
+    Returns:
+        (text, text_bounds): The joined text, and the offset in it where each
+        segment's text starts followed by the length of the text
+    """
+    # Prefixes need no declarations, as the parser does not process namespaces
+    parser = ParserCreate()
+    parser.EntityDeclHandler = _forbid_entity
+    pieces = []
+    parser.CharacterDataHandler = pieces.append
+    parser.Parse(b"<segments>", False)
+    view = memoryview(content)
+    text, text_bounds = io.StringIO(), array("q", [0])
+    for start, stop in zip(bounds, bounds[1:]):
+        # Text is reported by the end of the segment's last element; pieces held
+        # back until the next segment are whitespace between elements
+        parser.Parse(view[start:stop], False)
+        text_bounds.append(
+            text_bounds[-1] + text.write("".join("".join(pieces).split()))
+        )
+        pieces.clear()
+    parser.Parse(b"</segments>", True)
+    return text.getvalue(), text_bounds
+
+
+def _forbid_entity(name, is_parameter, value, base, system_id, public_id, notation):
+    """Expat entity declaration handler that rejects every entity, as defusedxml does."""
+    raise EntitiesForbidden(name, value, base, system_id, public_id, notation)
+
+
+def _digest(content):
+    """Return a digest of file content for change detection."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _hardened_parser():
+    """Return an lxml parser that keeps line numbers and never expands entities."""
+    return lxml.etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False)
+
+
+def _fragment_children(container):
+    """Detach and return the children of a parsed fragment container.
+
+    Their line numbers within the fragment are cleared, so that, as with minidom,
+    added elements have no line (sourceline None) and line lookups only find
+    elements parsed from the file.
+    """
+    assert not (container.text or "").strip(), "Fragment text must be in an element"
+    nodes = list(container)
+    assert any(isinstance(n.tag, str) for n in nodes), (
+        "Fragment must contain at least one element"
+    )
+    for node in nodes:
+        assert not (node.tail or "").strip(), "Fragment text must be in an element"
+        container.remove(node)
+        for elem in node.iter():
+            elem.sourceline = 0
+    return nodes
+
+
 def _create_line_tracking_parser():
     """
     Create a SAX parser that tracks line and column numbers for each element.
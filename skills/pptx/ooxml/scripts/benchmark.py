@@ -0,0 +1,850 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the OOXML pack/unpack/validate pipeline on synthetic documents.
+
+Usage:
+    python benchmark.py                      # Run all scenarios
+    python benchmark.py original-baseline    # Run selected scenarios
+    python benchmark.py --list
+    python benchmark.py docx-pipeline --json results.json
+    python benchmark.py docx-pipeline --compare results.json  # Report regressions
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pack import condense_xml_bytes, condense_xml_minidom, pack_document
+from synthetic import docx_document_xml, make_docx, make_pptx, make_xlsx
+from unpack import pretty_print_minidom, pretty_print_xml_bytes, unpack_document
+from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validation.results import ResultCache
+from validation.trees import TreeStore
+
+SCENARIOS = {}
+
+# Measurements of this run, as dicts for --json and --compare
+RESULTS = []
+
+# Name of the scenario being run, stored with each measurement
+CURRENT_SCENARIO = None
+
+
+def scenario(name):
+    """Register a benchmark scenario under the given name."""
+
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+
+    return register
+
+
+def timed(func, repeat=3):
+    """Return the best wall time of func over repeat runs, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def record(metric, value, unit="s", **params):
+    """Store a measurement of the running scenario and return the value.
+
+    Args:
+        metric: What was measured, such as "validate" or "pack"
+        value: The measurement
+        unit: Unit of value; "s" marks times, which --compare checks for
+            regressions
+        **params: Inputs that identify the measurement within the scenario,
+            such as the document size
+    """
+    RESULTS.append(
+        {
+            "scenario": CURRENT_SCENARIO,
+            "metric": metric,
+            "params": params,
+            "value": value,
+            "unit": unit,
+        }
+    )
+    return value
+
+
+def quiet(func):
+    """Wrap func so that anything it prints is discarded."""
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+
+    return run
+
+
+def unpack_to(docx_path, target_dir):
+    """Extract an Office file into target_dir and return the directory."""
+    target_dir = Path(target_dir)
+    with zipfile.ZipFile(docx_path) as zf:
+        zf.extractall(target_dir)
+    return target_dir
+
+
+@scenario("original-baseline")
+def bench_original_baseline(work_dir, repeat):
+    """XSD diffing against the original as parts with errors and archive size grow.
+
+    Every header carries an error that also exists in the original, so each one
+    must be checked against the original copy of the part.
+    """
+    print(f"{'parts w/ errors':>16} {'archive KB':>11} {'validate (s)':>13}")
+    for parts in (1, 8, 32):
+        for media_kb in (0, 4096):
+            docx_path = make_docx(
+                work_dir / f"baseline_{parts}_{media_kb}.docx",
+                paragraphs=200,
+                headers=parts,
+                invalid_headers=parts,
+                media_kb=media_kb,
+            )
+            unpacked = unpack_to(docx_path, work_dir / f"baseline_{parts}_{media_kb}")
+
+            def run():
+                validator = DOCXSchemaValidator(unpacked, docx_path)
+                assert validator.validate_against_xsd()
+
+            elapsed = timed(quiet(run), repeat)
+            size_kb = docx_path.stat().st_size // 1024
+            record("validate_against_xsd", elapsed, parts=parts, archive_kb=size_kb)
+            print(f"{parts:>16} {size_kb:>11} {elapsed:>13.3f}")
+
+
+@scenario("tree-store")
+def bench_tree_store(work_dir, repeat):
+    """Full DOCX validation of a large document, parsing each part once.
+
+    The parse count is the number of times any file was parsed in one run.
+    """
+    print(f"{'paragraphs':>11} {'parts':>6} {'parses':>7} {'validate (s)':>13}")
+    for paragraphs in (1000, 10000):
+        docx_path = make_docx(
+            work_dir / f"trees_{paragraphs}.docx", paragraphs=paragraphs, headers=4
+        )
+        unpacked = unpack_to(docx_path, work_dir / f"trees_{paragraphs}")
+        stats = {}
+
+        def run():
+            trees = TreeStore()
+            validator = DOCXSchemaValidator(unpacked, docx_path, trees=trees)
+            assert validator.validate()
+            stats["parts"] = len(validator.xml_files)
+            stats["parses"] = trees.parse_count
+
+        elapsed = timed(quiet(run), repeat)
+        record("validate", elapsed, paragraphs=paragraphs)
+        record("parses", stats["parses"], unit="count", paragraphs=paragraphs)
+        print(
+            f"{paragraphs:>11} {stats['parts']:>6} {stats['parses']:>7} "
+            f"{elapsed:>13.3f}"
+        )
+
+
+@scenario("parallel")
+def bench_parallel(work_dir, repeat):
+    """Full DOCX validation of a 300-part document with a process pool."""
+    docx_path = make_docx(
+        work_dir / "parallel.docx", paragraphs=2000, headers=300, invalid_headers=30
+    )
+    unpacked = unpack_to(docx_path, work_dir / "parallel")
+
+    print(f"{'jobs':>5} {'validate (s)':>13}")
+    for jobs in sorted({1, 2, 4, os.cpu_count() or 1}):
+
+        def run():
+            validator = DOCXSchemaValidator(unpacked, docx_path, jobs=jobs)
+            assert validator.validate()
+
+        elapsed = record("validate", timed(quiet(run), repeat), jobs=jobs)
+        print(f"{jobs:>5} {elapsed:>13.3f}")
+
+
+@scenario("incremental")
+def bench_incremental(work_dir, repeat):
+    """Re-validation after editing one part, with and without cached results."""
+    docx_path = make_docx(
+        work_dir / "incremental.docx", paragraphs=2000, headers=300, invalid_headers=30
+    )
+    unpacked = unpack_to(docx_path, work_dir / "incremental")
+    header = unpacked / "word" / "header1.xml"
+    trees, results = TreeStore(), ResultCache()
+
+    def edit():
+        header.write_text(header.read_text().replace("</w:t>", " edited</w:t>", 1))
+        trees.invalidate(header)
+        results.invalidate([header])
+
+    def run(cached):
+        edit()
+        validator = DOCXSchemaValidator(
+            unpacked,
+            docx_path,
+            trees=trees if cached else TreeStore(),
+            results=results if cached else None,
+        )
+        assert validator.validate()
+
+    quiet(lambda: run(True))()  # Warm the caches
+    print(f"{'mode':>12} {'validate (s)':>13}")
+    for mode, cached in (("full", False), ("incremental", True)):
+        elapsed = timed(quiet(lambda: run(cached)), repeat)
+        record("validate", elapsed, mode=mode)
+        print(f"{mode:>12} {elapsed:>13.3f}")
+
+
+@scenario("pack")
+def bench_pack(work_dir, repeat):
+    """Packing an unpacked media-heavy document into an Office file."""
+    docx_path = make_docx(
+        work_dir / "pack.docx", paragraphs=2000, headers=20, media_kb=512, images=40
+    )
+    unpacked = unpack_to(docx_path, work_dir / "pack")
+    output = work_dir / "packed.docx"
+
+    print(f"{'jobs':>5} {'pack (s)':>9}")
+    for jobs in sorted({1, os.cpu_count() or 1}):
+        elapsed = timed(lambda: pack_document(unpacked, output, jobs=jobs), repeat)
+        record("pack", elapsed, jobs=jobs)
+        print(f"{jobs:>5} {elapsed:>9.3f}")
+
+
+@scenario("condense")
+def bench_condense(work_dir, repeat):
+    """Condensing a pretty-printed document.xml, streaming vs. the DOM version."""
+    print(f"{'paragraphs':>11} {'MB':>6} {'minidom (s)':>12} {'streaming (s)':>14}")
+    for paragraphs in (1000, 10000):
+        content = (
+            docx_document_xml(paragraphs, tracked_changes=paragraphs // 20)
+            .replace("<w:p>", "\n    <w:p>")
+            .replace("<w:r>", "\n      <w:r>")
+            .encode()
+        )
+        assert condense_xml_bytes(content) == condense_xml_minidom(content)
+        dom = timed(lambda: condense_xml_minidom(content), repeat)
+        streaming = timed(lambda: condense_xml_bytes(content), repeat)
+        size_mb = len(content) / 2**20
+        record("condense", dom, paragraphs=paragraphs, mode="minidom")
+        record("condense", streaming, paragraphs=paragraphs, mode="streaming")
+        print(f"{paragraphs:>11} {size_mb:>6.1f} {dom:>12.3f} {streaming:>14.3f}")
+
+
+@scenario("unpack")
+def bench_unpack(work_dir, repeat):
+    """Unpacking a large document: DOM formatting, streaming, parallel and lazy."""
+    docx_path = make_docx(work_dir / "unpack.docx", paragraphs=20000, headers=200)
+    output = work_dir / "unpack"
+
+    def dom():
+        # The previous implementation: extract everything, then reformat in place
+        with zipfile.ZipFile(docx_path) as zf:
+            zf.extractall(output)
+        for xml_file in list(output.rglob("*.xml")) + list(output.rglob("*.rels")):
+            xml_file.write_bytes(pretty_print_minidom(xml_file.read_bytes()))
+
+    print(f"{'mode':>12} {'unpack (s)':>11}")
+    elapsed = record("unpack", timed(dom, repeat), mode="minidom")
+    print(f"{'minidom':>12} {elapsed:>11.3f}")
+    for jobs in sorted({1, os.cpu_count() or 1}):
+        elapsed = timed(lambda: unpack_document(docx_path, output, jobs=jobs), repeat)
+        record("unpack", elapsed, mode=f"jobs={jobs}")
+        print(f"{f'jobs={jobs}':>12} {elapsed:>11.3f}")
+    elapsed = timed(lambda: unpack_document(docx_path, output, lazy=True), repeat)
+    record("unpack", elapsed, mode="lazy")
+    print(f"{'lazy':>12} {elapsed:>11.3f}")
+
+
+def docx_document_module():
+    """Return the docx skill's scripts.document module, or None outside the docx skill."""
+    skill_dir = Path(__file__).resolve().parents[2]
+    if not (skill_dir / "scripts" / "document.py").exists():
+        return None
+    if str(skill_dir) not in sys.path:
+        sys.path.insert(0, str(skill_dir))
+    from scripts import document
+
+    return document
+
+
+def docx_editors():
+    """Return the docx editor classes by backend, or None outside the docx skill."""
+    document = docx_document_module()
+    if document is None:
+        return None
+    return {
+        "minidom": document.DocxXMLEditor,
+        "lxml": document.LxmlDocxXMLEditor,
+        "segmented": document.SegmentedDocxXMLEditor,
+    }
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB.
+
+    Read from /proc where available: a spawned process starts with the
+    ru_maxrss of its parent on Linux, while VmHWM starts over with the new
+    program.
+    """
+    with contextlib.suppress(OSError):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_editor(backend, xml_path, changes):
+    """Open, query, edit and save a part with one editor backend.
+
+    Runs in a fresh process, so the peak RSS growth over the whole run is the
+    editor's own.
+    """
+    editor_class = docx_editors()[backend]
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    editor = editor_class(xml_path, rsid="00AB12CD")
+    opened = time.perf_counter()
+
+    editor.get_node(tag="w:p", contains=f"Inserted clause {changes - 1}.")
+    looked_up = time.perf_counter()
+    with editor.batch():
+        for change_id in range(0, changes, changes // 100):
+            ins = editor.get_node(tag="w:ins", attrs={"w:id": str(change_id)})
+            editor.revert_insertion(ins)
+    edited = time.perf_counter()
+    editor.save()
+    saved = time.perf_counter()
+    return (
+        opened - start,
+        peak_rss_mb() - rss_before,
+        looked_up - opened,
+        edited - looked_up,
+        saved - edited,
+    )
+
+
+@scenario("editor-backends")
+def bench_editor_backends(work_dir, repeat):
+    """Editing a 50 MB document.xml with each docx editor backend."""
+    if docx_editors() is None:
+        print("skipped: the editors ship with the docx skill")
+        return
+
+    changes = 2000
+    xml_path = work_dir / "document.xml"
+    content = docx_document_xml(320000, tracked_changes=changes).encode()
+    xml_path.write_bytes(pretty_print_xml_bytes(content))
+    size_mb = xml_path.stat().st_size / 2**20
+
+    print(f"{size_mb:.0f} MB, 100 insertions reverted in one batch")
+    print(
+        f"{'backend':>8} {'open (s)':>9} {'RSS (MB)':>9} {'lookup (s)':>11}"
+        f" {'edit (s)':>9} {'save (s)':>9}"
+    )
+    context = multiprocessing.get_context("spawn")
+    for backend in docx_editors():
+        # Each run is one fresh process; a repeat would reuse its warm memory
+        with context.Pool(1) as pool:
+            timings = pool.apply(measure_editor, (backend, xml_path, changes))
+        opened, rss, lookup, edit, save = timings
+        for metric, value in (
+            ("open", opened),
+            ("lookup", lookup),
+            ("edit", edit),
+            ("save", save),
+        ):
+            record(metric, value, backend=backend)
+        record("rss", rss, unit="MB", backend=backend)
+        print(
+            f"{backend:>8} {opened:>9.2f} {rss:>9.0f} {lookup:>11.2f}"
+            f" {edit:>9.2f} {save:>9.2f}"
+        )
+        xml_path.write_bytes(pretty_print_xml_bytes(content))
+
+
+@scenario("bulk-comments")
+def bench_bulk_comments(work_dir, repeat):
+    """Adding 2000 comments one at a time and with add_comments."""
+    document = docx_document_module()
+    if document is None:
+        print("skipped: Document ships with the docx skill")
+        return
+
+    count = 2000
+    docx_path = make_docx(work_dir / "comments.docx", paragraphs=count)
+    source = unpack_to(docx_path, work_dir / "comments")
+
+    def one_at_a_time(doc, paragraphs):
+        for i, paragraph in enumerate(paragraphs):
+            doc.add_comment(paragraph, paragraph, f"Comment {i}")
+
+    def bulk(doc, paragraphs):
+        doc.add_comments([(p, p, f"Comment {i}") for i, p in enumerate(paragraphs)])
+
+    print(f"{count} comments, one per paragraph")
+    print(f"{'mode':>12} {'time (s)':>9} {'comments/s':>11}")
+    for mode, add in (("add_comment", one_at_a_time), ("add_comments", bulk)):
+        best = None
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                doc = document.Document(source, rsid="00AB12CD")
+            body = doc["word/document.xml"].get_node(tag="w:body")
+            paragraphs = body.getElementsByTagName("w:p")[:count]
+            # Free the DOMs of earlier runs, which are full of reference cycles
+            gc.collect()
+            start = time.perf_counter()
+            add(doc, paragraphs)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        record("add", best, mode=mode, comments=count)
+        print(f"{mode:>12} {best:>9.3f} {count / best:>11.0f}")
+
+
+@scenario("text-index")
+def bench_text_index(work_dir, repeat):
+    """Locating 1000 clauses in a 20000-paragraph document.xml."""
+    document = docx_document_module()
+    if document is None:
+        print("skipped: the editors ship with the docx skill")
+        return
+
+    clauses = 1000
+    xml_path = work_dir / "document.xml"
+    content = docx_document_xml(20000, tracked_changes=clauses)
+    xml_path.write_bytes(pretty_print_xml_bytes(content.encode()))
+    phrases = [f"Inserted clause {i}." for i in range(clauses)]
+
+    def get_node():
+        editor = document.DocxXMLEditor(xml_path, rsid="00AB12CD")
+        start = time.perf_counter()
+        for phrase in phrases:
+            editor.get_node(tag="w:p", contains=phrase)
+        return 0.0, time.perf_counter() - start
+
+    def text_index():
+        editor = document.DocxXMLEditor(xml_path, rsid="00AB12CD")
+        start = time.perf_counter()
+        index = editor.text_index()
+        index.find_all(phrases[0])
+        built = time.perf_counter()
+        for phrase in phrases:
+            (match,) = index.find_all(phrase)
+        return built - start, time.perf_counter() - built
+
+    print(f"{clauses} lookups, parsing excluded")
+    print(f"{'lookup':>10} {'build (s)':>10} {'lookups (s)':>12} {'lookups/s':>10}")
+    for name, run in (("get_node", get_node), ("text_index", text_index)):
+        build, lookups = min(run() for _ in range(repeat))
+        record("build", build, lookup=name)
+        record("lookups", lookups, lookup=name, count=clauses)
+        print(f"{name:>10} {build:>10.3f} {lookups:>12.3f} {clauses / lookups:>10.0f}")
+
+
+def pipeline(steps, repeat):
+    """Run steps in order, repeat times over, and return each step's best time.
+
+    Args:
+        steps: List of (name, func); each run of a step starts from the
+            state the steps before it left behind
+        repeat: Number of runs of the whole pipeline
+    """
+    best = {}
+    for _ in range(repeat):
+        for name, func in steps:
+            elapsed = timed(quiet(func), 1)
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+@scenario("docx-pipeline")
+def bench_docx_pipeline(work_dir, repeat):
+    """Unpack, edit, validate and pack documents with tracked changes and comments.
+
+    The edit step opens the document with Document, deletes a run in every
+    20th paragraph as a tracked change, comments on the same paragraphs and
+    saves, so that the redlining check has changes to undo.
+    """
+    document = docx_document_module()
+    if document is None:
+        print("edit step skipped: Document ships with the docx skill")
+
+    names = ["unpack", "edit", "schema", "redlining", "pack"]
+    if document is None:
+        names.remove("edit")
+    print(
+        f"{'paragraphs':>11} {'changes':>8} {'comments':>9} "
+        + " ".join(f"{name + ' (s)':>14}" for name in names)
+    )
+    for paragraphs in (1000, 10000):
+        existing = paragraphs // 20
+        docx_path = make_docx(
+            work_dir / f"pipeline_{paragraphs}.docx",
+            paragraphs=paragraphs,
+            tracked_changes=existing,
+            comments=existing,
+            headers=4,
+        )
+        unpacked = work_dir / f"pipeline_{paragraphs}"
+        output = work_dir / f"pipeline_{paragraphs}_packed.docx"
+
+        def unpack():
+            shutil.rmtree(unpacked, ignore_errors=True)
+            unpack_document(docx_path, unpacked)
+
+        def edit():
+            doc = document.Document(unpacked, rsid="00AB12CD")
+            editor = doc["word/document.xml"]
+            # Offset by one from the paragraphs that carry the existing markup
+            targets = editor.dom.getElementsByTagName("w:p")[1::20]
+            runs = [p.getElementsByTagName("w:r")[0] for p in targets]
+            with editor.batch():
+                for run in runs:
+                    editor.suggest_deletion(run)
+            doc.add_comments([(p, p, f"Review {i}") for i, p in enumerate(targets)])
+            doc.save(validate=False)
+
+        def schema():
+            assert DOCXSchemaValidator(unpacked, docx_path).validate()
+
+        def redlining():
+            assert RedliningValidator(unpacked, docx_path).validate()
+
+        steps = {
+            "unpack": unpack,
+            "edit": edit,
+            "schema": schema,
+            "redlining": redlining,
+            "pack": lambda: pack_document(unpacked, output),
+        }
+        best = pipeline([(name, steps[name]) for name in names], repeat)
+        for name in names:
+            record(name, best[name], paragraphs=paragraphs)
+        print(
+            f"{paragraphs:>11} {existing:>8} {existing:>9} "
+            + " ".join(f"{best[name]:>14.3f}" for name in names)
+        )
+
+
+@scenario("pptx-pipeline")
+def bench_pptx_pipeline(work_dir, repeat):
+    """Unpack, validate and pack presentations with embedded images."""
+    print(
+        f"{'slides':>7} {'shapes':>7} {'images':>7} {'unpack (s)':>11}"
+        f" {'validate (s)':>13} {'pack (s)':>9}"
+    )
+    for slides, shapes, images in ((20, 8, 10), (200, 8, 100)):
+        pptx_path = make_pptx(
+            work_dir / f"pipeline_{slides}.pptx",
+            slides=slides,
+            shapes=shapes,
+            images=images,
+            media_kb=64,
+        )
+        unpacked = work_dir / f"pipeline_{slides}"
+        output = work_dir / f"pipeline_{slides}_packed.pptx"
+
+        def unpack():
+            shutil.rmtree(unpacked, ignore_errors=True)
+            unpack_document(pptx_path, unpacked)
+
+        def validate():
+            assert PPTXSchemaValidator(unpacked, pptx_path).validate()
+
+        best = pipeline(
+            [
+                ("unpack", unpack),
+                ("validate", validate),
+                ("pack", lambda: pack_document(unpacked, output)),
+            ],
+            repeat,
+        )
+        for name, elapsed in best.items():
+            record(name, elapsed, slides=slides, shapes=shapes, images=images)
+        print(
+            f"{slides:>7} {shapes:>7} {images:>7} {best['unpack']:>11.3f}"
+            f" {best['validate']:>13.3f} {best['pack']:>9.3f}"
+        )
+
+
+def pptx_scripts_module(name):
+    """Return a module of the pptx skill's scripts, or None without the pptx skill."""
+    scripts_dir = Path(__file__).resolve().parents[3] / "pptx" / "scripts"
+    if not (scripts_dir / f"{name}.py").exists():
+        return None
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+    return importlib.import_module(name)
+
+
+@scenario("pptx-inventory")
+def bench_pptx_inventory(work_dir, repeat):
+    """Text inventory and overflow estimation of text-dense decks."""
+    inventory = pptx_scripts_module("inventory")
+    if inventory is None:
+        print("skipped: inventory.py ships with the pptx skill")
+        return
+    text_measure = pptx_scripts_module("text_measure")
+    fonts = pptx_scripts_module("fonts")
+
+    print(
+        f"{'slides':>7} {'paragraphs':>11} {'inventory (s)':>14}"
+        f" {'wrap (s)':>9} {'whole-line wrap (s)':>20}"
+    )
+    for slides in (10, 40):
+        pptx_path = make_pptx(
+            work_dir / f"inventory_{slides}.pptx",
+            slides=slides,
+            shapes=6,
+            paragraphs=4,
+            words=60,
+        )
+        inventory_time = timed(
+            lambda: inventory.extract_text_inventory(pptx_path), repeat
+        )
+
+        # Wrapping alone, from fresh measurers: summing the widths of words, and
+        # measuring every candidate line as a whole
+        paragraphs = [
+            (
+                paragraph["text"],
+                fonts.load_font("Arial", int(paragraph.get("font_size", 18))),
+            )
+            for shapes in inventory.get_inventory_as_dict(pptx_path).values()
+            for shape in shapes.values()
+            for paragraph in shape["paragraphs"]
+        ]
+
+        def wrap(additive):
+            measurers = {}
+            for text, font in paragraphs:
+                measurer = measurers.get(font)
+                if measurer is None:
+                    measurer = measurers[font] = text_measure.TextMeasurer(font)
+                    measurer.additive = additive
+                for line in text.split("\n"):
+                    measurer.wrap(line, 300)
+
+        wrap_time = timed(lambda: wrap(True), repeat)
+        whole_line_time = timed(lambda: wrap(False), repeat)
+
+        params = {"slides": slides, "paragraphs": len(paragraphs)}
+        record("inventory", inventory_time, **params)
+        record("wrap", wrap_time, mode="summed", **params)
+        record("wrap", whole_line_time, mode="whole-line", **params)
+        print(
+            f"{slides:>7} {len(paragraphs):>11} {inventory_time:>14.3f}"
+            f" {wrap_time:>9.3f} {whole_line_time:>20.3f}"
+        )
+
+
+@scenario("pptx-inventory-parallel")
+def bench_pptx_inventory_parallel(work_dir, repeat):
+    """Text inventory of a 100-slide text-dense deck, measuring slides in a pool."""
+    inventory = pptx_scripts_module("inventory")
+    if inventory is None:
+        print("skipped: inventory.py ships with the pptx skill")
+        return
+    pptx_path = make_pptx(
+        work_dir / "inventory_parallel.pptx",
+        slides=100,
+        shapes=6,
+        paragraphs=4,
+        words=60,
+    )
+
+    print(f"{'jobs':>5} {'inventory (s)':>14}")
+    for jobs in sorted({1, 2, 4, os.cpu_count() or 1}):
+        elapsed = record(
+            "inventory",
+            timed(
+                lambda: inventory.extract_text_inventory(pptx_path, jobs=jobs), repeat
+            ),
+            jobs=jobs,
+        )
+        print(f"{jobs:>5} {elapsed:>14.3f}")
+
+
+@scenario("pptx-overlaps")
+def bench_pptx_overlaps(work_dir, repeat):
+    """Overlap detection on slides with many shapes, against comparing all pairs."""
+    inventory = pptx_scripts_module("inventory")
+    if inventory is None:
+        print("skipped: inventory.py ships with the pptx skill")
+        return
+
+    def pairwise(shapes):
+        for i, shape1 in enumerate(shapes):
+            for shape2 in shapes[i + 1 :]:
+                inventory.calculate_overlap(
+                    (shape1.left, shape1.top, shape1.width, shape1.height),
+                    (shape2.left, shape2.top, shape2.width, shape2.height),
+                )
+
+    print(f"{'shapes':>7} {'overlaps':>9} {'sweep (s)':>10} {'pairwise (s)':>13}")
+    for shapes in (100, 400, 1600):
+        pptx_path = make_pptx(
+            work_dir / f"overlaps_{shapes}.pptx", slides=1, shapes=shapes
+        )
+        shape_data = list(
+            inventory.extract_text_inventory(pptx_path)["slide-0"].values()
+        )
+        overlaps = sum(len(s.overlapping_shapes) for s in shape_data) // 2
+
+        sweep_time = timed(lambda: inventory.detect_overlaps(shape_data), repeat)
+        pairwise_time = timed(lambda: pairwise(shape_data), repeat)
+        record("overlaps", sweep_time, shapes=shapes, mode="sweep")
+        record("overlaps", pairwise_time, shapes=shapes, mode="pairwise")
+        print(f"{shapes:>7} {overlaps:>9} {sweep_time:>10.4f} {pairwise_time:>13.4f}")
+
+
+@scenario("xlsx-pipeline")
+def bench_xlsx_pipeline(work_dir, repeat):
+    """Unpack and pack workbooks as sheets and cells grow."""
+    print(f"{'sheets':>7} {'cells':>9} {'unpack (s)':>11} {'pack (s)':>9}")
+    for sheets, rows, cols in ((4, 1000, 20), (8, 2000, 20)):
+        xlsx_path = make_xlsx(
+            work_dir / f"pipeline_{sheets}.xlsx", sheets=sheets, rows=rows, cols=cols
+        )
+        unpacked = work_dir / f"pipeline_{sheets}"
+        output = work_dir / f"pipeline_{sheets}_packed.xlsx"
+
+        def unpack():
+            shutil.rmtree(unpacked, ignore_errors=True)
+            unpack_document(xlsx_path, unpacked)
+
+        best = pipeline(
+            [("unpack", unpack), ("pack", lambda: pack_document(unpacked, output))],
+            repeat,
+        )
+        cells = sheets * rows * cols
+        for name, elapsed in best.items():
+            record(name, elapsed, sheets=sheets, cells=cells)
+        print(f"{sheets:>7} {cells:>9} {best['unpack']:>11.3f} {best['pack']:>9.3f}")
+
+
+def environment():
+    """Describe the machine and interpreter the results were measured on."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare_results(baseline, results, threshold):
+    """Find times that got slower than in a baseline by more than threshold.
+
+    Args:
+        baseline: Measurements from a previous --json file
+        results: Measurements of this run
+        threshold: Allowed slowdown as a fraction (0.1 = 10%)
+
+    Returns:
+        list: (measurement, baseline value) for each regression
+    """
+
+    def key(result):
+        params = json.dumps(result["params"], sort_keys=True)
+        return result["scenario"], result["metric"], params
+
+    previous = {key(r): r["value"] for r in baseline if r["unit"] == "s"}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before and result["value"] > before * (1 + threshold):
+            regressions.append((result, before))
+    return regressions
+
+
+def main():
+    global CURRENT_SCENARIO
+
+    parser = argparse.ArgumentParser(description="Benchmark the OOXML scripts")
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all)")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per measurement (default: 3)"
+    )
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    parser.add_argument("--json", help="Write the measurements to this JSON file")
+    parser.add_argument(
+        "--compare",
+        help="JSON file of an earlier run; exit with 1 if any time got slower",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown tolerated by --compare, as a fraction (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for name, func in SCENARIOS.items():
+            print(f"{name}: {func.__doc__.splitlines()[0]}")
+        return
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Error: Unknown scenario(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    # Read up front, so a bad path fails before the benchmarks run
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ooxml_bench_"))
+    try:
+        for name in args.scenarios or SCENARIOS:
+            print(f"== {name} ==")
+            CURRENT_SCENARIO = name
+            SCENARIOS[name](work_dir, args.repeat)
+            print()
+    finally:
+        shutil.rmtree(work_dir)
+
+    if args.json:
+        report = {**environment(), "repeat": args.repeat, "results": RESULTS}
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {len(RESULTS)} measurements to {args.json}")
+
+    if baseline is not None:
+        regressions = compare_results(baseline, RESULTS, args.threshold)
+        for result, before in regressions:
+            params = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+            print(
+                f"REGRESSION {result['scenario']} {result['metric']} ({params}): "
+                f"{before:.3f}s -> {result['value']:.3f}s"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No time got slower than {args.compare} by over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,28 +4,65 @@ Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting
 
 Example usage:
     python pack.py <input_directory> <office_file> [--force]
+    python pack.py <input_directory> <office_file> --jobs 0  # Condense on all CPUs
 """
 
 import argparse
-import shutil
-import subprocess
+import os
 import sys
 import tempfile
 import defusedxml.minidom
 import zipfile
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Directory of office.py, shared by the skills and kept with the docx skill
+OFFICE_SCRIPTS_DIR = Path(__file__).resolve().parents[3] / "docx" / "ooxml" / "scripts"
+
+# Parts that are condensed; matched on the name since "_rels/.rels" has no suffix
+XML_SUFFIXES = (".xml", ".rels")
+
+# Media formats that are already compressed and gain nothing from deflate.
+# EMF/WMF metafiles are uncompressed and still deflate well.
+STORED_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".jpe",
+    ".jfif",
+    ".gif",
+    ".emz",
+    ".wmz",
+    ".wdp",
+    ".mp3",
+    ".m4a",
+    ".mp4",
+    ".m4v",
+    ".zip",
+}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for condensing XML (0 = all CPUs)",
+    )
     args = parser.parse_args()
 
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            jobs=args.jobs,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +79,18 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(input_dir, output_file, validate=False, jobs=1):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
+    Each part is read once and written straight into the archive; XML parts
+    are condensed in memory and the input directory is never modified.
+    Already-compressed media is stored rather than deflated again.
+
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        jobs: Number of worker processes for condensing XML (0 = all CPUs)
 
     Returns:
         bool: True if successful, False if validation failed
@@ -61,34 +103,71 @@ def pack_document(input_dir, output_file, validate=False):
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    files = [f for f in input_dir.rglob("*") if f.is_file()]
+    xml_files = [f for f in files if f.name.endswith(XML_SUFFIXES)]
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+
+    # Create final Office file as zip archive, written next to the output and
+    # moved into place so a failure never leaves a partial file behind
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+    try:
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            if jobs > 1 and len(xml_files) > 1:
+                with ProcessPoolExecutor(max_workers=min(jobs, len(xml_files))) as pool:
+                    condensed = pool.map(
+                        _condense_file,
+                        xml_files,
+                        chunksize=max(1, len(xml_files) // (jobs * 4)),
+                    )
+                    _write_parts(zf, input_dir, files, condensed)
+            else:
+                _write_parts(zf, input_dir, files, map(_condense_file, xml_files))
+        os.replace(temp_path, output_file)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
+def _write_parts(zf, input_dir, files, condensed):
+    """Write files into the archive in order, taking XML content from condensed.
+
+    Args:
+        zf: Open ZipFile to write to
+        input_dir: Directory the archive names are relative to
+        files: All files to pack
+        condensed: Iterator of condensed XML bytes, one per .xml/.rels file in
+            files, in the same order
+    """
+    for f in files:
+        arcname = f.relative_to(input_dir)
+        if f.name.endswith(XML_SUFFIXES):
+            zinfo = zipfile.ZipInfo.from_file(f, arcname)
+            zf.writestr(zinfo, next(condensed), compress_type=zipfile.ZIP_DEFLATED)
+        elif f.suffix.lower() in STORED_EXTENSIONS:
+            zf.write(f, arcname, compress_type=zipfile.ZIP_STORED)
+        else:
+            zf.write(f, arcname)
+
+
+def _condense_file(xml_file):
+    """Read an XML file and return its condensed content."""
+    return condense_xml_bytes(Path(xml_file).read_bytes())
+
+
 def validate_document(doc_path):
-    """Validate document by converting to HTML with soffice."""
+    """Validate document by converting to HTML with soffice.
+
+    See office.py for running the conversion on a warm soffice instead.
+    """
     # Determine the correct filter based on file extension
     match doc_path.suffix.lower():
         case ".docx":
@@ -98,31 +177,20 @@ def validate_document(doc_path):
         case ".xlsx":
             filter_name = "html:HTML (StarCalc)"
 
+    # Imported here, so that importing pack as a package module
+    # (ooxml.scripts.pack) works without office.py's directory on sys.path
+    if str(OFFICE_SCRIPTS_DIR) not in sys.path:
+        sys.path.append(str(OFFICE_SCRIPTS_DIR))
+    from office import convert
+
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
-            if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
-                print(f"Validation error: {error_msg}", file=sys.stderr)
-                return False
+            convert(doc_path, temp_dir, filter_name, timeout=10)
             return True
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             print("Validation error: Timeout during conversion", file=sys.stderr)
             return False
         except Exception as e:
@@ -131,9 +199,41 @@ def validate_document(doc_path):
 
 
 def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
+    """Strip unnecessary whitespace and remove comments, rewriting the file."""
+    condensed = _condense_file(xml_file)
+    with open(xml_file, "wb") as f:
+        f.write(condensed)
+
+
+def condense_xml_bytes(content):
+    """Strip unnecessary whitespace and comments from XML content.
+
+    The document is condensed in a single pass over the parser events without
+    building a DOM, so time and memory stay linear in the size of the part. The
+    output is identical to condense_xml_minidom: text inside *:t elements is
+    kept verbatim, whitespace-only text nodes and comments inside other
+    elements are dropped.
+
+    Args:
+        content: XML document as bytes
+
+    Returns:
+        bytes: The condensed document, UTF-8 encoded
+    """
+    try:
+        return _StreamingCondenser().condense(content)
+    except _NeedsDOM:
+        # Documents with a DTD are rare in Office files; let defusedxml vet them
+        return condense_xml_minidom(content)
+
+
+def condense_xml_minidom(content):
+    """Reference DOM-based implementation of condense_xml_bytes.
+
+    Builds the full DOM and removes nodes from it, which is quadratic in the
+    number of children per element. Kept for equivalence tests and benchmarks.
+    """
+    dom = defusedxml.minidom.parseString(content)
 
     # Process each element to remove whitespace and comments
     for element in dom.getElementsByTagName("*"):
@@ -150,9 +250,147 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
+
+
+class _NeedsDOM(Exception):
+    """Raised when a document uses features only the DOM condenser handles."""
+
+
+def _escape(data):
+    """Escape character data the way minidom serializes text and attributes."""
+    return (
+        data.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+class _StreamingCondenser:
+    """Serialize expat events straight to condensed XML.
+
+    Uses the same namespace-aware expat configuration as minidom so that the
+    parsed nodes, and therefore the serialized output, match the DOM version.
+    """
+
+    def __init__(self):
+        self._out = []
+        # One entry per open element: True if its text is kept verbatim (*:t)
+        self._keep = []
+        self._text = []
+        self._cdata = None
+        self._start_open = False
+        self._ns_decls = []
+        self._names = {}
+
+    def condense(self, content):
+        parser = expat.ParserCreate(namespace_separator=" ")
+        parser.namespace_prefixes = True
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.specified_attributes = True
+        parser.StartDoctypeDeclHandler = self._doctype
+        parser.StartNamespaceDeclHandler = self._start_namespace
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._character_data
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+
+        self._out.append('<?xml version="1.0" encoding="UTF-8"?>')
+        parser.Parse(content, True)
+        return "".join(self._out).encode("utf-8")
+
+    def _qname(self, name):
+        """Turn expat's "uri local prefix" name back into the qualified name."""
+        qname = self._names.get(name)
+        if qname is None:
+            parts = name.split(" ")
+            if len(parts) == 3:
+                qname = f"{parts[2]}:{parts[1]}"
+            else:
+                qname = parts[-1]
+            self._names[name] = qname
+        return qname
+
+    def _close_start_tag(self):
+        if self._start_open:
+            self._out.append(">")
+            self._start_open = False
+
+    def _flush_text(self):
+        """Write the pending text node unless it is removable whitespace."""
+        if not self._text:
+            return
+        data = "".join(self._text)
+        self._text = []
+        if not self._keep or (not self._keep[-1] and data.strip() == ""):
+            return
+        self._close_start_tag()
+        self._out.append(_escape(data))
+
+    def _doctype(self, *args):
+        raise _NeedsDOM()
+
+    def _start_namespace(self, prefix, uri):
+        self._ns_decls.append((prefix, uri))
+
+    def _start_element(self, name, attributes):
+        self._flush_text()
+        self._close_start_tag()
+        qname = self._qname(name)
+        parts = ["<", qname]
+        # minidom lists namespace declarations before the other attributes
+        for prefix, uri in self._ns_decls:
+            attr = f"xmlns:{prefix}" if prefix else "xmlns"
+            parts.append(f' {attr}="{_escape(uri or "")}"')
+        self._ns_decls = []
+        for i in range(0, len(attributes), 2):
+            attr = self._qname(attributes[i])
+            parts.append(f' {attr}="{_escape(attributes[i + 1])}"')
+        self._out.append("".join(parts))
+        self._start_open = True
+        self._keep.append(qname.endswith(":t"))
+
+    def _end_element(self, name):
+        self._flush_text()
+        self._keep.pop()
+        if self._start_open:
+            self._out.append("/>")
+            self._start_open = False
+        else:
+            self._out.append(f"</{self._qname(name)}>")
+
+    def _character_data(self, data):
+        if self._cdata is not None:
+            self._cdata.append(data)
+        else:
+            self._text.append(data)
+
+    def _start_cdata(self):
+        self._cdata = []
+
+    def _end_cdata(self):
+        # An empty section creates no node, so text around it stays one node
+        if self._cdata:
+            self._flush_text()
+            self._close_start_tag()
+            self._out.append(f"<![CDATA[{''.join(self._cdata)}]]>")
+        self._cdata = None
+
+    def _comment(self, data):
+        self._flush_text()
+        if not self._keep or self._keep[-1]:
+            self._close_start_tag()
+            self._out.append(f"<!--{data}-->")
+
+    def _processing_instruction(self, target, data):
+        self._flush_text()
+        self._close_start_tag()
+        self._out.append(f"<?{target} {data}?>")
 
 
 if __name__ == "__main__":
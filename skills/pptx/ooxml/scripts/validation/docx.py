@@ -3,12 +3,11 @@ Validator for Word document XML files against XSD schemas.
 """
 
 import re
-import tempfile
-import zipfile
 
 import lxml.etree
 
 from .base import BaseSchemaValidator
+from .stats import validation_pass
 
 
 class DOCXSchemaValidator(BaseSchemaValidator):
@@ -69,6 +68,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
         return all_valid
 
+    @validation_pass
     def validate_whitespace_preservation(self):
         """
         Validate that w:t elements with whitespace have xml:space='preserve'.
@@ -81,7 +81,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.trees.getroot(xml_file)
 
                 # Find all w:t elements
                 for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
@@ -112,6 +112,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 )
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} whitespace preservation violations:")
             for error in errors:
                 print(error)
@@ -121,6 +122,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All whitespace is properly preserved")
             return True
 
+    @validation_pass
     def validate_deletions(self):
         """
         Validate that w:t elements are not within w:del elements.
@@ -134,7 +136,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.trees.getroot(xml_file)
 
                 # Find all w:t elements that are descendants of w:del elements
                 namespaces = {"w": self.WORD_2006_NAMESPACE}
@@ -161,6 +163,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 )
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} deletion validation violations:")
             for error in errors:
                 print(error)
@@ -180,7 +183,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.trees.getroot(xml_file)
                 # Count all w:p elements
                 paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
                 count = len(paragraphs)
@@ -194,25 +197,19 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            # Create temporary directory to unpack original
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Unpack original docx
-                with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
+            # Parse document.xml from the original
+            root = self.baseline.tree("word/document.xml").getroot()
 
-                # Parse document.xml
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                # Count all w:p elements
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            # Count all w:p elements
+            paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
+            count = len(paragraphs)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
 
         return count
 
+    @validation_pass
     def validate_insertions(self):
         """
         Validate that w:delText elements are not within w:ins elements.
@@ -225,7 +222,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.trees.getroot(xml_file)
                 namespaces = {"w": self.WORD_2006_NAMESPACE}
 
                 # Find w:delText in w:ins that are NOT within w:del
@@ -251,6 +248,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 )
 
         if errors:
+            self._record_errors(errors)
             print(f"FAILED - Found {len(errors)} insertion validation violations:")
             for error in errors:
                 print(error)
@@ -260,6 +258,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - No w:delText elements within w:ins elements")
             return True
 
+    @validation_pass
     def compare_paragraph_counts(self):
         """Compare paragraph counts between original and new document."""
         original_count = self.count_paragraphs_in_original()
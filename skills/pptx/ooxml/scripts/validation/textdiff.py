@@ -0,0 +1,217 @@
+"""
+In-process word diff of document text, one paragraph per line.
+
+Paragraphs are aligned first, so identical paragraphs are never diffed. Each
+paragraph that differs is then diffed by word, and a changed span is refined to
+single characters when only a few characters differ (a typo or punctuation
+fix). Changes are marked like git's plain word diff: [-removed-]{+added+}, with
+one output line per changed paragraph.
+"""
+
+import bisect
+import re
+from difflib import SequenceMatcher
+
+# Words, runs of whitespace and single punctuation marks
+_TOKEN = re.compile(r"\w+|\s+|[^\w\s]")
+
+# Replaced paragraphs this similar (by word) are shown as one edited paragraph
+PAIR_RATIO = 0.5
+
+# Changed spans this similar (by character) are shown character by character
+CHAR_RATIO = 0.75
+
+# Larger blocks of replaced paragraphs are not searched for similar pairs
+MAX_PAIRING = 2500
+
+
+def word_diff(original_text, modified_text):
+    """Return the word diff of two texts with one paragraph per line."""
+    return "\n".join(
+        diff_paragraphs(original_text.split("\n"), modified_text.split("\n"))
+    )
+
+
+def diff_paragraphs(original, modified):
+    """Return one marked-up line per paragraph that was changed, added or removed.
+
+    Args:
+        original: Sequence of paragraph texts before the changes
+        modified: Sequence of paragraph texts after the changes
+
+    Returns:
+        list: Lines in document order; empty if the sequences are equal
+    """
+    lines = []
+    for op, a1, a2, b1, b2 in align_paragraphs(original, modified):
+        if op == "equal":
+            continue
+        for old, new in _pair_paragraphs(original[a1:a2], modified[b1:b2]):
+            lines.append(_diff_pair(old, new))
+    return lines
+
+
+def align_paragraphs(a, b):
+    """Return SequenceMatcher-style opcodes aligning two paragraph sequences.
+
+    Works on any hashable paragraph keys, such as texts or fingerprints. This
+    is a patience diff: paragraphs that occur exactly once in each sequence are
+    matched up along their longest increasing run, and only the gaps between
+    those anchors go through SequenceMatcher, so long documents align in
+    near-linear time.
+    """
+    counts = {}
+    for i, text in enumerate(a):
+        entry = counts.setdefault(text, [0, 0, i, 0])
+        entry[0] += 1
+    for j, text in enumerate(b):
+        entry = counts.get(text)
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+    anchors = [
+        (entry[2], entry[3])
+        for entry in counts.values()
+        if entry[0] == 1 and entry[1] == 1
+    ]
+    anchors.sort()
+
+    # Longest run of anchors increasing in both sequences
+    tails, tail_index, previous = [], [], []
+    for k, (_, j) in enumerate(anchors):
+        pos = bisect.bisect_left(tails, j)
+        previous.append(tail_index[pos - 1] if pos else -1)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[pos] = j
+            tail_index[pos] = k
+    chain = []
+    k = tail_index[-1] if tail_index else -1
+    while k >= 0:
+        chain.append(anchors[k])
+        k = previous[k]
+    chain.reverse()
+
+    opcodes = []
+    i = j = 0
+    for anchor_i, anchor_j in chain + [(len(a), len(b))]:
+        if i < anchor_i or j < anchor_j:
+            for op, a1, a2, b1, b2 in _opcodes(a[i:anchor_i], b[j:anchor_j]):
+                opcodes.append((op, a1 + i, a2 + i, b1 + j, b2 + j))
+        if anchor_i < len(a):
+            opcodes.append(("equal", anchor_i, anchor_i + 1, anchor_j, anchor_j + 1))
+        i, j = anchor_i + 1, anchor_j + 1
+    return opcodes
+
+
+def _opcodes(a, b):
+    """Return SequenceMatcher opcodes, matching the common ends without it.
+
+    Most edits touch a small part of a document or paragraph, and trimming the
+    shared prefix and suffix first keeps the quadratic matcher off the rest.
+    """
+    start = 0
+    end_a, end_b = len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+
+    opcodes = [("equal", 0, start, 0, start)] if start else []
+    matcher = SequenceMatcher(None, a[start:end_a], b[start:end_b], autojunk=False)
+    for op, a1, a2, b1, b2 in matcher.get_opcodes():
+        opcodes.append((op, a1 + start, a2 + start, b1 + start, b2 + start))
+    if end_a < len(a):
+        opcodes.append(("equal", end_a, len(a), end_b, len(b)))
+    return opcodes
+
+
+def _pair_paragraphs(original, modified):
+    """Yield (old, new) pairs for a replaced block; either side may be None.
+
+    Pairs up the most similar paragraphs, like difflib.Differ, so an edited
+    paragraph is shown as an edit even when paragraphs were added around it.
+    """
+    if len(original) == len(modified) == 1:
+        yield original[0], modified[0]
+        return
+    if not original or not modified or len(original) * len(modified) > MAX_PAIRING:
+        yield from ((old, None) for old in original)
+        yield from ((None, new) for new in modified)
+        return
+
+    best_ratio, best = PAIR_RATIO, None
+    matcher = SequenceMatcher(None, autojunk=False)
+    original_tokens = [_TOKEN.findall(old) for old in original]
+    for j, new in enumerate(modified):
+        matcher.set_seq2(_TOKEN.findall(new))
+        for i, old_tokens in enumerate(original_tokens):
+            matcher.set_seq1(old_tokens)
+            if (
+                matcher.real_quick_ratio() > best_ratio
+                and matcher.quick_ratio() > best_ratio
+                and matcher.ratio() > best_ratio
+            ):
+                best_ratio, best = matcher.ratio(), (i, j)
+
+    if best is None:
+        if len(original) == len(modified):
+            yield from zip(original, modified)
+        else:
+            yield from ((old, None) for old in original)
+            yield from ((None, new) for new in modified)
+        return
+
+    i, j = best
+    yield from _pair_paragraphs(original[:i], modified[:j])
+    yield original[i], modified[j]
+    yield from _pair_paragraphs(original[i + 1 :], modified[j + 1 :])
+
+
+def _diff_pair(old, new):
+    """Mark up the difference between two paragraphs (None if absent)."""
+    if new is None:
+        return _mark(old, "")
+    if old is None:
+        return _mark("", new)
+
+    old_tokens = _TOKEN.findall(old)
+    new_tokens = _TOKEN.findall(new)
+    parts = []
+    for op, a1, a2, b1, b2 in _opcodes(old_tokens, new_tokens):
+        removed = "".join(old_tokens[a1:a2])
+        added = "".join(new_tokens[b1:b2])
+        if op == "equal":
+            parts.append(removed)
+        elif op == "replace":
+            parts.append(_diff_span(removed, added))
+        else:
+            parts.append(_mark(removed, added))
+    return "".join(parts)
+
+
+def _diff_span(old, new):
+    """Mark up a replaced span, by character if only a few characters differ."""
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    if matcher.ratio() < CHAR_RATIO:
+        return _mark(old, new)
+
+    parts = []
+    for op, a1, a2, b1, b2 in _opcodes(old, new):
+        if op == "equal":
+            parts.append(old[a1:a2])
+        else:
+            parts.append(_mark(old[a1:a2], new[b1:b2]))
+    return "".join(parts)
+
+
+def _mark(removed, added):
+    """Return [-removed-]{+added+}, leaving out an empty side."""
+    return (f"[-{removed}-]" if removed else "") + (f"{{+{added}+}}" if added else "")
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
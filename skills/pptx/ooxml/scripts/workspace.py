@@ -0,0 +1,159 @@
+"""
+Copy-on-write working copy of an unpacked Office document.
+
+Every part of the source is mirrored into the working directory and into a
+snapshot of the original, each as a file of its own: a clone sharing the
+source's blocks where the file system supports it (btrfs, XFS), otherwise a
+copy. Parts can be rewritten or modified in place without touching the source
+or the snapshot, and save() writes back only the parts that changed.
+
+The snapshot serves as the validation baseline; it stays valid after save()
+writes to the source.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl request that makes a file share another file's blocks (Linux FICLONE)
+_FICLONE = 0x40049409
+
+
+class Workspace:
+    """Private working copy of an unpacked document that saves only changes.
+
+    Attributes:
+        source: Directory the workspace was created from
+        path: Working directory to read and edit
+        original: Snapshot of the source as it was when the workspace was created
+    """
+
+    def __init__(self, source_dir, work_dir):
+        """Mirror source_dir into work_dir/unpacked and work_dir/original.
+
+        Args:
+            source_dir: Unpacked document directory
+            work_dir: Empty or new directory to hold the workspace
+        """
+        self.source = Path(source_dir)
+        self.path = Path(work_dir) / "unpacked"
+        self.original = Path(work_dir) / "original"
+
+        # Part -> stamp of its working entry while it still mirrors the source
+        self._mirrored = {}
+        # (target directory, part) -> stamp of the working entry last saved there
+        self._saved = {}
+
+        clone = fcntl is not None
+        for source_file in sorted(self.source.rglob("*")):
+            if source_file.is_file():
+                part = source_file.relative_to(self.source).as_posix()
+                clone = _mirror(source_file, self.path / part, clone)
+                clone = _mirror(source_file, self.original / part, clone)
+                self._mirrored[part] = _entry_stamp(self.path / part)
+
+    def changed_parts(self):
+        """Return the parts rewritten or added since the workspace was created."""
+        changed = []
+        for entry in sorted(self.path.rglob("*")):
+            if entry.is_file():
+                part = entry.relative_to(self.path).as_posix()
+                if self._mirrored.get(part) != _entry_stamp(entry):
+                    changed.append(part)
+        return changed
+
+    def save(self, target=None):
+        """Write the changed parts to target, each atomically.
+
+        Every part is written to a temporary file next to its destination and
+        renamed into place. Parts already saved to target and unchanged since
+        are skipped. Saving to a directory other than the source also copies
+        the unchanged parts that target is missing or has an older copy of.
+
+        Args:
+            target: Destination directory (default: the source directory)
+
+        Returns:
+            list: Parts that were written
+        """
+        target = Path(target) if target is not None else self.source
+        to_source = target.resolve() == self.source.resolve()
+        key = target.resolve()
+
+        changed = self.changed_parts()
+        written = []
+        for part in changed:
+            entry = self.path / part
+            stamp = _entry_stamp(entry)
+            if self._saved.get((key, part)) == stamp:
+                continue
+            _replace_with_copy(entry, target / part)
+            self._saved[(key, part)] = stamp
+            written.append(part)
+
+        if not to_source:
+            for part in sorted(self._mirrored.keys() - set(changed)):
+                source_file = self.source / part
+                destination = target / part
+                if not _same_file_content(source_file, destination):
+                    _replace_with_copy(source_file, destination)
+                    written.append(part)
+
+        return written
+
+
+def _entry_stamp(path):
+    """Identify the directory entry itself, so any replacement shows up."""
+    stat = os.lstat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _mirror(source_file, destination, clone=True):
+    """Give destination its own copy of source_file, cloned if clone is True.
+
+    Returns:
+        bool: Whether cloning worked, so callers stop trying once it fails
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if clone:
+        try:
+            with open(source_file, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            # Across devices, or on file systems without shared blocks
+            pass
+        else:
+            shutil.copystat(source_file, destination)
+            return True
+    shutil.copy2(source_file, destination)
+    return False
+
+
+def _replace_with_copy(source_file, destination):
+    """Copy source_file over destination through a temporary file and rename."""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copy2(source_file, temp_file)
+        os.replace(temp_file, destination)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+
+def _same_file_content(source_file, destination):
+    """Whether destination is a previous copy2 of source_file (same size and mtime)."""
+    try:
+        a, b = os.stat(source_file), os.stat(destination)
+    except FileNotFoundError:
+        return False
+    return (a.st_size, a.st_mtime_ns) == (b.st_size, b.st_mtime_ns)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Find installed font files by family name and load them for text measurement.
+
+Looking a font up by probing candidate file names in every font directory, and
+loading it again for every paragraph, makes text measurement slow on large
+presentations. Instead:
+
+- FontRegistry lists the font directories once and indexes the font files by
+  name, so lookups are dictionary hits. Families are resolved once each. The
+  index can be persisted to a cache file, which is reused for as long as none
+  of the font directories has changed.
+- load_font() keeps the most recently used fonts loaded, keyed by
+  (path, size), so each font is read from disk once per size.
+
+Usage:
+    font = load_font("Calibri", 14)  # FreeType font, or PIL's default font
+    path = get_registry().find("Calibri")
+"""
+
+import json
+import os
+import platform
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from PIL import ImageFont
+
+# Font directories, searched in order, and font file extensions by platform
+if platform.system() == "Darwin":  # macOS
+    FONT_DIRS = ["/System/Library/Fonts/", "/Library/Fonts/", "~/Library/Fonts/"]
+    FONT_EXTENSIONS = [".ttf", ".otf", ".ttc", ".dfont"]
+else:  # Linux
+    FONT_DIRS = ["/usr/share/fonts/truetype/", "/usr/local/share/fonts/", "~/.fonts/"]
+    FONT_EXTENSIONS = [".ttf", ".otf"]
+
+# Bumped when the cache file layout changes
+CACHE_VERSION = 1
+
+# Loaded fonts kept by load_font()
+LOADED_FONTS = 64
+
+
+def normalize_family(family: str) -> str:
+    """Return the lookup key of a family name: lowercase, without separators."""
+    return "".join(c for c in family.lower() if c not in " -_")
+
+
+class FontRegistry:
+    """Index of the font files in a list of font directories."""
+
+    def __init__(
+        self,
+        font_dirs: Optional[Sequence[str]] = None,
+        extensions: Optional[Sequence[str]] = None,
+        cache_file: Optional[Path] = None,
+    ):
+        """Index the font directories, or load the index from cache_file.
+
+        Args:
+            font_dirs: Directories to search in order, including their
+                subdirectories (default: FONT_DIRS for this platform)
+            extensions: Font file extensions (default: FONT_EXTENSIONS)
+            cache_file: Optional JSON file to load the index from and save it
+                to; it is rebuilt when a font directory changed since
+        """
+        self.font_dirs = [str(Path(d).expanduser()) for d in (font_dirs or FONT_DIRS)]
+        self.extensions = [e.lower() for e in (extensions or FONT_EXTENSIONS)]
+        self.cache_file = Path(cache_file) if cache_file else None
+
+        # Font directory -> font file paths in it and its subdirectories
+        self.files: Dict[str, List[str]] = {}
+        # Directory -> mtime_ns of every directory listed, to detect changes
+        self._mtimes: Dict[str, int] = {}
+        # Font directory -> normalized family -> path, for exact name matches
+        self._families: Dict[str, Dict[str, str]] = {}
+        # Family name -> path (or None if not installed), of families looked up
+        self._found: Dict[str, Optional[str]] = {}
+
+        if not self._load_cache():
+            self._scan()
+            self._save_cache()
+        self._index()
+
+    def find(self, family: str) -> Optional[str]:
+        """Return the font file for a family name, or None if not installed.
+
+        In each font directory in turn, a font file named after the family is
+        looked for first, ignoring case, spaces, hyphens and underscores
+        ("Times New Roman.ttf", "TimesNewRoman.ttf", "times-new-roman.ttf"),
+        then any font file whose name contains the family name without spaces.
+        """
+        if family in self._found:
+            return self._found[family]
+
+        key = normalize_family(family)
+        fuzzy = family.lower().replace(" ", "")
+        path = None
+        for font_dir in self.font_dirs:
+            path = self._families.get(font_dir, {}).get(key)
+            if path is None:
+                path = next(
+                    (
+                        file
+                        for file in self.files.get(font_dir, [])
+                        if fuzzy in os.path.basename(file).lower()
+                    ),
+                    None,
+                )
+            if path is not None:
+                break
+
+        self._found[family] = path
+        return path
+
+    def _scan(self) -> None:
+        """List the font files of every font directory."""
+        self.files, self._mtimes = {}, {}
+        for font_dir in self.font_dirs:
+            files = []
+            for directory, dirnames, filenames in os.walk(font_dir):
+                try:
+                    self._mtimes[directory] = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                dirnames.sort()
+                files.extend(
+                    os.path.join(directory, name)
+                    for name in sorted(filenames)
+                    if name.lower().endswith(tuple(self.extensions))
+                )
+            self.files[font_dir] = files
+
+    def _index(self) -> None:
+        """Index each directory's files by normalized family name.
+
+        Of files with the same name, the first extension in self.extensions
+        wins, then the first file listed.
+        """
+        self._families = {}
+        for font_dir, files in self.files.items():
+            families = self._families[font_dir] = {}
+            for file in sorted(files, key=self._extension_rank):
+                stem = os.path.splitext(os.path.basename(file))[0]
+                families.setdefault(normalize_family(stem), file)
+
+    def _extension_rank(self, file: str) -> int:
+        return self.extensions.index(os.path.splitext(file)[1].lower())
+
+    def _load_cache(self) -> bool:
+        """Load the index from the cache file if it is still current."""
+        if self.cache_file is None:
+            return False
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cache.get("version") != CACHE_VERSION or cache.get("key") != [
+            self.font_dirs,
+            self.extensions,
+        ]:
+            return False
+
+        # A new, removed or changed directory changes its own or its parent's
+        # mtime; font directories created since are missing from the cache
+        mtimes = cache["mtimes"]
+        for directory in {*mtimes, *self.font_dirs}:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtimes.get(directory) != mtime:
+                return False
+
+        self.files, self._mtimes = cache["files"], mtimes
+        return True
+
+    def _save_cache(self) -> None:
+        """Save the index to the cache file, if there is one."""
+        if self.cache_file is None:
+            return
+        cache = {
+            "version": CACHE_VERSION,
+            "key": [self.font_dirs, self.extensions],
+            "mtimes": self._mtimes,
+            "files": self.files,
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(temp_file, "w") as f:
+                json.dump(cache, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass  # The cache only saves time; the index is still usable
+
+
+# Registry of the running process, built on first use
+_registry: Optional[FontRegistry] = None
+
+
+def get_registry(cache_file: Optional[Path] = None) -> FontRegistry:
+    """Return the process-wide FontRegistry, building it on first use.
+
+    Args:
+        cache_file: Cache file for the index; only used when the registry is
+            built by this call
+    """
+    global _registry
+    if _registry is None:
+        _registry = FontRegistry(cache_file=cache_file)
+    return _registry
+
+
+@lru_cache(maxsize=LOADED_FONTS)
+def _load_truetype(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size=size)
+
+
+@lru_cache(maxsize=1)
+def _default_font():
+    return ImageFont.load_default()
+
+
+def load_font(family: str, size: int, registry: Optional[FontRegistry] = None):
+    """Return a loaded font of a family and size, for measuring text with PIL.
+
+    Args:
+        family: Font family name (e.g., 'Arial', 'Calibri')
+        size: Font size in pixels
+        registry: FontRegistry to look the family up in (default: the
+            process-wide registry)
+
+    Returns:
+        The font, or PIL's default font if the family is not installed or
+        cannot be loaded. Fonts are shared and must not be modified.
+    """
+    path = (registry or get_registry()).find(family)
+    if path:
+        try:
+            return _load_truetype(path, size)
+        except Exception:
+            pass
+    return _default_font()
@@ -23,17 +23,20 @@ Usage:
 """
 
 import argparse
+import bisect
 import json
-import platform
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from PIL import Image, ImageDraw, ImageFont
+from fonts import FontRegistry, get_registry, load_font
 from pptx import Presentation
 from pptx.enum.text import PP_ALIGN
 from pptx.shapes.base import BaseShape
+from text_measure import measure_paragraphs, measurer
 
 # Type aliases for cleaner signatures
 JsonValue = Union[str, int, float, bool, None]
@@ -60,6 +63,9 @@ Examples:
   python inventory.py presentation.pptx inventory.json --issues-only
     Extracts only text shapes that have overflow or overlap issues
 
+  python inventory.py presentation.pptx inventory.json --jobs 0
+    Measures the text of the slides in parallel, using all CPUs
+
 The output JSON includes:
   - All text content organized by slide and shape
   - Correct absolute positions for shapes in groups
@@ -76,6 +82,18 @@ The output JSON includes:
         action="store_true",
         help="Include only text shapes that have overflow or overlap issues",
     )
+    parser.add_argument(
+        "--font-cache",
+        type=Path,
+        help="Cache file for the index of installed fonts, reused across runs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes measuring the text of slides (0 = all CPUs)",
+    )
 
     args = parser.parse_args()
 
@@ -89,12 +107,15 @@ The output JSON includes:
         sys.exit(1)
 
     try:
+        get_registry(args.font_cache)
         print(f"Extracting text inventory from: {args.input}")
         if args.issues_only:
             print(
                 "Filtering to include only text shapes with issues (overflow/overlap)"
             )
-        inventory = extract_text_inventory(input_path, issues_only=args.issues_only)
+        inventory = extract_text_inventory(
+            input_path, issues_only=args.issues_only, jobs=args.jobs
+        )
 
         output_path = Path(args.output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -134,14 +155,96 @@ class ShapeWithPosition:
     absolute_top: int  # in EMUs
 
 
+@dataclass
+class ParagraphText:
+    """A paragraph's text with the properties that determine its height."""
+
+    index: int  # Position in the text frame, including empty paragraphs
+    text: str
+    font_name: str
+    font_size: int  # in points
+    line_spacing: Optional[float]  # in points
+    space_before: Optional[float]  # in points
+    space_after: Optional[float]  # in points
+
+
+@dataclass
+class FrameText:
+    """The text of a text frame and the space available for it.
+
+    Plain data, so that frames can be measured in other processes.
+    """
+
+    usable_width_px: int
+    usable_height_px: int
+    paragraphs: List[ParagraphText]
+
+
+def estimate_frame_overflow(
+    frame: FrameText, registry: Optional[FontRegistry] = None
+) -> Optional[float]:
+    """Estimate how far text overflows the bottom of its frame, using PIL.
+
+    Args:
+        frame: The text and usable size of the frame
+        registry: FontRegistry to look fonts up in (default: the process-wide
+            registry)
+
+    Returns:
+        The overflow in inches, or None if it is at most 0.05"
+    """
+    # Wrap all lines of all paragraphs
+    wrapped_paragraphs = measure_paragraphs(
+        [
+            (para.text, load_font(para.font_name, para.font_size, registry))
+            for para in frame.paragraphs
+        ],
+        frame.usable_width_px,
+    )
+
+    # Calculate total height of all paragraphs
+    total_height_px = 0
+
+    for para, all_wrapped_lines in zip(frame.paragraphs, wrapped_paragraphs):
+        if all_wrapped_lines:
+            # Calculate line height
+            if para.line_spacing:
+                # Custom line spacing explicitly set
+                line_height_px = para.line_spacing * 96 / 72
+            else:
+                # PowerPoint default single spacing (1.0x font size)
+                line_height_px = para.font_size * 96 / 72
+
+            # Add space_before (except first paragraph)
+            if para.index > 0 and para.space_before:
+                total_height_px += para.space_before * 96 / 72
+
+            # Add paragraph text height
+            total_height_px += len(all_wrapped_lines) * line_height_px
+
+            # Add space_after
+            if para.space_after:
+                total_height_px += para.space_after * 96 / 72
+
+    # Check for overflow (ignore negligible overflows <= 0.05")
+    if total_height_px > frame.usable_height_px:
+        overflow_px = total_height_px - frame.usable_height_px
+        overflow_inches = round(overflow_px / 96.0, 2)
+        if overflow_inches > 0.05:  # Only report significant overflows
+            return overflow_inches
+    return None
+
+
 class ParagraphData:
     """Data structure for paragraph properties extracted from a PowerPoint paragraph."""
 
-    def __init__(self, paragraph: Any):
+    def __init__(self, paragraph: Any, formatting: bool = True):
         """Initialize from a PowerPoint paragraph object.
 
         Args:
             paragraph: The PowerPoint paragraph object
+            formatting: If False, only read the properties that text
+                measurement needs: text, font name and size, and spacing
         """
         self.text: str = paragraph.text.strip()
         self.bullet: bool = False
@@ -160,7 +263,8 @@ class ParagraphData:
 
         # Check for bullet formatting
         if (
-            hasattr(paragraph, "_p")
+            formatting
+            and hasattr(paragraph, "_p")
             and paragraph._p is not None
             and paragraph._p.pPr is not None
         ):
@@ -175,7 +279,11 @@ class ParagraphData:
                     self.level = paragraph.level
 
         # Add alignment if not LEFT (default)
-        if hasattr(paragraph, "alignment") and paragraph.alignment is not None:
+        if (
+            formatting
+            and hasattr(paragraph, "alignment")
+            and paragraph.alignment is not None
+        ):
             alignment_map = {
                 PP_ALIGN.CENTER: "CENTER",
                 PP_ALIGN.RIGHT: "RIGHT",
@@ -199,25 +307,8 @@ class ParagraphData:
                     self.font_name = font.name
                 if font.size:
                     self.font_size = font.size.pt
-                if font.bold is not None:
-                    self.bold = font.bold
-                if font.italic is not None:
-                    self.italic = font.italic
-                if font.underline is not None:
-                    self.underline = font.underline
-
-                # Handle color - both RGB and theme colors
-                try:
-                    # Try RGB color first
-                    if font.color.rgb:
-                        self.color = str(font.color.rgb)
-                except (AttributeError, TypeError):
-                    # Fall back to theme color
-                    try:
-                        if font.color.theme_color:
-                            self.theme_color = font.color.theme_color.name
-                    except (AttributeError, TypeError):
-                        pass
+                if formatting:
+                    self._read_run_formatting(font)
 
         # Add line spacing if set
         if hasattr(paragraph, "line_spacing") and paragraph.line_spacing is not None:
@@ -228,6 +319,28 @@ class ParagraphData:
                 font_size = self.font_size if self.font_size else 12.0
                 self.line_spacing = round(paragraph.line_spacing * font_size, 2)
 
+    def _read_run_formatting(self, font: Any) -> None:
+        """Read the bold, italic, underline and color of a run's font."""
+        if font.bold is not None:
+            self.bold = font.bold
+        if font.italic is not None:
+            self.italic = font.italic
+        if font.underline is not None:
+            self.underline = font.underline
+
+        # Handle color - both RGB and theme colors
+        try:
+            # Try RGB color first
+            if font.color.rgb:
+                self.color = str(font.color.rgb)
+        except (AttributeError, TypeError):
+            # Fall back to theme color
+            try:
+                if font.color.theme_color:
+                    self.theme_color = font.color.theme_color.name
+            except (AttributeError, TypeError):
+                pass
+
     def to_dict(self) -> ParagraphDict:
         """Convert to dictionary for JSON serialization, excluding None values."""
         result: ParagraphDict = {"text": self.text}
@@ -286,61 +399,7 @@ class ShapeData:
         Returns:
             Path to the font file, or None if not found
         """
-        system = platform.system()
-
-        # Common font file variations to try
-        font_variations = [
-            font_name,
-            font_name.lower(),
-            font_name.replace(" ", ""),
-            font_name.replace(" ", "-"),
-        ]
-
-        # Define font directories and extensions by platform
-        if system == "Darwin":  # macOS
-            font_dirs = [
-                "/System/Library/Fonts/",
-                "/Library/Fonts/",
-                "~/Library/Fonts/",
-            ]
-            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
-        else:  # Linux
-            font_dirs = [
-                "/usr/share/fonts/truetype/",
-                "/usr/local/share/fonts/",
-                "~/.fonts/",
-            ]
-            extensions = [".ttf", ".otf"]
-
-        # Try to find the font file
-        from pathlib import Path
-
-        for font_dir in font_dirs:
-            font_dir_path = Path(font_dir).expanduser()
-            if not font_dir_path.exists():
-                continue
-
-            # First try exact matches
-            for variant in font_variations:
-                for ext in extensions:
-                    font_path = font_dir_path / f"{variant}{ext}"
-                    if font_path.exists():
-                        return str(font_path)
-
-            # Then try fuzzy matching - find files containing the font name
-            try:
-                for file_path in font_dir_path.iterdir():
-                    if file_path.is_file():
-                        file_name_lower = file_path.name.lower()
-                        font_name_lower = font_name.lower().replace(" ", "")
-                        if font_name_lower in file_name_lower and any(
-                            file_name_lower.endswith(ext) for ext in extensions
-                        ):
-                            return str(file_path)
-            except (OSError, PermissionError):
-                continue
-
-        return None
+        return get_registry().find(font_name)
 
     @staticmethod
     def get_slide_dimensions(slide: Any) -> tuple[Optional[int], Optional[int]]:
@@ -391,6 +450,7 @@ class ShapeData:
         absolute_left: Optional[int] = None,
         absolute_top: Optional[int] = None,
         slide: Optional[Any] = None,
+        measure_text: bool = True,
     ):
         """Initialize from a PowerPoint shape object.
 
@@ -399,6 +459,8 @@ class ShapeData:
             absolute_left: Absolute left position in EMUs (for shapes in groups)
             absolute_top: Absolute top position in EMUs (for shapes in groups)
             slide: Optional slide object to get dimensions and layout information
+            measure_text: If False, leave frame_overflow_bottom unset, to be
+                estimated later from frame_text()
         """
         self.shape = shape  # Store reference to original shape
         self.shape_id: str = ""  # Will be set after sorting
@@ -461,7 +523,8 @@ class ShapeData:
             str, float
         ] = {}  # Dict of shape_id -> overlap area in sq inches
         self.warnings: List[str] = []
-        self._estimate_frame_overflow()
+        if measure_text:
+            self._estimate_frame_overflow()
         self._calculate_slide_overflow()
         self._detect_bullet_issues()
 
@@ -533,108 +596,54 @@ class ShapeData:
 
     def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
         """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
-
-        if current_line:
-            wrapped.append(current_line)
+        return measurer(font).wrap(line, max_width_px)
 
-        return wrapped
+    def frame_text(self) -> Optional[FrameText]:
+        """Describe the shape's text for overflow estimation.
 
-    def _estimate_frame_overflow(self) -> None:
-        """Estimate if text overflows the shape bounds using PIL text measurement."""
+        Returns:
+            The FrameText, or None if the shape has no text frame or no room
+            for text
+        """
         if not self.shape or not hasattr(self.shape, "text_frame"):
-            return
+            return None
 
         text_frame = self.shape.text_frame  # type: ignore
         if not text_frame or not text_frame.paragraphs:
-            return
+            return None
 
         # Get usable dimensions after accounting for margins
         usable_width_px, usable_height_px = self._get_usable_dimensions(text_frame)
         if usable_width_px <= 0 or usable_height_px <= 0:
-            return
-
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
+            return None
 
         # Get default font size from placeholder or use conservative estimate
         default_font_size = self._get_default_font_size()
 
-        # Calculate total height of all paragraphs
-        total_height_px = 0
-
+        paragraphs = []
         for para_idx, paragraph in enumerate(text_frame.paragraphs):
             if not paragraph.text.strip():
                 continue
 
-            para_data = ParagraphData(paragraph)
-
-            # Load font for this paragraph
-            font_name = para_data.font_name or "Arial"
-            font_size = int(para_data.font_size or default_font_size)
+            para_data = ParagraphData(paragraph, formatting=False)
+            paragraphs.append(
+                ParagraphText(
+                    para_idx,
+                    paragraph.text,
+                    para_data.font_name or "Arial",
+                    int(para_data.font_size or default_font_size),
+                    para_data.line_spacing,
+                    para_data.space_before,
+                    para_data.space_after,
+                )
+            )
+        return FrameText(usable_width_px, usable_height_px, paragraphs)
 
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
-
-            # Wrap all lines in this paragraph
-            all_wrapped_lines = []
-            for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
-                all_wrapped_lines.extend(wrapped)
-
-            if all_wrapped_lines:
-                # Calculate line height
-                if para_data.line_spacing:
-                    # Custom line spacing explicitly set
-                    line_height_px = para_data.line_spacing * 96 / 72
-                else:
-                    # PowerPoint default single spacing (1.0x font size)
-                    line_height_px = font_size * 96 / 72
-
-                # Add space_before (except first paragraph)
-                if para_idx > 0 and para_data.space_before:
-                    total_height_px += para_data.space_before * 96 / 72
-
-                # Add paragraph text height
-                total_height_px += len(all_wrapped_lines) * line_height_px
-
-                # Add space_after
-                if para_data.space_after:
-                    total_height_px += para_data.space_after * 96 / 72
-
-        # Check for overflow (ignore negligible overflows <= 0.05")
-        if total_height_px > usable_height_px:
-            overflow_px = total_height_px - usable_height_px
-            overflow_inches = round(overflow_px / 96.0, 2)
-            if overflow_inches > 0.05:  # Only report significant overflows
-                self.frame_overflow_bottom = overflow_inches
+    def _estimate_frame_overflow(self) -> None:
+        """Estimate if text overflows the shape bounds using PIL text measurement."""
+        frame = self.frame_text()
+        if frame is not None:
+            self.frame_overflow_bottom = estimate_frame_overflow(frame)
 
     def _calculate_slide_overflow(self) -> None:
         """Calculate if shape overflows the slide boundaries."""
@@ -879,6 +888,70 @@ def calculate_overlap(
     return False, 0
 
 
+def _count_axis_overlaps(spans: List[Tuple[float, float]], tolerance: float) -> int:
+    """Count the pairs of (start, end) spans overlapping by more than tolerance.
+
+    The count may be off for spans overlapping by tolerance give or take a
+    rounding error; it only serves to pick the axis to sweep along.
+    """
+    count = 0
+    ends: List[float] = []
+    for start, end in sorted(spans):
+        if end - start > tolerance:
+            # Earlier spans start before this one, so they overlap it by more
+            # than tolerance if they end more than tolerance after its start
+            count += len(ends) - bisect.bisect_right(ends, start + tolerance)
+            bisect.insort(ends, end)
+    return count
+
+
+def _overlapping_pairs(
+    rects: List[Tuple[float, float, float, float]], tolerance: float = 0.05
+) -> List[Tuple[int, int, float]]:
+    """Find the pairs of rectangles that calculate_overlap() finds overlapping.
+
+    Sweeps along the axis with fewer overlapping pairs, keeping the rectangles
+    whose span on that axis overlaps the sweep position by more than
+    tolerance. Only those are compared, so the work is O(n log n + m) for the
+    m pairs overlapping along the sweep axis, instead of comparing all pairs.
+
+    Args:
+        rects: (left, top, width, height) of each rectangle in inches
+
+    Returns:
+        list[tuple]: (i, j, overlap area) of each overlapping pair, i < j, in
+            order of (i, j)
+    """
+    horizontal = [(left, left + width) for left, _, width, _ in rects]
+    vertical = [(top, top + height) for _, top, _, height in rects]
+    spans = horizontal
+    if _count_axis_overlaps(vertical, tolerance) < _count_axis_overlaps(
+        horizontal, tolerance
+    ):
+        spans = vertical
+
+    pairs = []
+    active: List[int] = []
+    for i in sorted(range(len(rects)), key=lambda k: spans[k][0]):
+        start, end = spans[i]
+        # The same difference calculate_overlap() compares to the tolerance;
+        # it only shrinks as the sweep advances, so dropped spans stay dropped
+        active = [j for j in active if spans[j][1] - start > tolerance]
+        if end - start <= tolerance:
+            continue
+        for j in active:
+            first, second = min(i, j), max(i, j)
+            overlaps, overlap_area = calculate_overlap(
+                rects[first], rects[second], tolerance
+            )
+            if overlaps:
+                pairs.append((first, second, overlap_area))
+        active.append(i)
+
+    pairs.sort()
+    return pairs
+
+
 def detect_overlaps(shapes: List[ShapeData]) -> None:
     """Detect overlapping shapes and update their overlapping_shapes dictionaries.
 
@@ -888,31 +961,25 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
-
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
+    if len(shapes) < 2:
+        return
 
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
+    # Ensure shape IDs are set
+    for i, shape in enumerate(shapes):
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
 
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
-
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
-
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+    rects = [(shape.left, shape.top, shape.width, shape.height) for shape in shapes]
+    for i, j, overlap_area in _overlapping_pairs(rects):
+        # Add shape IDs with overlap area in square inches
+        shapes[i].overlapping_shapes[shapes[j].shape_id] = overlap_area
+        shapes[j].overlapping_shapes[shapes[i].shape_id] = overlap_area
 
 
 def extract_text_inventory(
-    pptx_path: Path, prs: Optional[Any] = None, issues_only: bool = False
+    pptx_path: Path,
+    prs: Optional[Any] = None,
+    issues_only: bool = False,
+    jobs: int = 1,
 ) -> InventoryData:
     """Extract text content from all slides in a PowerPoint presentation.
 
@@ -920,6 +987,8 @@ def extract_text_inventory(
         pptx_path: Path to the PowerPoint file
         prs: Optional Presentation object to use. If not provided, will load from pptx_path.
         issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes measuring the text of the slides
+            (0 = all CPUs). The result is the same for any number of jobs.
 
     Returns a nested dictionary: {slide-N: {shape-N: ShapeData}}
     Shapes are sorted by visual position (top-to-bottom, left-to-right).
@@ -928,8 +997,11 @@ def extract_text_inventory(
     """
     if prs is None:
         prs = Presentation(str(pptx_path))
-    inventory: InventoryData = {}
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+    in_workers = jobs > 1 and len(prs.slides) > 1
 
+    # (slide index, ShapeData list) of each slide with text shapes
+    slides = []
     for slide_idx, slide in enumerate(prs.slides):
         # Collect all valid shapes from this slide with absolute positions
         shapes_with_positions = []
@@ -946,10 +1018,19 @@ def extract_text_inventory(
                 swp.absolute_left,
                 swp.absolute_top,
                 slide,
+                measure_text=not in_workers,
             )
             for swp in shapes_with_positions
         ]
+        slides.append((slide_idx, shape_data_list))
+
+    if in_workers:
+        _measure_slides_in_workers(
+            [shape_data_list for _, shape_data_list in slides], jobs
+        )
 
+    inventory: InventoryData = {}
+    for slide_idx, shape_data_list in slides:
         # Sort by visual position and assign stable IDs in one step
         sorted_shapes = sort_shapes_by_position(shape_data_list)
         for idx, shape_data in enumerate(sorted_shapes):
@@ -974,7 +1055,48 @@ def extract_text_inventory(
     return inventory
 
 
-def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> InventoryDict:
+def _measure_slides_in_workers(slides: List[List[ShapeData]], jobs: int) -> None:
+    """Estimate the text overflow of the shapes of each slide in a process pool.
+
+    The shapes are described to the workers as FrameText, and their
+    frame_overflow_bottom set from the results.
+    """
+    frames = [[shape_data.frame_text() for shape_data in shapes] for shapes in slides]
+    jobs = min(jobs, len(frames))
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(get_registry(),)
+    ) as executor:
+        overflows = executor.map(
+            _measure_slide,
+            frames,
+            chunksize=max(1, len(frames) // (jobs * 4)),
+        )
+        for shapes, slide_overflows in zip(slides, overflows):
+            for shape_data, overflow in zip(shapes, slide_overflows):
+                shape_data.frame_overflow_bottom = overflow
+
+
+# Font registry of a worker process, received from the parent process
+_worker_registry: Optional[FontRegistry] = None
+
+
+def _init_worker(registry: FontRegistry) -> None:
+    """Use the parent's font registry in this worker process."""
+    global _worker_registry
+    _worker_registry = registry
+
+
+def _measure_slide(frames: List[Optional[FrameText]]) -> List[Optional[float]]:
+    """Estimate the overflow of the text frames of a slide, in a worker."""
+    return [
+        estimate_frame_overflow(frame, _worker_registry) if frame else None
+        for frame in frames
+    ]
+
+
+def get_inventory_as_dict(
+    pptx_path: Path, issues_only: bool = False, jobs: int = 1
+) -> InventoryDict:
     """Extract text inventory and return as JSON-serializable dictionaries.
 
     This is a convenience wrapper around extract_text_inventory that returns
@@ -984,11 +1106,13 @@ def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> Invento
     Args:
         pptx_path: Path to the PowerPoint file
         issues_only: If True, only include shapes that have overflow or overlap issues
+        jobs: Number of worker processes measuring the text of the slides
+            (0 = all CPUs)
 
     Returns:
         Nested dictionary with all data serialized for JSON
     """
-    inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
+    inventory = extract_text_inventory(pptx_path, issues_only=issues_only, jobs=jobs)
 
     # Convert ShapeData objects to dictionaries
     dict_inventory: InventoryDict = {}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the font registry and the loaded-font cache.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+import fonts
+from fonts import FontRegistry, load_font
+from inventory import extract_text_inventory
+from PIL import ImageFont
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+# A font file to copy under other names; Pillow ships none of its own
+SOURCE_FONT = next(
+    (
+        path
+        for font_dir in fonts.FONT_DIRS
+        for path in sorted(Path(font_dir).expanduser().rglob("*.ttf"))
+    ),
+    None,
+)
+
+
+class TestFontRegistry(TestCase):
+    def setUp(self):
+        if SOURCE_FONT is None:
+            self.skipTest("No TrueType font installed")
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_fonts_"))
+        self.system = self.temp_dir / "system"
+        self.user = self.temp_dir / "user"
+        for path in (
+            "system/truetype/msttcorefonts/Times_New_Roman.ttf",
+            "system/Arial.otf",
+            "system/Arial.ttf",
+            "system/arialbd.ttf",
+            "system/notes.txt",
+            "user/Calibri.ttf",
+            "user/Arial.ttf",
+        ):
+            (self.temp_dir / path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(SOURCE_FONT, self.temp_dir / path)
+
+    def tearDown(self):
+        if hasattr(self, "temp_dir") and self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def registry(self, **kwargs):
+        return FontRegistry([self.system, self.user], **kwargs)
+
+    def test_finds_families(self):
+        registry = self.registry()
+        system = str(self.system)
+        self.assertEqual(registry.find("Arial"), f"{system}/Arial.ttf")
+        self.assertEqual(
+            registry.find("Times New Roman"),
+            f"{system}/truetype/msttcorefonts/Times_New_Roman.ttf",
+        )
+        self.assertEqual(registry.find("Calibri"), f"{self.user}/Calibri.ttf")
+        self.assertEqual(registry.find("ArialBD"), f"{system}/arialbd.ttf")
+        # No exact match: the first font file containing the name
+        self.assertEqual(registry.find("Arial B"), f"{system}/arialbd.ttf")
+        self.assertIsNone(registry.find("Wingdings"))
+        self.assertIsNone(registry.find("notes"))
+
+    def test_cache_file_is_reused_until_fonts_change(self):
+        cache_file = self.temp_dir / "cache" / "fonts.json"
+        expected = self.registry().files
+        self.assertEqual(self.registry(cache_file=cache_file).files, expected)
+
+        with mock.patch.object(fonts.os, "walk", side_effect=AssertionError):
+            registry = self.registry(cache_file=cache_file)
+        self.assertEqual(registry.files, expected)
+        self.assertEqual(registry.find("Calibri"), f"{self.user}/Calibri.ttf")
+
+        shutil.copy(SOURCE_FONT, self.user / "Georgia.ttf")
+        registry = self.registry(cache_file=cache_file)
+        self.assertEqual(registry.find("Georgia"), f"{self.user}/Georgia.ttf")
+
+    def test_loads_each_font_once_per_size(self):
+        registry = self.registry()
+        with mock.patch.object(
+            ImageFont, "truetype", side_effect=ImageFont.truetype
+        ) as truetype:
+            fonts._load_truetype.cache_clear()
+            first = load_font("Arial", 12, registry)
+            self.assertIs(load_font("Arial", 12, registry), first)
+            self.assertIsNot(load_font("Arial", 14, registry), first)
+            self.assertEqual(truetype.call_count, 2)
+        self.assertIs(load_font("Wingdings", 12, registry), fonts._default_font())
+
+    def test_inventory_loads_few_fonts(self):
+        presentation = Presentation()
+        for i in range(40):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+            box = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(3), Inches(1))
+            for j, size in enumerate((12, 18, 24)):
+                paragraph = box.text_frame.add_paragraph()
+                paragraph.text = f"Slide {i} paragraph {j} " * 4
+                paragraph.runs[0].font.name = ("Arial", "Calibri")[j % 2]
+                paragraph.runs[0].font.size = Pt(size)
+        deck = self.temp_dir / "deck.pptx"
+        presentation.save(deck)
+
+        fonts._load_truetype.cache_clear()
+        with mock.patch.object(fonts, "_registry", self.registry()):
+            with mock.patch.object(
+                ImageFont, "truetype", side_effect=ImageFont.truetype
+            ) as truetype:
+                inventory = extract_text_inventory(deck)
+        self.assertEqual(len(inventory), 40)
+        self.assertEqual(truetype.call_count, 3)
+
+
+if __name__ == "__main__":
+    main()
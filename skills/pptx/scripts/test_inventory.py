@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Regression tests for shape overlap detection and parallel inventory extraction.
+"""
+
+import json
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase, main
+
+from inventory import (
+    calculate_overlap,
+    detect_overlaps,
+    extract_text_inventory,
+    get_inventory_as_dict,
+)
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+
+def shape(shape_id, left, top, width, height):
+    """Stand-in for a ShapeData, with the attributes detect_overlaps() uses."""
+    return SimpleNamespace(
+        shape_id=shape_id,
+        left=left,
+        top=top,
+        width=width,
+        height=height,
+        overlapping_shapes={},
+    )
+
+
+def reference_overlaps(shapes):
+    """Compare every pair, as detect_overlaps() did before the sweep."""
+    for i in range(len(shapes)):
+        for j in range(i + 1, len(shapes)):
+            shape1, shape2 = shapes[i], shapes[j]
+            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
+            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+            overlaps, overlap_area = calculate_overlap(rect1, rect2)
+            if overlaps:
+                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
+                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+
+
+def layouts():
+    """Yield (name, rectangles) of slide layouts to detect overlaps in."""
+    rng = random.Random(0)
+    for n in (2, 5, 40, 300):
+        yield (
+            f"random-{n}",
+            [
+                (
+                    round(rng.uniform(0, 10), 2),
+                    round(rng.uniform(0, 7.5), 2),
+                    round(rng.uniform(0, 3), 2),
+                    round(rng.uniform(0, 2), 2),
+                )
+                for _ in range(n)
+            ],
+        )
+    # Full-width rows and full-height columns, touching or overlapping by
+    # about the tolerance
+    yield "rows", [(0.5, 0.2 + i * 0.45, 9.0, 0.5) for i in range(30)]
+    yield "columns", [(0.2 + i * 0.3, 0.5, 0.35, 6.5) for i in range(30)]
+    yield (
+        "grid",
+        [
+            (col * 0.5, row * 0.5, 0.5 + 0.05 * (col % 3), 0.55)
+            for row in range(15)
+            for col in range(20)
+        ],
+    )
+    # Duplicates, nesting, and empty or negative sizes
+    yield (
+        "degenerate",
+        [
+            (1.0, 1.0, 2.0, 2.0),
+            (1.0, 1.0, 2.0, 2.0),
+            (1.5, 1.5, 0.5, 0.5),
+            (2.0, 2.0, 0.0, 1.0),
+            (2.0, 2.0, 0.05, 1.0),
+            (2.0, 2.0, 0.06, 1.0),
+            (3.0, 3.0, -1.0, -1.0),
+            (0.0, 0.0, 10.0, 7.5),
+        ],
+    )
+
+
+class TestDetectOverlaps(TestCase):
+    def test_matches_pairwise_comparison(self):
+        for name, rects in layouts():
+            with self.subTest(layout=name):
+                shapes = [shape(f"shape-{i}", *rect) for i, rect in enumerate(rects)]
+                expected = [shape(f"shape-{i}", *rect) for i, rect in enumerate(rects)]
+                detect_overlaps(shapes)
+                reference_overlaps(expected)
+                # Compared as JSON, so the order of the entries counts too
+                self.assertEqual(
+                    [json.dumps(s.overlapping_shapes) for s in shapes],
+                    [json.dumps(s.overlapping_shapes) for s in expected],
+                )
+
+    def test_single_shape(self):
+        shapes = [shape(None, 0, 0, 1, 1)]
+        detect_overlaps(shapes)
+        self.assertEqual(shapes[0].overlapping_shapes, {})
+
+
+class TestParallelInventory(TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp(prefix="test_inventory_"))
+        presentation = Presentation()
+        for i in range(6):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[i % 2])
+            slide.shapes.title.text = f"Slide {i}"
+            # Boxes overlapping each other, with more text than fits in some
+            for j in range(3):
+                box = slide.shapes.add_textbox(
+                    Inches(1 + j), Inches(2 + j * 0.5), Inches(2.5), Inches(1)
+                )
+                for k in range(i % 3 + 1):
+                    paragraph = box.text_frame.add_paragraph()
+                    paragraph.text = f"Shape {j} paragraph {k} " * (i + 1)
+                    paragraph.runs[0].font.size = Pt(12 + 4 * k)
+                    paragraph.space_before = Pt(k * 6)
+        presentation.slides.add_slide(presentation.slide_layouts[6])
+        self.deck = self.temp_dir / "deck.pptx"
+        presentation.save(self.deck)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_sequential_extraction(self):
+        for issues_only in (False, True):
+            with self.subTest(issues_only=issues_only):
+                expected = get_inventory_as_dict(self.deck, issues_only)
+                self.assertTrue(
+                    any(
+                        "overflow" in shape_dict
+                        for shapes in expected.values()
+                        for shape_dict in shapes.values()
+                    )
+                )
+                inventory = get_inventory_as_dict(self.deck, issues_only, jobs=2)
+                self.assertEqual(json.dumps(inventory), json.dumps(expected))
+
+    def test_keeps_shapes(self):
+        presentation = Presentation(str(self.deck))
+        inventory = extract_text_inventory(self.deck, presentation, jobs=2)
+        self.assertEqual(list(inventory), [f"slide-{i}" for i in range(6)])
+        self.assertIs(
+            inventory["slide-0"]["shape-0"].shape.part,
+            presentation.slides[0].part,
+        )
+
+
+if __name__ == "__main__":
+    main()
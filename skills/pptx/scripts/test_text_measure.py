@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Regression tests for memoized text measurement and wrapping.
+"""
+
+import random
+from unittest import TestCase, main
+
+from PIL import Image, ImageDraw, ImageFont
+from test_fonts import SOURCE_FONT
+from text_measure import TextMeasurer, measure_paragraphs, measurer
+
+# Pairs that fonts commonly kern, and words to build random text from
+KERNED = ["AV", "To", "WA", "Ty", "LT", "P.", "r,", "Yo"]
+WORDS = ["The", "quick", "AVATAR", "Today", "WAVE", "y", "", "(Type)", "été"]
+
+
+def reference_wrap(line, max_width_px, font):
+    """Wrap a line as the inventory did, measuring every candidate line."""
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    if not line:
+        return [""]
+    if draw.textlength(line, font=font) <= max_width_px:
+        return [line]
+    wrapped = []
+    current_line = ""
+    for word in line.split(" "):
+        test_line = current_line + (" " if current_line else "") + word
+        if draw.textlength(test_line, font=font) <= max_width_px:
+            current_line = test_line
+        else:
+            if current_line:
+                wrapped.append(current_line)
+            current_line = word
+    if current_line:
+        wrapped.append(current_line)
+    return wrapped
+
+
+class TestTextMeasurer(TestCase):
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.fonts = [ImageFont.load_default(), ImageFont.load_default(size=23)]
+        if SOURCE_FONT is not None:
+            self.fonts += [
+                ImageFont.truetype(str(SOURCE_FONT), size) for size in (9, 17)
+            ]
+
+    def random_line(self):
+        words = self.rng.choices(WORDS + KERNED, k=self.rng.randrange(1, 40))
+        return " ".join(words)
+
+    def test_widths_match_textlength(self):
+        draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        for font in self.fonts:
+            for text in KERNED + ["AVAWATo Ty", " leading  spaces "]:
+                with self.subTest(font=font.size, text=text):
+                    self.assertEqual(
+                        measurer(font)._append(
+                            *measurer(font)._append(0.0, None, text[:2]), text[2:]
+                        )[0],
+                        draw.textlength(text, font=font),
+                    )
+
+    def test_wraps_like_measuring_whole_lines(self):
+        for font in self.fonts:
+            exact = TextMeasurer(font)
+            exact.additive = False
+            for _ in range(150):
+                line = self.random_line()
+                width = self.rng.randrange(1, 400)
+                with self.subTest(font=font.size, line=line, width=width):
+                    expected = reference_wrap(line, width, font)
+                    self.assertEqual(measurer(font).wrap(line, width), expected)
+                    self.assertEqual(exact.wrap(line, width), expected)
+
+    def test_measure_paragraphs(self):
+        font = self.fonts[0]
+        paragraphs = [("Title", font), ("one two three\nfour", font), ("", font)]
+        self.assertEqual(
+            measure_paragraphs(paragraphs, 60),
+            [["Title"], ["one two", "three", "four"], [""]],
+        )
+        self.assertIs(measurer(font), measurer(font))
+
+
+if __name__ == "__main__":
+    main()
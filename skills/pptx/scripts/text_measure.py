@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Measure and wrap text for overflow estimation, reusing every measurement.
+
+Wrapping a line word by word and measuring the whole line so far after each
+word is quadratic in the line length, and measures the same words again for
+every shape. TextMeasurer measures each word once per font, and adds up line
+widths from the word widths instead, wrapping a line in one pass over its
+words.
+
+With Pillow's basic text layout, the width of a string is the sum of the
+widths of its pieces plus the kerning between the last character of one
+piece and the first character of the next. Kerning is measured once per
+character pair, so the sums are exactly what ImageDraw.textlength() returns
+for the whole string. With the Raqm layout, text shaping can change a
+string's width in ways that do not add up, so whole lines are measured
+(still once per distinct line).
+
+Usage:
+    lines = measurer(font).wrap("Some long paragraph text", max_width_px=200)
+    wrapped = measure_paragraphs([(text, font), ...], max_width_px=200)
+"""
+
+import weakref
+from typing import Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Measurements are taken as ImageDraw.textlength() on an RGB image takes them,
+# since the image mode can change the font's hinting
+_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+# Font -> TextMeasurer, dropped along with the font
+_measurers = weakref.WeakKeyDictionary()
+
+
+class TextMeasurer:
+    """Text widths and greedy line wrapping in one font."""
+
+    def __init__(self, font):
+        self.font = font
+        # Whether widths of pieces add up (plus kerning) to the whole width
+        self.additive = getattr(font, "layout_engine", None) != ImageFont.Layout.RAQM
+        # Text -> width, of words and (without additive widths) lines
+        self._widths = {}
+        # (character, character) -> kerning between them
+        self._kerning = {}
+
+    def width(self, text: str) -> float:
+        """Return the width of text in pixels, as ImageDraw.textlength()."""
+        width = self._widths.get(text)
+        if width is None:
+            width = self._widths[text] = _draw.textlength(text, font=self.font)
+        return width
+
+    def _kern(self, left: str, right: str) -> float:
+        """Return the kerning between two adjacent characters."""
+        pair = (left, right)
+        kerning = self._kerning.get(pair)
+        if kerning is None:
+            kerning = self._kerning[pair] = (
+                self.width(left + right) - self.width(left) - self.width(right)
+            )
+        return kerning
+
+    def _append(self, width: float, last: Optional[str], piece: str):
+        """Return (width, last character) of a text after appending a piece."""
+        if not piece:
+            return width, last
+        width += self.width(piece)
+        if last is not None:
+            width += self._kern(last, piece[0])
+        return width, piece[-1]
+
+    def wrap(self, line: str, max_width_px: float) -> List[str]:
+        """Wrap a line of text at spaces to fit within max_width_px.
+
+        Lines are filled greedily with words. A word wider than max_width_px
+        gets a line of its own. The space at each line break is dropped.
+
+        Returns:
+            list[str]: The wrapped lines ([""] for an empty line)
+        """
+        if not line:
+            return [""]
+        if not self.additive:
+            return self._wrap_measuring_lines(line, max_width_px)
+
+        words = line.split(" ")
+        width, last = 0.0, None
+        for i, word in enumerate(words):
+            if i:
+                width, last = self._append(width, last, " ")
+            width, last = self._append(width, last, word)
+        if width <= max_width_px:
+            return [line]
+
+        # Words of the current line, and (width, last character) of the line
+        wrapped = []
+        current: List[str] = []
+        width, last = 0.0, None
+        for word in words:
+            if current:
+                test = self._append(*self._append(width, last, " "), word)
+            else:
+                test = self._append(0.0, None, word)
+            if test[0] <= max_width_px:
+                if current or word:
+                    current.append(word)
+                width, last = test
+            else:
+                if current:
+                    wrapped.append(" ".join(current))
+                current = [word] if word else []
+                width, last = self._append(0.0, None, word)
+
+        if current:
+            wrapped.append(" ".join(current))
+        return wrapped
+
+    def _wrap_measuring_lines(self, line: str, max_width_px: float) -> List[str]:
+        """Wrap like wrap(), measuring every candidate line as a whole."""
+        if self.width(line) <= max_width_px:
+            return [line]
+
+        wrapped = []
+        current_line = ""
+        for word in line.split(" "):
+            test_line = current_line + (" " if current_line else "") + word
+            if self.width(test_line) <= max_width_px:
+                current_line = test_line
+            else:
+                if current_line:
+                    wrapped.append(current_line)
+                current_line = word
+
+        if current_line:
+            wrapped.append(current_line)
+        return wrapped
+
+
+def measurer(font) -> TextMeasurer:
+    """Return the shared TextMeasurer of a font."""
+    text_measurer = _measurers.get(font)
+    if text_measurer is None:
+        text_measurer = _measurers[font] = TextMeasurer(font)
+    return text_measurer
+
+
+def measure_paragraphs(
+    paragraphs: Iterable[Tuple[str, object]], max_width_px: float
+) -> List[List[str]]:
+    """Wrap paragraphs of text to fit within max_width_px.
+
+    Args:
+        paragraphs: (text, font) of each paragraph; line breaks in the text
+            start new lines
+        max_width_px: Available width in pixels
+
+    Returns:
+        list[list[str]]: The wrapped lines of each paragraph
+    """
+    return [
+        [
+            wrapped
+            for line in text.split("\n")
+            for wrapped in measurer(font).wrap(line, max_width_px)
+        ]
+        for text, font in paragraphs
+    ]
@@ -50,12 +50,20 @@ from inventory import extract_text_inventory
 from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
 
+# office.py, shared by the skills, is kept with the docx skill's ooxml scripts
+OFFICE_SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "docx" / "ooxml" / "scripts"
+if str(OFFICE_SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(OFFICE_SCRIPTS_DIR))
+
+from office import OfficeError, convert  # noqa: E402
+
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
 CONVERSION_DPI = 100  # DPI for PDF to image conversion
 MAX_COLS = 6  # Maximum number of columns
 DEFAULT_COLS = 5  # Default number of columns
 JPEG_QUALITY = 95  # JPEG compression quality
+PDF_TIMEOUT = 600  # Seconds allowed for converting to PDF
 
 # Grid layout constants
 GRID_PADDING = 20  # Padding between thumbnails
@@ -212,25 +220,12 @@ def convert_to_images(pptx_path, temp_dir, dpi):
     if hidden_slides:
         print(f"Hidden slides: {sorted(hidden_slides)}")
 
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
-
-    # Convert to PDF
+    # Convert to PDF (with OFFICE_SERVICE=on, on a warm soffice instance)
     print("Converting to PDF...")
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
+    try:
+        pdf_path = convert(pptx_path, temp_dir, "pdf", timeout=PDF_TIMEOUT)
+    except (OSError, OfficeError) as e:
+        raise RuntimeError(f"PDF conversion failed: {e}") from e
 
     # Convert PDF to images
     print(f"Converting to images at {dpi} DPI...")
@@ -2,6 +2,10 @@
 """
 Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
+
+A macro is run in a fresh soffice. With OFFICE_SERVICE=on, recalculation runs
+on the warm soffice instances of the conversion service instead (see office.py
+in the docx skill's ooxml/scripts).
 """
 
 import json
@@ -12,6 +16,13 @@ import platform
 from pathlib import Path
 from openpyxl import load_workbook
 
+# office.py, shared by the skills, is kept with the docx skill's ooxml scripts
+OFFICE_SCRIPTS_DIR = Path(__file__).resolve().parents[1] / 'docx' / 'ooxml' / 'scripts'
+if str(OFFICE_SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(OFFICE_SCRIPTS_DIR))
+
+from office import OfficeError, ServiceUnavailable, recalculate  # noqa: E402
+
 
 def setup_libreoffice_macro():
     """Setup LibreOffice macro for recalculation if not already configured"""
@@ -66,6 +77,28 @@ def recalc(filename, timeout=30):
     
     abs_path = str(Path(filename).absolute())
     
+    try:
+        recalculate(abs_path, timeout)
+    except (ServiceUnavailable, FileNotFoundError):
+        error = recalc_with_macro(abs_path, timeout)
+        if error:
+            return error
+    except TimeoutError:
+        return {'error': f'Recalculation took longer than {timeout} seconds'}
+    except OfficeError as e:
+        return {'error': str(e)}
+    
+    # Check for Excel errors in the recalculated file - scan ALL cells
+    return check_workbook(filename)
+
+
+def recalc_with_macro(abs_path, timeout):
+    """
+    Recalculate formulas by running the macro in a fresh soffice
+    
+    Returns:
+        dict with the error, or None on success
+    """
     if not setup_libreoffice_macro():
         return {'error': 'Failed to setup LibreOffice macro'}
     
@@ -97,8 +130,11 @@ def recalc(filename, timeout=30):
             return {'error': 'LibreOffice macro not configured properly'}
         else:
             return {'error': error_msg}
-    
-    # Check for Excel errors in the recalculated file - scan ALL cells
+    return None
+
+
+def check_workbook(filename):
+    """Report the Excel errors and the number of formulas in a workbook"""
     try:
         wb = load_workbook(filename, data_only=True)
         